@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# tylko app.core i app.utils: cli nie moze importowac PyQt6 (serwery bez ekranu,
+# szybki start); pilnuje tego test w tests/app/test_cli.py
+from app.core.bandwidth import BandwidthLimiter, parse_rate, shared_limiter
+from app.core.cancel import CancelToken
+from app.core.download import (
+    AUDIO_CONTAINERS,
+    AUDIO_SKIPPED,
+    DEFAULT_CONCURRENCY,
+    MAX_CONCURRENCY,
+    ProgressEvent,
+    default_concurrency,
+    download_audio,
+    download_audio_mp3,
+    download_video_mp4,
+)
+from app.core.download_archive import DEFAULT_EXTRACTOR, DownloadArchive, shared_archive
+from app.core.paths import get_ffmpeg_path
+from app.core.postprocess import PostprocessPool, shared_postprocess_pool
+from app.core.ytclient import PROFILES, YTClient, get_profile
+from app.utils.errors import CancelledError
+from app.utils.url import extract_video_id
+
+# pozycja do pobrania: url, id filmu (albo None)
+Job = Tuple[str, Optional[str]]
+
+
+# wypisuje zdarzenia jako linie json (jedna linia = jedno zdarzenie)
+# wspolny zamek, bo piszace watki pobieraja rownolegle
+class JsonReporter:
+
+    def __init__(self, out: IO[str]):
+        self._out = out
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields) -> None:
+        line = json.dumps({"event": event, "ts": round(time.time(), 3), **fields})
+        with self._lock:
+            self._out.write(line + "\n")
+            self._out.flush()
+
+
+# czyta url z argumentow, pliku (lub "-" = stdin); puste linie i # sa pomijane
+def read_urls(urls: Sequence[str], files: Sequence[str], stdin: IO[str]) -> List[str]:
+    out = list(urls)
+    for name in files:
+        if name == "-":
+            out.extend(_lines(stdin))
+        else:
+            with open(name, encoding="utf-8") as f:
+                out.extend(_lines(f))
+    return out
+
+
+def _lines(f: Iterable[str]) -> Iterator[str]:
+    for line in f:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+# rozwija playlisty do listy filmow (lista czytana leniwie, strona po stronie)
+# zwraca pozycje i liczbe playlist, ktorych nie udalo sie wczytac
+def expand(
+    urls: Sequence[str], yt: YTClient, report: JsonReporter
+) -> Tuple[List[Job], int]:
+    jobs: List[Job] = []
+    errors = 0
+    for url in urls:
+        if "list=" not in url:
+            jobs.append((url, extract_video_id(url)))
+            continue
+        opts = {"skip_download": True, "extract_flat": True}
+        try:
+            before = len(jobs)
+            for e in yt.iter_entries(url, opts):
+                vid = e.get("id")
+                if vid:
+                    jobs.append((f"https://www.youtube.com/watch?v={vid}", vid))
+            report.emit("playlist", url=url, count=len(jobs) - before)
+        except Exception as e:
+            errors += 1
+            report.emit("error", url=url, error=str(e))
+    return jobs, errors
+
+
+# pobiera pozycje w puli watkow; zwraca (gotowe, bledy, pominiete)
+# concurrency ogranicza etap sieci; z pula postprocess pozycja w konwersji mp3
+# zwalnia miejsce dla kolejnego pobierania
+def run_jobs(
+    jobs: Sequence[Job],
+    *,
+    output: str,
+    kind: str,
+    format_id: Optional[str],
+    concurrency: int,
+    yt: YTClient,
+    report: JsonReporter,
+    archive: Optional[DownloadArchive] = None,
+    cancel: Optional[CancelToken] = None,
+    limiter: Optional[BandwidthLimiter] = None,
+    postprocess: Optional[PostprocessPool] = None,
+) -> Tuple[int, int, int]:
+    # token partii: ctrl+c anuluje przez niego tokeny wszystkich zadan
+    cancel = cancel or CancelToken()
+    network = threading.Semaphore(concurrency)
+    todo: List[Tuple[int, str, Optional[str]]] = []
+    skipped = 0
+    done_keys = (
+        archive.done_keys((DEFAULT_EXTRACTOR, vid, kind) for _, vid in jobs if vid)
+        if archive is not None
+        else set()
+    )
+    for i, (url, vid) in enumerate(jobs):
+        if vid and (DEFAULT_EXTRACTOR, vid, kind) in done_keys:
+            skipped += 1
+            report.emit("skipped", index=i, url=url, reason="archive")
+        else:
+            todo.append((i, url, vid))
+
+    def one(i: int, url: str, vid: Optional[str]) -> bool:
+        report.emit("start", index=i, url=url, kind=kind)
+        # wlasny token zadania: pliki i procesy jednej pozycji, anulowanie partii
+        # przechodzi na wszystkie
+        token = cancel.child()
+
+        def progress(ev: ProgressEvent) -> None:
+            report.emit(
+                "progress",
+                index=i,
+                phase=ev.phase,
+                percent=round(ev.percent, 1),
+                downloaded=ev.downloaded,
+                total=ev.total,
+                speed=ev.speed,
+                eta=ev.eta,
+            )
+
+        while not network.acquire(timeout=0.1):
+            if cancel.is_set():
+                report.emit("cancelled", index=i, url=url)
+                return False
+        released = threading.Event()
+
+        def release_network() -> None:
+            if not released.is_set():
+                released.set()
+                network.release()
+
+        channel = limiter.channel() if limiter is not None else None
+        try:
+            if kind == "mp3":
+                mode = download_audio_mp3(
+                    yt,
+                    url,
+                    output,
+                    progress,
+                    token,
+                    bandwidth=channel,
+                    postprocess=postprocess,
+                    downloaded_cb=release_network,
+                )
+            elif kind in AUDIO_CONTAINERS:
+                mode = download_audio(
+                    yt,
+                    url,
+                    output,
+                    kind,
+                    progress,
+                    token,
+                    bandwidth=channel,
+                    postprocess=postprocess,
+                    downloaded_cb=release_network,
+                )
+            else:
+                mode = download_video_mp4(
+                    yt,
+                    url,
+                    output,
+                    format_id,
+                    progress,
+                    token,
+                    bandwidth=channel,
+                )
+        except CancelledError:
+            report.emit("cancelled", index=i, url=url)
+            return False
+        except Exception as e:
+            report.emit("failed", index=i, url=url, error=str(e))
+            return False
+        finally:
+            release_network()
+            if channel is not None:
+                channel.close()
+        # pozycja bez pobranego pliku nie trafia do archiwum
+        if archive is not None and vid and mode != AUDIO_SKIPPED:
+            try:
+                archive.add(DEFAULT_EXTRACTOR, vid, kind)
+            except Exception as e:
+                # plik juz jest na dysku: blad archiwum nie przerywa partii
+                report.emit(
+                    "error", index=i, url=url, error=f"Nie zapisano w archiwum: {e}"
+                )
+        report.emit("done", index=i, url=url, mode=mode)
+        return True
+
+    # watki czekajace na konwersje nie blokuja pobieran, stad zapas watkow
+    spare = postprocess.max_pending if postprocess is not None else 0
+    with ThreadPoolExecutor(max_workers=concurrency + spare) as pool:
+        futures = [pool.submit(one, *job) for job in todo]
+        try:
+            results = [f.result() for f in futures]
+        except KeyboardInterrupt:
+            # token przerywa trwajace zapytania i ffmpeg, oczekujace nie wystartuja
+            # (pliki .part zostaja - ponowne uruchomienie je dokonczy)
+            cancel.cancel()
+            for f in futures:
+                f.cancel()
+            raise
+    ok = sum(results)
+    return ok, len(results) - ok, skipped
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description="Pobieranie filmów i playlist bez interfejsu graficznego. "
+        "Postęp wypisywany jest jako linie JSON na stdout.",
+    )
+    p.add_argument("urls", nargs="*", help="linki do filmów lub playlist")
+    p.add_argument(
+        "-a",
+        "--batch-file",
+        action="append",
+        default=[],
+        metavar="PLIK",
+        help="plik z linkami, jeden na linię ('-' = stdin)",
+    )
+    p.add_argument("-o", "--output", default=".", help="folder docelowy")
+    p.add_argument(
+        "-t", "--type", choices=("mp4", "mp3", *AUDIO_CONTAINERS), default="mp4"
+    )
+    p.add_argument("-f", "--format", default=None, help="format_id dla mp4")
+    p.add_argument(
+        "-j",
+        "--concurrency",
+        type=int,
+        default=None,
+        help=f"równoległe pobrania (domyślnie {DEFAULT_CONCURRENCY}, "
+        f"maks. {MAX_CONCURRENCY})",
+    )
+    p.add_argument(
+        "--profile",
+        choices=tuple(PROFILES),
+        default=None,
+        help="profil pobierania: fragmenty dash/hls naraz, porcje http, bufor",
+    )
+    p.add_argument(
+        "-r",
+        "--limit-rate",
+        default=None,
+        metavar="LIMIT",
+        help="łączny limit prędkości wszystkich pobrań, np. 500K lub 5M (bajty/s)",
+    )
+    p.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="nie pomijaj i nie zapisuj pobranych w archiwum",
+    )
+    return p
+
+
+# punkt wejscia; zwraca kod wyjscia: 0 wszystko ok, 1 bledy pobierania, 2 uzycie
+def main(
+    argv: Optional[Sequence[str]] = None,
+    stdin: IO[str] = sys.stdin,
+    stdout: IO[str] = sys.stdout,
+) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    limiter = shared_limiter()
+    if args.limit_rate is not None:
+        try:
+            limiter.set_rate(parse_rate(args.limit_rate))
+        except ValueError:
+            parser.error(f"niepoprawny limit: {args.limit_rate}")
+    files = list(args.batch_file)
+    if not args.urls and not files and not stdin.isatty():
+        files.append("-")
+    report = JsonReporter(stdout)
+    try:
+        urls = read_urls(args.urls, files, stdin)
+    except OSError as e:
+        report.emit("error", error=str(e))
+        return 2
+    if not urls:
+        parser.print_usage(sys.stderr)
+        return 2
+
+    concurrency = args.concurrency or default_concurrency()
+    concurrency = max(1, min(concurrency, MAX_CONCURRENCY))
+    try:
+        yt = YTClient(ffmpeg_path=get_ffmpeg_path(), profile=get_profile(args.profile))
+        # archiwum w katalogu cache (brak uprawnien, uszkodzona baza)
+        archive = None if args.no_archive else shared_archive()
+    except Exception as e:
+        report.emit("error", error=str(e))
+        return 2
+
+    jobs, bad_lists = expand(urls, yt, report)
+    try:
+        ok, failed, skipped = run_jobs(
+            jobs,
+            output=args.output,
+            kind=args.type,
+            format_id=args.format,
+            concurrency=concurrency,
+            yt=yt,
+            report=report,
+            archive=archive,
+            limiter=limiter,
+            postprocess=(shared_postprocess_pool() if args.type != "mp4" else None),
+        )
+    except KeyboardInterrupt:
+        report.emit("interrupted")
+        return 130
+    failed += bad_lists
+    report.emit("summary", done=ok, failed=failed, skipped=skipped, total=len(jobs))
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
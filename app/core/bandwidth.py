@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Callable, Optional, Set
+
+# zmienna srodowiskowa z limitem dla calego procesu, np. "5M" (bajty/s)
+RATE_LIMIT_ENV = "JUSTDOWNIT_RATE_LIMIT"
+# ile sekund transferu moze pojsc "na zapas" po przerwie
+BURST_SECONDS = 0.5
+# kanal bez pobierania dluzej niz tyle sekund oddaje swoj udzial innym
+ACTIVE_WINDOW = 1.0
+# najdluzsza pojedyncza drzemka; miedzy nimi sprawdzane jest anulowanie
+_MAX_SLEEP = 0.1
+# waga pozycji, ktora uzytkownik oglada (pojedynczy film, zaznaczony wiersz)
+PRIORITY_WEIGHT = 4.0
+
+_SUFFIXES = {"k": 1_000, "m": 1_000_000, "g": 1_000_000_000}
+
+
+# zamienia zapis typu "500k" / "5M" / "1.5m" na bajty na sekunde
+def parse_rate(text: str) -> int:
+    text = text.strip().lower()
+    if text.endswith("/s"):
+        text = text[:-2]
+    text = text.rstrip("b")
+    mult = _SUFFIXES.get(text[-1:], 1) if text else 1
+    if mult != 1:
+        text = text[:-1]
+    return max(0, int(float(text or 0) * mult))
+
+
+# kanal ogranicznika dla jednego pobierania; wlasny kubelek zetonow, ktorego
+# tempo to udzial w limicie globalnym proporcjonalny do wagi
+class BandwidthChannel:
+
+    def __init__(self, limiter: BandwidthLimiter, weight: float):
+        self._limiter = limiter
+        self.weight = max(weight, 0.01)
+        self._ready_at: Optional[float] = None
+        self.last_used: Optional[float] = None
+
+    def set_weight(self, weight: float) -> None:
+        self._limiter.set_weight(self, weight)
+
+    # pobiera zetony za n bajtow; przy dlugu czeka (w krotkich odcinkach,
+    # zeby anulowanie nie czekalo na koniec drzemki)
+    def throttle(self, nbytes: int, cancel_cb: Optional[Callable[[], bool]] = None):
+        wait = self._limiter._charge(self, nbytes)
+        deadline = self._limiter._clock() + wait
+        while wait > 0:
+            if cancel_cb and cancel_cb():
+                return
+            self._limiter._sleep(min(wait, _MAX_SLEEP))
+            wait = deadline - self._limiter._clock()
+
+    def close(self) -> None:
+        self._limiter._release(self)
+
+    def __enter__(self) -> BandwidthChannel:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ogranicznik przepustowosci wspolny dla wszystkich pobran w procesie
+# limit (rate, bajty/s) dzielony jest miedzy aktywne kanaly wedlug wag, wiec
+# suma nie przekracza limitu niezaleznie od liczby workerow; kanal ktory nie
+# pobiera (np. ffmpeg) po ACTIVE_WINDOW przestaje zabierac udzial
+# rate 0 = bez limitu
+class BandwidthLimiter:
+
+    def __init__(
+        self,
+        rate: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._rate = max(0, int(rate))
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._channels: Set[BandwidthChannel] = set()
+
+    @property
+    def rate(self) -> int:
+        return self._rate
+
+    # zmienia limit w trakcie pobierania (kolejne bloki juz wedlug nowego)
+    def set_rate(self, rate: int) -> None:
+        with self._lock:
+            self._rate = max(0, int(rate))
+
+    # otwiera kanal dla nowego pobierania
+    def channel(self, weight: float = 1.0) -> BandwidthChannel:
+        ch = BandwidthChannel(self, weight)
+        with self._lock:
+            self._channels.add(ch)
+        return ch
+
+    def set_weight(self, ch: BandwidthChannel, weight: float) -> None:
+        with self._lock:
+            ch.weight = max(weight, 0.01)
+
+    # liczba otwartych kanalow
+    def channel_count(self) -> int:
+        with self._lock:
+            return len(self._channels)
+
+    def _release(self, ch: BandwidthChannel) -> None:
+        with self._lock:
+            self._channels.discard(ch)
+
+    # udzial kanalu w limicie: jego waga wzgledem wag kanalow aktywnych
+    def _share(self, ch: BandwidthChannel, now: float) -> float:
+        total = ch.weight
+        for other in self._channels:
+            if other is ch or other.last_used is None:
+                continue
+            if now - other.last_used <= ACTIVE_WINDOW:
+                total += other.weight
+        return self._rate * ch.weight / total
+
+    # dolicza n bajtow do kanalu i zwraca ile sekund trzeba odczekac
+    # kanal pamieta chwile, w ktorej splaci wszystkie pobrane bajty (ready_at);
+    # po przerwie moze wyprzedzic zegar najwyzej o BURST_SECONDS, a zmiana
+    # limitu dotyczy tylko kolejnych bajtow
+    def _charge(self, ch: BandwidthChannel, nbytes: int) -> float:
+        with self._lock:
+            now = self._clock()
+            ch.last_used = now
+            if self._rate <= 0:
+                ch._ready_at = None
+                return 0.0
+            rate = self._share(ch, now)
+            start = (
+                now if ch._ready_at is None else max(ch._ready_at, now - BURST_SECONDS)
+            )
+            ch._ready_at = start + nbytes / rate
+            return max(ch._ready_at - now, 0.0)
+
+
+_shared_limiter: Optional[BandwidthLimiter] = None
+_shared_lock = threading.Lock()
+
+
+# zwraca ogranicznik wspolny dla procesu (limit startowy ze zmiennej srodowiskowej)
+def shared_limiter() -> BandwidthLimiter:
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            try:
+                rate = parse_rate(os.getenv(RATE_LIMIT_ENV, ""))
+            except ValueError:
+                rate = 0
+            _shared_limiter = BandwidthLimiter(rate)
+        return _shared_limiter
@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import glob
+import logging
+import os
+import socket
+import subprocess  # nosec B404 - tylko sprawdzenie klasy Popen yt-dlp
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Set
+
+from app.utils.errors import CancelledError
+
+# twarde przerywanie (shutdown gniazda odpowiedzi, zabijanie procesow yt-dlp)
+# korzysta z wewnetrznej budowy yt-dlp i bibliotek http; jest wykrywane w
+# trakcie dzialania, a gdy czegos brakuje zostaje anulowanie w hookach postepu
+# i jednorazowe ostrzezenie w logu
+# atrybuty prowadzace od odpowiedzi yt-dlp do gniazda; pokrywa obsluge przez
+# requests/urllib3 (fp -> _fp -> fp -> raw -> _sock) i przez urllib
+_SOCKET_ATTRS = ("fp", "_fp", "raw", "_sock")
+_SOCKET_DEPTH = 8
+# ile czekac az zabity proces zniknie
+_KILL_WAIT = 2.0
+
+_local = threading.local()
+_log = logging.getLogger(__name__)
+_warned: Set[str] = set()
+_warn_lock = threading.Lock()
+
+
+# zasoby jednego wywolania yt-dlp: otwarte odpowiedzi http i procesy potomne
+# (slabe referencje - zakonczone i zwolnione obiekty same znikaja)
+class _Scope:
+
+    def __init__(self, token: CancelToken) -> None:
+        self.token = token
+        self.responses: weakref.WeakSet = weakref.WeakSet()
+        self.processes: weakref.WeakSet = weakref.WeakSet()
+
+
+# token anulowania jednego zadania pobierania
+# wywolanie tokenu zwraca czy anulowano, wiec pasuje wszedzie tam, gdzie
+# oczekiwany jest cancel_cb; dodatkowo cancel() przerywa od razu zablokowane
+# odczyty http (shutdown gniazda) i zabija procesy ffmpeg uruchomione przez
+# yt-dlp, a na zyczenie usuwa pliki czesciowe zadania
+class CancelToken:
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._scopes: Set[_Scope] = set()
+        self._remove_partial = False
+        # pliki zapisywane przez zadanie i wyjscia zabitych procesow ffmpeg
+        self._files: Set[str] = set()
+        self._outputs: Set[str] = set()
+        self._started: Set[str] = set()
+        # tokeny zadan powiazane z tym (slabe referencje - zakonczone znikaja)
+        self._children: weakref.WeakSet = weakref.WeakSet()
+
+    def __call__(self) -> bool:
+        return self._event.is_set()
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    # zglasza anulowanie; wolne z kazdego watku (np. z gui)
+    def cancel(self, remove_partial: bool = False) -> None:
+        with self._lock:
+            self._event.set()
+            self._remove_partial = self._remove_partial or remove_partial
+            responses = [r for s in self._scopes for r in list(s.responses)]
+            processes = [p for s in self._scopes for p in list(s.processes)]
+            children = list(self._children)
+        for child in children:
+            child.cancel(remove_partial)
+        for resp in responses:
+            _abort_response(resp)
+        for proc in processes:
+            self._kill(proc)
+
+    # nowy token jednego zadania z partii: ma wlasne zakresy i pliki, a cancel()
+    # tego tokenu anuluje tez wszystkie jego dzieci
+    def child(self) -> CancelToken:
+        token = CancelToken()
+        with self._lock:
+            cancelled = self._event.is_set()
+            if not cancelled:
+                self._children.add(token)
+        if cancelled:
+            token.cancel(self._remove_partial)
+        return token
+
+    # rzuca CancelledError, jesli zadanie anulowano
+    def check(self) -> None:
+        if self._event.is_set():
+            raise CancelledError("Pobieranie anulowane przez użytkownika.")
+
+    # usuwa pliki czesciowe, jesli anulowano z remove_partial; wolane w watku
+    # zadania, kiedy yt-dlp i ffmpeg juz nic nie pisza
+    def cleanup(self) -> None:
+        with self._lock:
+            if not (self._event.is_set() and self._remove_partial):
+                return
+            files, self._files = self._files, set()
+            outputs, self._outputs = self._outputs, set()
+        for path in sorted(files | outputs):
+            _remove(path)
+            # fragmenty dash/hls: <plik>.part-Frag<n>
+            for frag in glob.glob(glob.escape(path) + "-Frag*"):
+                _remove(frag)
+
+    # wiaze token z instancja yt-dlp na czas jednego wywolania; wyjatek po
+    # anulowaniu (np. DownloadError po zabitym ffmpeg) staje sie CancelledError
+    # zapytania http tej instancji trafiaja do zakresu tokenu, a z modulem
+    # yt_dlp (gdy jego Popen da sie sledzic) takze procesy uruchomione
+    # w biezacym watku, wiec cancel() przerywa je od razu
+    @contextmanager
+    def bind(self, ydl: Any, yt_dlp: Any = None) -> Iterator[None]:
+        self.check()
+        scope = _Scope(self)
+        hard = yt_dlp is not None
+        popen = _trackable_popen(yt_dlp) if hard else None
+        with self._lock:
+            self._scopes.add(scope)
+        previous = getattr(_local, "scope", None)
+        _local.scope = scope
+        if hard:
+            _track_urlopen(ydl, scope)
+        if popen is not None:
+            _popen_tracking.acquire(popen)
+        try:
+            yield
+        except BaseException as e:
+            if not self._event.is_set():
+                raise
+            self.cleanup()
+            if isinstance(e, CancelledError):
+                raise
+            raise CancelledError("Pobieranie anulowane przez użytkownika.") from e
+        finally:
+            _local.scope = previous
+            if popen is not None:
+                _popen_tracking.release(popen)
+            if hard:
+                vars(ydl).pop("urlopen", None)
+            with self._lock:
+                self._scopes.discard(scope)
+
+    # hook postepu yt-dlp (przekazywany w opcjach wywolania): zapamietuje pliki,
+    # ktore zadanie samo zapisuje, i przerywa pobieranie po anulowaniu;
+    # gotowy plik jest nasz tylko wtedy, gdy wczesniej byl pobierany (plik
+    # pobrany w poprzednim uruchomieniu yt-dlp zglasza od razu jako finished)
+    def progress_hook(self, d: dict) -> None:
+        name = d.get("filename") or ""
+        tmp = d.get("tmpfilename")
+        with self._lock:
+            if tmp:
+                self._files.add(tmp)
+                if name:
+                    self._started.add(name)
+                    self._files.add(name + ".ytdl")
+            elif d.get("status") == "finished" and name in self._started:
+                self._files.add(name)
+        self.check()
+
+    def _track_response(self, scope: _Scope, resp: Any) -> None:
+        if _response_socket(resp) is None:
+            _warn_once(
+                "socket",
+                "Anulowanie: brak gniazda pod odpowiedzią %s, przerwanie poczeka na "
+                "koniec odczytu.",
+                type(resp).__name__,
+            )
+        with self._lock:
+            cancelled = self._event.is_set()
+            if not cancelled:
+                scope.responses.add(resp)
+        if cancelled:
+            _abort_response(resp)
+            self.check()
+
+    def _track_process(self, scope: _Scope, proc: Any) -> None:
+        with self._lock:
+            cancelled = self._event.is_set()
+            if not cancelled:
+                scope.processes.add(proc)
+        if cancelled:
+            self._kill(proc)
+
+    # zabija proces; plik wyjsciowy ffmpeg (ostatni argument, yt-dlp dodaje
+    # przedrostek "file:") jest czesciowy - zapamietany przed zabiciem, zeby
+    # sprzatanie w watku zadania go nie minelo
+    def _kill(self, proc: Any) -> None:
+        if proc.poll() is not None:
+            return
+        args = proc.args if isinstance(proc.args, (list, tuple)) else []
+        if args and os.path.basename(str(args[0])).lower().startswith("ffmpeg"):
+            out = str(args[-1])
+            with self._lock:
+                self._outputs.add(out[5:] if out.startswith("file:") else out)
+        try:
+            proc.kill()
+            proc.wait(timeout=_KILL_WAIT)
+        except Exception:
+            pass
+
+
+# zwraca token, jesli cancel_cb nim jest (zwykly callback daje tylko
+# anulowanie kooperacyjne w hookach)
+def as_token(cancel_cb: Optional[Callable[[], bool]]) -> Optional[CancelToken]:
+    return cancel_cb if isinstance(cancel_cb, CancelToken) else None
+
+
+# gniazdo pod odpowiedzia yt-dlp (prywatne atrybuty http.client/urllib3)
+# albo None, gdy budowa odpowiedzi jest inna
+def _response_socket(resp: Any) -> Optional[socket.socket]:
+    obj = resp
+    for _ in range(_SOCKET_DEPTH):
+        if isinstance(obj, socket.socket):
+            return obj
+        nxt = None
+        for attr in _SOCKET_ATTRS:
+            nxt = getattr(obj, attr, None)
+            if nxt is not None:
+                break
+        if nxt is None:
+            return None
+        obj = nxt
+    return None
+
+
+# przerywa odczyt z odpowiedzi: shutdown gniazda budzi watek zablokowany w recv
+def _abort_response(resp: Any) -> None:
+    sock = _response_socket(resp)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    try:
+        resp.close()
+    except Exception:
+        pass
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# ostrzezenie o braku twardego przerywania, raz na proces dla danego klucza
+def _warn_once(key: str, msg: str, *args: Any) -> None:
+    with _warn_lock:
+        if key in _warned:
+            return
+        _warned.add(key)
+    _log.warning(msg, *args)
+
+
+# klasa Popen yt-dlp, jesli da sie sledzic tworzone przez nia procesy
+# (podklasa subprocess.Popen z wlasnym __init__), inaczej None z ostrzezeniem
+def _trackable_popen(yt_dlp: Any) -> Optional[type]:
+    popen = getattr(getattr(yt_dlp, "utils", None), "Popen", None)
+    if (
+        isinstance(popen, type)
+        and issubclass(popen, subprocess.Popen)
+        and callable(vars(popen).get("__init__"))
+    ):
+        return popen
+    _warn_once(
+        "popen",
+        "Anulowanie: yt_dlp.utils.Popen nie pozwala śledzić procesów, przerwanie "
+        "poczeka na koniec ffmpeg.",
+    )
+    return None
+
+
+# na czas powiazania podmienia metode urlopen samej instancji (klasa YoutubeDL
+# zostaje nietknieta): anulowanie jest sprawdzane przed kazdym zapytaniem
+# (ekstrakcja, pobieranie, fragmenty), a odpowiedz trafia do zakresu
+def _track_urlopen(ydl: Any, scope: _Scope) -> None:
+    urlopen = ydl.urlopen
+
+    def wrapper(req):
+        scope.token.check()
+        resp = urlopen(req)
+        scope.token._track_response(scope, resp)
+        return resp
+
+    ydl.urlopen = wrapper
+
+
+# sledzenie procesow yt_dlp.utils.Popen (ffmpeg, runtime js): konstruktor jest
+# podmieniony tylko dopoki jakis token jest powiazany, proces trafia do zakresu
+# tokenu z watku, ktory go uruchomil
+class _PopenTracking:
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._users = 0
+        self._original: Optional[Callable[..., None]] = None
+
+    def acquire(self, popen_cls: type) -> None:
+        with self._lock:
+            if self._users == 0:
+                self._original = popen_cls.__init__
+                popen_cls.__init__ = _cancel_aware_init(self._original)
+            self._users += 1
+
+    def release(self, popen_cls: type) -> None:
+        with self._lock:
+            self._users -= 1
+            if self._users == 0 and self._original is not None:
+                popen_cls.__init__ = self._original
+                self._original = None
+
+
+_popen_tracking = _PopenTracking()
+
+
+def _cancel_aware_init(init: Callable[..., None]) -> Callable[..., None]:
+    def wrapper(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        scope = getattr(_local, "scope", None)
+        if scope is not None:
+            scope.token._track_process(scope, self)
+
+    return wrapper
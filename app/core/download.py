@@ -1,37 +1,324 @@
 from __future__ import annotations
 
-from typing import Callable, Optional
+import os
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
 
+from app.core.bandwidth import BandwidthChannel
+from app.core.cancel import as_token
+from app.core.ffmpeg_caps import FFmpegCaps, encoder_args, try_ffmpeg_caps
 from app.core.paths import outtmpl_for
-from app.core.ytclient import YTClient
+from app.core.postprocess import PostprocessPool, mp3_args, transcode, wait_result
+from app.core.ytclient import DownloadProfile, YTClient
 from app.utils.errors import CancelledError
 
+# etapy pobierania raportowane w ProgressEvent
+PHASE_DOWNLOADING = "downloading"  # transfer pliku (lub jednego ze strumieni)
+PHASE_FINISHED = "finished"  # plik pobrany w calosci
+PHASE_POSTPROCESSING = "postprocessing"  # ffmpeg (sklejanie, remux, mp3)
+
+# domyslna maksymalna czestotliwosc zdarzen postepu (na sekunde)
+DEFAULT_PROGRESS_HZ = 10.0
+
+# domyslna liczba rownoleglych pobran; kazde pobieranie to osobne polaczenie
+# i przy krotkich filmach czas startu (ekstrakcja) dominuje nad transferem
+DEFAULT_CONCURRENCY = 3
+MAX_CONCURRENCY = 8
+CONCURRENCY_ENV = "JUSTDOWNIT_CONCURRENCY"
+
+
+# zwraca domyslna liczbe rownoleglych pobran (mozna nadpisac zmienna srodowiskowa)
+def default_concurrency() -> int:
+    try:
+        value = int(os.getenv(CONCURRENCY_ENV, DEFAULT_CONCURRENCY))
+    except ValueError:
+        value = DEFAULT_CONCURRENCY
+    return max(1, min(value, MAX_CONCURRENCY))
+
+
+# zdarzenie postepu pobierania
+class ProgressEvent(NamedTuple):
+    phase: str
+    downloaded: int  # bajty pobrane
+    total: int  # bajty calkowite (0 gdy nieznane)
+    speed: float = 0.0  # bajty na sekunde
+    eta: Optional[int] = None  # sekundy do konca
+    postprocessor: str = ""  # nazwa postprocesora w etapie postprocessing
+    filename: str = ""  # plik zapisywany przez yt-dlp (.part w trakcie pobierania)
+
+    # procent postepu 0..100 (0 gdy rozmiar nieznany)
+    @property
+    def percent(self) -> float:
+        if self.phase == PHASE_FINISHED:
+            return 100.0
+        return (self.downloaded / self.total * 100.0) if self.total else 0.0
+
+
 # definicja typow dla callbackow
-# progressCb przyjmuje procent postepu, liczbe pobranych bajtow i calkowita liczbe bajtow
+# progressCb dostaje ProgressEvent, juz ograniczone do max_rate na sekunde
 # CancelCb to funkcja ktora zwraca bool czy anulowac pobieranie
-ProgressCb = Callable[[float, int, int], None]  # percent, downloaded, total
+ProgressCb = Callable[[ProgressEvent], None]
 CancelCb = Callable[[], bool]
 
 
+# ogranicza czestotliwosc zdarzen postepu; posrednie zdarzenia sa pomijane
+# (kazde niesie stan skumulowany), zmiana etapu przechodzi zawsze
+class ProgressThrottle:
+
+    def __init__(
+        self,
+        max_rate: float = DEFAULT_PROGRESS_HZ,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self._clock = clock
+        self._last_at: Optional[float] = None
+        self._last_phase: Optional[str] = None
+
+    # zwraca True jesli zdarzenie nalezy przekazac dalej
+    def offer(self, event: ProgressEvent) -> bool:
+        now = self._clock()
+        due = (
+            event.phase != self._last_phase
+            or event.phase != PHASE_DOWNLOADING
+            or (event.total and event.downloaded >= event.total)
+            or self._last_at is None
+            or now - self._last_at >= self.interval
+        )
+        if due:
+            self._last_at = now
+            self._last_phase = event.phase
+        return bool(due)
+
+
+# sposob przygotowania pliku mp4 zwracany przez download_video_mp4
+MP4_REMUX = "remux"  # tylko kopiowanie strumieni do kontenera mp4
+MP4_TRANSCODE = "transcode"  # ffmpeg koduje co najmniej jeden strumien
+MP4_AUTO = "auto"  # kodeki nieznane, ffmpeg sam dobiera kodowanie do mp4
+
+# kodeki ktore mozna skopiowac do mp4 bez przekodowania
+MP4_VIDEO_CODECS: Tuple[str, ...] = ("avc1", "h264", "hev1", "hvc1", "av01")
+MP4_AUDIO_CODECS: Tuple[str, ...] = ("mp4a", "aac", "mp3")
+# kodery dla strumieni, ktorych nie da sie skopiowac do mp4 (od najlepszego;
+# mpeg4 i aac sa wbudowane w kazdy ffmpeg)
+MP4_VIDEO_ENCODERS: Tuple[str, ...] = ("libx264", "mpeg4")
+MP4_AUDIO_ENCODERS: Tuple[str, ...] = ("aac",)
+
+# domyslny wybor formatu: najlepsze video mp4 z audio m4a
+DEFAULT_MP4_FORMAT = "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]"
+
+# tryb audio mp3 (zawsze kodowanie) i sposob przygotowania pliku audio
+# zwracany przez download_audio
+AUDIO_MP3 = "mp3"
+AUDIO_COPY = "copy"  # strumien skopiowany do kontenera bez dekodowania
+AUDIO_TRANSCODE = "transcode"  # kodek zrodla nie pasuje do kontenera
+AUDIO_SKIPPED = "skipped"  # yt-dlp nie zglosil zadnego pobranego pliku
+
+
+# kontener audio: kodeki zrodla, ktore mozna do niego skopiowac, muxer ffmpeg,
+# kodery gdy zrodlo nie pasuje (w kolejnosci preferencji, wybierany pierwszy
+# dostepny w binarce ffmpeg), bitrate i wybor formatu preferujacy pasujace zrodlo
+class AudioContainer(NamedTuple):
+    codecs: Tuple[str, ...]
+    muxer: str
+    encoders: Tuple[str, ...]
+    bitrate: str
+    format: str
+
+
+AUDIO_CONTAINERS: Dict[str, AudioContainer] = {
+    "m4a": AudioContainer(
+        ("mp4a", "aac"),
+        "mp4",
+        ("aac",),
+        "256k",
+        "bestaudio[acodec^=mp4a]/bestaudio/best",
+    ),
+    "opus": AudioContainer(
+        ("opus",),
+        "opus",
+        ("libopus", "opus"),
+        "160k",
+        "bestaudio[acodec=opus]/bestaudio/best",
+    ),
+    "ogg": AudioContainer(
+        ("opus", "vorbis"),
+        "ogg",
+        ("libopus", "libvorbis", "opus", "vorbis"),
+        "160k",
+        "bestaudio[acodec=opus]/bestaudio[acodec=vorbis]/bestaudio/best",
+    ),
+}
+
+# opcje audio na liscie jakosci: format_id "bestaudio" to mp3,
+# "bestaudio:<kontener>" to zapis bez przekodowania
+AUDIO_OPTIONS: Tuple[Tuple[str, str], ...] = (
+    ("bestaudio", "Tylko audio (MP3)"),
+    ("bestaudio:m4a", "Audio M4A (bez przekodowania)"),
+    ("bestaudio:opus", "Audio Opus (bez przekodowania)"),
+    ("bestaudio:ogg", "Audio OGG (bez przekodowania)"),
+)
+
+
+# typ pliku dla format_id z listy jakosci: "mp4", "mp3" albo kontener audio
+def kind_for_format(format_id: Optional[str]) -> str:
+    if not format_id or not format_id.startswith("bestaudio"):
+        return "mp4"
+    container = format_id.partition(":")[2]
+    return container if container in AUDIO_CONTAINERS else AUDIO_MP3
+
+
+# decyduje czy strumien audio mozna skopiowac do kontenera; zwraca tryb
+# i argumenty ffmpeg; caps (mozliwosci binarki) wybiera dostepny koder
+def plan_audio(
+    container: str, acodec: Optional[str], caps: Optional[FFmpegCaps] = None
+) -> Tuple[str, List[str]]:
+    spec = AUDIO_CONTAINERS[container]
+    if acodec and acodec.lower().startswith(spec.codecs):
+        return AUDIO_COPY, ["-vn", "-c:a", "copy", "-f", spec.muxer]
+    encode = encoder_args("a", spec.encoders, caps)
+    return AUDIO_TRANSCODE, ["-vn", *encode, "-b:a", spec.bitrate, "-f", spec.muxer]
+
+
 # funkcja pomocnicza tworzaca hook do sledzenia postepu i obslugi anulowania
-def _hook(progress_cb: Optional[ProgressCb], cancel_cb: Optional[CancelCb]):
+# anulowanie sprawdzane jest przy kazdym wywolaniu, postep najwyzej max_rate/s
+# z kanalem bandwidth hook dolicza nowe bajty do ogranicznika przepustowosci;
+# yt-dlp wola hook po kazdym bloku, wiec drzemka tutaj opoznia kolejny odczyt
+def _hook(
+    progress_cb: Optional[ProgressCb],
+    cancel_cb: Optional[CancelCb],
+    throttle: Optional[ProgressThrottle] = None,
+    bandwidth: Optional[BandwidthChannel] = None,
+):
+    throttle = throttle or ProgressThrottle()
+    seen: dict = {}  # plik -> bajty juz doliczone do ogranicznika
+
     def progress_hook(d: dict):
         # jesli callback anulowania zwroci True to przerwij pobieranie
         if cancel_cb and cancel_cb():
             raise CancelledError("Pobieranie anulowane przez użytkownika.")
         # sprawdz status przekazany przez yt-dlp
-        if d.get("status") == "downloading":
-            downloaded = int(d.get("downloaded_bytes") or 0)
-            total = int(d.get("total_bytes") or d.get("total_bytes_estimate") or 0)
-            pct = (downloaded / total * 100.0) if total else 0.0
-            # jesli podano callback postepu to wywolaj go
-            if progress_cb:
-                progress_cb(pct, downloaded, total)
+        status = d.get("status")
+        if bandwidth is not None and status == PHASE_DOWNLOADING:
+            name = d.get("tmpfilename") or d.get("filename") or ""
+            done = int(d.get("downloaded_bytes") or 0)
+            delta = done - seen.get(name, 0)
+            if delta > 0:
+                seen[name] = done
+                bandwidth.throttle(delta, cancel_cb)
+        if not progress_cb or status not in (PHASE_DOWNLOADING, PHASE_FINISHED):
+            return
+        downloaded = int(d.get("downloaded_bytes") or 0)
+        total = int(d.get("total_bytes") or d.get("total_bytes_estimate") or 0)
+        if status == PHASE_FINISHED:
+            downloaded = total = downloaded or total
+        eta = d.get("eta")
+        event = ProgressEvent(
+            phase=status,
+            downloaded=downloaded,
+            total=total,
+            speed=float(d.get("speed") or 0.0),
+            eta=int(eta) if eta is not None else None,
+            filename=d.get("tmpfilename") or d.get("filename") or "",
+        )
+        if throttle.offer(event):
+            progress_cb(event)
 
     return progress_hook
 
 
+# hook postprocesorow yt-dlp: zglasza etap postprocessing i pozwala go anulowac
+def _pp_hook(progress_cb: Optional[ProgressCb], cancel_cb: Optional[CancelCb]):
+    def postprocessor_hook(d: dict):
+        if cancel_cb and cancel_cb():
+            raise CancelledError("Pobieranie anulowane przez użytkownika.")
+        if progress_cb and d.get("status") == "started":
+            progress_cb(
+                ProgressEvent(
+                    phase=PHASE_POSTPROCESSING,
+                    downloaded=0,
+                    total=0,
+                    postprocessor=str(d.get("postprocessor") or ""),
+                )
+            )
+
+    return postprocessor_hook
+
+
+# czy kodek moze trafic do mp4 bez kodowania ("none" = brak strumienia)
+def _mp4_compatible(codec: str, known: Sequence[str]) -> bool:
+    if codec == "none":
+        return True
+    return codec.lower().startswith(tuple(known))
+
+
+# kodek strumienia ("vcodec"/"acodec") w formatach wybranych przez yt-dlp;
+# "none" gdy zaden format go nie ma, None gdy yt-dlp nie zna kodeka
+def _stream_codec(selected: Sequence[dict], key: str) -> Optional[str]:
+    codecs = [f.get(key) for f in selected]
+    for codec in codecs:
+        if codec and codec != "none":
+            return codec
+    return "none" if codecs and all(c == "none" for c in codecs) else None
+
+
+# formaty wybrane przez yt-dlp: skladowe przy sklejaniu albo jeden format
+def selected_formats(info: Optional[dict]) -> List[dict]:
+    if not info:
+        return []
+    return list(info.get("requested_formats") or [info])
+
+
+# decyduje czy wystarczy remux, czy trzeba kodowac; zwraca tryb i argumenty ffmpeg
+# dla przekodowania (strumienie zgodne z mp4 i tak sa kopiowane, pozostale
+# koduje najlepszy koder dostepny wedlug caps, bez caps - domyslny ffmpeg)
+# nieznany kodek (albo brak formatow) daje MP4_AUTO bez argumentow
+def plan_mp4(
+    selected: Sequence[dict], caps: Optional[FFmpegCaps] = None
+) -> Tuple[str, List[str]]:
+    vcodec = _stream_codec(selected, "vcodec")
+    acodec = _stream_codec(selected, "acodec")
+    if vcodec is None or acodec is None:
+        return MP4_AUTO, []
+    copy_video = _mp4_compatible(vcodec, MP4_VIDEO_CODECS)
+    copy_audio = _mp4_compatible(acodec, MP4_AUDIO_CODECS)
+    if copy_video and copy_audio:
+        return MP4_REMUX, []
+    args: List[str] = []
+    if copy_video:
+        args += ["-c:v", "copy"]
+    elif caps is not None:
+        args += encoder_args("v", MP4_VIDEO_ENCODERS, caps)
+    if copy_audio:
+        args += ["-c:a", "copy"]
+    elif caps is not None:
+        args += encoder_args("a", MP4_AUDIO_ENCODERS, caps)
+    return MP4_TRANSCODE, args
+
+
+# opcje postprocesingu yt-dlp dla trybu mp4
+def _mp4_pipeline(mode: str, pp_args: List[str]) -> Dict[str, Any]:
+    if mode == MP4_REMUX:
+        return {
+            "merge_output_format": "mp4",  # sklejanie przez kopiowanie strumieni
+            # zmienia tylko kontener, pomijany gdy plik juz jest mp4
+            "postprocessors": [{"key": "FFmpegVideoRemuxer", "preferedformat": "mp4"}],
+        }
+    # mkv przyjmie dowolne kodeki, do mp4 konwertujemy dopiero na koncu
+    # (plik juz w mp4 konwerter pomija)
+    return {
+        "merge_output_format": "mkv",
+        "postprocessors": [{"key": "FFmpegVideoConvertor", "preferedformat": "mp4"}],
+        "postprocessor_args": {"videoconvertor": pp_args},
+    }
+
+
 # funkcja do pobierania wideo w formacie mp4
+# tryb (remux/przekodowanie) jest ustalany po wyborze formatu przez yt-dlp,
+# na podstawie kodekow faktycznie wybranych formatow
+# profile nadpisuje profil pobierania klienta (fragmenty, porcje, bufor)
+# bandwidth to kanal wspolnego ogranicznika przepustowosci (None = bez limitu)
+# zwraca MP4_REMUX, MP4_TRANSCODE albo MP4_AUTO
 def download_video_mp4(
     yt: YTClient,
     url: str,
@@ -39,40 +326,223 @@ def download_video_mp4(
     format_id: Optional[str] = None,
     progress_cb: Optional[ProgressCb] = None,
     cancel_cb: Optional[CancelCb] = None,
-):
+    progress_hz: float = DEFAULT_PROGRESS_HZ,
+    profile: Optional[DownloadProfile] = None,
+    bandwidth: Optional[BandwidthChannel] = None,
+) -> str:
     # jesli nie podano formatu to uzyj najlepszego video mp4 z audio
-    fmt = format_id or "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]"
+    fmt = format_id or DEFAULT_MP4_FORMAT
     opts = {
         "format": fmt,
-        "recode_video": "mp4",  # wymus konwersje do mp4
-        "merge_output_format": "mp4",  # format wynikowy mp4
         "outtmpl": outtmpl_for(output_dir),  # sciezka do pliku wynikowego
-        "progress_hooks": [_hook(progress_cb, cancel_cb)],
+        "progress_hooks": [
+            _hook(progress_cb, cancel_cb, ProgressThrottle(progress_hz), bandwidth)
+        ],
+        "postprocessor_hooks": [_pp_hook(progress_cb, cancel_cb)],
         "restrictfilenames": True,  # bezpieczne nazwy plikow
+        "continuedl": True,  # dokancza istniejace pliki .part (http range)
+    }
+    if "+bestaudio" in fmt:
+        # bestaudio wybiera aac przed opusem, wtedy mp4 sklei sie bez kodowania
+        opts["format_sort"] = ["acodec:aac"]
+    # do czasu wyboru formatow obowiazuje bezpieczna sciezka auto; gdy plan jej
+    # nie zmieni, pobieranie idzie na instancji z ekstrakcji
+    opts.update(_mp4_pipeline(MP4_AUTO, []))
+    planned = [MP4_AUTO]
+
+    def prepare(info: dict) -> Dict[str, Any]:
+        mode, pp_args = plan_mp4(
+            selected_formats(info), try_ffmpeg_caps(yt.ffmpeg_path)
+        )
+        planned[0] = mode
+        return _mp4_pipeline(mode, pp_args)
+
+    yt.download(url, opts, profile=profile, cancel=as_token(cancel_cb), prepare=prepare)
+    return planned[0]
+
+
+# pobiera samo audio przez yt-dlp; zwraca slownik ostatniego zakonczonego pliku
+# z hooka postepu (filename, info_dict) albo None gdy yt-dlp nic nie zglosil
+def _fetch_audio(
+    yt: YTClient,
+    url: str,
+    output_dir: str,
+    fmt: str,
+    progress_cb: Optional[ProgressCb],
+    cancel_cb: Optional[CancelCb],
+    progress_hz: float,
+    profile: Optional[DownloadProfile],
+    bandwidth: Optional[BandwidthChannel],
+    postprocessors: Optional[List[dict]] = None,
+) -> Optional[dict]:
+    finished: List[dict] = []
+
+    def remember_file(d: dict):
+        if d.get("status") == PHASE_FINISHED and d.get("filename"):
+            finished.append(d)
+
+    opts = {
+        "format": fmt,
+        "outtmpl": outtmpl_for(output_dir),
+        "keepvideo": False,  # nie zachowuj oryginalnego video
+        "progress_hooks": [
+            _hook(progress_cb, cancel_cb, ProgressThrottle(progress_hz), bandwidth),
+            remember_file,
+        ],
+        "postprocessor_hooks": [_pp_hook(progress_cb, cancel_cb)],
+        "restrictfilenames": True,
+        "continuedl": True,
     }
-    yt.download(url, opts)
+    if postprocessors:
+        opts["postprocessors"] = postprocessors
+    yt.download(url, opts, profile=profile, cancel=as_token(cancel_cb))
+    return finished[-1] if finished else None
+
+
+# konwertuje pobrany plik audio ffmpeg-iem: w puli postprocess (wtedy
+# downloaded_cb zglasza wolna siec) albo od razu w biezacym watku
+# po anulowaniu token (jesli cancel_cb nim jest) sprzata pobrany plik zrodlowy
+def _convert_audio(
+    yt: YTClient,
+    src: str,
+    dst: str,
+    args: List[str],
+    name: str,
+    progress_cb: Optional[ProgressCb],
+    cancel_cb: Optional[CancelCb],
+    postprocess: Optional[PostprocessPool],
+    downloaded_cb: Optional[Callable[[], None]],
+) -> None:
+    ffmpeg = yt.ffmpeg_path or "ffmpeg"
+    try:
+        future = None
+        if postprocess is not None:
+            future = postprocess.submit(
+                transcode, ffmpeg, src, dst, args, cancel_cb, cancel_cb=cancel_cb
+            )
+            if downloaded_cb:
+                downloaded_cb()
+        if progress_cb:
+            progress_cb(
+                ProgressEvent(
+                    phase=PHASE_POSTPROCESSING,
+                    downloaded=0,
+                    total=0,
+                    postprocessor=name,
+                )
+            )
+        if future is not None:
+            wait_result(future, cancel_cb)
+        else:
+            transcode(ffmpeg, src, dst, args, cancel_cb)
+    except CancelledError:
+        token = as_token(cancel_cb)
+        if token is not None:
+            token.cleanup()
+        raise
 
 
 # funkcja do pobierania audio w formacie mp3
+# z pula postprocess konwersja do mp3 idzie osobnym etapem: yt-dlp pobiera samo
+# audio, plik trafia do puli, a downloaded_cb sygnalizuje, ze siec jest wolna
+# (kolejka moze zaczac nastepne pobieranie, zanim ffmpeg skonczy)
+# zwraca AUDIO_TRANSCODE (mp3 jest zawsze kodowane), a AUDIO_SKIPPED gdy nic
+# nie pobrano
 def download_audio_mp3(
     yt: YTClient,
     url: str,
     output_dir: str,
     progress_cb: Optional[ProgressCb] = None,
     cancel_cb: Optional[CancelCb] = None,
-):
-    opts = {
-        "format": "bestaudio/best",  # wybierz najlepsze audio
-        "outtmpl": outtmpl_for(output_dir),
-        "keepvideo": False,  # nie zachowuj oryginalnego video
-        "postprocessors": [
+    progress_hz: float = DEFAULT_PROGRESS_HZ,
+    profile: Optional[DownloadProfile] = None,
+    bandwidth: Optional[BandwidthChannel] = None,
+    postprocess: Optional[PostprocessPool] = None,
+    downloaded_cb: Optional[Callable[[], None]] = None,
+) -> str:
+    postprocessors = None
+    if postprocess is None:
+        postprocessors = [
             {
                 "key": "FFmpegExtractAudio",  # uzyj ffmpeg do wyciagniecia audio
                 "preferredcodec": "mp3",  # konwertuj do mp3
                 "preferredquality": "320",  # jakosc 320 kbps
             }
-        ],
-        "progress_hooks": [_hook(progress_cb, cancel_cb)],
-        "restrictfilenames": True,
-    }
-    yt.download(url, opts)
+        ]
+    done = _fetch_audio(
+        yt,
+        url,
+        output_dir,
+        "bestaudio/best",  # wybierz najlepsze audio
+        progress_cb,
+        cancel_cb,
+        progress_hz,
+        profile,
+        bandwidth,
+        postprocessors,
+    )
+    if done is None:
+        return AUDIO_SKIPPED
+    if postprocess is None:
+        return AUDIO_TRANSCODE
+    src = done["filename"]
+    _convert_audio(
+        yt,
+        src,
+        os.path.splitext(src)[0] + ".mp3",
+        mp3_args(caps=try_ffmpeg_caps(yt.ffmpeg_path)),
+        "FFmpegExtractAudio",
+        progress_cb,
+        cancel_cb,
+        postprocess,
+        downloaded_cb,
+    )
+    return AUDIO_TRANSCODE
+
+
+# pobiera audio do kontenera m4a/opus/ogg; gdy kodek zrodla pasuje do kontenera
+# strumien jest tylko kopiowany (bez dekodowania, od razu w tym watku), inaczej
+# kodowany jak mp3 (w puli postprocess, jesli podana)
+# zwraca AUDIO_COPY albo AUDIO_TRANSCODE, a AUDIO_SKIPPED gdy nic nie pobrano
+def download_audio(
+    yt: YTClient,
+    url: str,
+    output_dir: str,
+    container: str,
+    progress_cb: Optional[ProgressCb] = None,
+    cancel_cb: Optional[CancelCb] = None,
+    progress_hz: float = DEFAULT_PROGRESS_HZ,
+    profile: Optional[DownloadProfile] = None,
+    bandwidth: Optional[BandwidthChannel] = None,
+    postprocess: Optional[PostprocessPool] = None,
+    downloaded_cb: Optional[Callable[[], None]] = None,
+) -> str:
+    spec = AUDIO_CONTAINERS[container]
+    done = _fetch_audio(
+        yt,
+        url,
+        output_dir,
+        spec.format,
+        progress_cb,
+        cancel_cb,
+        progress_hz,
+        profile,
+        bandwidth,
+    )
+    if done is None:
+        return AUDIO_SKIPPED
+    src = done["filename"]
+    acodec = (done.get("info_dict") or {}).get("acodec")
+    mode, args = plan_audio(container, acodec, try_ffmpeg_caps(yt.ffmpeg_path))
+    _convert_audio(
+        yt,
+        src,
+        f"{os.path.splitext(src)[0]}.{container}",
+        args,
+        "FFmpegCopyAudio" if mode == AUDIO_COPY else "FFmpegExtractAudio",
+        progress_cb,
+        cancel_cb,
+        postprocess if mode == AUDIO_TRANSCODE else None,
+        downloaded_cb,
+    )
+    return mode
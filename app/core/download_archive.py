@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Set, Tuple
+
+from app.core.paths import cache_dir
+
+_FILE_NAME = "archive.sqlite3"
+DEFAULT_EXTRACTOR = "youtube"
+# limit parametrow w jednym zapytaniu sqlite (bezpiecznie ponizej 999)
+_QUERY_BATCH = 500
+
+# klucz archiwum: ekstraktor, id filmu, typ pliku ("mp4"/"mp3"/kontener audio)
+ArchiveKey = Tuple[str, str, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive (
+    extractor TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    added REAL NOT NULL,
+    PRIMARY KEY (extractor, video_id, kind)
+) WITHOUT ROWID
+"""
+
+
+# archiwum pobranych filmow w sqlite; pozwala pominac pozycje zanim powstanie
+# worker i zanim pojdzie jakiekolwiek zapytanie do sieci
+# po load() (w tle, patrz warm_download_archive) sprawdzanie idzie przez zbior
+# w pamieci, O(1); wczesniej przez klucz glowny w bazie, bez wczytywania pliku
+class DownloadArchive:
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._keys: Optional[Set[ArchiveKey]] = None
+        self._loading = False
+        self._added_while_loading: Set[ArchiveKey] = set()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # zapisuje pobrany film
+    def add(self, extractor: str, video_id: str, kind: str) -> None:
+        key = (extractor, video_id, kind)
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO archive VALUES (?, ?, ?, ?)",
+                    (*key, time.time()),
+                )
+            if self._keys is not None:
+                self._keys.add(key)
+            elif self._loading:
+                self._added_while_loading.add(key)
+
+    def contains(self, extractor: str, video_id: str, kind: str) -> bool:
+        return bool(self.done_keys([(extractor, video_id, kind)]))
+
+    # zwraca te klucze z podanych, ktore sa juz w archiwum
+    def done_keys(self, keys: Iterable[ArchiveKey]) -> Set[ArchiveKey]:
+        keys = list(keys)
+        with self._lock:
+            if self._keys is not None:
+                return {k for k in keys if k in self._keys}
+            wanted = set(keys)
+            ids = sorted({k[1] for k in keys})
+            found: Set[ArchiveKey] = set()
+            for i in range(0, len(ids), _QUERY_BATCH):
+                part = ids[i : i + _QUERY_BATCH]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    "SELECT extractor, video_id, kind FROM archive"
+                    f" WHERE video_id IN ({marks})",
+                    part,
+                ).fetchall()
+                found.update(r for r in rows if r in wanted)
+        return found
+
+    # wczytuje wszystkie klucze do pamieci; osobne polaczenie, zeby odczyt
+    # nie blokowal zapisow i zapytan z watku gui
+    def load(self) -> None:
+        with self._lock:
+            if self._keys is not None or self._loading:
+                return
+            self._loading = True
+        keys: Set[ArchiveKey] = set()
+        ok = False
+        try:
+            conn = sqlite3.connect(str(self.path))
+            try:
+                keys.update(
+                    conn.execute("SELECT extractor, video_id, kind FROM archive")
+                )
+                ok = True
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            # bez zbioru w pamieci zostaja zapytania do bazy
+            pass
+        finally:
+            with self._lock:
+                self._loading = False
+                if ok:
+                    self._keys = keys | self._added_while_loading
+                self._added_while_loading = set()
+
+    def is_loaded(self) -> bool:
+        with self._lock:
+            return self._keys is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._keys is not None:
+                return len(self._keys)
+            return self._conn.execute("SELECT COUNT(*) FROM archive").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_shared_archive: Optional[DownloadArchive] = None
+_shared_lock = threading.Lock()
+
+
+# zwraca archiwum pobran wspoldzielone przez caly proces
+def shared_archive() -> DownloadArchive:
+    global _shared_archive
+    with _shared_lock:
+        if _shared_archive is None:
+            _shared_archive = DownloadArchive(cache_dir() / _FILE_NAME)
+        return _shared_archive
+
+
+# wczytuje archiwum do pamieci w watku w tle (po pokazaniu okna)
+def warm_download_archive() -> threading.Thread:
+    t = threading.Thread(
+        target=lambda: shared_archive().load(), name="archive-load", daemon=True
+    )
+    t.start()
+    return t
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess  # nosec B404 - uruchamiamy wylacznie wykryty plik ffmpeg
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Sequence
+
+from app.core.paths import cache_dir
+from app.utils.errors import DependencyMissingError
+
+_CACHE_NAME = "ffmpeg_caps.json"
+_MAX_ENTRIES = 8  # ile roznych binarek ffmpeg pamietamy na dysku
+_PROBE_TIMEOUT = 15.0
+# wbudowane kodery ffmpeg oznaczone jako eksperymentalne (wymagaja -strict)
+EXPERIMENTAL_ENCODERS = frozenset({"opus", "vorbis"})
+
+
+# mozliwosci konkretnej binarki ffmpeg
+class FFmpegCaps(NamedTuple):
+    path: str
+    version: str
+    encoders: FrozenSet[str]
+    muxers: FrozenSet[str]
+    threads: bool  # czy build wspiera wielowatkowosc
+
+    def has_encoder(self, name: str) -> bool:
+        return name in self.encoders
+
+    def has_muxer(self, name: str) -> bool:
+        return name in self.muxers
+
+
+# klucz wpisu w cache: sciezka + czas modyfikacji + rozmiar binarki
+def _binary_key(path: str) -> str:
+    st = os.stat(path)
+    return f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}"
+
+
+# uruchamia ffmpeg z podanymi argumentami i zwraca stdout
+def _run(path: str, *args: str) -> str:
+    flags = getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
+    out = subprocess.run(  # nosec B603 - brak powloki, stala lista argumentow
+        [path, "-hide_banner", *args],
+        capture_output=True,
+        text=True,
+        timeout=_PROBE_TIMEOUT,
+        creationflags=flags,
+    )
+    return out.stdout
+
+
+# wyciaga nazwy z tabeli -encoders / -muxers (wiersze po linii z kreskami)
+def _parse_table(text: str) -> FrozenSet[str]:
+    names = set()
+    started = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not started:
+            started = bool(stripped) and set(stripped) == {"-"}
+            continue
+        parts = stripped.split()
+        if len(parts) >= 2:
+            names.update(parts[1].split(","))
+    return frozenset(names)
+
+
+# parsuje wynik "ffmpeg -version": numer wersji i obsluge watkow
+def _parse_version(text: str) -> tuple[str, bool]:
+    version = ""
+    threads = True
+    for line in text.splitlines():
+        if line.startswith("ffmpeg version "):
+            version = line.split()[2]
+        elif line.startswith("configuration:"):
+            threads = "--disable-pthreads" not in line or "--enable-w32threads" in line
+    return version, threads
+
+
+# uruchamia sondowanie binarki (bez cache)
+def _probe(path: str) -> FFmpegCaps:
+    version, threads = _parse_version(_run(path, "-version"))
+    return FFmpegCaps(
+        path=path,
+        version=version,
+        encoders=_parse_table(_run(path, "-encoders")),
+        muxers=_parse_table(_run(path, "-muxers")),
+        threads=threads,
+    )
+
+
+def _to_json(caps: FFmpegCaps) -> dict:
+    return {
+        "path": caps.path,
+        "version": caps.version,
+        "encoders": sorted(caps.encoders),
+        "muxers": sorted(caps.muxers),
+        "threads": caps.threads,
+    }
+
+
+def _from_json(d: dict) -> FFmpegCaps:
+    return FFmpegCaps(
+        path=d["path"],
+        version=d["version"],
+        encoders=frozenset(d["encoders"]),
+        muxers=frozenset(d["muxers"]),
+        threads=bool(d["threads"]),
+    )
+
+
+# cache wynikow sondowania: w pamieci procesu i w pliku json na dysku
+class FFmpegCapsCache:
+
+    def __init__(self, path: Optional[str | Path] = None):
+        self._path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._memory: Dict[str, FFmpegCaps] = {}
+
+    @property
+    def path(self) -> Path:
+        return self._path or cache_dir() / _CACHE_NAME
+
+    # zwraca mozliwosci ffmpeg, sonduje binarke tylko gdy zmienila sie od ostatniego razu
+    def get(self, ffmpeg_path: str) -> FFmpegCaps:
+        key = _binary_key(ffmpeg_path)
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                return hit
+            stored = self._load()
+            if key in stored:
+                caps = _from_json(stored[key])
+            else:
+                caps = _probe(ffmpeg_path)
+                stored[key] = _to_json(caps)
+                self._save(stored)
+            self._memory[key] = caps
+            return caps
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    # zapis atomowy, najstarsze wpisy wypadaja po przekroczeniu limitu
+    def _save(self, data: Dict[str, dict]) -> None:
+        keys: List[str] = list(data)[-_MAX_ENTRIES:]
+        trimmed = {k: data[k] for k in keys}
+        tmp = self.path.with_suffix(".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(trimmed, fh)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+
+_shared = FFmpegCapsCache()
+
+
+# zwraca mozliwosci podanej binarki ffmpeg (z cache procesu i dysku)
+def ffmpeg_caps(ffmpeg_path: str) -> FFmpegCaps:
+    return _shared.get(ffmpeg_path)
+
+
+# sonduje ffmpeg w tle, zeby pierwsze pobieranie nie czekalo na sondowanie
+def warm_ffmpeg_caps(ffmpeg_path: str) -> threading.Thread:
+    def run():
+        try:
+            ffmpeg_caps(ffmpeg_path)
+        except Exception:
+            pass
+
+    t = threading.Thread(target=run, name="ffmpeg-probe", daemon=True)
+    t.start()
+    return t
+
+
+# zwraca mozliwosci binarki albo None, gdy nie da sie ich ustalic (brak pliku,
+# blad sondowania, wynik bez listy koderow) - wtedy wybor kodera zostaje
+# domyslny ffmpeg; sciezka bez katalogu jest szukana w PATH
+def try_ffmpeg_caps(ffmpeg_path: Optional[str]) -> Optional[FFmpegCaps]:
+    path = ffmpeg_path or "ffmpeg"
+    if not os.path.dirname(path):
+        path = shutil.which(path) or ""
+    if not os.path.isfile(path):
+        return None
+    try:
+        caps = ffmpeg_caps(path)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return caps if caps.encoders else None
+
+
+# wybiera pierwszy dostepny koder z listy preferencji; bez caps (nieznana
+# binarka) zostaje pierwszy z listy
+def pick_encoder(candidates: Sequence[str], caps: Optional[FFmpegCaps]) -> str:
+    if caps is None:
+        return candidates[0]
+    for name in candidates:
+        if caps.has_encoder(name):
+            return name
+    raise DependencyMissingError(
+        f"FFmpeg nie ma żadnego z koderów: {', '.join(candidates)}"
+    )
+
+
+# argumenty kodowania strumienia ("a" albo "v") pierwszym dostepnym koderem
+def encoder_args(
+    stream: str, candidates: Sequence[str], caps: Optional[FFmpegCaps]
+) -> List[str]:
+    name = pick_encoder(candidates, caps)
+    args = [f"-c:{stream}", name]
+    if name in EXPERIMENTAL_ENCODERS:
+        args += ["-strict", "experimental"]
+    return args
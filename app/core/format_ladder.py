@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# domyslne preferencje kodekow wideo (od najbardziej pozadanego)
+# h264 na poczatku bo do mp4 trafia bez konwersji
+VIDEO_CODEC_PREFS: Tuple[str, ...] = ("avc1", "h264", "vp09", "vp9", "av01")
+AUDIO_CODEC_PREFS: Tuple[str, ...] = ("mp4a", "aac", "opus", "vorbis")
+
+# kontenery w ktorych akceptujemy gotowe formaty video+audio
+MUXED_EXTS: Tuple[str, ...] = ("mp4",)
+
+
+# pojedynczy szczebel drabinki jakosci
+class Rung(NamedTuple):
+    height: int
+    fps: int
+    format_id: str
+    vcodec: str
+    acodec: str
+    ext: str
+
+
+# wynik klasyfikacji formatow, kazda lista posortowana od najlepszych
+class Ladder(NamedTuple):
+    muxed: Tuple[Rung, ...]
+    video_only: Tuple[Rung, ...]  # najlepszy wariant dla kazdej wysokosci
+    audio_only: Tuple[Rung, ...]
+
+    # lista par (format_id, etykieta) do pokazania w comboboxie
+    def options(self) -> List[Tuple[str, str]]:
+        out: List[Tuple[str, str]] = []
+        # laczy najlepsze warianty video-only z audio
+        if self.video_only and self.audio_only:
+            for r in self.video_only:
+                out.append((f"{r.format_id}+bestaudio", f"{r.height}p + audio"))
+        for r in self.muxed:
+            out.append((r.format_id, muxed_label(r.height, r.fps)))
+        return out
+
+    # zwraca szczebel o podanym format_id albo None
+    def find(self, format_id: str) -> Optional[Rung]:
+        for r in self.muxed + self.video_only + self.audio_only:
+            if r.format_id == format_id:
+                return r
+        return None
+
+
+# etykieta formatu muxed, wspolna dla widoku pojedynczego i playlisty
+def muxed_label(height: int, fps: int) -> str:
+    return f"{height}p" + (f" @ {fps}fps" if fps else "")
+
+
+# pozycja kodeka na liscie preferencji (mniej = lepiej)
+def _codec_rank(codec: str, prefs: Sequence[str]) -> int:
+    for i, p in enumerate(prefs):
+        if codec.startswith(p):
+            return i
+    return len(prefs)
+
+
+# klasyfikuje liste formatow yt-dlp w jednym przejsciu
+# muxed: video+audio w akceptowanym kontenerze, video_only: najlepszy per wysokosc,
+# audio_only: wszystkie formaty bez obrazu
+def build_ladder(
+    formats: Iterable[Dict[str, Any]],
+    video_prefs: Sequence[str] = VIDEO_CODEC_PREFS,
+    audio_prefs: Sequence[str] = AUDIO_CODEC_PREFS,
+    muxed_exts: Sequence[str] = MUXED_EXTS,
+    prefer_ext: str = "mp4",
+) -> Ladder:
+    muxed: Dict[Tuple[int, int], Tuple[tuple, Rung]] = {}
+    video: Dict[int, Tuple[tuple, Rung]] = {}
+    audio: List[Tuple[tuple, Rung]] = []
+    # ranking kodekow liczony raz na unikalny string (powtarzaja sie w liscie)
+    vranks: Dict[str, int] = {}
+    aranks: Dict[str, int] = {}
+
+    for f in formats:
+        get = f.get
+        vcodec = get("vcodec") or ""
+        acodec = get("acodec") or ""
+        height = get("height") or 0
+
+        if vcodec != "none" and height:
+            fps = int(get("fps") or 0)
+            ext = get("ext") or ""
+            vrank = vranks.get(vcodec)
+            if vrank is None:
+                vrank = vranks[vcodec] = _codec_rank(vcodec, video_prefs)
+            if acodec != "none":
+                # format wideo z audio razem (muxed)
+                if ext not in muxed_exts:
+                    continue
+                key: tuple = (-vrank,)
+                slot = muxed.get((height, fps))
+                if slot is None or key > slot[0]:
+                    rung = Rung(height, fps, get("format_id"), vcodec, acodec, ext)
+                    muxed[(height, fps)] = (key, rung)
+            else:
+                # format tylko wideo, wygrywa wyzszy fps, potem kodek i kontener
+                key = (fps, -vrank, ext == prefer_ext)
+                slot = video.get(height)
+                if slot is None or key > slot[0]:
+                    rung = Rung(height, fps, get("format_id"), vcodec, acodec, ext)
+                    video[height] = (key, rung)
+            continue
+
+        # format tylko audio
+        if vcodec == "none" and acodec != "none":
+            arank = aranks.get(acodec)
+            if arank is None:
+                arank = aranks[acodec] = _codec_rank(acodec, audio_prefs)
+            rung = Rung(0, 0, get("format_id"), "none", acodec, get("ext") or "")
+            audio.append(((-arank, get("abr") or 0), rung))
+
+    return Ladder(
+        muxed=tuple(
+            r for _, r in sorted(muxed.values(), key=lambda s: s[1][:2], reverse=True)
+        ),
+        video_only=tuple(
+            r for _, r in sorted(video.values(), key=lambda s: s[1][0], reverse=True)
+        ),
+        audio_only=tuple(r for _, r in sorted(audio, key=lambda s: s[0], reverse=True)),
+    )
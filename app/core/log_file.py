@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+from logging.handlers import QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Iterable, Optional
+
+from app.core.paths import cache_dir
+
+# zmienna srodowiskowa wlaczajaca zapis logow do pliku:
+# "1" = plik w katalogu cache, inna wartosc = sciezka pliku
+LOG_FILE_ENV = "JUSTDOWNIT_LOG_FILE"
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+_DEFAULT_NAME = "justdownit.log"
+
+
+# plik logow z rotacja; zapis idzie w osobnym watku (QueueListener),
+# wiec wolny dysk nie blokuje watku gui
+class LogFileSink:
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backups: int = DEFAULT_BACKUPS,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handler = RotatingFileHandler(
+            self.path,
+            maxBytes=max_bytes,
+            backupCount=backups,
+            encoding="utf-8",
+            delay=True,
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener = QueueListener(self._queue, self._handler)
+        self._listener.start()
+        self._closed = False
+
+    # dopisuje gotowe linie (juz z czasem) do pliku
+    def write(self, lines: Iterable[str]) -> None:
+        if self._closed:
+            return
+        for line in lines:
+            self._queue.put(logging.makeLogRecord({"msg": line}))
+
+    # dopisuje zalegle linie i zamyka plik
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._listener.stop()
+        self._handler.close()
+
+
+# tworzy plik logow wedlug zmiennej srodowiskowej (None gdy wylaczony)
+def log_sink_from_env() -> Optional[LogFileSink]:
+    value = os.getenv(LOG_FILE_ENV, "").strip()
+    if not value or value == "0":
+        return None
+    path = cache_dir() / "logs" / _DEFAULT_NAME if value == "1" else Path(value)
+    try:
+        return LogFileSink(path)
+    except OSError:
+        # brak dostepu do pliku nie moze zatrzymac aplikacji
+        return None
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from app.core.paths import cache_dir
+from app.core.thumbnails import thumbnail_from_info
+
+# domyslne limity cache metadanych
+DEFAULT_TTL = 24 * 3600.0  # po jakim czasie wpis jest uznawany za nieaktualny
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024  # budzet rozmiaru danych w bazie
+_DB_NAME = "metadata.sqlite3"
+
+# pola formatu ktore sa faktycznie czytane przy budowaniu listy jakosci
+_FORMAT_KEYS = ("format_id", "ext", "vcodec", "acodec", "height", "fps", "abr")
+
+# sqlite ma limit liczby parametrow w jednym zapytaniu
+_CHUNK = 500
+
+
+# sprowadza pelny info dict z yt-dlp do danych ktorych uzywa aplikacja
+# (czas trwania, najlepsza miniatura i odchudzona lista formatow)
+def project_info(info: Dict[str, Any]) -> Dict[str, Any]:
+    formats = [
+        {k: f[k] for k in _FORMAT_KEYS if f.get(k) is not None}
+        for f in info.get("formats") or []
+    ]
+    return {
+        "id": info.get("id"),
+        "title": info.get("title") or "",
+        "duration": info.get("duration") or 0,
+        "thumbnail": thumbnail_from_info(info) or "",
+        "formats": formats,
+    }
+
+
+# trwaly cache metadanych w sqlite (tryb WAL), kluczowany id filmu
+# wpisy wygasaja po ttl, a przy przekroczeniu max_bytes usuwane sa najdawniej uzyte
+class MetadataCache:
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # jedno polaczenie dzielone przez watki workerow, dostep chroniony lockiem
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                video_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS meta_accessed ON meta(accessed_at)"
+        )
+
+    # zwraca zapisane metadane albo None jesli brak lub wpis wygasl
+    def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([video_id]).get(video_id)
+
+    # zwraca slownik id -> metadane dla wszystkich aktualnych wpisow z listy
+    def get_many(self, video_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        ids = list(dict.fromkeys(v for v in video_ids if v))
+        out: Dict[str, Dict[str, Any]] = {}
+        if not ids:
+            return out
+        now = self._clock()
+        with self._lock:
+            try:
+                for i in range(0, len(ids), _CHUNK):
+                    chunk = ids[i : i + _CHUNK]
+                    marks = ",".join("?" * len(chunk))
+                    rows = self._conn.execute(
+                        "SELECT video_id, data, fetched_at FROM meta"
+                        f" WHERE video_id IN ({marks})",  # nosec B608
+                        chunk,
+                    ).fetchall()
+                    fresh = [r for r in rows if now - r[2] <= self.ttl]
+                    stale = [(r[0],) for r in rows if now - r[2] > self.ttl]
+                    # jedna transakcja na paczke zamiast zapisu per wiersz
+                    self._conn.execute("BEGIN")
+                    self._conn.executemany("DELETE FROM meta WHERE video_id=?", stale)
+                    self._conn.executemany(
+                        "UPDATE meta SET accessed_at=? WHERE video_id=?",
+                        [(now, r[0]) for r in fresh],
+                    )
+                    self._conn.execute("COMMIT")
+                    for vid, data, _ in fresh:
+                        out[vid] = json.loads(data)
+            except sqlite3.Error:
+                # uszkodzony lub zablokowany cache nie moze blokowac metadanych
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+        return out
+
+    # zapisuje metadane dla filmu i pilnuje budzetu rozmiaru
+    def put(self, video_id: str, data: Dict[str, Any]) -> None:
+        if not video_id:
+            return
+        blob = json.dumps(data, separators=(",", ":"))
+        now = self._clock()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta"
+                    " (video_id, data, size, fetched_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (video_id, blob, len(blob), now, now),
+                )
+                self._evict()
+        except sqlite3.Error:
+            pass
+
+    # usuwa wpis (np. gdy dane okazaly sie niepoprawne)
+    def invalidate(self, video_id: str) -> None:
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM meta WHERE video_id=?", (video_id,))
+        except sqlite3.Error:
+            pass
+
+    # laczny rozmiar zapisanych danych w bajtach
+    def total_bytes(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM meta")
+            return int(row.fetchone()[0])
+
+    # liczba wpisow w cache
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM meta").fetchone()[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # usuwa wygasle wpisy, a potem najdawniej uzywane az do zmieszczenia w budzecie
+    # wywolywane pod lockiem
+    def _evict(self) -> None:
+        self._conn.execute(
+            "DELETE FROM meta WHERE fetched_at < ?", (self._clock() - self.ttl,)
+        )
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM meta")
+        excess = int(total.fetchone()[0]) - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for vid, size in self._conn.execute(
+            "SELECT video_id, size FROM meta ORDER BY accessed_at"
+        ):
+            victims.append((vid,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM meta WHERE video_id=?", victims)
+
+
+_shared_cache: Optional[MetadataCache] = None
+_shared_lock = threading.Lock()
+
+
+# zwraca cache metadanych wspoldzielony przez caly proces
+def shared_cache() -> MetadataCache:
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = MetadataCache(cache_dir() / _DB_NAME)
+        return _shared_cache
+
+
+# zwraca metadane filmu z cache albo wyciaga je przez yt-dlp i zapisuje
+def cached_extract(
+    yt: Any,
+    url: str,
+    video_id: Optional[str],
+    cache: Optional[MetadataCache] = None,
+) -> Dict[str, Any]:
+    cache = cache if cache is not None else shared_cache()
+    if video_id:
+        hit = cache.get(video_id)
+        if hit is not None:
+            return hit
+    meta = project_info(yt.extract(url))
+    key = video_id or meta.get("id")
+    if key:
+        cache.put(key, meta)
+    return meta
@@ -1,25 +1,43 @@
 from __future__ import annotations
 
 import os
+import threading
 from pathlib import Path
+from typing import Optional
+
+# sciezka ffmpeg z imageio_ffmpeg, wyznaczana raz na proces
+_imageio_ffmpeg_exe: Optional[str] = None
+_ffmpeg_lock = threading.Lock()
 
 
 # zwraca sciezke do programu ffmpeg
 def get_ffmpeg_path() -> str:
+    global _imageio_ffmpeg_exe
 
     # sprawdza zmienna srodowiskowa FFMPEG_PATH i czy plik istnieje
     env = os.getenv("FFMPEG_PATH")
     if env and Path(env).exists():
         return env
-    try:
-        import imageio_ffmpeg  # biblioteka dostarczajaca ffmpeg
-    except ImportError as e:
-        from app.utils.errors import DependencyMissingError
+    with _ffmpeg_lock:
+        if _imageio_ffmpeg_exe is not None:
+            return _imageio_ffmpeg_exe
+        try:
+            import imageio_ffmpeg  # biblioteka dostarczajaca ffmpeg
+        except ImportError as e:
+            from app.utils.errors import DependencyMissingError
+
+            # jesli nie ma biblioteki to rzuca blad informujacy o braku zaleznosci
+            raise DependencyMissingError() from e
+        # jesli import sie udal to zapamietuje sciezke do ffmpeg od imageio_ffmpeg
+        _imageio_ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
+        return _imageio_ffmpeg_exe
+
 
-        # jesli nie ma biblioteki to rzuca blad informujacy o braku zaleznosci
-        raise DependencyMissingError() from e
-    # jesli import sie udal to zwraca sciezke do ffmpeg od imageio_ffmpeg
-    return imageio_ffmpeg.get_ffmpeg_exe()
+# czysci zapamietana sciezke ffmpeg (np. po instalacji nowej wersji, w testach)
+def reset_ffmpeg_path_cache() -> None:
+    global _imageio_ffmpeg_exe
+    with _ffmpeg_lock:
+        _imageio_ffmpeg_exe = None
 
 
 # upewnia sie ze katalog wyjsciowy istnieje, w razie potrzeby go tworzy
@@ -29,6 +47,20 @@ def ensure_output_dir(path: str | Path) -> Path:
     return p
 
 
+# zwraca katalog na dane podreczne aplikacji (cache metadanych, miniatur itp.)
+# mozna go nadpisac zmienna srodowiskowa JUSTDOWNIT_CACHE_DIR
+def cache_dir() -> Path:
+    env = os.getenv("JUSTDOWNIT_CACHE_DIR")
+    if env:
+        base = Path(env)
+    elif os.name == "nt" and os.getenv("LOCALAPPDATA"):
+        base = Path(os.environ["LOCALAPPDATA"]) / "JustDownIt"
+    else:
+        xdg = os.getenv("XDG_CACHE_HOME")
+        base = (Path(xdg) if xdg else Path.home() / ".cache") / "justdownit"
+    return ensure_output_dir(base)
+
+
 # tworzy wzor nazwy pliku dla yt-dlp w podanym katalogu
 # %(title)s i %(ext)s beda podstawiane przez yt-dlp
 def outtmpl_for(dirpath: str | Path) -> str:
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import os
+import subprocess  # nosec B404 - uruchamiamy wylacznie wykryty plik ffmpeg
+import threading
+import weakref
+from concurrent.futures import CancelledError as FutureCancelled
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Callable, List, Optional, Set
+
+from app.core.ffmpeg_caps import FFmpegCaps, encoder_args
+from app.utils.errors import CancelledError
+
+# co ile sekund sprawdzane jest anulowanie (czekanie na miejsce i na ffmpeg)
+_POLL = 0.1
+# ile znakow stderr ffmpeg trafia do komunikatu bledu
+_ERR_TAIL = 400
+# ile plikow na jeden proces ffmpeg moze czekac w kolejce etapu
+PENDING_PER_WORKER = 2
+
+CancelCb = Callable[[], bool]
+
+# pula, w ktorej watku biegnie biezace zadanie (procesy ffmpeg trafiaja do niej)
+_local = threading.local()
+
+
+# domyslna liczba rownoleglych konwersji: po jednej na rdzen
+def default_workers() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+# kodery mp3 w kolejnosci preferencji (ffmpeg nie ma wlasnego kodera mp3)
+MP3_ENCODERS = ("libmp3lame", "libshine", "mp3_mf")
+
+
+# argumenty ffmpeg dla mp3 (jak FFmpegExtractAudio z preferredquality 320);
+# caps wybiera koder dostepny w tej binarce
+def mp3_args(bitrate: str = "320k", caps: Optional[FFmpegCaps] = None) -> List[str]:
+    return ["-vn", *encoder_args("a", MP3_ENCODERS, caps), "-b:a", bitrate, "-f", "mp3"]
+
+
+# konwertuje src do dst osobnym procesem ffmpeg; wynik powstaje pod nazwa
+# tymczasowa i jest podmieniany dopiero po sukcesie, src znika po sukcesie
+# anulowanie zabija proces ffmpeg i usuwa czesciowy wynik
+# w zadaniu PostprocessPool proces jest zabijany tez przy shutdown(wait=False)
+def transcode(
+    ffmpeg: str,
+    src: str,
+    dst: str,
+    args: List[str],
+    cancel_cb: Optional[CancelCb] = None,
+) -> str:
+    tmp = dst + ".part"
+    flags = getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
+    cmd = [ffmpeg, "-hide_banner", "-nostdin", "-loglevel", "error", "-y"]
+    proc = subprocess.Popen(  # nosec B603 - brak powloki, stala lista argumentow
+        [*cmd, "-i", src, *args, tmp],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        creationflags=flags,
+    )
+    pool = getattr(_local, "pool", None)
+    if pool is not None:
+        pool._track(proc)
+    while True:
+        try:
+            proc.wait(timeout=_POLL)
+            break
+        except subprocess.TimeoutExpired:
+            if cancel_cb and cancel_cb():
+                proc.kill()
+                proc.wait()
+                _remove(tmp)
+                raise CancelledError("Konwersja anulowana przez użytkownika.")
+    err = proc.stderr.read().decode("utf-8", "replace") if proc.stderr else ""
+    if proc.stderr:
+        proc.stderr.close()
+    if proc.returncode != 0:
+        _remove(tmp)
+        raise RuntimeError(f"FFmpeg ({proc.returncode}): {err.strip()[-_ERR_TAIL:]}")
+    os.replace(tmp, dst)
+    if os.path.abspath(src) != os.path.abspath(dst):
+        _remove(src)
+    return dst
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# etap przetwarzania po pobraniu: pula konwersji ffmpeg (kazda to osobny proces,
+# watek puli tylko go pilnuje), zeby siec i kodowanie szly rownolegle
+# max_pending ogranicza pliki czekajace + konwertowane; gdy etap jest pelny,
+# submit czeka, wiec worker pobierania nie zwalnia miejsca w kolejce i surowe
+# pliki na dysku sa ograniczone (pobierane + max_pending)
+class PostprocessPool:
+
+    def __init__(
+        self, workers: Optional[int] = None, max_pending: Optional[int] = None
+    ):
+        self.workers = max(1, workers or default_workers())
+        self.max_pending = max(
+            self.workers, max_pending or self.workers * PENDING_PER_WORKER
+        )
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._futures: Set[Future] = set()
+        self._processes: weakref.WeakSet = weakref.WeakSet()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="postprocess"
+        )
+
+    # liczba zadan w etapie (czekajace + w trakcie)
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    # dodaje zadanie; przy pelnym etapie czeka na miejsce (chyba ze anulowano)
+    def submit(
+        self, fn: Callable[..., str], *args, cancel_cb: Optional[CancelCb] = None
+    ) -> Future:
+        while not self._slots.acquire(timeout=_POLL):
+            if cancel_cb and cancel_cb():
+                raise CancelledError("Pobieranie anulowane przez użytkownika.")
+        with self._lock:
+            self._pending += 1
+        try:
+            future = self._executor.submit(self._run, fn, *args)
+        except BaseException:
+            self._done(None)
+            raise
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _run(self, fn: Callable[..., str], *args) -> str:
+        _local.pool = self
+        try:
+            return fn(*args)
+        finally:
+            _local.pool = None
+
+    def _track(self, proc: subprocess.Popen) -> None:
+        with self._lock:
+            self._processes.add(proc)
+
+    def _done(self, future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._futures.discard(future)
+        self._slots.release()
+
+    # wait=False (zamkniecie aplikacji): zadania czekajace w kolejce sa
+    # anulowane, a trwajace procesy ffmpeg zabijane (bez czekania na koniec)
+    def shutdown(self, wait: bool = True) -> None:
+        if not wait:
+            with self._lock:
+                futures = list(self._futures)
+                processes = list(self._processes)
+            for future in futures:
+                future.cancel()
+            for proc in processes:
+                if proc.poll() is None:
+                    proc.kill()
+        self._executor.shutdown(wait=wait)
+
+
+# czeka na wynik zadania etapu; anulowanie zdejmuje zadanie z kolejki
+# (trwajaca konwersje przerywa cancel_cb przekazany do transcode)
+def wait_result(future: Future, cancel_cb: Optional[CancelCb] = None) -> str:
+    while True:
+        try:
+            return future.result(timeout=_POLL)
+        except FutureCancelled:
+            # zadanie zdjete przy zamykaniu puli
+            raise CancelledError("Pobieranie anulowane przez użytkownika.")
+        except FutureTimeout:
+            if cancel_cb and cancel_cb() and future.cancel():
+                raise CancelledError("Pobieranie anulowane przez użytkownika.")
+
+
+_shared_pool: Optional[PostprocessPool] = None
+_shared_lock = threading.Lock()
+
+
+# zwraca pule konwersji wspoldzielona przez caly proces
+def shared_postprocess_pool() -> PostprocessPool:
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = PostprocessPool()
+        return _shared_pool
+
+
+# zamyka wspolna pule (jesli powstala) bez czekania: czekajace konwersje sa
+# anulowane, procesy ffmpeg zabijane; uzywane przy zamykaniu aplikacji
+def shutdown_shared_pool() -> None:
+    global _shared_pool
+    with _shared_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from app.core.paths import cache_dir
+
+_FILE_NAME = "queue.sqlite3"
+
+# stany pojedynczej pozycji kolejki (planista, dziennik i widok playlisty)
+QUEUED = "queued"
+RUNNING = "running"
+POSTPROCESSING = "postprocessing"  # pobrane, konwersja w puli postprocess
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINAL_STATES = (DONE, FAILED, CANCELLED)
+
+# stany pozycji, ktore po restarcie wracaja do kolejki;
+# RUNNING oznacza pobieranie przerwane zamknieciem lub awaria aplikacji,
+# POSTPROCESSING przerwana konwersje (yt-dlp uzna plik za pobrany)
+RESUMABLE_STATES = (QUEUED, RUNNING, POSTPROCESSING)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    format_id TEXT,
+    kind TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    state TEXT NOT NULL,
+    error TEXT NOT NULL DEFAULT '',
+    part_path TEXT NOT NULL DEFAULT '',
+    updated REAL NOT NULL
+)
+"""
+
+
+# pozycja zapisana w dzienniku kolejki
+class JournalJob(NamedTuple):
+    id: int
+    url: str
+    format_id: Optional[str]
+    kind: str  # "mp4" / "mp3" / kontener audio ("m4a", "opus", "ogg")
+    folder: str
+    state: str
+    part_path: str  # ostatni plik .part zgloszony przez yt-dlp
+
+
+# dziennik kolejki pobierania w sqlite; kazda zmiana stanu jest od razu
+# zatwierdzana, wiec po zamknieciu lub awarii aplikacji kolejke mozna wznowic
+class QueueJournal:
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        # wal + synchronous=normal: commit bez fsync przy kazdej zmianie stanu,
+        # a baza nadal przezywa awarie procesu
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    # zapisuje nowe pozycje (url, format_id, typ) jako oczekujace, zwraca ich id
+    def add(
+        self, folder: str, items: Sequence[Tuple[str, Optional[str], str]]
+    ) -> List[int]:
+        now = time.time()
+        ids: List[int] = []
+        with self._lock, self._conn:
+            for url, fmt_id, kind in items:
+                cur = self._conn.execute(
+                    "INSERT INTO jobs (url, format_id, kind, folder, state, updated)"
+                    " VALUES (?, ?, ?, ?, 'queued', ?)",
+                    (url, fmt_id, kind, folder, now),
+                )
+                ids.append(int(cur.lastrowid))
+        return ids
+
+    def set_state(self, job_id: int, state: str, error: str = "") -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, updated = ? WHERE id = ?",
+                (state, error, time.time(), job_id),
+            )
+
+    # zapamietuje plik czesciowy, ktory yt-dlp dokonczy po wznowieniu
+    def set_part(self, job_id: int, part_path: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET part_path = ?, updated = ? WHERE id = ?",
+                (part_path, time.time(), job_id),
+            )
+
+    # pozycje do wznowienia, w kolejnosci dodania
+    def unfinished(self) -> List[JournalJob]:
+        marks = ",".join("?" * len(RESUMABLE_STATES))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, url, format_id, kind, folder, state, part_path"
+                f" FROM jobs WHERE state IN ({marks}) ORDER BY id",
+                RESUMABLE_STATES,
+            ).fetchall()
+        return [JournalJob(*r) for r in rows]
+
+    def get(self, job_id: int) -> Optional[JournalJob]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, url, format_id, kind, folder, state, part_path"
+                " FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        return JournalJob(*row) if row else None
+
+    # usuwa pozycje (np. po zakonczeniu calej kolejki)
+    def remove(self, job_ids: Sequence[int]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM jobs WHERE id = ?", [(i,) for i in job_ids]
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_shared_journal: Optional[QueueJournal] = None
+_shared_lock = threading.Lock()
+
+
+# zwraca dziennik kolejki wspoldzielony przez caly proces
+def shared_journal() -> QueueJournal:
+    global _shared_journal
+    with _shared_lock:
+        if _shared_journal is None:
+            _shared_journal = QueueJournal(cache_dir() / _FILE_NAME)
+        return _shared_journal
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from app.core.paths import cache_dir
+
+# domyslny budzet miejsca na dysku dla oryginalnych bajtow miniatur
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+_DIR_NAME = "thumbs"
+_SUFFIX = ".img"
+
+# id filmu trafia do nazwy pliku, wiec akceptujemy tylko bezpieczne znaki
+_SAFE_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+# cache oryginalnych bajtow miniatur na dysku, jeden plik na id filmu
+# przy przekroczeniu max_bytes usuwane sa najdawniej uzyte pliki
+class ThumbDiskCache:
+
+    def __init__(self, path: str | Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # id -> rozmiar, w kolejnosci od najdawniej uzytego (wczytywane leniwie)
+        self._index: Optional[OrderedDict[str, int]] = None
+        self._total = 0
+
+    def _file(self, video_id: str) -> Path:
+        return self.path / f"{video_id}{_SUFFIX}"
+
+    # buduje indeks z zawartosci katalogu, kolejnosc wedlug czasu modyfikacji
+    def _load_index(self) -> OrderedDict[str, int]:
+        if self._index is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            found = []
+            for p in self.path.glob(f"*{_SUFFIX}"):
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                found.append((st.st_mtime_ns, p.stem, st.st_size))
+            found.sort()
+            self._index = OrderedDict((vid, size) for _, vid, size in found)
+            self._total = sum(self._index.values())
+        return self._index
+
+    # zwraca bajty miniatury albo None
+    def get(self, video_id: str) -> Optional[bytes]:
+        if not _SAFE_ID.fullmatch(video_id or ""):
+            return None
+        with self._lock:
+            index = self._load_index()
+            if video_id not in index:
+                return None
+            p = self._file(video_id)
+            try:
+                data = p.read_bytes()
+                os.utime(p)  # swiezy czas uzycia przezyje ponowne wczytanie indeksu
+            except OSError:
+                self._total -= index.pop(video_id)
+                return None
+            index.move_to_end(video_id)
+            return data
+
+    # zapisuje bajty miniatury (atomowo) i pilnuje budzetu
+    def put(self, video_id: str, data: bytes) -> None:
+        if not _SAFE_ID.fullmatch(video_id or "") or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            index = self._load_index()
+            p = self._file(video_id)
+            tmp = p.with_suffix(".tmp")
+            try:
+                tmp.write_bytes(data)
+                os.replace(tmp, p)
+            except OSError:
+                return
+            self._total += len(data) - index.pop(video_id, 0)
+            index[video_id] = len(data)
+            self._evict(index)
+
+    def _evict(self, index: OrderedDict[str, int]) -> None:
+        while self._total > self.max_bytes and index:
+            vid, size = index.popitem(last=False)
+            self._total -= size
+            try:
+                self._file(vid).unlink()
+            except OSError:
+                pass
+
+    # laczny rozmiar plikow w cache
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._load_index()
+            return self._total
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load_index())
+
+
+_shared_thumb_cache: Optional[ThumbDiskCache] = None
+_shared_lock = threading.Lock()
+
+
+# zwraca dyskowy cache miniatur wspoldzielony przez caly proces
+def shared_thumb_cache() -> ThumbDiskCache:
+    global _shared_thumb_cache
+    with _shared_lock:
+        if _shared_thumb_cache is None:
+            _shared_thumb_cache = ThumbDiskCache(cache_dir() / _DIR_NAME)
+        return _shared_thumb_cache
@@ -1,15 +1,63 @@
 from __future__ import annotations
 
-from typing import Callable, Optional
-
-import requests
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
 
 from app.utils.url import extract_video_id
 
+# ile wynikow sprawdzania maxres pamietamy w procesie
+_PROBE_CACHE_SIZE = 4096
+
+# id filmu -> czy istnieje maxresdefault.jpg (takze wyniki negatywne)
+_probe_cache: OrderedDict[str, bool] = OrderedDict()
+_probe_lock = threading.Lock()
+
+
+# wybiera najwieksza miniature z info dict yt-dlp (lub projekcji z cache)
+def thumbnail_from_info(info: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not info:
+        return None
+    thumbs = info.get("thumbnails") or []
+    if thumbs:
+        best = max(thumbs, key=lambda t: (t.get("width") or 0) * (t.get("height") or 0))
+        if best.get("url"):
+            return best["url"]
+    return info.get("thumbnail") or None
+
+
+# miniatura z cache metadanych, jesli film byl juz wczytany (bez sieci)
+def _thumbnail_from_meta_cache(vid: str) -> Optional[str]:
+    try:
+        from app.core.meta_cache import shared_cache
+
+        return thumbnail_from_info(shared_cache().get(vid))
+    except Exception:
+        return None
+
+
+def _remember_probe(vid: str, exists: bool) -> None:
+    with _probe_lock:
+        _probe_cache[vid] = exists
+        _probe_cache.move_to_end(vid)
+        while len(_probe_cache) > _PROBE_CACHE_SIZE:
+            _probe_cache.popitem(last=False)
+
+
+# czysci zapamietane wyniki sprawdzania maxres (np. w testach)
+def reset_probe_cache() -> None:
+    with _probe_lock:
+        _probe_cache.clear()
+
 
 # zwraca url miniatury dla podanego linku do wideo
+# kolejnosc: info dict (jesli podany), cache metadanych, zapamietany wynik
+# sprawdzenia maxres, a dopiero na koncu zapytanie HEAD do serwera
 def get_thumbnail_url(
-    video_url: str, timeout: float = 3.0, log: Optional[Callable] = None
+    video_url: str,
+    timeout: float = 3.0,
+    log: Optional[Callable] = None,
+    info: Optional[Dict[str, Any]] = None,
 ) -> Optional[str]:
 
     # probuje wyciagnac id filmu z url
@@ -22,15 +70,29 @@ def get_thumbnail_url(
         if log:
             log(msg)
 
-    # najpierw sprawdza czy istnieje miniatura w najwyzszej rozdzielczosci
+    known = thumbnail_from_info(info) or _thumbnail_from_meta_cache(vid)
+    if known:
+        return known
+
     maxres = f"https://i.ytimg.com/vi/{vid}/maxresdefault.jpg"
+    hq = f"https://i.ytimg.com/vi/{vid}/hqdefault.jpg"
+    with _probe_lock:
+        cached = _probe_cache.get(vid)
+    if cached is not None:
+        return maxres if cached else hq
+
+    # requests importowany dopiero tutaj, zeby nie wydluzal startu aplikacji
+    import requests
+
+    # sprawdza czy istnieje miniatura w najwyzszej rozdzielczosci
     try:
         r = requests.head(maxres, timeout=timeout)
+        _remember_probe(vid, r.status_code == 200)
         if r.status_code == 200:
             return maxres
     except Exception as e:
-        # jesli nie udalo sie sprawdzic to zapisuje komunikat
+        # blad sieci nie jest zapamietywany, nastepnym razem sprobujemy znowu
         _log(f"HEAD maxres błąd: {e}")
 
     # jesli nie ma maxres to zwraca standardowa miniature hq
-    return f"https://i.ytimg.com/vi/{vid}/hqdefault.jpg"
+    return hq
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import importlib
+import threading
+from typing import Sequence
+
+# ciezkie zaleznosci importowane leniwie, poza sciezka startu okna
+HEAVY_MODULES: tuple[str, ...] = ("yt_dlp", "requests", "imageio_ffmpeg")
+
+
+# importuje podane moduly w tle, zeby pierwsze uzycie (np. wklejenie url)
+# nie czekalo na import yt-dlp; brak modulu nie jest tu bledem
+def warm_imports(modules: Sequence[str] = HEAVY_MODULES) -> threading.Thread:
+    def run():
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+
+    t = threading.Thread(target=run, name="import-warmup", daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# klucze opcji ustawiane per wywolanie, nie wchodza do odcisku instancji
+# hooki sa podmieniane na cieplej instancji zamiast budowac ja od nowa
+_PER_CALL_KEYS = ("progress_hooks", "postprocessor_hooks")
+
+# domyslne limity puli
+DEFAULT_MAX_SIZE = 4
+DEFAULT_IDLE_TIMEOUT = 300.0  # sekundy bez uzycia po ktorych instancja jest zamykana
+
+
+# zwraca stabilny odcisk opcji yt-dlp (bez hookow per wywolanie)
+# obiekty spoza json (logger, funkcje) nie maja stabilnej postaci tekstowej -
+# odcisk z repr() zmienialby sie przy kazdym wywolaniu i pula by nie dzialala,
+# dlatego sa odrzucane
+def fingerprint(opts: Dict[str, Any]) -> str:
+    stable = {k: v for k, v in opts.items() if k not in _PER_CALL_KEYS}
+    try:
+        return json.dumps(stable, sort_keys=True)
+    except (TypeError, ValueError):
+        bad = [k for k, v in stable.items() if not _serializable(v)]
+        raise TypeError(
+            f"Opcje yt-dlp spoza JSON nie moga trafic do puli: {', '.join(bad)}"
+        ) from None
+
+
+def _serializable(value: Any) -> bool:
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+# hooki biezacego wywolania; instancja dostaje je raz przy tworzeniu przez
+# publiczne add_progress_hook/add_postprocessor_hook (takze postprocesory
+# dodawane pozniej), a pula tylko podmienia listy, do ktorych przekazuja
+class _HookRelay:
+
+    def __init__(self) -> None:
+        self.progress: List[Callable[[dict], None]] = []
+        self.postprocessor: List[Callable[[dict], None]] = []
+
+    def set(self, opts: Dict[str, Any]) -> None:
+        self.progress = list(opts.get("progress_hooks") or [])
+        self.postprocessor = list(opts.get("postprocessor_hooks") or [])
+
+    def on_progress(self, d: dict) -> None:
+        for hook in self.progress:
+            hook(d)
+
+    def on_postprocessor(self, d: dict) -> None:
+        for hook in self.postprocessor:
+            hook(d)
+
+
+# ciepla instancja w puli razem z jej przekaznikiem hookow
+_Warm = Tuple[Any, _HookRelay]
+
+
+# tworzy instancje bez hookow per wywolanie i podpina do niej przekaznik
+def _create(factory: Callable[[Dict[str, Any]], Any], opts: Dict[str, Any]) -> _Warm:
+    base = {k: v for k, v in opts.items() if k not in _PER_CALL_KEYS}
+    # nowa instancja wchodzi w kontekst raz i zostaje w nim az do eviction
+    ydl = factory(base).__enter__()
+    relay = _HookRelay()
+    ydl.add_progress_hook(relay.on_progress)
+    ydl.add_postprocessor_hook(relay.on_postprocessor)
+    return ydl, relay
+
+
+# zamyka instancje yt-dlp, bledy przy zamykaniu nie sa istotne
+def _close(ydl: Any) -> None:
+    try:
+        ydl.__exit__(None, None, None)
+    except Exception:
+        pass
+
+
+# bezpieczna watkowo pula cieplych instancji yt_dlp.YoutubeDL
+# instancje sa kluczowane fabryka i odciskiem opcji, wydawane na wylacznosc
+class YDLPool:
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        # bezczynne instancje: (klucz, (instancja, przekaznik hookow), czas
+        # ostatniego uzycia)
+        self._idle: List[Tuple[Tuple[Any, str], _Warm, float]] = []
+
+    # liczba bezczynnych instancji w puli
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    # wypozycza instancje dla podanych opcji, po uzyciu wraca ona do puli
+    @contextmanager
+    def lease(self, factory: Callable[[Dict[str, Any]], Any], opts: Dict[str, Any]):
+        key = (factory, fingerprint(opts))
+        warm = self._checkout(key) or _create(factory, opts)
+        ydl, relay = warm
+        relay.set(opts)
+        try:
+            yield ydl
+        except BaseException:
+            # stan instancji po przerwanym wywolaniu jest nieznany - nie wraca do puli
+            _close(ydl)
+            raise
+        relay.set({})
+        self._checkin(key, warm)
+
+    # zamyka wszystkie bezczynne instancje
+    def clear(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for _, (ydl, _), _ in idle:
+            _close(ydl)
+
+    # zwraca bezczynna instancje o podanym kluczu albo None
+    def _checkout(self, key: Tuple[Any, str]) -> Optional[_Warm]:
+        found = None
+        with self._lock:
+            expired = self._evict_expired()
+            for i in range(len(self._idle) - 1, -1, -1):
+                if self._idle[i][0] == key:
+                    found = self._idle.pop(i)[1]
+                    break
+        for ydl in expired:
+            _close(ydl)
+        return found
+
+    # oddaje instancje do puli, nadmiarowe najstarsze instancje sa zamykane
+    def _checkin(self, key: Tuple[Any, str], warm: _Warm) -> None:
+        with self._lock:
+            evicted = self._evict_expired()
+            self._idle.append((key, warm, self._clock()))
+            while len(self._idle) > self.max_size:
+                evicted.append(self._idle.pop(0)[1][0])
+        for old in evicted:
+            _close(old)
+
+    # usuwa z listy instancje bezczynne dluzej niz idle_timeout (pod lockiem)
+    def _evict_expired(self) -> List[Any]:
+        now = self._clock()
+        keep, expired = [], []
+        for entry in self._idle:
+            if now - entry[2] > self.idle_timeout:
+                expired.append(entry[1][0])
+            else:
+                keep.append(entry)
+        self._idle = keep
+        return expired
+
+
+_shared_pool: Optional[YDLPool] = None
+_shared_lock = threading.Lock()
+
+
+# zwraca pule wspoldzielona przez caly proces
+def shared_pool() -> YDLPool:
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = YDLPool()
+        return _shared_pool
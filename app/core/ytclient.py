@@ -1,13 +1,73 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import os
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional
+
+from app.core.cancel import CancelToken
+from app.core.ydl_pool import YDLPool, shared_pool
+
+# ile razy wynik typu "url" (przekierowanie do innego ekstraktora) jest rozwijany
+_MAX_URL_HOPS = 3
+
+
+# profil wydajnosci pobierania: ile fragmentow dash/hls idzie naraz, jakimi
+# porcjami (http range) pobierany jest plik ciagly i od jakiego bufora startuje
+# odczyt gniazda (yt-dlp sam go powieksza)
+class DownloadProfile(NamedTuple):
+    name: str
+    concurrent_fragments: int = 1
+    http_chunk_size: Optional[int] = None  # None = jedno zapytanie na caly plik
+    buffer_size: int = 1024
+
+    # opcje yt-dlp dla profilu (zawsze wszystkie, zeby nadpisac profil klienta)
+    def to_opts(self) -> Dict[str, Any]:
+        return {
+            "concurrent_fragment_downloads": self.concurrent_fragments,
+            "http_chunk_size": self.http_chunk_size,
+            "buffersize": self.buffer_size,
+        }
+
+
+# gotowe profile; przy duzych opoznieniach laczy zysk daje glownie liczba
+# fragmentow naraz, porcje 10 MiB omijaja dlawienie dlugich polaczen po stronie yt
+PROFILES: Dict[str, DownloadProfile] = {
+    p.name: p
+    for p in (
+        DownloadProfile("standard"),
+        DownloadProfile("fast", 4, 10 * 1024 * 1024, 64 * 1024),
+        DownloadProfile("max", 8, 10 * 1024 * 1024, 1024 * 1024),
+    )
+}
+PROFILE_LABELS: Dict[str, str] = {
+    "standard": "Standardowy (1 fragment)",
+    "fast": "Szybki (4 fragmenty)",
+    "max": "Maksymalny (8 fragmentów)",
+}
+DEFAULT_PROFILE = "fast"
+PROFILE_ENV = "JUSTDOWNIT_PROFILE"
+
+
+# zwraca profil o podanej nazwie; None lub nieznana nazwa daje profil domyslny
+# (mozna go zmienic zmienna srodowiskowa)
+def get_profile(name: Optional[str] = None) -> DownloadProfile:
+    name = name or os.getenv(PROFILE_ENV, DEFAULT_PROFILE)
+    return PROFILES.get(name, PROFILES[DEFAULT_PROFILE])
 
 
 # klient do obslugi yt-dlp
 class YTClient:
 
     # inicjalizacja klienta z podana sciezka do ffmpeg i opcjonalnym proxy
-    def __init__(self, ffmpeg_path: str, proxy: Optional[str] = None):
+    # instancje YoutubeDL sa brane z puli (domyslnie wspolnej dla procesu)
+    # profile ustawia domyslny profil pobierania, pojedyncze zadanie moze go zmienic
+    def __init__(
+        self,
+        ffmpeg_path: Optional[str] = None,
+        proxy: Optional[str] = None,
+        pool: Optional[YDLPool] = None,
+        profile: Optional[DownloadProfile] = None,
+    ):
         try:
             import yt_dlp  # type: ignore
         except ImportError as e:
@@ -18,18 +78,22 @@ class YTClient:
         self._yt_dlp = yt_dlp
         self.ffmpeg_path = ffmpeg_path
         self.proxy = proxy
+        self.pool = pool if pool is not None else shared_pool()
+        self.profile = profile or get_profile()
 
     # buduje podstawowe opcje dla yt-dlp, mozna rozszerzyc o dodatkowe
     def _base_opts(self, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         opts: Dict[str, Any] = {
-            "ffmpeg_location": self.ffmpeg_path,  # sciezka do ffmpeg
             "no-mtime": True,  # nie nadpisuje czasu modyfikacji pliku
             "quiet": True,  # tryb cichy
+            "noprogress": True,  # postep idzie przez hooki, bez paska na konsoli
             "no_warnings": True,  # brak ostrzezen
-            "ratelimit": 25_000_000,  # limit predkosci pobierania
             "retries": 3,  # liczba ponownych prob
             "no_check_certificate": True,  # ignoruj certyfikaty ssl
         }
+        # sama ekstrakcja metadanych nie potrzebuje ffmpeg
+        if self.ffmpeg_path:
+            opts["ffmpeg_location"] = self.ffmpeg_path  # sciezka do ffmpeg
         if self.proxy:
             opts["proxy"] = self.proxy
         if extra:
@@ -37,17 +101,82 @@ class YTClient:
         return opts
 
     # pobiera plik z podanego url z uzyciem opcji
-    def download(self, url: str, options: Dict[str, Any]) -> None:
-        with self._yt_dlp.YoutubeDL(self._base_opts(options)) as ydl:
-            ydl.download([url])
+    # profil zadania (albo domyslny klienta) dochodzi tylko przy pobieraniu,
+    # sama ekstrakcja z niego nie korzysta i nie rozbija puli na rozne odciski
+    # token anulowania przerywa tez ekstrakcje, odczyty http i ffmpeg yt-dlp
+    # prepare dostaje info po wyborze formatow (requested_formats) i zwraca
+    # opcje pobierania, np. postprocesory zalezne od kodekow; pobieranie idzie
+    # wtedy z tego samego info, bez ponownej ekstrakcji, a gdy opcje sie nie
+    # zmienily - na tej samej instancji
+    def download(
+        self,
+        url: str,
+        options: Dict[str, Any],
+        profile: Optional[DownloadProfile] = None,
+        cancel: Optional[CancelToken] = None,
+        prepare: Optional[Callable[[dict], Dict[str, Any]]] = None,
+    ) -> None:
+        opts = self._base_opts({**(profile or self.profile).to_opts(), **options})
+        if cancel is not None:
+            # hook tokenu idzie z opcjami wywolania (pula podpina go na czas dzierzawy)
+            hooks = list(opts.get("progress_hooks") or [])
+            opts["progress_hooks"] = [*hooks, cancel.progress_hook]
+        if prepare is None:
+            self._run(opts, cancel, lambda ydl: ydl.download([url]))
+            return
+        with self.pool.lease(self._yt_dlp.YoutubeDL, opts) as ydl:
+            with (
+                cancel.bind(ydl, self._yt_dlp) if cancel is not None else nullcontext()
+            ):
+                info = ydl.extract_info(url, download=False)
+                planned = {**opts, **prepare(info)}
+                if planned == opts:
+                    ydl.process_ie_result(info, download=True)
+                    return
+        self._run(
+            planned, cancel, lambda ydl: ydl.process_ie_result(info, download=True)
+        )
+
+    # wykonuje call na instancji z puli, pod tokenem anulowania
+    def _run(
+        self,
+        opts: Dict[str, Any],
+        cancel: Optional[CancelToken],
+        call: Callable[[Any], Any],
+    ) -> Any:
+        with self.pool.lease(self._yt_dlp.YoutubeDL, opts) as ydl:
+            with (
+                cancel.bind(ydl, self._yt_dlp) if cancel is not None else nullcontext()
+            ):
+                return call(ydl)
 
     # wyciaga informacje o materiale bez pobierania (chyba ze opcje inaczej ustawia)
     def extract(self, url: str, options: Optional[Dict[str, Any]] = None) -> dict:
-        with self._yt_dlp.YoutubeDL(
-            self._base_opts(options or {"skip_download": True})
-        ) as ydl:
+        opts = self._base_opts(options or {"skip_download": True})
+        with self.pool.lease(self._yt_dlp.YoutubeDL, opts) as ydl:
             return ydl.extract_info(url, download=False)
 
+    # iteruje po elementach playlisty w miare jak yt-dlp pobiera kolejne strony
+    # (process=False zostawia entries jako leniwy generator); instancja z puli
+    # jest zajeta do konca iteracji, bo generator korzysta z jej polaczen
+    def iter_entries(
+        self, url: str, options: Optional[Dict[str, Any]] = None
+    ) -> Iterator[dict]:
+        opts = self._base_opts(options or {"skip_download": True})
+        with self.pool.lease(self._yt_dlp.YoutubeDL, opts) as ydl:
+            info = ydl.extract_info(url, download=False, process=False)
+            # np. link watch?v=..&list=.. wskazuje dopiero na strone playlisty
+            for _ in range(_MAX_URL_HOPS):
+                if not info or info.get("_type") not in ("url", "url_transparent"):
+                    break
+                info = ydl.extract_info(
+                    info["url"],
+                    download=False,
+                    process=False,
+                    ie_key=info.get("ie_key"),
+                )
+            yield from (info or {}).get("entries") or []
+
     # zwraca modul utils z yt-dlp do obslugi bledow i innych narzedzi
     @property
     def errors(self):
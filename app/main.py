@@ -1,15 +1,24 @@
 from __future__ import annotations
 
+import json
 import os
 import sys
 import time
 
+from PyQt6.QtCore import QTimer
 from PyQt6.QtGui import QIcon
 from PyQt6.QtWidgets import QApplication, QMainWindow, QStatusBar
 
+from app.core.download_archive import warm_download_archive
+from app.core.ffmpeg_caps import warm_ffmpeg_caps
 from app.core.paths import get_ffmpeg_path
+from app.core.postprocess import shutdown_shared_pool
+from app.core.warmup import HEAVY_MODULES, warm_imports
 from app.ui.ui_mainwindow import YouTubeDownloader
 
+# zmienna srodowiskowa wlaczajaca pomiar startu (uzywana przez testy budzetu)
+STARTUP_PROBE_ENV = "JUSTDOWNIT_STARTUP_PROBE"
+
 
 # glowne okno aplikacji
 class MainWindow(QMainWindow):
@@ -24,22 +33,49 @@ class MainWindow(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
 
-        # ustawia sciezke do ffmpeg podczas startu
+        # wykrywanie ffmpeg dopiero po pierwszym odrysowaniu okna
+        QTimer.singleShot(0, self._detect_ffmpeg)
+        # archiwum pobran wczytywane do pamieci w tle, nie w watku gui
+        QTimer.singleShot(0, warm_download_archive)
+        # pytanie o wznowienie przerwanej kolejki, gdy okno jest juz widoczne
+        QTimer.singleShot(0, self.downloader_widget.offer_queue_resume)
+
+    # ustawia sciezke do ffmpeg (poza sciezka startu okna)
+    def _detect_ffmpeg(self) -> None:
         try:
             ff_path = get_ffmpeg_path()
             self.downloader_widget.set_ffmpeg_path(ff_path)
             self.log_message(f"FFmpeg: {ff_path}")
+            # mozliwosci ffmpeg (kodery do planow konwersji) sondowane w tle,
+            # zeby pierwsze pobieranie nie czekalo na sondowanie
+            warm_ffmpeg_caps(ff_path)
         except Exception as e:
             # aplikacja moze dzialac bez ffmpeg, ale konwersje beda problematyczne
             self.downloader_widget.set_ffmpeg_path("")
             self.log_message(f"Nie wykryto FFmpeg: {e}")
 
+    # przerywa pobierania i konwersje (razem z procesami ffmpeg), zatrzymuje
+    # watki miniatur, zeby nie wstrzymywaly zamkniecia aplikacji, i dopisuje
+    # zalegle logi do pliku
+    def closeEvent(self, event) -> None:
+        self.downloader_widget.stop_downloads()
+        shutdown_shared_pool()
+        self.downloader_widget.thumbs.shutdown()
+        self.downloader_widget.log_output.shutdown()
+        super().closeEvent(event)
+
     # metoda do logowania komunikatow w pasku statusu
     def log_message(self, msg: str) -> None:
         timestamp = time.strftime("%H:%M:%S")
         self.status_bar.showMessage(f"[{timestamp}] {msg}")
 
 
+# wypisuje wynik pomiaru startu i zamyka aplikacje
+def _report_startup(app: QApplication, loaded: list[str]) -> None:
+    print(json.dumps({"shown_at": time.time(), "heavy_loaded": loaded}), flush=True)
+    app.quit()
+
+
 # funkcja startowa aplikacji
 def main() -> int:
     app = QApplication(sys.argv)
@@ -54,6 +90,14 @@ def main() -> int:
     window.setWindowTitle("JustDownIt")
     window.resize(900, 650)
     window.show()
+
+    if os.getenv(STARTUP_PROBE_ENV):
+        # ciezkie moduly zaladowane do chwili pokazania okna
+        loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+        QTimer.singleShot(0, lambda: _report_startup(app, loaded))
+    else:
+        # rozgrzewa ciezkie importy w tle, po pierwszym odrysowaniu
+        QTimer.singleShot(0, warm_imports)
     return app.exec()
 
 
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import List, Optional
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer
+from PyQt6.QtGui import QKeySequence
+from PyQt6.QtWidgets import QAbstractItemView, QApplication, QListView
+
+from app.core.log_file import LogFileSink
+
+# ile linii trzyma okno logow (starsze wypadaja) i co ile ms dopisuje zalegle
+DEFAULT_MAX_LINES = 5000
+FLUSH_INTERVAL_MS = 100
+
+
+# model logow: bufor cykliczny z limitem linii; nowe linie czekaja w kolejce
+# i trafiaja do widoku partiami z timera, a nie pojedynczo przy kazdym komunikacie
+class LogModel(QAbstractListModel):
+
+    def __init__(
+        self,
+        max_lines: int = DEFAULT_MAX_LINES,
+        flush_ms: int = FLUSH_INTERVAL_MS,
+        sink: Optional[LogFileSink] = None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.max_lines = max(1, max_lines)
+        self.dropped = 0  # linie usuniete z widoku przez limit
+        self._lines: deque[str] = deque()
+        self._pending: List[str] = []
+        self._sink = sink
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(flush_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._lines)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            return self._lines[index.row()]
+        return None
+
+    # dodaje linie do kolejki; widok zobaczy ja przy najblizszym flush
+    def append(self, line: str) -> None:
+        self._pending.append(line)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    # przenosi zalegle linie do bufora: jedno usuniecie z gory i jedno wstawienie
+    def flush(self) -> None:
+        self._timer.stop()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        if self._sink is not None:
+            self._sink.write(pending)
+
+        batch = pending[-self.max_lines :]
+        overflow = len(self._lines) + len(batch) - self.max_lines
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self._lines.popleft()
+            self.endRemoveRows()
+        first = len(self._lines)
+        self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+        self._lines.extend(batch)
+        self.endInsertRows()
+        self.dropped += max(overflow, 0) + len(pending) - len(batch)
+
+    # usuwa wszystkie linie z widoku (plik logow zostaje nietkniety)
+    def clear(self) -> None:
+        self._timer.stop()
+        self.beginResetModel()
+        self._lines.clear()
+        self._pending = []
+        self.endResetModel()
+
+    def lines(self) -> List[str]:
+        return list(self._lines)
+
+    # dopisuje zalegle linie i zamyka plik logow
+    def close(self) -> None:
+        self.flush()
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+
+# lista logow; przewija sie na dol tylko gdy uzytkownik juz byl na dole
+class LogView(QListView):
+
+    def __init__(
+        self,
+        max_lines: int = DEFAULT_MAX_LINES,
+        sink: Optional[LogFileSink] = None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.log_model = LogModel(max_lines=max_lines, sink=sink, parent=self)
+        self.setModel(self.log_model)
+        # stala wysokosc wierszy: widok nie mierzy kazdej linii osobno
+        self.setUniformItemSizes(True)
+        self.setWordWrap(False)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self._follow = True
+        self.log_model.rowsAboutToBeInserted.connect(self._remember_position)
+        self.log_model.rowsInserted.connect(self._follow_tail)
+
+    def append(self, line: str) -> None:
+        self.log_model.append(line)
+
+    def clear(self) -> None:
+        self.log_model.clear()
+
+    def shutdown(self) -> None:
+        self.log_model.close()
+
+    def _remember_position(self, *_):
+        sb = self.verticalScrollBar()
+        self._follow = sb.value() >= sb.maximum()
+
+    def _follow_tail(self, *_):
+        if self._follow:
+            self.scrollToBottom()
+
+    # ctrl+c kopiuje zaznaczone linie
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.StandardKey.Copy):
+            rows = sorted(i.row() for i in self.selectedIndexes())
+            lines = self.log_model.lines()
+            QApplication.clipboard().setText("\n".join(lines[r] for r in rows))
+            return
+        super().keyPressEvent(event)
@@ -0,0 +1,393 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Tuple
+
+from PyQt6.QtCore import (
+    QAbstractTableModel,
+    QEvent,
+    QModelIndex,
+    QRect,
+    QSize,
+    Qt,
+    QTimer,
+)
+from PyQt6.QtWidgets import (
+    QApplication,
+    QComboBox,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionButton,
+    QStyleOptionViewItem,
+)
+
+from app.core.download import AUDIO_OPTIONS
+from app.core.queue_journal import (
+    CANCELLED,
+    DONE,
+    FAILED,
+    POSTPROCESSING,
+    QUEUED,
+    RUNNING,
+)
+
+# tylko dla adnotacji: model nie zalezy od warstwy workerow
+if TYPE_CHECKING:
+    from app.workers.thumbnail_service import ThumbnailService
+
+# kolumny tabeli playlisty
+COL_INDEX, COL_THUMB, COL_TITLE, COL_DURATION, COL_QUALITY, COL_CHECK, COL_STATE = (
+    range(7)
+)
+HEADERS = ("#", "Miniaturka", "Tytuł", "Czas", "Jakość", "Pobierz?", "Stan")
+
+# opcje jakosci dostepne zawsze, zanim przyjda metadane wiersza
+BASE_QUALITIES: Tuple[Tuple[Optional[str], str], ...] = (
+    (None, "Auto"),
+    *AUDIO_OPTIONS,
+)
+
+# rola z lista opcji jakosci wiersza: [(format_id, etykieta), ...]
+QualityOptionsRole = Qt.ItemDataRole.UserRole + 1
+# rola z miniatura wiersza: (id filmu, url obrazka) albo None
+ThumbnailRole = Qt.ItemDataRole.UserRole + 2
+
+# etykiety stanow pozycji kolejki pobierania
+STATE_LABELS = {
+    QUEUED: "W kolejce",
+    RUNNING: "Pobieranie",
+    POSTPROCESSING: "Konwersja",
+    DONE: "Gotowe",
+    FAILED: "Błąd",
+    CANCELLED: "Anulowano",
+}
+
+
+# formatuje czas trwania w sekundach do postaci mm:ss lub hh:mm:ss
+def fmt_duration(seconds: int | None) -> str:
+    if seconds is None:
+        return "—"
+    try:
+        seconds = int(seconds)
+    except Exception:
+        return "—"
+    m, s = divmod(seconds, 60)
+    h, m = divmod(m, 60)
+    return f"{h:d}:{m:02d}:{s:02d}" if h else f"{m:d}:{s:02d}"
+
+
+# dane jednego wiersza playlisty
+class PlaylistRow:
+    __slots__ = (
+        "id",
+        "url",
+        "title",
+        "duration",
+        "thumb_url",
+        "qualities",
+        "quality",
+        "checked",
+        "state",
+        "message",
+        "progress",
+        "meta_error",
+    )
+
+    def __init__(self, entry: dict):
+        self.id: Optional[str] = entry.get("id")
+        self.url: Optional[str] = entry.get("url")
+        self.title: str = entry.get("title") or "—"
+        self.duration: Optional[int] = None
+        # sam url obrazka; zdekodowana miniatura zyje tylko w lru serwisu miniatur
+        self.thumb_url: Optional[str] = None
+        self.qualities: List[Tuple[Optional[str], str]] = list(BASE_QUALITIES)
+        self.quality: Optional[str] = None  # wybrany format_id (None = auto)
+        self.checked = True
+        self.state = ""  # stan pobierania (pusty = nie bylo w kolejce)
+        self.message = ""  # blad pobierania (podpowiedz w kolumnie stanu)
+        self.progress: Optional[float] = None
+        self.meta_error = ""  # blad wczytywania metadanych (kolumna czasu)
+
+    # etykieta aktualnie wybranej jakosci
+    def quality_label(self) -> str:
+        for fid, label in self.qualities:
+            if fid == self.quality:
+                return label
+        return "Auto"
+
+
+# model tabeli playlisty; operacje zbiorcze emituja jeden dataChanged
+class PlaylistModel(QAbstractTableModel):
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[PlaylistRow] = []
+
+    # api zgodne z qt
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            role == Qt.ItemDataRole.DisplayRole
+            and orientation == Qt.Orientation.Horizontal
+        ):
+            return HEADERS[section]
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        f = Qt.ItemFlag.ItemIsEnabled
+        if index.column() == COL_QUALITY:
+            f |= Qt.ItemFlag.ItemIsEditable
+        elif index.column() == COL_CHECK:
+            f |= Qt.ItemFlag.ItemIsUserCheckable
+        return f
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        r = self._rows[index.row()]
+        col = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == COL_INDEX:
+                return str(index.row() + 1)
+            if col == COL_THUMB:
+                return None if r.thumb_url else "—"
+            if col == COL_TITLE:
+                return r.title
+            if col == COL_DURATION:
+                return "Błąd" if r.meta_error else fmt_duration(r.duration)
+            if col == COL_QUALITY:
+                return r.quality_label()
+            if col == COL_STATE:
+                text = STATE_LABELS.get(r.state, r.state)
+                if r.state == RUNNING and r.progress is not None:
+                    text = f"{text} {r.progress:.0f}%"
+                return text
+        elif role == ThumbnailRole and col == COL_THUMB:
+            return (r.id, r.thumb_url) if r.id and r.thumb_url else None
+        elif role == Qt.ItemDataRole.CheckStateRole and col == COL_CHECK:
+            return Qt.CheckState.Checked if r.checked else Qt.CheckState.Unchecked
+        elif role == Qt.ItemDataRole.EditRole and col == COL_QUALITY:
+            return r.quality
+        elif role == QualityOptionsRole and col == COL_QUALITY:
+            return r.qualities
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            if col == COL_DURATION and r.meta_error:
+                return r.meta_error
+            if col == COL_STATE and r.message:
+                return r.message
+        elif role == Qt.ItemDataRole.TextAlignmentRole and col == COL_THUMB:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def setData(self, index: QModelIndex, value: Any, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid():
+            return False
+        r = self._rows[index.row()]
+        if index.column() == COL_CHECK and role == Qt.ItemDataRole.CheckStateRole:
+            r.checked = Qt.CheckState(value) == Qt.CheckState.Checked
+        elif index.column() == COL_QUALITY and role == Qt.ItemDataRole.EditRole:
+            r.quality = value
+        else:
+            return False
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    # api aplikacji
+
+    def row(self, row: int) -> PlaylistRow:
+        return self._rows[row]
+
+    def rows(self) -> Sequence[PlaylistRow]:
+        return self._rows
+
+    # wymienia cala zawartosc (jeden reset modelu zamiast n wstawien)
+    def reset(self, entries: Sequence[dict]) -> None:
+        self.beginResetModel()
+        self._rows = [PlaylistRow(e) for e in entries]
+        self.endResetModel()
+
+    # dokleja wiersze na koncu (kolejne porcje listowania playlisty)
+    def append(self, entries: Sequence[dict]) -> None:
+        if not entries:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        self._rows.extend(PlaylistRow(e) for e in entries)
+        self.endInsertRows()
+
+    # uzupelnia wiersz metadanymi, zachowujac wybrana jakosc jesli nadal dostepna
+    def update_meta(
+        self, row: int, duration: Optional[int], formats: Sequence[Tuple[str, str]]
+    ) -> None:
+        r = self._rows[row]
+        r.duration = duration
+        r.meta_error = ""
+        r.qualities = [*BASE_QUALITIES, *formats]
+        if all(fid != r.quality for fid, _ in r.qualities):
+            r.quality = None
+        self._emit_row(row, COL_DURATION, COL_QUALITY)
+
+    # url miniatury wiersza (None = brak, np. po bledzie pobierania)
+    def set_thumbnail_url(self, row: int, url: Optional[str]) -> None:
+        self._rows[row].thumb_url = url or None
+        self._emit_row(row, COL_THUMB, COL_THUMB)
+
+    # miniatura wiersza trafila do cache, komorka ma sie przerysowac
+    def thumbnail_loaded(self, row: int) -> None:
+        self._emit_row(row, COL_THUMB, COL_THUMB)
+
+    def mark_failed(self, row: int, message: str) -> None:
+        self._rows[row].meta_error = message
+        self._emit_row(row, COL_DURATION, COL_DURATION)
+
+    def set_state(
+        self, row: int, state: str, message: str = "", pct: Optional[float] = None
+    ) -> None:
+        r = self._rows[row]
+        r.state = state
+        r.progress = pct
+        if message or state != RUNNING:
+            r.message = message
+        self._emit_row(row, COL_STATE, COL_STATE)
+
+    # oznacza wiersze jako juz pobrane: odznacza je i ustawia stan, jeden dataChanged
+    def mark_done(self, rows: Sequence[int], message: str = "") -> None:
+        if not rows:
+            return
+        for row in rows:
+            r = self._rows[row]
+            r.checked = False
+            r.state = DONE
+            r.progress = None
+            r.message = message
+        self.dataChanged.emit(
+            self.index(min(rows), COL_CHECK), self.index(max(rows), COL_STATE)
+        )
+
+    # zaznacza/odznacza wszystkie wiersze, jeden dataChanged
+    def set_all_checked(self, checked: bool) -> None:
+        for r in self._rows:
+            r.checked = checked
+        self._emit_column(COL_CHECK, Qt.ItemDataRole.CheckStateRole)
+
+    # ustawia jakosc we wszystkich wierszach: po format_id, a gdy wiersz go nie
+    # ma - po etykiecie; bez obu przywraca auto; jeden dataChanged
+    def apply_quality(self, format_id: Optional[str], label: str = "") -> None:
+        for r in self._rows:
+            if format_id is None and not label:
+                r.quality = None
+                continue
+            for fid, _ in r.qualities:
+                if format_id is not None and fid == format_id:
+                    r.quality = fid
+                    break
+            else:
+                for fid, lbl in r.qualities:
+                    if label and lbl == label:
+                        r.quality = fid
+                        break
+        self._emit_column(COL_QUALITY, Qt.ItemDataRole.EditRole)
+
+    # zaznaczone wiersze: (nr wiersza, url, format_id)
+    def checked_items(self) -> List[Tuple[int, str, Optional[str]]]:
+        return [
+            (i, r.url, r.quality)
+            for i, r in enumerate(self._rows)
+            if r.checked and r.url
+        ]
+
+    def _emit_row(self, row: int, first: int, last: int) -> None:
+        self.dataChanged.emit(self.index(row, first), self.index(row, last))
+
+    def _emit_column(self, col: int, role: Qt.ItemDataRole) -> None:
+        if self._rows:
+            self.dataChanged.emit(
+                self.index(0, col), self.index(len(self._rows) - 1, col), [role]
+            )
+
+
+# rysuje miniaturke wysrodkowana w komorce (bez widgetu na wiersz)
+# obraz bierze z lru serwisu miniatur; przy braku zleca go pod kluczem
+# "row:<nr>", wiec pobierane sa tylko miniatury wierszy, ktore widac
+class ThumbnailDelegate(QStyledItemDelegate):
+
+    def __init__(self, size: Tuple[int, int], thumbs: ThumbnailService, parent=None):
+        super().__init__(parent)
+        self._size = QSize(*size)
+        self._thumb_size = size
+        self._thumbs = thumbs
+
+    def paint(self, painter, option: QStyleOptionViewItem, index: QModelIndex):
+        thumb = index.data(ThumbnailRole)
+        img = self._thumbs.cached(thumb[0], self._thumb_size) if thumb else None
+        if img is None:
+            key = f"row:{index.row()}"
+            if thumb and not self._thumbs.is_pending(key):
+                self._thumbs.request(key, thumb[1], self._thumb_size, thumb[0])
+            super().paint(painter, option, index)
+            return
+        r = option.rect
+        x = r.x() + (r.width() - img.width()) // 2
+        y = r.y() + (r.height() - img.height()) // 2
+        painter.drawImage(x, y, img)
+
+    def sizeHint(self, option, index) -> QSize:
+        return self._size + QSize(8, 4)
+
+
+# combobox jakosci tworzony tylko na czas edycji jednej komorki
+class QualityDelegate(QStyledItemDelegate):
+
+    def createEditor(self, parent, option, index):
+        combo = QComboBox(parent)
+        for fid, label in index.data(QualityOptionsRole) or BASE_QUALITIES:
+            combo.addItem(label, userData=fid)
+        # wybor z listy od razu zapisuje dane i zamyka edytor
+        combo.activated.connect(lambda _: self._commit(combo))
+        QTimer.singleShot(0, combo.showPopup)
+        return combo
+
+    def _commit(self, combo: QComboBox) -> None:
+        self.commitData.emit(combo)
+        self.closeEditor.emit(combo)
+
+    def setEditorData(self, editor: QComboBox, index: QModelIndex) -> None:
+        i = editor.findData(index.data(Qt.ItemDataRole.EditRole))
+        editor.setCurrentIndex(max(i, 0))
+
+    def setModelData(self, editor: QComboBox, model, index: QModelIndex) -> None:
+        model.setData(index, editor.currentData(), Qt.ItemDataRole.EditRole)
+
+
+# checkbox rysowany na srodku komorki, klik w dowolne miejsce komorki przelacza
+class CheckDelegate(QStyledItemDelegate):
+
+    def paint(self, painter, option: QStyleOptionViewItem, index: QModelIndex):
+        opt = QStyleOptionButton()
+        opt.rect = self._indicator_rect(option)
+        checked = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+        opt.state = QStyle.StateFlag.State_Enabled | (
+            QStyle.StateFlag.State_On if checked else QStyle.StateFlag.State_Off
+        )
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_CheckBox, opt, painter)
+
+    def editorEvent(self, event, model, option, index) -> bool:
+        if event.type() != QEvent.Type.MouseButtonRelease:
+            return event.type() == QEvent.Type.MouseButtonDblClick
+        checked = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+        new = Qt.CheckState.Unchecked if checked else Qt.CheckState.Checked
+        return model.setData(index, new.value, Qt.ItemDataRole.CheckStateRole)
+
+    @staticmethod
+    def _indicator_rect(option: QStyleOptionViewItem) -> QRect:
+        style = option.widget.style() if option.widget else QApplication.style()
+        w = style.pixelMetric(QStyle.PixelMetric.PM_IndicatorWidth)
+        h = style.pixelMetric(QStyle.PixelMetric.PM_IndicatorHeight)
+        r = option.rect
+        return QRect(r.x() + (r.width() - w) // 2, r.y() + (r.height() - h) // 2, w, h)
@@ -26,7 +26,7 @@ def apply_dark_theme(app_or_window):
 
     # dodatkowe style css dla wybranych widgetow
     app_or_window.setStyleSheet("""
-        QLineEdit, QTextEdit {
+        QLineEdit, QTextEdit, QListView {
             background-color: #2b2f3a;
             border: 1px solid #3d4351;
             border-radius: 4px;
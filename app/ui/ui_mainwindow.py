@@ -3,9 +3,8 @@
 import os
 import time
 
-import requests
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont, QPixmap, QTextCursor
+from PyQt6.QtGui import QFont, QImage, QPixmap
 from PyQt6.QtWidgets import (
     QComboBox,
     QFileDialog,
@@ -17,14 +16,22 @@ from PyQt6.QtWidgets import (
     QPushButton,
     QRadioButton,
     QStackedWidget,
-    QTextEdit,
     QVBoxLayout,
     QWidget,
 )
 
-from app.core.thumbnails import get_thumbnail_url  # wyznaczanie URL miniatury
+from app.core.bandwidth import PRIORITY_WEIGHT, shared_limiter
+from app.core.download import kind_for_format
+from app.core.download_archive import DEFAULT_EXTRACTOR, DownloadArchive, shared_archive
+from app.core.log_file import log_sink_from_env
+from app.core.queue_journal import RUNNING, QueueJournal, shared_journal
+from app.ui.log_view import LogView
 from app.ui.theme import apply_dark_theme
-from app.ui.ui_playlist import PlaylistView
+from app.ui.ui_playlist import PlaylistView, profile_combo, rate_limit_spin
+from app.utils.url import extract_video_id
+from app.workers.download_scheduler import (  # rownolegla kolejka playlisty
+    DownloadScheduler,
+)
 from app.workers.download_worker import DownloadWorker  # pobieranie MP4/MP3
 from app.workers.format_worker import (
     FormatFetchWorker,  # formaty dla pojedynczego wideo
@@ -37,14 +44,20 @@ from app.workers.playlist_fetch_worker import (
 from app.workers.playlist_formats_worker import (
     PlaylistFormatsWorker,  # meta per-wideo (czas/miniatura/formaty)
 )
+from app.workers.thumbnail_service import (  # miniatury w tle
+    SINGLE_SIZE,
+    ThumbnailService,
+)
+
+# klucz zadania miniatury w widoku pojedynczego filmu
+THUMB_KEY = "single"
 
 
 class YouTubeDownloader(QWidget):
     def __init__(self):
 
-        self._dl_queue = []
-        self._dl_total = 0
-        self._dl_index = 0
+        self._dl_rows: list[int] = []  # indeks w kolejce -> wiersz tabeli playlisty
+        self._scheduler: DownloadScheduler | None = None
         self.download_thread = None
 
         super().__init__()
@@ -66,11 +79,18 @@ class YouTubeDownloader(QWidget):
         self._pl_meta_thread = None
         self._pl_fetch_running = False
         self._pl_meta_running = False
+        self._pl_listed = 0  # wiersze juz pokazane z biezacego listowania
+        self._pl_meta_feed = None  # worker metadanych czekajacy na kolejne porcje
+
+        # miniatury pobierane i skalowane poza watkiem gui
+        self.thumbs = ThumbnailService(parent=self)
+        self.thumbs.ready.connect(self._on_thumbnail_ready)
+        self.thumbs.failed.connect(self._on_thumbnail_failed)
 
         # Stos widoków: pojedynczy film <-> playlista
         self.stack = QStackedWidget(self)
         self.page_single = QWidget()
-        self.page_playlist = PlaylistView()
+        self.page_playlist = PlaylistView(self.thumbs)
         self.stack.addWidget(self.page_single)
         self.stack.addWidget(self.page_playlist)
 
@@ -160,6 +180,24 @@ class YouTubeDownloader(QWidget):
 
         opts_box.addWidget(type_label)
         opts_box.addLayout(type_buttons)
+
+        # Profil pobierania (fragmenty naraz)
+        profile_label = QLabel("Profil pobierania:")
+        profile_label.setFont(section_font)
+        self.profile_combo = profile_combo()
+        self.profile_combo.setFont(normal_font)
+        self.profile_combo.setMaximumWidth(240)
+        opts_box.addWidget(profile_label)
+        opts_box.addWidget(self.profile_combo)
+
+        # Limit przepustowosci (wspolny dla wszystkich pobran)
+        rate_label = QLabel("Limit prędkości:")
+        rate_label.setFont(section_font)
+        self.rate_limit = rate_limit_spin()
+        self.rate_limit.setFont(normal_font)
+        self.rate_limit.setMaximumWidth(240)
+        opts_box.addWidget(rate_label)
+        opts_box.addWidget(self.rate_limit)
         opts_box.addStretch()
 
         row_opts_thumb.addLayout(opts_box, stretch=1)
@@ -246,9 +284,9 @@ class YouTubeDownloader(QWidget):
         log_label.setFont(section_font)
         log_layout.addWidget(log_label)
 
-        self.log_output = QTextEdit()
+        # bufor z limitem linii, dopisywany partiami; opcjonalnie plik z rotacja
+        self.log_output = LogView(sink=log_sink_from_env())
         self.log_output.setFont(normal_font)
-        self.log_output.setReadOnly(True)
         log_layout.addWidget(self.log_output)
 
         main_layout.addLayout(log_layout, 1)
@@ -272,6 +310,15 @@ class YouTubeDownloader(QWidget):
         self.page_playlist.btn_download.clicked.connect(
             self._playlist_download_selected
         )
+        self.page_playlist.btn_cancel_all.clicked.connect(self.cancel_download)
+        self.page_playlist.concurrency.valueChanged.connect(
+            lambda n: self._scheduler and self._scheduler.set_concurrency(n)
+        )
+        self.rate_limit.valueChanged.connect(self._set_rate_limit)
+        self.page_playlist.rate_limit.valueChanged.connect(self._set_rate_limit)
+        self.page_playlist.table.selectionModel().currentRowChanged.connect(
+            self._prioritize_playlist_row
+        )
 
     # ===========================================================================
     # Logika pojedynczego widoku
@@ -313,6 +360,9 @@ class YouTubeDownloader(QWidget):
 
         self.available_formats = []
         self.quality_combo.clear()
+        if url_changed:
+            # miniatura poprzedniego url nie moze juz nadpisac etykiety
+            self.thumbs.cancel(THUMB_KEY)
 
         if ("youtube.com/watch?v=" in self.current_url) or (
             "youtu.be/" in self.current_url
@@ -324,6 +374,7 @@ class YouTubeDownloader(QWidget):
             self.fetch_thread = FormatFetchWorker(self.current_url)
             self.fetch_thread.formats_ready.connect(self.on_formats_ready)
             self.fetch_thread.error.connect(self.on_formats_error)
+            self.fetch_thread.thumbnail_ready.connect(self._on_info_thumbnail)
             self.fetch_thread.start()
         elif is_playlist:
             self.thumbnail_label.setText(
@@ -355,36 +406,36 @@ class YouTubeDownloader(QWidget):
 
     def fetch_thumbnail(self, url: str):
         self.thumbnail_label.setText("Pobieranie miniatury…")
-        try:
-            thumb_url = get_thumbnail_url(url, log=self.log_message)
-            if thumb_url:
-                self.log_message(f"Pobrano URL miniatury: {thumb_url}")
-                response = requests.get(thumb_url, timeout=5)
-                response.raise_for_status()
-                pixmap = QPixmap()
-                pixmap.loadFromData(response.content)
-                if not pixmap.isNull():
-                    pixmap = pixmap.scaled(
-                        320,
-                        180,
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation,
-                    )
-                    self.thumbnail_label.setPixmap(pixmap)
-                else:
-                    self.thumbnail_label.setText("Błąd ładowania miniatury")
-            else:
-                self.thumbnail_label.setText("Nie znaleziono miniatury")
-                self.log_message("Nie udało się pobrać miniatury")
-        except Exception as e:
+        self.thumbnail_label.setPixmap(QPixmap())
+        self.thumbs.request_for_video(THUMB_KEY, url, SINGLE_SIZE)
+
+    # metadane przyszly przed miniatura: zamiast sprawdzania maxres bierzemy
+    # url z listy miniatur w metadanych; wynik workera dla poprzedniego url
+    # jest odrzucany, zeby nie trafil do cache pod id biezacego filmu
+    def _on_info_thumbnail(self, video_url: str, thumb_url: str):
+        if video_url != self.current_url:
+            return
+        if self.thumbs.is_pending(THUMB_KEY):
+            self.thumbs.request(
+                THUMB_KEY,
+                thumb_url,
+                SINGLE_SIZE,
+                extract_video_id(video_url),
+            )
+
+    def _on_thumbnail_ready(self, key: str, image: QImage):
+        if key == THUMB_KEY:
+            self.thumbnail_label.setPixmap(QPixmap.fromImage(image))
+
+    def _on_thumbnail_failed(self, key: str, error: str):
+        if key == THUMB_KEY:
             self.thumbnail_label.setText("Błąd pobierania miniatury")
-            self.log_message(f"Błąd pobierania miniatury: {e}")
+            self.log_message(f"Błąd pobierania miniatury: {error}")
 
     def log_message(self, message: str):
         timestamp = time.strftime("%H:%M:%S")
         formatted_msg = f"[{timestamp}] {message}"
         self.log_output.append(formatted_msg)
-        self.log_output.moveCursor(QTextCursor.MoveOperation.End)
 
     def set_download_type(self, download_type: str):
         self.download_type = download_type
@@ -402,12 +453,30 @@ class YouTubeDownloader(QWidget):
         self.log_output.clear()
         self.log_message("Logi wyczyszczone")
 
+    # anulowanie z przycisku usuwa pliki czesciowe: anulowane pozycje nie sa
+    # wznawiane z dziennika kolejki, wiec zostalyby na dysku bez celu
     def cancel_download(self):
-        if hasattr(self, "download_thread") and self.download_thread.isRunning():
-            self.download_thread.cancel()
+        if self._scheduler and self._scheduler.is_active():
+            self._scheduler.cancel_all(remove_partial=True)
+            self.log_message("Anulowanie kolejki pobierania…")
+            self.cancel_button.setEnabled(False)
+            self.page_playlist.btn_cancel_all.setEnabled(False)
+            return
+        if self.download_thread and self.download_thread.isRunning():
+            self.download_thread.cancel(remove_partial=True)
             self.log_message("Wysyłanie żądania anulowania…")
             self.cancel_button.setEnabled(False)
 
+    # zamkniecie okna: kolejka i pojedyncze pobieranie sa przerywane bez
+    # usuwania plikow .part (tokeny workerow zabijaja procesy ffmpeg yt-dlp),
+    # dziennik kolejki zostaje do wznowienia; czeka na watki najwyzej timeout_ms
+    def stop_downloads(self, timeout_ms: int = 5000):
+        if self._scheduler is not None:
+            self._scheduler.shutdown(timeout_ms)
+        if self.download_thread and self.download_thread.isRunning():
+            self.download_thread.cancel()
+            self.download_thread.wait(timeout_ms)
+
     # Inteligentny przycisk
     def on_primary_button_clicked(self):
         if self._primary_mode == "show_playlist":
@@ -464,6 +533,8 @@ class YouTubeDownloader(QWidget):
             folder=folder,
             download_type=self.download_type,
             format_id=format_id,
+            profile=self.profile_combo.currentData(),
+            weight=PRIORITY_WEIGHT,  # ogladany film przed pobraniami z playlisty
         )
         self.download_thread.log_signal.connect(self.log_message)
         self.download_thread.progress_signal.connect(self.update_progress)
@@ -487,6 +558,7 @@ class YouTubeDownloader(QWidget):
         self.url_input.setEnabled(enabled)
         self.type_mp4.setEnabled(enabled)
         self.type_mp3.setEnabled(enabled)
+        self.profile_combo.setEnabled(enabled)
         self.quality_combo.setEnabled(enabled and self.quality_combo.count() > 0)
         self.browse_button.setEnabled(enabled)
         self.download_button.setEnabled(enabled)
@@ -502,17 +574,6 @@ class YouTubeDownloader(QWidget):
             )
         )
 
-    def _on_queue_item_finished(self, success: bool, error_msg: str):
-        if success:
-            self.log_message("Pozycja zakończona pomyślnie.")
-        else:
-            self.log_message(f"Błąd pozycji: {error_msg}")
-            # nie przerywamy całej kolejki; jeśli chcesz – tu dodaj decyzję
-
-        # ważne: *po* zakończeniu poprzedniego wątku startuj kolejny
-        self.download_thread = None
-        self._start_next_from_queue()
-
     def set_ffmpeg_path(self, path: str):
         self.ffmpeg_path = path
 
@@ -537,10 +598,12 @@ class YouTubeDownloader(QWidget):
             self._pl_url = url
             self._pl_entries = None
             self._pl_meta_done = False
+            self._pl_listed = 0
 
             self.log_message("Ładuję listę filmów z playlisty…")
 
             self._pl_fetch_thread = PlaylistFetchWorker(url)
+            self._pl_fetch_thread.chunk.connect(self._on_playlist_chunk)
             self._pl_fetch_thread.result.connect(self._on_playlist_list_ready)
             self._pl_fetch_thread.error.connect(self._on_playlist_error)
             self._pl_fetch_thread.finished.connect(
@@ -552,7 +615,24 @@ class YouTubeDownloader(QWidget):
         self.stack.setCurrentWidget(self.page_playlist)
         self.back_button.setVisible(True)
 
+    # kolejna porcja listy: pierwsza wypelnia tabele i od razu startuje
+    # metadane, nastepne doklejaja wiersze i trafiaja do dzialajacego workera
+    def _on_playlist_chunk(self, chunk: list):
+        if self._pl_url != self.current_url or "list=" not in self.current_url:
+            return
+
+        if self._pl_listed == 0:
+            self.page_playlist.reset_and_fill(chunk)
+            self._start_playlist_meta(chunk, streaming=True)
+        else:
+            self.page_playlist.append_rows(chunk)
+            if self._pl_meta_feed is not None:
+                self._pl_meta_feed.add_entries(chunk)
+        self._uncheck_archived(self._pl_listed, chunk)
+        self._pl_listed += len(chunk)
+
     def _on_playlist_list_ready(self, entries: list):
+        self._close_playlist_meta_feed()
         if self._pl_url != self.current_url or "list=" not in self.current_url:
             self.log_message("Odrzucono wynik – URL playlisty się zmienił.")
             return
@@ -565,23 +645,42 @@ class YouTubeDownloader(QWidget):
 
         if not self._pl_entries:
             self._pl_entries = entries
-            self.page_playlist.reset_and_fill(entries)
+            if self._pl_listed == 0:
+                self.page_playlist.reset_and_fill(entries)
+                self._uncheck_archived(0, entries)
             self.log_message(f"Załadowano pozycje: {len(entries)}")
 
+        self._start_playlist_meta(entries)
+
+    # startuje wczytywanie metadanych wierszy (o ile nie trwa ani nie skonczylo sie)
+    def _start_playlist_meta(self, entries: list, streaming: bool = False):
         if not self._pl_meta_running and not self._pl_meta_done:
-            self._pl_meta_thread = PlaylistFormatsWorker(entries)
+            self._pl_meta_thread = PlaylistFormatsWorker(entries, streaming=streaming)
             self._pl_meta_thread.row_ready.connect(
                 lambda row, thumb, dur, formats: self.page_playlist.update_row(
                     row, thumb_url=thumb, duration=dur, formats=formats
                 )
             )
+            self._pl_meta_thread.row_failed.connect(self.page_playlist.mark_row_failed)
             self._pl_meta_thread.error.connect(
                 lambda e: self.log_message(f"Błąd metadanych playlisty: {e}")
             )
+            self._pl_meta_thread.summary.connect(
+                lambda ok, bad: self.log_message(
+                    f"Metadane: {ok} wczytanych, {bad} z błędem."
+                )
+            )
             self._pl_meta_thread.finished.connect(self._on_playlist_meta_finished)
             self._pl_meta_running = True
+            self._pl_meta_feed = self._pl_meta_thread if streaming else None
             self._pl_meta_thread.start()
 
+    # konczy liste dla workera metadanych, ktory czekal na kolejne porcje
+    def _close_playlist_meta_feed(self):
+        if self._pl_meta_feed is not None:
+            self._pl_meta_feed.close_input()
+            self._pl_meta_feed = None
+
     def _on_playlist_meta_finished(self):
         self._pl_meta_running = False
         self._pl_meta_done = True
@@ -589,6 +688,7 @@ class YouTubeDownloader(QWidget):
 
     def _on_playlist_error(self, err: str):
         self._pl_fetch_running = False
+        self._close_playlist_meta_feed()
         self.log_message(f"Błąd playlisty: {err}")
         QMessageBox.critical(self, "Błąd playlisty", err)
 
@@ -603,21 +703,12 @@ class YouTubeDownloader(QWidget):
 
     # Akcje globalne z PlaylistView
     def _playlist_select_all(self):
-        tbl = self.page_playlist.table
-        for row in range(tbl.rowCount()):
-            chk = tbl.cellWidget(row, 5)
-            if chk:
-                chk.setChecked(True)
+        self.page_playlist.select_all()
 
     def _playlist_unselect_all(self):
-        tbl = self.page_playlist.table
-        for row in range(tbl.rowCount()):
-            chk = tbl.cellWidget(row, 5)
-            if chk:
-                chk.setChecked(False)
+        self.page_playlist.unselect_all()
 
     def _playlist_download_selected(self):
-        tbl = self.page_playlist.table
         folder = self.folder_input.text().strip()
 
         if not os.path.isdir(folder):
@@ -632,70 +723,166 @@ class YouTubeDownloader(QWidget):
             return
 
         queue = []
-        for row in range(tbl.rowCount()):
-            chk = tbl.cellWidget(row, 5)
-            if not (chk and chk.isChecked()):
-                continue
-
-            url_item = entries[row]["url"] if row < len(entries) else None
-            if not url_item:
-                continue
-
-            fmt_combo = tbl.cellWidget(row, 4)
-            fmt_id = fmt_combo.currentData() if fmt_combo else None
+        rows = []
+        for row, url_item, fmt_id in self.page_playlist.selected_items():
             if fmt_id is None:
                 fmt_id = "best"
 
-            dtype = "mp3" if fmt_id == "bestaudio" else "mp4"
+            dtype = kind_for_format(fmt_id)
             queue.append((url_item, fmt_id, dtype))
+            rows.append(row)
+
+        # pozycje z archiwum odpadaja zanim powstanie jakikolwiek worker
+        done = self._archived_indexes(
+            [(extract_video_id(url), dtype) for url, _, dtype in queue]
+        )
+        if done:
+            self.page_playlist.mark_rows_done([rows[i] for i in done])
+            self.log_message(f"Pominięto już pobrane: {len(done)}")
+            queue = [q for i, q in enumerate(queue) if i not in done]
+            rows = [r for i, r in enumerate(rows) if i not in done]
 
         if not queue:
             QMessageBox.information(
                 self, "Brak wyboru", "Zaznacz elementy do pobrania."
             )
             return
-
-        # zapisz kolejkę i odpal pierwsze
-        self._dl_queue = queue
-        self._dl_total = len(queue)
-        self._dl_index = 0
-        self.set_ui_enabled(False)
-        self.progress_bar.setValue(0)
-        self.log_message(f"Start pobierania {self._dl_total} pozycji…")
-
-        self._start_next_from_queue()
-
-    def _start_next_from_queue(self):
-        # jeśli idziemy poza koniec – koniec serii
-        if self._dl_index >= self._dl_total:
-            self.set_ui_enabled(True)
-            self.log_message("Pobieranie playlisty zakończone.")
-            QMessageBox.information(self, "Gotowe", "Pobieranie playlisty zakończone.")
-            self._dl_queue = []
+        if self._scheduler and self._scheduler.is_active():
+            QMessageBox.information(
+                self, "Kolejka działa", "Poczekaj na zakończenie bieżącej kolejki."
+            )
             return
 
-        url, fmt_id, dtype = self._dl_queue[self._dl_index]
-        self._dl_index += 1
+        self._start_queue(folder, queue, rows)
+
+    # startuje kolejke w DownloadScheduler; rows to wiersze tabeli playlisty
+    # (-1 gdy pozycja nie jest widoczna, np. przy wznowieniu po restarcie)
+    def _start_queue(self, folder: str, queue: list, rows: list, job_ids=None):
+        self._dl_rows = rows
+        self._scheduler = DownloadScheduler(
+            folder,
+            concurrency=self.page_playlist.concurrency.value(),
+            parent=self,
+            journal=self._queue_journal(),
+            archive=self._download_archive(),
+            profile=self.page_playlist.profile.currentData(),
+        )
+        self._scheduler.item_state.connect(self._on_queue_item_state)
+        self._scheduler.item_progress.connect(
+            lambda i, pct: self.page_playlist.set_row_state(
+                self._dl_rows[i], RUNNING, pct=pct
+            )
+        )
+        self._scheduler.overall_progress.connect(self.update_progress)
+        self._scheduler.log.connect(self.log_message)
+        self._scheduler.all_finished.connect(self._on_queue_finished)
 
-        self.log_message(f"[{self._dl_index}/{self._dl_total}] {url}")
+        self.set_ui_enabled(False)
+        self.page_playlist.btn_download.setEnabled(False)
+        self.page_playlist.btn_cancel_all.setEnabled(True)
         self.progress_bar.setValue(0)
+        self.log_message(
+            f"Start pobierania {len(queue)} pozycji "
+            f"(równolegle: {self._scheduler.concurrency})…"
+        )
+        self._scheduler.start(queue, job_ids)
+
+    # zmienia wspolny limit przepustowosci; oba pola (widok pojedynczy
+    # i playlista) pokazuja te sama wartosc
+    def _set_rate_limit(self, mbps: float):
+        shared_limiter().set_rate(int(mbps * 1_000_000))
+        for spin in (self.rate_limit, self.page_playlist.rate_limit):
+            if spin.value() != mbps:
+                spin.blockSignals(True)
+                spin.setValue(mbps)
+                spin.blockSignals(False)
+
+    # zaznaczony wiersz playlisty dostaje wiekszy udzial w limicie przepustowosci
+    def _prioritize_playlist_row(self, current, _previous=None):
+        if self._scheduler is None or current.row() not in self._dl_rows:
+            return
+        self._scheduler.prioritize(self._dl_rows.index(current.row()))
 
-        # UTWÓRZ *JEDEN* worker i trzymaj referencję
-        self.download_thread = DownloadWorker(
-            url=url,
-            folder=self.folder_input.text().strip(),
-            download_type=dtype,
-            format_id=fmt_id,
+    # archiwum pobranych filmow; bez niego nic nie jest pomijane
+    def _download_archive(self) -> DownloadArchive | None:
+        try:
+            return shared_archive()
+        except Exception as e:
+            self.log_message(f"Archiwum pobrań niedostępne: {e}")
+            return None
+
+    # indeksy pozycji (id filmu, typ) ktore sa juz w archiwum pobran
+    def _archived_indexes(self, items: list) -> set[int]:
+        archive = self._download_archive()
+        if archive is None:
+            return set()
+        keys = [(DEFAULT_EXTRACTOR, vid, kind) for vid, kind in items]
+        try:
+            done = archive.done_keys(k for k in keys if k[1])
+        except Exception as e:
+            self.log_message(f"Archiwum pobrań niedostępne: {e}")
+            return set()
+        return {i for i, k in enumerate(keys) if k in done}
+
+    # odznacza w tabeli wiersze playlisty pobrane juz wczesniej
+    def _uncheck_archived(self, first_row: int, entries: list):
+        items = [
+            (e.get("id"), self.page_playlist.row_kind(first_row + i))
+            for i, e in enumerate(entries)
+        ]
+        done = self._archived_indexes(items)
+        if done:
+            self.page_playlist.mark_rows_done(sorted(first_row + i for i in done))
+
+    # dziennik kolejki na dysku; bez niego kolejka dziala tylko w pamieci
+    def _queue_journal(self) -> QueueJournal | None:
+        try:
+            return shared_journal()
+        except Exception as e:
+            self.log_message(f"Dziennik kolejki niedostępny: {e}")
+            return None
+
+    # po starcie proponuje wznowienie kolejki przerwanej zamknieciem lub awaria;
+    # yt-dlp dokonczy istniejace pliki .part zamiast pobierac je od nowa
+    def offer_queue_resume(self):
+        journal = self._queue_journal()
+        jobs = journal.unfinished() if journal is not None else []
+        if not jobs or (self._scheduler and self._scheduler.is_active()):
+            return
+        # kolejka ma jeden folder docelowy, pozostale wpisy poczekaja
+        folder = jobs[0].folder
+        jobs = [j for j in jobs if j.folder == folder]
+        partial = sum(1 for j in jobs if j.part_path and os.path.exists(j.part_path))
+
+        answer = QMessageBox.question(
+            self,
+            "Przerwana kolejka",
+            f"Poprzednia kolejka nie została ukończona: {len(jobs)} pozycji "
+            f"(częściowo pobranych: {partial}).\nWznowić pobieranie do {folder}?",
+        )
+        if answer != QMessageBox.StandardButton.Yes or not os.path.isdir(folder):
+            journal.remove([j.id for j in jobs])
+            return
+        self._start_queue(
+            folder,
+            [(j.url, j.format_id, j.kind) for j in jobs],
+            [-1] * len(jobs),
+            [j.id for j in jobs],
         )
-        self.download_thread.log_signal.connect(self.log_message)
-        self.download_thread.progress_signal.connect(self._queue_progress_bridge)
-        self.download_thread.finished_signal.connect(self._on_queue_item_finished)
-        self.download_thread.start()
 
-    def _queue_progress_bridge(self, pct: float):
-        # opcjonalnie: pokaż progres pozycji + prosty progres całości
-        per_item = pct
-        overall = ((self._dl_index - 1) / max(1, self._dl_total) * 100.0) + (
-            per_item / max(1, self._dl_total)
+    def _on_queue_item_state(self, index: int, state: str, error_msg: str):
+        row = self._dl_rows[index]
+        self.page_playlist.set_row_state(row, state, error_msg)
+        if error_msg and state != RUNNING:
+            self.log_message(f"#{index + 1}: {error_msg}")
+
+    def _on_queue_finished(self, done: int, failed: int, cancelled: int):
+        self.set_ui_enabled(True)
+        self.page_playlist.btn_download.setEnabled(True)
+        self.page_playlist.btn_cancel_all.setEnabled(False)
+        summary = (
+            f"Pobieranie playlisty zakończone: {done} gotowych, "
+            f"{failed} z błędem, {cancelled} anulowanych."
         )
-        self.update_progress(min(overall, 100.0))
+        self.log_message(summary)
+        QMessageBox.information(self, "Gotowe", summary)
@@ -1,43 +1,84 @@
-import requests
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QFont, QPixmap
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtGui import QFont, QImage
 from PyQt6.QtWidgets import (
-    QCheckBox,
+    QAbstractItemView,
     QComboBox,
+    QDoubleSpinBox,
     QHBoxLayout,
     QHeaderView,
     QLabel,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
+    QSpinBox,
+    QTableView,
     QVBoxLayout,
     QWidget,
 )
 
+from app.core.bandwidth import shared_limiter
+from app.core.download import kind_for_format
+from app.core.ytclient import PROFILE_LABELS, get_profile
+from app.ui.playlist_model import (  # noqa: F401 - STATE_LABELS, fmt_duration
+    BASE_QUALITIES,
+    COL_CHECK,
+    COL_DURATION,
+    COL_INDEX,
+    COL_QUALITY,
+    COL_STATE,
+    COL_THUMB,
+    COL_TITLE,
+    STATE_LABELS,
+    CheckDelegate,
+    PlaylistModel,
+    QualityDelegate,
+    ThumbnailDelegate,
+    fmt_duration,
+)
 from app.ui.theme import apply_dark_theme
+from app.workers.download_scheduler import MAX_CONCURRENCY, default_concurrency
+from app.workers.thumbnail_service import ROW_SIZE, ThumbnailService
+
+
+# lista profili pobierania (fragmenty dash/hls naraz), wybrany domyslny
+def profile_combo() -> QComboBox:
+    combo = QComboBox()
+    for name, label in PROFILE_LABELS.items():
+        combo.addItem(label, userData=name)
+    combo.setCurrentIndex(combo.findData(get_profile().name))
+    combo.setToolTip(
+        "Ile fragmentów strumienia pobierać jednocześnie; "
+        "więcej pomaga na łączach z dużym opóźnieniem"
+    )
+    return combo
 
 
-# formatuje czas trwania w sekundach do postaci mm:ss lub hh:mm:ss
-def fmt_duration(seconds: int | None) -> str:
-    if seconds is None:
-        return "—"
-    try:
-        seconds = int(seconds)
-    except Exception:
-        return "—"
-    m, s = divmod(seconds, 60)
-    h, m = divmod(m, 60)
-    return f"{h:d}:{m:02d}:{s:02d}" if h else f"{m:d}:{s:02d}"
+# limit przepustowosci wszystkich pobran w MB/s (0 = bez limitu)
+def rate_limit_spin() -> QDoubleSpinBox:
+    spin = QDoubleSpinBox()
+    spin.setRange(0.0, 1000.0)
+    spin.setDecimals(1)
+    spin.setSingleStep(0.5)
+    spin.setSuffix(" MB/s")
+    spin.setSpecialValueText("bez limitu")
+    spin.setValue(shared_limiter().rate / 1_000_000)
+    spin.setToolTip("Łączny limit prędkości wszystkich pobrań")
+    return spin
 
 
 # widok playlisty: tabela elementow + akcje globalne
+# dane wierszy trzyma PlaylistModel, komorki rysuja delegaty (bez widgetow
+# na wiersz), wiec tabela znosi dziesiatki tysiecy pozycji
 class PlaylistView(QWidget):
 
     back_requested = pyqtSignal()  # sygnal do powrotu do ekranu glownego
 
-    def __init__(self):
+    def __init__(self, thumbs: ThumbnailService | None = None):
         super().__init__()
         self.entries = []  # lista elementow playlisty: {'id','url','title'}
+        self.model = PlaylistModel(self)
+        # miniatury widocznych wierszy pobierane w tle, klucz zadania "row:<nr>"
+        self.thumbs = thumbs or ThumbnailService(parent=self)
+        self.thumbs.ready.connect(self._on_thumbnail_ready)
+        self.thumbs.failed.connect(self._on_thumbnail_failed)
         apply_dark_theme(self)  # stosuje ciemny motyw
         self._build()  # buduje interfejs
 
@@ -67,32 +108,63 @@ class PlaylistView(QWidget):
         self.btn_select_all = QPushButton("Zaznacz wszystkie")
         self.btn_unselect_all = QPushButton("Odznacz wszystkie")
         self.global_quality = QComboBox()
-        self.global_quality.addItem("Auto", userData=None)
-        self.global_quality.addItem("Tylko audio (MP3)", userData="bestaudio")
+        for fid, label in BASE_QUALITIES:
+            self.global_quality.addItem(label, userData=fid)
+        self._global_labels = {label for _, label in BASE_QUALITIES}
+        self.concurrency = QSpinBox()
+        self.concurrency.setRange(1, MAX_CONCURRENCY)
+        self.concurrency.setValue(default_concurrency())
+        self.concurrency.setToolTip("Liczba filmów pobieranych jednocześnie")
+        self.profile = profile_combo()
+        self.rate_limit = rate_limit_spin()
         self.btn_download = QPushButton("Pobierz zaznaczone")
+        self.btn_cancel_all = QPushButton("Anuluj wszystkie")
+        self.btn_cancel_all.setEnabled(False)
         top.addWidget(self.btn_select_all)
         top.addWidget(self.btn_unselect_all)
         top.addWidget(QLabel("Jakość dla wszystkich:"))
         top.addWidget(self.global_quality)
         top.addStretch()
+        top.addWidget(QLabel("Równolegle:"))
+        top.addWidget(self.concurrency)
+        top.addWidget(QLabel("Profil:"))
+        top.addWidget(self.profile)
+        top.addWidget(QLabel("Limit:"))
+        top.addWidget(self.rate_limit)
         top.addWidget(self.btn_download)
+        top.addWidget(self.btn_cancel_all)
         layout.addLayout(top)
 
-        # tabela elementow playlisty
-        self.table = QTableWidget(0, 6)
-        self.table.setHorizontalHeaderLabels(
-            ["#", "Miniaturka", "Tytuł", "Czas", "Jakość", "Pobierz?"]
+        # tabela elementow playlisty; stale szerokosci kolumn i wysokosc wierszy,
+        # bo dopasowanie do zawartosci przeglada wszystkie wiersze przy kazdej zmianie
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setItemDelegateForColumn(
+            COL_THUMB, ThumbnailDelegate(ROW_SIZE, self.thumbs, self)
         )
+        self.table.setItemDelegateForColumn(COL_QUALITY, QualityDelegate(self))
+        self.table.setItemDelegateForColumn(COL_CHECK, CheckDelegate(self))
         hdr = self.table.horizontalHeader()
-        hdr.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
-        hdr.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
-        hdr.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
-        hdr.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
-        hdr.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
-        hdr.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
-        self.table.verticalHeader().setVisible(False)
-        self.table.setSelectionMode(QTableWidget.SelectionMode.NoSelection)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        for col, width in (
+            (COL_INDEX, 48),
+            (COL_THUMB, ROW_SIZE[0] + 8),
+            (COL_DURATION, 70),
+            (COL_QUALITY, 180),
+            (COL_CHECK, 70),
+            (COL_STATE, 120),
+        ):
+            hdr.setSectionResizeMode(col, QHeaderView.ResizeMode.Interactive)
+            hdr.resizeSection(col, width)
+        hdr.setSectionResizeMode(COL_TITLE, QHeaderView.ResizeMode.Stretch)
+        vhdr = self.table.verticalHeader()
+        vhdr.setVisible(False)
+        vhdr.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vhdr.setDefaultSectionSize(ROW_SIZE[1] + 4)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.table.setEditTriggers(
+            QAbstractItemView.EditTrigger.SelectedClicked
+            | QAbstractItemView.EditTrigger.CurrentChanged
+        )
         layout.addWidget(self.table)
 
         # podpina akcje globalne do przyciskow i comboboxa
@@ -104,32 +176,16 @@ class PlaylistView(QWidget):
 
     # resetuje tabele i wypelnia wiersze nowymi elementami playlisty
     def reset_and_fill(self, entries: list[dict]):
-        self.entries = entries
-        self.table.setRowCount(0)
-        for i, e in enumerate(entries):
-            self.table.insertRow(i)
-            self.table.setItem(i, 0, QTableWidgetItem(str(i + 1)))
-
-            # placeholder miniaturki do czasu az przyjdzie prawdziwa
-            thumb = QLabel("—")
-            thumb.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setCellWidget(i, 1, thumb)
-
-            # tytul i czas trwania
-            self.table.setItem(i, 2, QTableWidgetItem(e.get("title") or "—"))
-            self.table.setItem(i, 3, QTableWidgetItem("—"))
-
-            # wybor jakosci dla pojedynczego elementu
-            q = QComboBox()
-            q.addItem("Auto", userData=None)
-            q.addItem("Tylko audio (MP3)", userData="bestaudio")
-            self.table.setCellWidget(i, 4, q)
-
-            # checkbox do wyboru czy pobierac
-            chk = QCheckBox()
-            chk.setChecked(True)
-            chk.setStyleSheet("margin-left:20px;")
-            self.table.setCellWidget(i, 5, chk)
+        # miniatury poprzedniej zawartosci tabeli sa juz nieaktualne
+        for r in range(self.model.rowCount()):
+            self.thumbs.cancel(f"row:{r}")
+        self.entries = list(entries)
+        self.model.reset(entries)
+
+    # dokleja kolejne elementy playlisty pod istniejacymi wierszami
+    def append_rows(self, entries: list[dict]):
+        self.entries.extend(entries)
+        self.model.append(entries)
 
     # aktualizuje pojedynczy wiersz danymi: miniaturka, czas, formaty
     def update_row(
@@ -140,88 +196,88 @@ class PlaylistView(QWidget):
         duration: int | None,
         formats: list[tuple[str, str]],
     ):
-        if row < 0 or row >= self.table.rowCount():
+        if row < 0 or row >= self.model.rowCount():
             return
 
-        # laduje miniaturke jesli url jest dostepny
+        # wiersz pamieta tylko url miniatury, obraz zleca delegat przy rysowaniu
         if thumb_url:
-            try:
-                r = requests.get(thumb_url, timeout=5)
-                p = QPixmap()
-                p.loadFromData(r.content)
-                if not p.isNull():
-                    p = p.scaled(
-                        120,
-                        68,
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation,
-                    )
-                    lbl = QLabel()
-                    lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                    lbl.setPixmap(p)
-                    self.table.setCellWidget(row, 1, lbl)
-            except Exception:
-                pass
-
-        # ustawia sformatowany czas w kolumnie
-        self.table.setItem(row, 3, QTableWidgetItem(fmt_duration(duration)))
-
-        # uzupelnia combobox formatow i stara sie zachowac poprzedni wybor
-        combo: QComboBox = self.table.cellWidget(row, 4)
-        if combo:
-            current_ud = combo.currentData()
-            combo.clear()
-            combo.addItem("Auto", userData=None)
-            combo.addItem("Tylko audio (MP3)", userData="bestaudio")
-            for fmt_id, label in formats:
-                combo.addItem(label, userData=fmt_id)
-            if current_ud is not None:
-                idx = combo.findData(current_ud)
-                if idx >= 0:
-                    combo.setCurrentIndex(idx)
+            self.model.set_thumbnail_url(row, thumb_url)
+
+        # czas i lista formatow (poprzedni wybor zostaje, jesli nadal dostepny)
+        self.model.update_meta(row, duration, formats)
 
         # dopelnia globalny combobox o brakujace etykiety
         self._sync_global_quality(formats)
 
+    # miniatura wiersza jest juz w lru serwisu, komorka przerysuje sie z cache
+    def _on_thumbnail_ready(self, key: str, image: QImage):
+        row = self._thumb_row(key)
+        if row is not None:
+            self.model.thumbnail_loaded(row)
+
+    # bez url wiersz pokazuje kreske i delegat nie zleca miniatury ponownie
+    def _on_thumbnail_failed(self, key: str, error: str):
+        row = self._thumb_row(key)
+        if row is not None:
+            self.model.set_thumbnail_url(row, None)
+
+    def _thumb_row(self, key: str) -> int | None:
+        if not key.startswith("row:"):
+            return None
+        row = int(key[4:])
+        return row if row < self.model.rowCount() else None
+
+    # oznacza wiersz ktorego metadanych nie udalo sie wczytac
+    def mark_row_failed(self, row: int, message: str):
+        if row < 0 or row >= self.model.rowCount():
+            return
+        self.model.mark_failed(row, message)
+
+    # pokazuje stan pobierania wiersza (opcjonalnie postep i blad w podpowiedzi)
+    def set_row_state(
+        self, row: int, state: str, message: str = "", pct: float | None = None
+    ):
+        if row < 0 or row >= self.model.rowCount():
+            return
+        self.model.set_state(row, state, message, pct)
+
+    # odznacza wiersze pobrane juz wczesniej (wedlug archiwum pobran)
+    def mark_rows_done(self, rows: list[int], message: str = "Pobrane wcześniej"):
+        rows = [r for r in rows if 0 <= r < self.model.rowCount()]
+        self.model.mark_done(rows, message)
+
+    # typ pliku wiersza wedlug wybranej jakosci: "mp4", "mp3" albo kontener audio
+    def row_kind(self, row: int) -> str:
+        return kind_for_format(self.model.row(row).quality)
+
+    # zaznaczone wiersze do pobrania: (nr wiersza, url, format_id)
+    def selected_items(self) -> list[tuple[int, str, str | None]]:
+        return self.model.checked_items()
+
     # akcje lokalne / globalne
 
     # zaznacza checkbox we wszystkich wierszach
     def select_all(self):
-        for r in range(self.table.rowCount()):
-            chk = self.table.cellWidget(r, 5)
-            if chk:
-                chk.setChecked(True)
+        self.model.set_all_checked(True)
 
     # odznacza checkbox we wszystkich wierszach
     def unselect_all(self):
-        for r in range(self.table.rowCount()):
-            chk = self.table.cellWidget(r, 5)
-            if chk:
-                chk.setChecked(False)
+        self.model.set_all_checked(False)
 
     # stosuje wybor globalnej jakosci do wszystkich wierszy
+    # (pierwsza pozycja to auto; etykiety dopisane z formatow nie maja format_id)
     def apply_global_quality(self):
-        ud = self.global_quality.currentData()
-        txt = self.global_quality.currentText()
-        for r in range(self.table.rowCount()):
-            combo = self.table.cellWidget(r, 4)
-            if not combo:
-                continue
-            combo: QComboBox
-            if ud is None:
-                combo.setCurrentIndex(0)  # auto
-            else:
-                i = combo.findData(ud)
-                if i < 0:
-                    i = combo.findText(txt)
-                if i >= 0:
-                    combo.setCurrentIndex(i)
+        if self.global_quality.currentIndex() <= 0:
+            self.model.apply_quality(None)
+            return
+        self.model.apply_quality(
+            self.global_quality.currentData(), self.global_quality.currentText()
+        )
 
     # uzgadnia opcje w globalnym comboboxie z nowo dostepnymi etykietami
     def _sync_global_quality(self, formats: list[tuple[str, str]]):
-        have = {
-            self.global_quality.itemText(i) for i in range(self.global_quality.count())
-        }
+        known = self._global_labels
         for _, label in formats:
-            if label not in have:
+            if label not in known:
+                known.add(label)
                 self.global_quality.addItem(label)
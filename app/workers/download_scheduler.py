@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from app.core.bandwidth import PRIORITY_WEIGHT
+from app.core.download import (  # noqa: F401 - reeksport dla ui
+    CONCURRENCY_ENV,
+    DEFAULT_CONCURRENCY,
+    MAX_CONCURRENCY,
+    default_concurrency,
+)
+from app.core.download_archive import DEFAULT_EXTRACTOR, DownloadArchive
+from app.core.queue_journal import (  # noqa: F401 - reeksport stanow
+    CANCELLED,
+    DONE,
+    FAILED,
+    FINAL_STATES,
+    POSTPROCESSING,
+    QUEUED,
+    RUNNING,
+    QueueJournal,
+)
+from app.utils.url import extract_video_id
+from app.workers.download_worker import DownloadWorker
+
+# pozycja kolejki: url, format_id, typ ("mp4"/"mp3")
+QueueItem = Tuple[str, Optional[str], str]
+WorkerFactory = Callable[..., DownloadWorker]
+
+
+# planista kolejki pobran: uruchamia do N workerow naraz, pilnuje stanu pozycji
+# dziala w watku gui, same pobierania ida w watkach DownloadWorker
+# limit dotyczy etapu sieci: pozycja w konwersji (POSTPROCESSING) zwalnia
+# miejsce, a etap konwersji ma wlasny limit w PostprocessPool
+# z dziennikiem (journal) kazda zmiana stanu i plik .part trafiaja do sqlite,
+# a po zakonczeniu calej kolejki jej wpisy sa usuwane
+# z archiwum (archive) kazda ukonczona pozycja jest zapisywana jako pobrana
+# profile to nazwa profilu pobierania dla wszystkich pozycji (None = domyslny)
+class DownloadScheduler(QObject):
+    item_state = pyqtSignal(int, str, str)  # indeks, stan, komunikat bledu
+    item_progress = pyqtSignal(int, float)  # indeks, postep pozycji 0..100
+    overall_progress = pyqtSignal(float)  # postep calej kolejki 0..100
+    log = pyqtSignal(str)
+    all_finished = pyqtSignal(int, int, int)  # ukonczone, bledy, anulowane
+
+    def __init__(
+        self,
+        folder: str,
+        concurrency: Optional[int] = None,
+        worker_factory: WorkerFactory = DownloadWorker,
+        parent: Optional[QObject] = None,
+        journal: Optional[QueueJournal] = None,
+        archive: Optional[DownloadArchive] = None,
+        profile: Optional[str] = None,
+    ):
+        super().__init__(parent)
+        self.folder = folder
+        self.concurrency = max(1, concurrency or default_concurrency())
+        self._factory = worker_factory
+        self._journal = journal
+        self._archive = archive
+        self.profile = profile
+        self._priority: Optional[int] = None  # pozycja z wiekszym udzialem w limicie
+        self._job_ids: List[int] = []
+        self._items: List[QueueItem] = []
+        self._states: List[str] = []
+        self._progress: List[float] = []
+        self._workers: Dict[int, DownloadWorker] = {}
+        self._retired: set[DownloadWorker] = set()  # zakonczone, watek jeszcze zyje
+        self._next = 0
+        self._cancelling = False
+        self._closing = False  # zamkniecie aplikacji: dziennik zostaje bez zmian
+        self._cancel_requested: set[int] = set()
+        self._skipped: set[int] = set()  # ukonczone bez pobranego pliku
+
+    # stan pozycji o podanym indeksie
+    def state(self, index: int) -> str:
+        return self._states[index]
+
+    # czy w kolejce sa jeszcze pozycje oczekujace lub w trakcie
+    def is_active(self) -> bool:
+        return any(s in (QUEUED, RUNNING, POSTPROCESSING) for s in self._states)
+
+    # zlicza pozycje w danym stanie
+    def count(self, state: str) -> int:
+        return self._states.count(state)
+
+    # ustawia nowa kolejke i startuje pierwsze pobrania
+    # job_ids wskazuje wpisy dziennika wznawianej kolejki (inaczej powstaja nowe)
+    def start(
+        self, items: Sequence[QueueItem], job_ids: Optional[Sequence[int]] = None
+    ) -> None:
+        if self.is_active():
+            raise RuntimeError("Kolejka pobierania już działa.")
+        self._items = list(items)
+        if self._journal is not None:
+            self._job_ids = list(
+                job_ids
+                if job_ids is not None
+                else self._journal.add(self.folder, self._items)
+            )
+        self._states = [QUEUED] * len(self._items)
+        self._progress = [0.0] * len(self._items)
+        self._next = 0
+        self._cancelling = False
+        self._cancel_requested = set()
+        self._skipped = set()
+        self._priority = None
+        for i in range(len(self._items)):
+            self.item_state.emit(i, QUEUED, "")
+        self._fill()
+        self._check_finished()
+
+    # zmienia limit rownoleglych pobran w trakcie dzialania kolejki
+    def set_concurrency(self, value: int) -> None:
+        self.concurrency = max(1, min(int(value), MAX_CONCURRENCY))
+        self._fill()
+
+    # daje pozycji (np. zaznaczonej w tabeli) wiekszy udzial we wspolnym limicie
+    # przepustowosci; pozostale trwajace pobrania dziela sie reszta; None zdejmuje
+    def prioritize(self, index: Optional[int]) -> None:
+        previous, self._priority = self._priority, index
+        for i in (previous, index):
+            if i is not None and i in self._workers:
+                self._workers[i].set_weight(PRIORITY_WEIGHT if i == index else 1.0)
+
+    # anuluje pojedyncza pozycje (oczekujaca od razu, trwajaca przez worker)
+    # remove_partial: worker usuwa pliki czesciowe przerwanego pobierania
+    def cancel(self, index: int, remove_partial: bool = False) -> None:
+        if self._states[index] == QUEUED:
+            self._set_state(index, CANCELLED)
+            self._check_finished()
+        elif self._states[index] in (RUNNING, POSTPROCESSING):
+            self._cancel_requested.add(index)
+            self._workers[index].cancel(remove_partial)
+
+    # anuluje oczekujace pozycje i wysyla zadanie anulowania do trwajacych
+    def cancel_all(self, remove_partial: bool = False) -> None:
+        if not self.is_active():
+            return
+        self._cancelling = True
+        for i, s in enumerate(self._states):
+            if s == QUEUED:
+                self._set_state(i, CANCELLED)
+        for i, worker in list(self._workers.items()):
+            self._cancel_requested.add(i)
+            worker.cancel(remove_partial)
+        self._check_finished()
+
+    # zamkniecie aplikacji: nowe pozycje nie startuja, trwajace sa przerywane
+    # (pliki .part zostaja), a stany w dzienniku nie sa zmieniane, wiec kolejka
+    # wraca do wznowienia przy nastepnym starcie; czeka na watki workerow
+    # najwyzej timeout_ms, zeby qt nie niszczyl dzialajacych watkow
+    def shutdown(self, timeout_ms: int = 5000) -> None:
+        self._closing = True
+        self._cancelling = True
+        workers = [*self._workers.values(), *self._retired]
+        for worker in self._workers.values():
+            worker.cancel()
+        deadline = time.monotonic() + timeout_ms / 1000
+        for worker in workers:
+            worker.wait(max(0, int((deadline - time.monotonic()) * 1000)))
+
+    # liczba pozycji w etapie sieci
+    def _downloading(self) -> int:
+        return sum(1 for i in self._workers if self._states[i] == RUNNING)
+
+    # uruchamia kolejne pozycje az do limitu rownoleglosci
+    def _fill(self) -> None:
+        while self._downloading() < self.concurrency and self._next < len(self._items):
+            i = self._next
+            self._next += 1
+            if self._states[i] != QUEUED:
+                continue
+            self._launch(i)
+
+    def _launch(self, i: int) -> None:
+        url, fmt_id, dtype = self._items[i]
+        kwargs = {"profile": self.profile} if self.profile else {}
+        try:
+            worker = self._factory(
+                url=url,
+                folder=self.folder,
+                download_type=dtype,
+                format_id=fmt_id,
+                **kwargs,
+            )
+        except Exception as e:
+            # blad tworzenia workera (np. brak ffmpeg) nie blokuje kolejki
+            self._set_state(i, FAILED, str(e))
+            return
+        self._workers[i] = worker
+        worker.log_signal.connect(lambda m, i=i: self.log.emit(f"#{i + 1}: {m}"))
+        worker.progress_signal.connect(lambda p, i=i: self._on_progress(i, p))
+        worker.downloaded.connect(lambda i=i: self._on_item_downloaded(i))
+        worker.skipped.connect(lambda i=i: self._skipped.add(i))
+        worker.finished_signal.connect(
+            lambda ok, err, i=i: self._on_item_finished(i, ok, err)
+        )
+        if self._journal is not None:
+            worker.partial_file.connect(
+                lambda path, i=i: self._journal.set_part(self._job_ids[i], path)
+            )
+        if i == self._priority:
+            worker.set_weight(PRIORITY_WEIGHT)
+        self._set_state(i, RUNNING)
+        worker.start()
+
+    # postep liczy sie tylko w etapie sieci (konwersja nie raportuje procentow)
+    def _on_progress(self, i: int, pct: float) -> None:
+        if self._states[i] != RUNNING:
+            return
+        self._progress[i] = min(max(pct, 0.0), 100.0)
+        self.item_progress.emit(i, self._progress[i])
+        self.overall_progress.emit(self._overall())
+
+    # plik pobrany i oddany do konwersji: miejsce w etapie sieci jest wolne
+    def _on_item_downloaded(self, i: int) -> None:
+        if self._states[i] != RUNNING:
+            return
+        self._progress[i] = 100.0
+        self._set_state(i, POSTPROCESSING)
+        if not self._cancelling:
+            self._fill()
+
+    def _on_item_finished(self, i: int, ok: bool, err: str) -> None:
+        worker = self._workers.pop(i, None)
+        if worker is not None and not worker.isFinished():
+            # referencja musi przezyc do konca watku, inaczej qt go zniszczy w trakcie
+            self._retired.add(worker)
+            worker.finished.connect(lambda w=worker: self._retired.discard(w))
+        if ok:
+            self._progress[i] = 100.0
+            self._remember_done(i)
+            self._set_state(i, DONE)
+        elif i in self._cancel_requested:
+            self._set_state(i, CANCELLED, err)
+        else:
+            self._set_state(i, FAILED, err)
+        self.overall_progress.emit(self._overall())
+        if not self._cancelling:
+            self._fill()
+        self._check_finished()
+
+    # zapisuje ukonczona pozycje w archiwum pobran (bez pozycji, dla ktorych
+    # yt-dlp nic nie pobral)
+    def _remember_done(self, i: int) -> None:
+        url, _, dtype = self._items[i]
+        video_id = extract_video_id(url)
+        if self._archive is None or not video_id or i in self._skipped:
+            return
+        try:
+            self._archive.add(DEFAULT_EXTRACTOR, video_id, dtype)
+        except Exception as e:
+            # plik juz jest na dysku, brak wpisu w archiwum nie jest bledem pozycji
+            self.log.emit(f"#{i + 1}: nie zapisano w archiwum: {e}")
+
+    def _set_state(self, i: int, state: str, err: str = "") -> None:
+        self._states[i] = state
+        if self._journal is not None and not self._closing:
+            self._journal.set_state(self._job_ids[i], state, err)
+        self.item_state.emit(i, state, err)
+
+    # pozycje zakonczone licza sie jako 100%, niezaleznie od wyniku
+    def _overall(self) -> float:
+        if not self._items:
+            return 0.0
+        total = sum(
+            100.0 if s in FINAL_STATES else p
+            for s, p in zip(self._states, self._progress)
+        )
+        return total / len(self._items)
+
+    def _check_finished(self) -> None:
+        if self._workers or QUEUED in self._states:
+            return
+        if self._journal is not None and not self._closing:
+            # nic do wznowienia: wpisy tej kolejki nie sa juz potrzebne
+            self._journal.remove(self._job_ids)
+            self._job_ids = []
+        self.all_finished.emit(
+            self.count(DONE), self.count(FAILED), self.count(CANCELLED)
+        )
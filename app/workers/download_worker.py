@@ -2,83 +2,199 @@ from __future__ import annotations
 
 from PyQt6.QtCore import QThread, pyqtSignal
 
-from app.core.download import download_audio_mp3, download_video_mp4
+from app.core.bandwidth import shared_limiter
+from app.core.cancel import CancelToken
+from app.core.download import (
+    AUDIO_CONTAINERS,
+    AUDIO_COPY,
+    AUDIO_SKIPPED,
+    MP4_REMUX,
+    MP4_TRANSCODE,
+    PHASE_DOWNLOADING,
+    PHASE_FINISHED,
+    PHASE_POSTPROCESSING,
+    ProgressEvent,
+    download_audio,
+    download_audio_mp3,
+    download_video_mp4,
+)
 from app.core.paths import get_ffmpeg_path
-from app.core.ytclient import YTClient
+from app.core.postprocess import shared_postprocess_pool
+from app.core.ytclient import YTClient, get_profile
 from app.utils.errors import CancelledError
 
+# co ile procent pojawia sie wpis w logu (postep i tak idzie na pasek)
+LOG_MILESTONE_STEP = 25
+
 
 # worker w osobnym watku do pobierania plikow
 class DownloadWorker(QThread):
     # sygnaly przekazywane do interfejsu
     log_signal = pyqtSignal(str)  # komunikaty tekstowe
     progress_signal = pyqtSignal(float)  # postep w procentach 0..100
+    progress_event = pyqtSignal(object)  # ProgressEvent (max ~10 na sekunde)
     finished_signal = pyqtSignal(bool, str)  # czy sukces i ewentualny blad
+    partial_file = pyqtSignal(str)  # nowy plik .part (do dziennika kolejki)
+    downloaded = pyqtSignal()  # pobieranie skonczone, plik czeka na konwersje
+    skipped = pyqtSignal()  # yt-dlp nie pobral zadnego pliku (przed finished)
     cancel_requested = pyqtSignal()
 
     def __init__(
-        self, url: str, folder: str, download_type: str, format_id: str | None
+        self,
+        url: str,
+        folder: str,
+        download_type: str,
+        format_id: str | None,
+        profile: str | None = None,
+        weight: float = 1.0,
     ):
         """
         :param url: YouTube URL
         :param folder: katalog docelowy
-        :param download_type: "mp4" lub "mp3"
+        :param download_type: "mp4", "mp3" lub kontener audio ("m4a"/"opus"/"ogg")
         :param format_id: np. "137+bestaudio" / "22" (dla mp3 -> None)
+        :param profile: nazwa profilu pobierania (None -> domyslny klienta)
+        :param weight: udzial we wspolnym limicie przepustowosci
         """
         super().__init__()
         self.url = url
         self.folder = folder
         self.download_type = download_type
         self.format_id = format_id
-        self._cancelled = False
+        self.profile = get_profile(profile) if profile else None
+        self.weight = weight
+        self._channel = None  # kanal ogranicznika przepustowosci w trakcie run()
+        self._cancel = CancelToken()
+        self._last_phase = ""
+        self._last_file = ""
+        self._next_milestone = LOG_MILESTONE_STEP
 
         # inicjalizacja yt-dlp przez klienta, worker nie musi znac szczegolow
         ffmpeg = get_ffmpeg_path()
         self._yt = YTClient(ffmpeg_path=ffmpeg, proxy=None)
 
-    # api anulowania
-    def cancel(self):
-        self._cancelled = True
+    # api anulowania: przerywa tez trwajace zapytania http i procesy ffmpeg,
+    # remove_partial usuwa pliki czesciowe pobierania
+    def cancel(self, remove_partial: bool = False):
+        self._cancel.cancel(remove_partial)
         self.cancel_requested.emit()
         self.log_signal.emit("Anulowanie pobierania...")
 
-    # callback postepu pobierania
-    def _on_progress(self, pct: float, downloaded: int, total: int):
+    # zmienia udzial pobierania w limicie przepustowosci (takze w trakcie)
+    def set_weight(self, weight: float):
+        self.weight = weight
+        if self._channel is not None:
+            self._channel.set_weight(weight)
+
+    # callback postepu pobierania (zdarzenia juz ograniczone w download.py)
+    # pasek dostaje kazde zdarzenie, log tylko zmiany etapu i co 25%
+    def _on_progress(self, ev: ProgressEvent):
+        self.progress_signal.emit(ev.percent)
+        self.progress_event.emit(ev)
+        if ev.phase == PHASE_DOWNLOADING and ev.filename != self._last_file:
+            self._last_file = ev.filename
+            self.partial_file.emit(ev.filename)
+
+        phase_changed = ev.phase != self._last_phase
+        self._last_phase = ev.phase
+        if ev.phase == PHASE_DOWNLOADING:
+            if phase_changed:
+                self._next_milestone = LOG_MILESTONE_STEP
+                self.log_signal.emit(f"Pobieranie: {self._describe(ev)}")
+            elif ev.total and ev.percent >= self._next_milestone:
+                while self._next_milestone <= ev.percent:
+                    self._next_milestone += LOG_MILESTONE_STEP
+                self.log_signal.emit(f"Postęp: {self._describe(ev)}")
+        elif ev.phase == PHASE_FINISHED and phase_changed:
+            self.log_signal.emit(f"Pobrano plik ({ev.total/1_000_000:.1f} MB)")
+        elif ev.phase == PHASE_POSTPROCESSING:
+            self.log_signal.emit(f"Przetwarzanie: {ev.postprocessor or 'FFmpeg'}…")
 
-        self.progress_signal.emit(pct)
-        if total:
-            self.log_signal.emit(
-                f"Postęp: {pct:.1f}% ({downloaded/1_000_000:.1f}/{total/1_000_000:.1f} MB)"
-            )
-        else:
-            self.log_signal.emit(f"Postęp: {pct:.1f}%")
+    # opis zdarzenia do logu: procent, megabajty, predkosc, eta
+    @staticmethod
+    def _describe(ev: ProgressEvent) -> str:
+        if not ev.total:
+            return f"{ev.downloaded/1_000_000:.1f} MB"
+        text = (
+            f"{ev.percent:.1f}% "
+            f"({ev.downloaded/1_000_000:.1f}/{ev.total/1_000_000:.1f} MB"
+        )
+        if ev.speed:
+            text += f", {ev.speed/1_000_000:.1f} MB/s"
+        if ev.eta is not None:
+            text += f", ETA {ev.eta // 60}:{ev.eta % 60:02d}"
+        return text + ")"
 
     # callback sprawdzajacy czy uzytkownik anulowal
     def _is_cancelled(self) -> bool:
-        return self._cancelled
+        return self._cancel.is_set()
 
     # glowna metoda uruchamiana w watku
+    # kanal ogranicznika jest otwarty tylko na czas pobierania
     def run(self):
+        self._channel = shared_limiter().channel(self.weight)
         try:
             if self.download_type == "mp3":
                 self.log_signal.emit(f"Start audio → {self.url}")
-                download_audio_mp3(
+                mode = download_audio_mp3(
+                    yt=self._yt,
+                    url=self.url,
+                    output_dir=self.folder,
+                    progress_cb=self._on_progress,
+                    cancel_cb=self._cancel,
+                    profile=self.profile,
+                    bandwidth=self._channel,
+                    postprocess=shared_postprocess_pool(),
+                    downloaded_cb=self.downloaded.emit,
+                )
+                if mode == AUDIO_SKIPPED:
+                    self.log_signal.emit("Audio: yt-dlp nie pobrał żadnego pliku.")
+                    self.skipped.emit()
+            elif self.download_type in AUDIO_CONTAINERS:
+                self.log_signal.emit(
+                    f"Start audio {self.download_type.upper()} → {self.url}"
+                )
+                mode = download_audio(
                     yt=self._yt,
                     url=self.url,
                     output_dir=self.folder,
+                    container=self.download_type,
                     progress_cb=self._on_progress,
-                    cancel_cb=self._is_cancelled,
+                    cancel_cb=self._cancel,
+                    profile=self.profile,
+                    bandwidth=self._channel,
+                    postprocess=shared_postprocess_pool(),
+                    downloaded_cb=self.downloaded.emit,
                 )
+                if mode == AUDIO_COPY:
+                    self.log_signal.emit(
+                        "Audio: kopiowanie strumienia (bez kodowania)."
+                    )
+                elif mode == AUDIO_SKIPPED:
+                    self.log_signal.emit("Audio: yt-dlp nie pobrał żadnego pliku.")
+                    self.skipped.emit()
+                else:
+                    self.log_signal.emit("Audio: przekodowanie przez FFmpeg.")
             else:
                 self.log_signal.emit(f"Start wideo (fmt={self.format_id}) → {self.url}")
-                download_video_mp4(
+                mode = download_video_mp4(
                     yt=self._yt,
                     url=self.url,
                     output_dir=self.folder,
                     format_id=self.format_id,
                     progress_cb=self._on_progress,
-                    cancel_cb=self._is_cancelled,
+                    cancel_cb=self._cancel,
+                    profile=self.profile,
+                    bandwidth=self._channel,
                 )
+                if mode == MP4_REMUX:
+                    self.log_signal.emit("MP4: kopiowanie strumieni (bez kodowania).")
+                elif mode == MP4_TRANSCODE:
+                    self.log_signal.emit("MP4: przekodowanie przez FFmpeg.")
+                else:
+                    self.log_signal.emit(
+                        "MP4: nieznane kodeki, konwersję dobierze FFmpeg."
+                    )
             self.finished_signal.emit(True, "")
         except CancelledError:
             # anulowanie nie jest traktowane jako krytyczny blad
@@ -86,3 +202,6 @@ class DownloadWorker(QThread):
         except Exception as e:
             # realny blad – przekazujemy tresc do ui lub logow
             self.finished_signal.emit(False, str(e))
+        finally:
+            self._channel.close()
+            self._channel = None
@@ -1,11 +1,18 @@
-import yt_dlp
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from app.core.format_ladder import build_ladder
+from app.core.meta_cache import cached_extract
+from app.core.thumbnails import thumbnail_from_info
+from app.core.ytclient import YTClient
+from app.utils.url import extract_video_id
+
 
 # worker w osobnym watku ktory pobiera dostepne formaty wideo i audio dla url
 class FormatFetchWorker(QThread):
     formats_ready = pyqtSignal(list)  # lista par (format_id, label)
     error = pyqtSignal(str)  # sygnal bledu
+    # url filmu i url miniatury z metadanych (bez HEAD)
+    thumbnail_ready = pyqtSignal(str, str)
 
     def __init__(self, url: str):
         super().__init__()
@@ -15,51 +22,13 @@ class FormatFetchWorker(QThread):
     def run(self):
         try:
             # pobiera metadane o formatach bez sciagania pliku
-            with yt_dlp.YoutubeDL({"quiet": True, "skip_download": True}) as ydl:
-                info = ydl.extract_info(self.url, download=False)
-                formats = info.get("formats", [])
-
-            muxed, video_only, audio_only = [], {}, []
-
-            # przechodzi po wszystkich formatach i klasyfikuje je
-            for f in formats:
-                ext = f.get("ext")
-                vcodec = f.get("vcodec")
-                acodec = f.get("acodec")
-                fid = f.get("format_id")
-                height = f.get("height") or 0
-                fps = f.get("fps") or 0
-
-                # format z video i audio razem (muxed)
-                if vcodec != "none" and acodec != "none" and ext == "mp4" and height:
-                    label = f"{height}p" + (f" @ {fps}fps" if fps else "")
-                    muxed.append((height, fps, fid, label))
-                    continue
-
-                # format tylko video (bez audio)
-                if vcodec != "none" and acodec == "none" and height:
-                    ex = video_only.get(height)
-                    # wybiera wariant z najwyzszym fps dla danej wysokosci
-                    if not ex or fps > ex[1]:
-                        video_only[height] = (fid, fps)
-                    continue
-
-                # format tylko audio
-                if acodec != "none" and vcodec == "none":
-                    audio_only.append(fid)
-
-            options = []
-
-            # laczy najlepsze warianty video-only z audio
-            if video_only and audio_only:
-                for h in sorted(video_only.keys(), reverse=True):
-                    fid, _fps = video_only[h]
-                    options.append((f"{fid}+bestaudio", f"{h}p + audio"))
-
-            # dodaje warianty muxed posortowane od najlepszych
-            muxed.sort(key=lambda x: (x[0], x[1]), reverse=True)
-            for _, _, fid, label in muxed:
-                options.append((fid, label))
+            # (najpierw z cache metadanych, w razie braku przez pule yt-dlp)
+            info = cached_extract(YTClient(), self.url, extract_video_id(self.url))
+            thumb = thumbnail_from_info(info)
+            if thumb:
+                self.thumbnail_ready.emit(self.url, thumb)
+            # klasyfikuje formaty wspolnym silnikiem drabinki jakosci
+            options = build_ladder(info.get("formats") or []).options()
 
             # jesli nie ma zadnych opcji to traktuje jako blad
             if not options:
@@ -1,43 +1,86 @@
-import yt_dlp
+import threading
+
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from app.core.ytclient import YTClient
+
+# porcja listy wysylana do ui: co tyle elementow albo co tyle sekund
+CHUNK_SIZE = 50
+CHUNK_INTERVAL = 0.2
+
 
 # worker w osobnym watku ktory pobiera liste filmow z playlisty youtube
+# elementy przychodza porcjami (chunk) w miare stronicowania przez yt-dlp,
+# na koniec result z pelna lista
 class PlaylistFetchWorker(QThread):
+    chunk = pyqtSignal(list)  # kolejne elementy listy, w kolejnosci playlisty
     result = pyqtSignal(list)  # lista slownikow {'id','url','title'}
     error = pyqtSignal(str)  # sygnal bledu
 
-    def __init__(self, url: str):
+    def __init__(
+        self,
+        url: str,
+        chunk_size: int = CHUNK_SIZE,
+        chunk_interval: float = CHUNK_INTERVAL,
+    ):
         super().__init__()
         self.url = url
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_interval = max(0.01, chunk_interval)  # okres watku porcji
 
     # glowna metoda uruchamiana w watku
+    # porcje wg czasu wysyla osobny watek, bo iteracja stoi na czas pobierania
+    # kolejnej strony i zebrane juz wiersze czekalyby na nastepny element
     def run(self):
+        out = []
+        buf = []
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        # wysyla zebrane elementy; pod blokada, zeby porcje szly w kolejnosci
+        def flush():
+            nonlocal buf
+            with lock:
+                if buf:
+                    self.chunk.emit(buf)
+                    buf = []
+
+        def tick():
+            while not stop.wait(self.chunk_interval):
+                flush()
+
+        timer = threading.Thread(target=tick, name="playlist-chunks", daemon=True)
+        timer.start()
         try:
             # extract_flat = True sprawia ze yt-dlp pobiera tylko metadane playlisty
-            opts = {"quiet": True, "skip_download": True, "extract_flat": True}
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                info = ydl.extract_info(self.url, download=False)
-
-            # entries zawiera liste elementow playlisty
-            entries = info.get("entries", []) or []
-            out = []
-            for e in entries:
+            opts = {"skip_download": True, "extract_flat": True}
+
+            # entries sa czytane leniwie, strona po stronie
+            for e in YTClient().iter_entries(self.url, opts):
                 vid = e.get("id")
                 if not vid:
                     continue
                 # buduje slownik z podstawowymi informacjami
-                out.append(
-                    {
-                        "id": vid,
-                        "url": f"https://www.youtube.com/watch?v={vid}",
-                        "title": e.get("title") or "",
-                    }
-                )
+                item = {
+                    "id": vid,
+                    "url": f"https://www.youtube.com/watch?v={vid}",
+                    "title": e.get("title") or "",
+                }
+                out.append(item)
+                with lock:
+                    buf.append(item)
+                    full = len(buf) >= self.chunk_size
+                if full:
+                    flush()
 
+            stop.set()
+            timer.join()
+            flush()
             # przekazuje gotowa liste do ui
             self.result.emit(out)
 
         except Exception as e:
             # w razie bledu przekazuje komunikat do ui
             self.error.emit(str(e))
+        finally:
+            stop.set()
@@ -1,89 +1,186 @@
-import yt_dlp
+from __future__ import annotations
+
+import queue
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from app.core.download import AUDIO_OPTIONS
+from app.core.format_ladder import build_ladder
+from app.core.meta_cache import cached_extract, shared_cache
+from app.core.ytclient import YTClient
+from app.utils.url import extract_video_id
+
+# domyslna liczba rownoleglych ekstrakcji i dodatkowych rund dla nieudanych
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 1
+# co ile sekund watek sprawdza nowe porcje listy, gdy ekstrakcje jeszcze trwaja
+_INPUT_POLL = 0.05
+
 
 # worker w osobnym watku ktory dla kazdego elementu playlisty pobiera szczegoly
 # zwraca miniaturke, czas trwania oraz liste dostepnych formatow
+# ekstrakcje ida rownolegle w ograniczonej puli watkow, wiersze przychodza
+# w kolejnosci ukonczenia, a blad jednego filmu nie zatrzymuje reszty
+# w trybie streaming kolejne elementy dochodza przez add_entries() w trakcie
+# listowania playlisty, a close_input() oznacza koniec listy
 class PlaylistFormatsWorker(QThread):
 
     row_ready = pyqtSignal(int, str, int, list)  # przekazuje dane o jednym wierszu
+    row_failed = pyqtSignal(int, str)  # wiersz ktorego nie udalo sie wczytac
+    summary = pyqtSignal(int, int)  # podsumowanie: udane, nieudane
     error = pyqtSignal(str)  # sygnal bledu
 
-    def __init__(self, entries: list[dict]):
+    def __init__(
+        self,
+        entries: list[dict],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        retries: int = DEFAULT_RETRIES,
+        streaming: bool = False,
+    ):
         super().__init__()
-        self.entries = entries
+        self.entries = list(entries)
+        self.concurrency = max(1, concurrency)
+        self.retries = max(0, retries)
+        self.streaming = streaming
+        self._incoming: queue.Queue[list[dict] | None] = queue.Queue()
+
+    # dokleja elementy na koniec listy (wolane z watku gui)
+    def add_entries(self, entries: list[dict]) -> None:
+        self._incoming.put(list(entries))
+
+    # konczy liste; po przetworzeniu wszystkich wierszy watek sie zakonczy
+    def close_input(self) -> None:
+        self._incoming.put(None)
+
+    # przenosi porcje z kolejki do listy, zwraca czy wejscie jest nadal otwarte
+    def _drain_input(self, block: bool) -> bool:
+        while True:
+            try:
+                chunk = (
+                    self._incoming.get(timeout=_INPUT_POLL)
+                    if block
+                    else (self._incoming.get_nowait())
+                )
+            except queue.Empty:
+                return True
+            if chunk is None:
+                return False
+            self.entries.extend(chunk)
+            block = False
 
     # glowna metoda uruchamiana w watku
     def run(self):
         try:
-            for row, e in enumerate(self.entries):
-                url = e["url"]
-                with yt_dlp.YoutubeDL({"quiet": True, "skip_download": True}) as ydl:
-                    info = ydl.extract_info(url, download=False)
-
-                # pobiera czas trwania filmu
-                duration = info.get("duration") or 0
-
-                # wybiera najlepsza miniaturke (najwieksze pole powierzchni)
-                thumbs = info.get("thumbnails") or []
-                thumb_url = ""
-                if thumbs:
-                    thumbs = sorted(
-                        thumbs,
-                        key=lambda t: (t.get("width", 0) * t.get("height", 0)),
-                        reverse=True,
+            # jeden klient dla wszystkich watkow, instancje yt-dlp sa brane z puli
+            yt = YTClient()
+            cache = shared_cache()
+        except Exception as e:
+            # bez klienta lub cache nie ma czego rownoleglic
+            self.error.emit(str(e))
+            return
+
+        ok = 0
+        ids: list[str | None] = []
+        failures: dict[int, str] = {}
+        open_input = self.streaming
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures: dict[Future, int] = {}
+
+            def submit(row: int) -> None:
+                fut = pool.submit(
+                    cached_extract, yt, self.entries[row]["url"], ids[row], cache
+                )
+                futures[fut] = row
+
+            # pierwsza runda: wiersze startuja zaraz po dotarciu swojej porcji
+            while True:
+                if open_input:
+                    open_input = self._drain_input(block=not futures)
+                if len(ids) < len(self.entries):
+                    new = range(len(ids), len(self.entries))
+                    ids.extend(
+                        self.entries[r].get("id")
+                        or extract_video_id(self.entries[r]["url"])
+                        for r in new
                     )
-                    thumb_url = thumbs[0].get("url") or ""
-
-                # buduje liste formatow podobnie jak w FormatFetchWorker
-                formats_raw = info.get("formats", [])
-                muxed, video_only, audio_only = [], {}, []
-                for f in formats_raw:
-                    ext = f.get("ext")
-                    vcodec = f.get("vcodec")
-                    acodec = f.get("acodec")
-                    fid = f.get("format_id")
-                    h = f.get("height") or 0
-                    fps = f.get("fps") or 0
-
-                    # format wideo z audio razem (muxed)
-                    if vcodec != "none" and acodec != "none" and ext == "mp4" and h:
-                        muxed.append(
-                            (h, fps, fid, f"{h}p" + (f" {fps}fps" if fps else ""))
-                        )
-                        continue
-
-                    # format tylko wideo
-                    if vcodec != "none" and acodec == "none" and h:
-                        ex = video_only.get(h)
-                        if not ex or fps > ex[1]:
-                            video_only[h] = (fid, fps)
+                    # jednym zapytaniem wyciaga z cache wszystko co juz jest znane
+                    known = cache.get_many(ids[r] for r in new if ids[r])
+                    for row in new:
+                        info = known.get(ids[row]) if ids[row] else None
+                        if info is not None and self._emit_row(row, info) is None:
+                            ok += 1
+                        else:
+                            submit(row)
+                if not futures:
+                    if open_input:
                         continue
+                    break
+                done, _ = wait(
+                    futures,
+                    timeout=_INPUT_POLL if open_input else None,
+                    return_when=FIRST_COMPLETED,
+                )
+                for fut in done:
+                    row = futures.pop(fut)
+                    err = self._collect(row, fut)
+                    if err is None:
+                        ok += 1
+                    else:
+                        failures[row] = err
+
+            # nieudane wracaja w kolejnych rundach, po reszcie playlisty
+            for _ in range(self.retries):
+                if not failures:
+                    break
+                for row in sorted(failures):
+                    submit(row)
+                failures = {}
+                for fut in as_completed(list(futures)):
+                    row = futures.pop(fut)
+                    err = self._collect(row, fut)
+                    if err is None:
+                        ok += 1
+                    else:
+                        failures[row] = err
+
+        for row in sorted(failures):
+            self.row_failed.emit(row, failures[row])
+            self.error.emit(f"#{row + 1}: {failures[row]}")
+        self.summary.emit(ok, len(failures))
+
+    # wynik ekstrakcji jednego wiersza: emituje go, zwraca opis bledu albo None
+    def _collect(self, row: int, fut: Future) -> str | None:
+        try:
+            return self._emit_row(row, fut.result())
+        except Exception as e:
+            return str(e)
 
-                    # format tylko audio
-                    if acodec != "none" and vcodec == "none":
-                        audio_only.append(fid)
-
-                options = []
-                # laczy najlepsze opcje video-only z audio
-                if video_only and audio_only:
-                    for h in sorted(video_only.keys(), reverse=True):
-                        fid, _fps = video_only[h]
-                        options.append((f"{fid}+bestaudio", f"{h}p + audio"))
-
-                # dodaje warianty muxed posortowane od najlepszych
-                muxed.sort(key=lambda x: (x[0], x[1]), reverse=True)
-                for _, _, fid, label in muxed:
-                    options.append((fid, label))
+    # buduje dane jednego wiersza i je emituje, zwraca opis bledu albo None
+    def _emit_row(self, row: int, info: dict) -> str | None:
+        try:
+            # pobiera czas trwania filmu
+            duration = info.get("duration") or 0
 
-                # jesli nic nie znaleziono to daje auto i audio
-                if not options:
-                    options = [("best", "Auto")]
-                options.append(("bestaudio", "Tylko audio (MP3)"))
+            # najlepsza miniaturka (najwieksze pole) wybrana przy projekcji
+            thumb_url = info.get("thumbnail") or ""
 
-                # przekazuje gotowe dane dla jednego elementu playlisty
-                self.row_ready.emit(row, thumb_url, int(duration), options)
+            # buduje liste formatow wspolnym silnikiem drabinki jakosci
+            options = build_ladder(info.get("formats") or []).options()
 
+            # jesli nic nie znaleziono to daje auto; opcje audio zawsze na koncu
+            if not options:
+                options = [("best", "Auto")]
+            options.extend(AUDIO_OPTIONS)
         except Exception as e:
-            # jesli cos poszlo nie tak wysyla blad
-            self.error.emit(str(e))
+            return str(e)
+
+        # przekazuje gotowe dane dla jednego elementu playlisty
+        self.row_ready.emit(row, thumb_url, int(duration), options)
+        return None
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from app.core.thumb_cache import ThumbDiskCache, shared_thumb_cache
+from app.core.thumbnails import get_thumbnail_url
+from app.utils.url import extract_video_id
+
+DEFAULT_WORKERS = 4
+FETCH_TIMEOUT = 5.0
+DEFAULT_MEMORY_BYTES = 32 * 1024 * 1024  # budzet na zdekodowane obrazy w pamieci
+
+# rozmiary miniatur uzywane w ui
+SINGLE_SIZE: Tuple[int, int] = (320, 180)  # widok pojedynczego filmu
+ROW_SIZE: Tuple[int, int] = (120, 68)  # komorka tabeli playlisty
+
+Fetch = Callable[[str], bytes]
+# klucz w cache pamieci: id filmu, szerokosc, wysokosc
+MemKey = Tuple[str, int, int]
+
+_local = threading.local()
+
+
+# pobiera bajty obrazka; sesja per watek, zeby polaczenia do i.ytimg.com byly
+# wykorzystywane ponownie miedzy kolejnymi miniaturami
+def http_fetch(url: str) -> bytes:
+    session = getattr(_local, "session", None)
+    if session is None:
+        import requests  # leniwy import - poza sciezka startu okna
+
+        session = _local.session = requests.Session()
+    r = session.get(url, timeout=FETCH_TIMEOUT)
+    r.raise_for_status()
+    return r.content
+
+
+# dekoduje bajty do QImage i skaluje do rozmiaru (z zachowaniem proporcji)
+def decode_scaled(data: bytes, size: Tuple[int, int]) -> Optional[QImage]:
+    img = QImage()
+    if not img.loadFromData(data) or img.isNull():
+        return None
+    return img.scaled(
+        size[0],
+        size[1],
+        Qt.AspectRatioMode.KeepAspectRatio,
+        Qt.TransformationMode.SmoothTransformation,
+    )
+
+
+# lru zdekodowanych i przeskalowanych obrazow z budzetem w bajtach
+# uzywany tylko z watku gui
+class ImageLRU:
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[MemKey, QImage] = OrderedDict()
+        self._total = 0
+
+    def get(self, key: MemKey) -> Optional[QImage]:
+        img = self._items.get(key)
+        if img is not None:
+            self._items.move_to_end(key)
+        return img
+
+    def put(self, key: MemKey, img: QImage) -> None:
+        size = img.sizeInBytes()
+        if size > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._total -= old.sizeInBytes()
+        self._items[key] = img
+        self._total += size
+        while self._total > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self._total -= evicted.sizeInBytes()
+
+    def total_bytes(self) -> int:
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# serwis miniatur: pobieranie, dekodowanie i skalowanie w puli watkow,
+# gotowe QImage trafiaja do ui sygnalem ready(klucz, obraz)
+# klucz to dowolny identyfikator zadania (np. "single", "row:5"); nowe zadanie
+# albo cancel() dla tego samego klucza uniewaznia poprzednie
+# gdy znane jest id filmu, obrazy ida przez dwa poziomy cache: lru w pamieci
+# (id + rozmiar, trafienie bez watku) i oryginalne bajty na dysku (id)
+class ThumbnailService(QObject):
+    ready = pyqtSignal(str, QImage)
+    failed = pyqtSignal(str, str)
+
+    # wynik z watku roboczego; sprawdzany w watku gui zanim trafi do ready
+    _done = pyqtSignal(str, int, object, object, str)
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        fetch: Fetch = http_fetch,
+        parent: Optional[QObject] = None,
+        memory: Optional[ImageLRU] = None,
+        disk: Optional[ThumbDiskCache] = None,
+    ):
+        super().__init__(parent)
+        self._fetch = fetch
+        self.memory = memory if memory is not None else ImageLRU()
+        self._disk = disk
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="thumbnails"
+        )
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, int] = {}
+        self._futures: Dict[str, Future] = {}
+        self._seq = 0
+        self._done.connect(self._deliver)
+
+    # zleca miniature z gotowego url obrazka
+    def request(
+        self,
+        key: str,
+        image_url: str,
+        size: Tuple[int, int],
+        video_id: Optional[str] = None,
+    ) -> None:
+        self._submit(key, lambda: image_url, size, video_id)
+
+    # zleca miniature dla linku do filmu (url obrazka wyznaczany w tle)
+    def request_for_video(
+        self, key: str, video_url: str, size: Tuple[int, int] = SINGLE_SIZE
+    ) -> None:
+        self._submit(
+            key, lambda: get_thumbnail_url(video_url), size, extract_video_id(video_url)
+        )
+
+    # obraz z cache w pamieci (bez pobierania) albo None
+    def cached(self, video_id: str, size: Tuple[int, int]) -> Optional[QImage]:
+        return self.memory.get((video_id, size[0], size[1]))
+
+    @property
+    def disk(self) -> ThumbDiskCache:
+        if self._disk is None:
+            self._disk = shared_thumb_cache()
+        return self._disk
+
+    # uniewaznia zadanie dla klucza; wynik, nawet jesli juz w drodze, nie dotrze
+    def cancel(self, key: str) -> None:
+        with self._lock:
+            self._tokens.pop(key, None)
+            future = self._futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def cancel_all(self) -> None:
+        with self._lock:
+            keys = list(self._tokens)
+        for key in keys:
+            self.cancel(key)
+
+    # czy zadanie dla klucza jeszcze czeka na wynik
+    def is_pending(self, key: str) -> bool:
+        with self._lock:
+            return key in self._tokens
+
+    # liczba zadan oczekujacych lub w trakcie
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._tokens)
+
+    # zatrzymuje pule watkow (przy zamykaniu okna)
+    def shutdown(self) -> None:
+        self.cancel_all()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(
+        self,
+        key: str,
+        resolve: Callable[[], Optional[str]],
+        size: Tuple[int, int],
+        video_id: Optional[str],
+    ) -> None:
+        self.cancel(key)
+        mem_key = (video_id, size[0], size[1]) if video_id else None
+        hit = self.memory.get(mem_key) if mem_key else None
+        if hit is not None:
+            self.ready.emit(key, hit)
+            return
+        disk = self.disk if video_id else None
+        with self._lock:
+            self._seq += 1
+            token = self._seq
+            self._tokens[key] = token
+            self._futures[key] = self._pool.submit(
+                self._run, key, token, resolve, size, mem_key, disk
+            )
+
+    def _is_current(self, key: str, token: int) -> bool:
+        with self._lock:
+            return self._tokens.get(key) == token
+
+    # praca w watku roboczym
+    def _run(
+        self,
+        key: str,
+        token: int,
+        resolve: Callable[[], Optional[str]],
+        size: Tuple[int, int],
+        mem_key: Optional[MemKey],
+        disk: Optional[ThumbDiskCache],
+    ) -> None:
+        if not self._is_current(key, token):
+            return
+        try:
+            data = disk.get(mem_key[0]) if disk is not None and mem_key else None
+            if data is None:
+                url = resolve()
+                if not url:
+                    self._done.emit(key, token, None, None, "Nie znaleziono miniatury")
+                    return
+                if not self._is_current(key, token):
+                    return
+                data = self._fetch(url)
+                img = decode_scaled(data, size)
+                if img is not None and disk is not None and mem_key:
+                    disk.put(mem_key[0], data)
+            else:
+                img = decode_scaled(data, size)
+            if img is None:
+                self._done.emit(key, token, None, None, "Błąd ładowania miniatury")
+                return
+            self._done.emit(key, token, img, mem_key, "")
+        except Exception as e:
+            self._done.emit(key, token, None, None, str(e))
+
+    # watek gui: przekazuje wynik tylko jesli zadanie nie zostalo uniewaznione
+    # (do cache w pamieci obraz trafia zawsze, przyda sie przy nastepnym razie)
+    def _deliver(
+        self,
+        key: str,
+        token: int,
+        img: Optional[QImage],
+        mem_key: Optional[MemKey],
+        err: str,
+    ) -> None:
+        if img is not None and mem_key is not None:
+            self.memory.put(mem_key, img)
+        with self._lock:
+            if self._tokens.get(key) != token:
+                return
+            del self._tokens[key]
+            self._futures.pop(key, None)
+        if img is not None:
+            self.ready.emit(key, img)
+        else:
+            self.failed.emit(key, err)
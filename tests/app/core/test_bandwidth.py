@@ -0,0 +1,133 @@
+import pytest
+
+from app.core.bandwidth import (
+    ACTIVE_WINDOW,
+    RATE_LIMIT_ENV,
+    BandwidthLimiter,
+    parse_rate,
+    shared_limiter,
+)
+
+
+# zegar i drzemka bez czekania: sleep przesuwa czas
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, s):
+        self.now += s
+        self.slept += s
+
+
+def _limiter(rate):
+    t = FakeTime()
+    return BandwidthLimiter(rate, clock=t.clock, sleep=t.sleep), t
+
+
+# test parsowania limitu z jednostkami
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("", 0),
+        ("0", 0),
+        ("1500", 1500),
+        ("500k", 500_000),
+        ("5M", 5_000_000),
+        ("1.5m", 1_500_000),
+        ("2MB/s", 2_000_000),
+    ],
+)
+def test_parse_rate(text, expected):
+    assert parse_rate(text) == expected
+
+
+# test bledu dla nieczytelnego limitu
+def test_parse_rate_invalid():
+    with pytest.raises(ValueError):
+        parse_rate("szybko")
+
+
+# test ze bez limitu kanal nigdy nie czeka
+def test_unlimited_never_waits():
+    limiter, t = _limiter(0)
+    with limiter.channel() as ch:
+        ch.throttle(10_000_000)
+    assert t.slept == 0.0
+
+
+# test ze pojedynczy kanal pobiera z predkoscia limitu
+def test_single_channel_rate():
+    limiter, t = _limiter(1_000_000)
+    ch = limiter.channel()
+    for _ in range(10):
+        ch.throttle(100_000)
+    assert t.now == pytest.approx(1.0)
+
+
+# test ze suma kanalow nie przekracza limitu, a wagi dziela przepustowosc
+def test_channels_share_by_weight():
+    limiter, t = _limiter(1_000_000)
+    hi = limiter.channel(weight=3.0)
+    lo = limiter.channel(weight=1.0)
+    got = {"hi": 0, "lo": 0}
+    next_at = {"hi": 0.0, "lo": 0.0}
+    # prosta symulacja dwoch watkow: zawsze rusza ten, ktory moze wczesniej
+    while t.now < 4.0:
+        name = min(next_at, key=next_at.get)
+        t.now = max(t.now, next_at[name])
+        ch = hi if name == "hi" else lo
+        wait = limiter._charge(ch, 10_000)
+        got[name] += 10_000
+        next_at[name] = t.now + wait
+
+    total = got["hi"] + got["lo"]
+    assert total / t.now == pytest.approx(1_000_000, rel=0.05)
+    assert got["hi"] / got["lo"] == pytest.approx(3.0, rel=0.1)
+
+
+# test ze kanal bez ruchu oddaje swoj udzial pozostalym
+def test_idle_channel_releases_share():
+    limiter, t = _limiter(1_000_000)
+    idle = limiter.channel()
+    busy = limiter.channel()
+    limiter._charge(idle, 1)
+    t.now += ACTIVE_WINDOW + 0.1
+    start = t.now
+    for _ in range(10):
+        busy.throttle(100_000)
+    assert t.now - start == pytest.approx(1.0)
+
+
+# test zmiany limitu i wagi w trakcie pobierania
+def test_runtime_rate_and_weight_change():
+    limiter, t = _limiter(1_000_000)
+    ch = limiter.channel()
+    ch.throttle(1_000_000)
+    limiter.set_rate(2_000_000)
+    start = t.now
+    ch.throttle(1_000_000)
+    assert t.now - start == pytest.approx(0.5)
+
+    ch.set_weight(4.0)
+    assert ch.weight == 4.0
+    ch.close()
+    assert limiter.channel_count() == 0
+
+
+# test ze anulowanie przerywa czekanie na zetony
+def test_throttle_stops_on_cancel():
+    limiter, t = _limiter(1_000)
+    ch = limiter.channel()
+    ch.throttle(1_000_000, cancel_cb=lambda: t.now > 0.5)
+    assert t.now < 1.0
+
+
+# test wspolnego ogranicznika ze zmienna srodowiskowa
+def test_shared_limiter_env(monkeypatch):
+    monkeypatch.setenv(RATE_LIMIT_ENV, "3M")
+    assert shared_limiter().rate == 3_000_000
+    assert shared_limiter() is shared_limiter()
@@ -0,0 +1,364 @@
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.cancel import CancelToken, as_token
+from app.utils.errors import CancelledError
+
+# gorna granica czasu od cancel() do CancelledError (bez tokenu: 20 s timeoutu
+# gniazda albo cala konwersja)
+CANCEL_LIMIT = 1.5
+# po tylu sekundach od wejscia w etap zglaszane jest anulowanie
+SETTLE = 0.2
+# tyle bajtow serwer wysyla z deklarowanych, zanim zamilknie
+_TEASER = 64 * 1024
+
+
+# test tokenu jako cancel_cb i rzucania CancelledError
+def test_token_is_cancel_callback():
+    token = CancelToken()
+    assert token() is False
+    token.check()
+    token.cancel()
+    assert token() is True and token.is_set()
+    with pytest.raises(CancelledError):
+        token.check()
+    assert as_token(token) is token
+    assert as_token(lambda: False) is None
+
+
+class _Ydl:
+    def urlopen(self, req):
+        return req
+
+
+# test ze po anulowaniu dowolny wyjatek z yt-dlp staje sie CancelledError
+def test_bind_converts_errors_after_cancel():
+    token = CancelToken()
+    ydl = _Ydl()
+    with pytest.raises(ValueError):
+        with token.bind(ydl):
+            raise ValueError("zwykly blad")
+    with pytest.raises(CancelledError) as info:
+        with token.bind(ydl):
+            token.cancel()
+            raise RuntimeError("DownloadError po zabitym ffmpeg")
+    assert isinstance(info.value.__cause__, RuntimeError)
+
+
+# test sprzatania: pliki zadania znikaja tylko przy remove_partial, plik
+# pobrany wczesniej (finished bez tmpfilename) zostaje
+def test_cleanup_removes_only_own_files(tmp_path):
+    own = tmp_path / "a.webm"
+    old = tmp_path / "b.webm"
+    part = tmp_path / "c.mp4.part"
+    frag = tmp_path / "c.mp4.part-Frag3"
+    for f in (own, old, part, frag):
+        f.write_bytes(b"x")
+    token = CancelToken()
+    ydl = _Ydl()
+    with pytest.raises(CancelledError):
+        with token.bind(ydl):
+            hook = token.progress_hook
+            hook({"status": "downloading", "filename": str(own), "tmpfilename": "x"})
+            hook({"status": "finished", "filename": str(own)})
+            hook({"status": "finished", "filename": str(old)})
+            hook(
+                {
+                    "status": "downloading",
+                    "filename": str(tmp_path / "c.mp4"),
+                    "tmpfilename": str(part),
+                }
+            )
+            token.cancel()
+            token.check()
+    assert all(f.exists() for f in (own, old, part, frag))
+
+    token.cancel(remove_partial=True)
+    token.cleanup()
+    assert not own.exists() and not part.exists() and not frag.exists()
+    assert old.exists()
+
+
+# test tokenow dzieci: anulowanie rodzica przechodzi na dzieci (takze
+# utworzone pozniej), pliki dziecka nie trafiaja do rodzica, a zwolnione
+# dzieci nie sa trzymane
+def test_child_tokens(tmp_path):
+    import gc
+
+    parent = CancelToken()
+    child = parent.child()
+    child.progress_hook(
+        {"status": "downloading", "filename": "a.mp4", "tmpfilename": "a.mp4.part"}
+    )
+    assert parent._files == set() and child._files
+
+    parent.child()
+    gc.collect()
+    assert list(parent._children) == [child]
+
+    parent.cancel(remove_partial=True)
+    assert child.is_set() and child._remove_partial
+    late = parent.child()
+    assert late.is_set() and late._remove_partial
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # /page: strona, ktora urywa sie w polowie (ekstrakcja)
+    # /stall.webm: plik, ktory przestaje plynac po kilku blokach (odczyt http)
+    # /clip.webm: maly plik pobierany od razu (dalej etap ffmpeg)
+    def do_GET(self):
+        srv = self.server
+        if self.path.startswith("/clip"):
+            body = b"\x1aE\xdf\xa3" + b"\0" * 4000
+            self._headers("video/webm", len(body))
+            self.wfile.write(body)
+            return
+        if self.path.startswith("/page"):
+            self._headers("text/html", 100_000)
+            self.wfile.write(b"<html><head>")
+        else:
+            self._headers("video/webm", 50_000_000)
+            self.wfile.write(b"\0" * _TEASER)
+        self.wfile.flush()
+        srv.stalled.set()
+        srv.release.wait(30)
+
+    def _headers(self, ctype, length):
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(length))
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = _Server(("127.0.0.1", 0), _StandIn)
+    srv.stalled = threading.Event()
+    srv.release = threading.Event()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.release.set()
+    srv.shutdown()
+    srv.server_close()
+
+
+# wolny ffmpeg: odpowiada na sprawdzenie wersji i sondowanie koderow, zwykle
+# wywolanie zostawia znacznik i spi
+@pytest.fixture
+def slow_ffmpeg(tmp_path):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    mark = tmp_path / "ffmpeg-started"
+    fake = bin_dir / "ffmpeg"
+    fake.write_text(
+        "#!/bin/sh\n"
+        'for a in "$@"; do case "$a" in\n'
+        '  -version|-bsfs) echo "ffmpeg version 7.0.0"; exit 0;;\n'
+        "  -encoders|-muxers) exit 0;;\n"
+        "esac; done\n"
+        f'touch "{mark}"\n'
+        "exec sleep 30\n"
+    )
+    fake.chmod(0o755)
+    return str(fake), mark
+
+
+# uruchamia fn(token) i anuluje, kiedy reached() zwroci True; zwraca czas od
+# cancel() do CancelledError
+def _time_to_cancel(fn, reached, remove_partial=True):
+    token = CancelToken()
+    cancelled_at = []
+
+    def canceller():
+        deadline = time.monotonic() + 20
+        while not reached() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(SETTLE)
+        cancelled_at.append(time.monotonic())
+        token.cancel(remove_partial)
+
+    t = threading.Thread(target=canceller, daemon=True)
+    t.start()
+    with pytest.raises(CancelledError):
+        fn(token)
+    elapsed = time.monotonic() - cancelled_at[0]
+    t.join()
+    return elapsed
+
+
+def _client(ffmpeg=None):
+    from app.core.ydl_pool import YDLPool
+    from app.core.ytclient import YTClient
+
+    return YTClient(ffmpeg_path=ffmpeg, pool=YDLPool())
+
+
+# test czasu anulowania w kazdym etapie; bez wymuszenia ekstrakcja i odczyt
+# czekalyby na timeout gniazda, a ffmpeg do konca konwersji
+@pytest.mark.skipif(sys.platform == "win32", reason="skrypt powloki")
+@pytest.mark.parametrize("phase", ["extract", "http", "ffmpeg"])
+def test_time_to_cancel(phase, server, slow_ffmpeg, tmp_path):
+    from app.core.download import download_video_mp4
+
+    ffmpeg, mark = slow_ffmpeg
+    out = tmp_path / "out"
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    path, reached = {
+        "extract": ("/page", server.stalled.is_set),
+        "http": ("/stall.webm", server.stalled.is_set),
+        "ffmpeg": ("/clip.webm", mark.exists),
+    }[phase]
+
+    elapsed = _time_to_cancel(
+        lambda token: download_video_mp4(
+            _client(ffmpeg), base + path, str(out), "best", cancel_cb=token
+        ),
+        reached,
+    )
+
+    assert elapsed < CANCEL_LIMIT
+    assert not out.exists() or os.listdir(out) == []
+
+
+# test ze bez remove_partial przerwany plik .part zostaje do wznowienia
+def test_cancel_keeps_partial_by_default(server, tmp_path):
+    from app.core.download import download_video_mp4
+
+    out = tmp_path / "out"
+    url = f"http://127.0.0.1:{server.server_address[1]}/stall.webm"
+    elapsed = _time_to_cancel(
+        lambda token: download_video_mp4(
+            _client(), url, str(out), "best", cancel_cb=token
+        ),
+        server.stalled.is_set,
+        remove_partial=False,
+    )
+    assert elapsed < CANCEL_LIMIT
+    assert [p.name for p in out.iterdir()] == ["stall.webm.part"]
+
+
+# test etapu konwersji mp3 w puli: wolny ffmpeg zabity, zrodlo usuniete
+@pytest.mark.skipif(sys.platform == "win32", reason="skrypt powloki")
+def test_time_to_cancel_mp3_stage(server, slow_ffmpeg, tmp_path):
+    from app.core.download import download_audio_mp3
+    from app.core.postprocess import PostprocessPool
+
+    ffmpeg, mark = slow_ffmpeg
+    out = tmp_path / "out"
+    url = f"http://127.0.0.1:{server.server_address[1]}/clip.webm"
+    pool = PostprocessPool(workers=1)
+    try:
+        elapsed = _time_to_cancel(
+            lambda token: download_audio_mp3(
+                _client(ffmpeg), url, str(out), cancel_cb=token, postprocess=pool
+            ),
+            mark.exists,
+        )
+    finally:
+        pool.shutdown()
+    assert elapsed < CANCEL_LIMIT
+    assert os.listdir(out) == []
+
+
+# test wykrywania Popen yt-dlp: klasa z wlasnym __init__ jest sledzona, inaczej
+# zostaje anulowanie w hookach i jedno ostrzezenie w logu
+def test_popen_detection_falls_back(monkeypatch, caplog):
+    import subprocess
+    from types import SimpleNamespace
+
+    import yt_dlp
+
+    from app.core import cancel
+
+    monkeypatch.setattr(cancel, "_warned", set())
+    assert cancel._trackable_popen(yt_dlp) is yt_dlp.utils.Popen
+
+    inherited = type("Popen", (subprocess.Popen,), {})
+    for module in (
+        SimpleNamespace(),
+        SimpleNamespace(utils=SimpleNamespace(Popen=object())),
+        SimpleNamespace(utils=SimpleNamespace(Popen=inherited)),
+    ):
+        assert cancel._trackable_popen(module) is None
+        with CancelToken().bind(_Ydl(), module):
+            pass
+    assert len([r for r in caplog.records if "Popen" in r.getMessage()]) == 1
+
+
+# test odpowiedzi bez gniazda: anulowanie tylko ja zamyka, w logu ostrzezenie
+def test_response_without_socket_warns(monkeypatch, caplog):
+    from app.core import cancel
+
+    monkeypatch.setattr(cancel, "_warned", set())
+
+    class _Resp:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    token = CancelToken()
+    scope = cancel._Scope(token)
+    first, second = _Resp(), _Resp()
+    token._track_response(scope, first)
+    token._track_response(scope, second)
+    token._scopes.add(scope)
+    token.cancel()
+    assert first.closed and second.closed
+    assert len([r for r in caplog.records if "gniazda" in r.getMessage()]) == 1
+
+
+# test drogi od odpowiedzi yt-dlp do gniazda (prywatne atrybuty) dla obslugi
+# http przez requests i przez urllib; pada, gdy yt-dlp albo biblioteka http
+# zmieni budowe odpowiedzi
+@pytest.mark.parametrize("compat", [[], ["prefer-legacy-http-handler"]])
+def test_response_socket_reachable(server, compat):
+    import socket
+
+    import yt_dlp
+
+    from app.core.cancel import _response_socket
+
+    with yt_dlp.YoutubeDL({"quiet": True, "compat_opts": compat}) as ydl:
+        resp = ydl.urlopen(f"http://127.0.0.1:{server.server_address[1]}/clip")
+        try:
+            assert isinstance(_response_socket(resp), socket.socket)
+        finally:
+            resp.close()
+
+
+# test ze powiazanie nie zostawia zmian w yt-dlp: klasa YoutubeDL nietknieta,
+# konstruktor Popen przywrocony po ostatnim powiazaniu
+def test_bind_restores_ytdlp():
+    import yt_dlp
+
+    init = yt_dlp.utils.Popen.__init__
+    urlopen = yt_dlp.YoutubeDL.urlopen
+    first, second = CancelToken(), CancelToken()
+    with yt_dlp.YoutubeDL({"quiet": True}) as a, yt_dlp.YoutubeDL({"quiet": True}) as b:
+        with first.bind(a, yt_dlp):
+            with second.bind(b, yt_dlp):
+                assert yt_dlp.utils.Popen.__init__ is not init
+                assert "urlopen" in vars(b)
+            assert yt_dlp.utils.Popen.__init__ is not init
+            assert "urlopen" not in vars(b)
+        assert yt_dlp.utils.Popen.__init__ is init
+        assert "urlopen" not in vars(a)
+    assert yt_dlp.YoutubeDL.urlopen is urlopen
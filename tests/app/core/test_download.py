@@ -12,6 +12,7 @@ def test_download_video_mp4_default_format(tmp_path):
         from app.core.ytclient import YTClient
 
         mock_yt = MagicMock(spec=YTClient)
+        mock_yt.ffmpeg_path = None
 
         download_video_mp4(
             yt=mock_yt,
@@ -26,7 +27,10 @@ def test_download_video_mp4_default_format(tmp_path):
         # sprawdz domyslny format
         assert "format" in opts
         assert "bestvideo" in opts["format"]
-        assert opts["merge_output_format"] == "mp4"
+        # kontener ustala prepare po wyborze formatow (h264 + aac -> mp4)
+        prepare = call_args.kwargs["prepare"]
+        selected = {"vcodec": "avc1.640028", "acodec": "mp4a.40.2"}
+        assert prepare(selected)["merge_output_format"] == "mp4"
 
 
 # test z customowym formatem
@@ -36,6 +40,7 @@ def test_download_video_mp4_custom_format(tmp_path):
         from app.core.ytclient import YTClient
 
         mock_yt = MagicMock(spec=YTClient)
+        mock_yt.ffmpeg_path = None
 
         download_video_mp4(
             yt=mock_yt,
@@ -56,10 +61,11 @@ def test_download_video_mp4_progress_callback(tmp_path):
         from app.core.ytclient import YTClient
 
         mock_yt = MagicMock(spec=YTClient)
+        mock_yt.ffmpeg_path = None
         progress_calls = []
 
-        def progress_cb(pct, downloaded, total):
-            progress_calls.append((pct, downloaded, total))
+        def progress_cb(ev):
+            progress_calls.append(ev)
 
         download_video_mp4(
             yt=mock_yt,
@@ -87,15 +93,15 @@ def test_download_video_mp4_cancel():
 
         progress_calls = []
 
-        def progress_cb(pct, downloaded, total):
-            progress_calls.append((pct, downloaded, total))
+        def progress_cb(ev):
+            progress_calls.append(ev)
 
         hook = _hook(progress_cb, cancel_cb)
 
         # symuluj downloading
         hook({"status": "downloading", "downloaded_bytes": 1000, "total_bytes": 10000})
         assert len(progress_calls) == 1
-        assert progress_calls[0][0] == pytest.approx(10.0)
+        assert progress_calls[0].percent == pytest.approx(10.0)
 
         # symuluj anulowanie
         cancelled = True
@@ -116,15 +122,35 @@ def test_download_hook_zero_bytes():
 
         progress_calls = []
 
-        def progress_cb(pct, downloaded, total):
-            progress_calls.append((pct, downloaded, total))
+        def progress_cb(ev):
+            progress_calls.append(ev)
 
         hook = _hook(progress_cb, None)
         hook({"status": "downloading", "downloaded_bytes": 0, "total_bytes": 0})
 
         # nie powinno crashnac
         assert len(progress_calls) == 1
-        assert progress_calls[0][0] == 0.0
+        assert progress_calls[0].percent == 0.0
+
+
+# test ze zdarzenie niesie sciezke pliku .part zapisywanego przez yt-dlp
+def test_download_hook_reports_tmpfilename():
+    with patch.dict("sys.modules", {"yt_dlp": MagicMock()}):
+        from app.core.download import _hook
+
+        events = []
+        hook = _hook(events.append, None)
+        hook(
+            {
+                "status": "downloading",
+                "downloaded_bytes": 10,
+                "total_bytes": 100,
+                "filename": "/out/a.mp4",
+                "tmpfilename": "/out/a.mp4.part",
+            }
+        )
+
+        assert events[0].filename == "/out/a.mp4.part"
 
 
 # test hook bez total_bytes (estimate)
@@ -134,8 +160,8 @@ def test_download_hook_estimate():
 
         progress_calls = []
 
-        def progress_cb(pct, downloaded, total):
-            progress_calls.append((pct, downloaded, total))
+        def progress_cb(ev):
+            progress_calls.append(ev)
 
         hook = _hook(progress_cb, None)
         hook(
@@ -146,7 +172,7 @@ def test_download_hook_estimate():
             }
         )
 
-        assert progress_calls[0][0] == pytest.approx(50.0)
+        assert progress_calls[0].percent == pytest.approx(50.0)
 
 
 # test download_audio_mp3
@@ -156,6 +182,7 @@ def test_download_audio_mp3_calls_ytclient(tmp_path):
         from app.core.ytclient import YTClient
 
         mock_yt = MagicMock(spec=YTClient)
+        mock_yt.ffmpeg_path = None
 
         download_audio_mp3(
             yt=mock_yt, url="https://youtube.com/watch?v=TEST", output_dir=str(tmp_path)
@@ -183,11 +210,12 @@ def test_download_audio_mp3_with_callbacks(tmp_path):
         from app.core.ytclient import YTClient
 
         mock_yt = MagicMock(spec=YTClient)
+        mock_yt.ffmpeg_path = None
         progress_calls = []
         cancel_calls = []
 
-        def progress_cb(pct, downloaded, total):
-            progress_calls.append((pct, downloaded, total))
+        def progress_cb(ev):
+            progress_calls.append(ev)
 
         def cancel_cb():
             cancel_calls.append(True)
@@ -213,19 +241,24 @@ def test_download_hook_different_status():
 
         progress_calls = []
 
-        def progress_cb(pct, downloaded, total):
-            progress_calls.append((pct, downloaded, total))
+        def progress_cb(ev):
+            progress_calls.append(ev)
 
         hook = _hook(progress_cb, None)
 
-        # status "finished" nie powinien wywolac progress_cb
-        hook({"status": "finished"})
+        # status "error" nie powinien wywolac progress_cb
+        hook({"status": "error"})
         assert len(progress_calls) == 0
 
-        # tylko "downloading" wywoluje callback
+        # "downloading" wywoluje callback
         hook({"status": "downloading", "downloaded_bytes": 100, "total_bytes": 1000})
         assert len(progress_calls) == 1
 
+        # "finished" to zdarzenie koncowe - przechodzi zawsze, ze 100%
+        hook({"status": "finished", "total_bytes": 1000})
+        assert progress_calls[-1].phase == "finished"
+        assert progress_calls[-1].percent == 100.0
+
 
 # test restrictfilenames option
 def test_download_video_restrictfilenames(tmp_path):
@@ -234,6 +267,7 @@ def test_download_video_restrictfilenames(tmp_path):
         from app.core.ytclient import YTClient
 
         mock_yt = MagicMock(spec=YTClient)
+        mock_yt.ffmpeg_path = None
 
         download_video_mp4(
             yt=mock_yt, url="https://youtube.com/watch?v=TEST", output_dir=str(tmp_path)
@@ -242,3 +276,536 @@ def test_download_video_restrictfilenames(tmp_path):
         call_args = mock_yt.download.call_args
         opts = call_args[0][1]
         assert opts["restrictfilenames"] is True
+
+
+def _formats():
+    return [
+        {"format_id": "137", "ext": "mp4", "vcodec": "avc1.640028", "acodec": "none"},
+        {"format_id": "248", "ext": "webm", "vcodec": "vp9", "acodec": "none"},
+        {"format_id": "140", "ext": "m4a", "vcodec": "none", "acodec": "mp4a.40.2"},
+        {"format_id": "251", "ext": "webm", "vcodec": "none", "acodec": "opus"},
+        {"format_id": "43", "ext": "webm", "vcodec": "vp8", "acodec": "vorbis"},
+    ]
+
+
+# formaty wybrane przez yt-dlp dla podanych id (jak requested_formats)
+def _selected(*ids):
+    by_id = {f["format_id"]: f for f in _formats()}
+    return [by_id[i] for i in ids]
+
+
+# test planu: h264 + aac wystarczy skopiowac
+def test_plan_mp4_remux_for_h264_aac():
+    from app.core.download import MP4_REMUX, plan_mp4
+
+    assert plan_mp4(_selected("137", "140")) == (MP4_REMUX, [])
+
+
+# test planu: vp9 trzeba zakodowac, audio aac jest kopiowane
+def test_plan_mp4_transcode_video_only():
+    from app.core.download import MP4_TRANSCODE, plan_mp4
+
+    assert plan_mp4(_selected("248", "140")) == (MP4_TRANSCODE, ["-c:a", "copy"])
+    assert plan_mp4(_selected("137", "251")) == (MP4_TRANSCODE, ["-c:v", "copy"])
+    assert plan_mp4(_selected("43")) == (MP4_TRANSCODE, [])
+
+
+# test planu z mozliwosciami ffmpeg: brak libx264 - wbudowany mpeg4
+def test_plan_mp4_picks_available_encoder():
+    from app.core.download import MP4_TRANSCODE, plan_mp4
+    from app.core.ffmpeg_caps import FFmpegCaps
+
+    caps = FFmpegCaps("/ffmpeg", "7.0", frozenset({"mpeg4", "aac"}), frozenset(), True)
+    assert plan_mp4(_selected("248", "140"), caps) == (
+        MP4_TRANSCODE,
+        ["-c:v", "mpeg4", "-c:a", "copy"],
+    )
+    assert plan_mp4(_selected("137", "251"), caps) == (
+        MP4_TRANSCODE,
+        ["-c:v", "copy", "-c:a", "aac"],
+    )
+
+
+# test planu bez znanych kodekow - tryb auto zamiast udawanego remuxu
+def test_plan_mp4_unknown_codecs_is_auto():
+    from app.core.download import MP4_AUTO, plan_mp4
+
+    assert plan_mp4([]) == (MP4_AUTO, [])
+    assert plan_mp4([{"format_id": "0", "ext": "mp4"}]) == (MP4_AUTO, [])
+    video = {"format_id": "0", "vcodec": "avc1", "acodec": "none"}
+    assert plan_mp4([video, {"format_id": "1", "vcodec": "none"}]) == (MP4_AUTO, [])
+
+
+# test wyboru skladowych: requested_formats przy sklejaniu, inaczej samo info
+def test_selected_formats():
+    from app.core.download import selected_formats
+
+    merged = {"format_id": "137+140", "requested_formats": _selected("137", "140")}
+    assert selected_formats(merged) == _selected("137", "140")
+    single = _selected("43")[0]
+    assert selected_formats(single) == [single]
+    assert selected_formats(None) == []
+
+
+# uruchamia download_video_mp4 z klientem, ktory "wybiera" podane formaty;
+# zwraca tryb i opcje pobierania po prepare
+def _run_mp4(tmp_path, format_id, info):
+    from app.core.download import download_video_mp4
+
+    mock_yt = MagicMock()
+    mock_yt.ffmpeg_path = None
+    final = {}
+
+    def fake_download(url, opts, profile=None, cancel=None, prepare=None):
+        final.update({**opts, **prepare(info)})
+
+    mock_yt.download.side_effect = fake_download
+    mode = download_video_mp4(
+        yt=mock_yt,
+        url="https://youtube.com/watch?v=TEST",
+        output_dir=str(tmp_path),
+        format_id=format_id,
+    )
+    return mode, final
+
+
+# test opcji yt-dlp dla sciezki remux (bez recode_video)
+def test_download_video_mp4_remux_opts(tmp_path):
+    from app.core.download import MP4_REMUX
+
+    info = {"requested_formats": _selected("137", "140")}
+    mode, opts = _run_mp4(tmp_path, "137+bestaudio", info)
+
+    assert mode == MP4_REMUX
+    assert "recode_video" not in opts
+    assert opts["format"] == "137+bestaudio"
+    assert opts["format_sort"] == ["acodec:aac"]
+    assert opts["merge_output_format"] == "mp4"
+    assert opts["postprocessors"] == [
+        {"key": "FFmpegVideoRemuxer", "preferedformat": "mp4"}
+    ]
+
+
+# test opcji yt-dlp dla sciezki z przekodowaniem
+def test_download_video_mp4_transcode_opts(tmp_path):
+    from app.core.download import MP4_TRANSCODE
+
+    info = {"requested_formats": _selected("248", "140")}
+    mode, opts = _run_mp4(tmp_path, "248+140", info)
+
+    assert mode == MP4_TRANSCODE
+    assert opts["merge_output_format"] == "mkv"
+    assert opts["postprocessors"][0]["key"] == "FFmpegVideoConvertor"
+    assert opts["postprocessor_args"] == {"videoconvertor": ["-c:a", "copy"]}
+
+
+# test: vp9 + opus wybrane przez yt-dlp (np. jawne id bez metadanych w cache)
+# nie jest sklejane do mp4 kopiowaniem
+def test_download_video_mp4_plans_from_selected_formats(tmp_path):
+    from app.core.download import MP4_TRANSCODE
+
+    info = {"requested_formats": _selected("248", "251")}
+    mode, opts = _run_mp4(tmp_path, "bestvideo+bestaudio", info)
+
+    assert mode == MP4_TRANSCODE
+    assert opts["merge_output_format"] == "mkv"
+    assert opts["postprocessors"][0]["key"] == "FFmpegVideoConvertor"
+
+
+# test: kodeki nieznane - tryb auto i konwersja przez ffmpeg
+def test_download_video_mp4_unknown_codecs_auto(tmp_path):
+    from app.core.download import MP4_AUTO
+
+    mode, opts = _run_mp4(tmp_path, "best", {"format_id": "0", "ext": "mp4"})
+
+    assert mode == MP4_AUTO
+    assert opts["postprocessors"][0]["key"] == "FFmpegVideoConvertor"
+    assert opts["postprocessor_args"] == {"videoconvertor": []}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _chunk(downloaded, total=1000, **kw):
+    d = {"status": "downloading", "downloaded_bytes": downloaded, "total_bytes": total}
+    d.update(kw)
+    return d
+
+
+# test ograniczania czestotliwosci zdarzen (8 Hz)
+def test_download_hook_throttles_events():
+    from app.core.download import ProgressThrottle, _hook
+
+    clock = FakeClock()
+    events = []
+    hook = _hook(events.append, None, ProgressThrottle(8.0, clock=clock))
+
+    for i in range(1, 100):
+        clock.now = i / 128  # 128 wywolan na sekunde
+        hook(_chunk(i))
+
+    # pierwsze zdarzenie i potem co 125 ms (16 wywolan)
+    assert [e.downloaded for e in events] == [1, 17, 33, 49, 65, 81, 97]
+
+
+# test ze koniec pliku i zmiana etapu przechodza mimo limitu
+def test_download_hook_final_events_always_delivered():
+    from app.core.download import ProgressThrottle, _hook
+
+    clock = FakeClock()
+    events = []
+    hook = _hook(events.append, None, ProgressThrottle(1.0, clock=clock))
+
+    hook(_chunk(10))
+    hook(_chunk(500))  # pominiete
+    hook(_chunk(1000))  # ostatni fragment
+    hook({"status": "finished", "total_bytes": 1000, "downloaded_bytes": 1000})
+    hook(_chunk(5, total=200))  # drugi strumien (np. audio)
+
+    assert [(e.phase, e.downloaded) for e in events] == [
+        ("downloading", 10),
+        ("downloading", 1000),
+        ("finished", 1000),
+        ("downloading", 5),
+    ]
+
+
+# test pol zdarzenia: predkosc i eta
+def test_download_hook_event_fields():
+    from app.core.download import _hook
+
+    events = []
+    hook = _hook(events.append, None)
+    hook(_chunk(250, speed=125.5, eta=6))
+
+    ev = events[0]
+    assert (ev.downloaded, ev.total, ev.speed, ev.eta) == (250, 1000, 125.5, 6)
+    assert ev.percent == pytest.approx(25.0)
+
+
+# test anulowania sprawdzanego przy kazdym wywolaniu, takze pominietym przez limit
+def test_download_hook_cancel_not_throttled():
+    from app.core.download import ProgressThrottle, _hook
+
+    clock = FakeClock()
+    cancelled = []
+    hook = _hook(lambda e: None, lambda: bool(cancelled), ProgressThrottle(1.0, clock))
+    hook(_chunk(1))
+    cancelled.append(True)
+
+    with pytest.raises(CancelledError):
+        hook(_chunk(2))
+
+
+# test hooka postprocesora - etap postprocessing z nazwa
+def test_pp_hook_reports_phase():
+    from app.core.download import _pp_hook
+
+    events = []
+    hook = _pp_hook(events.append, None)
+    hook({"status": "started", "postprocessor": "Merger"})
+    hook({"status": "finished", "postprocessor": "Merger"})
+
+    assert [(e.phase, e.postprocessor) for e in events] == [
+        ("postprocessing", "Merger")
+    ]
+
+
+# test ze profil zadania jest przekazywany do klienta
+def test_download_passes_profile(tmp_path):
+    from app.core.download import download_audio_mp3, download_video_mp4
+    from app.core.ytclient import PROFILES
+
+    mock_yt = MagicMock()
+    download_video_mp4(
+        mock_yt, "https://youtu.be/TEST", str(tmp_path), profile=PROFILES["max"]
+    )
+    assert mock_yt.download.call_args.kwargs["profile"] == PROFILES["max"]
+
+    download_audio_mp3(mock_yt, "https://youtu.be/TEST", str(tmp_path))
+    assert mock_yt.download.call_args.kwargs["profile"] is None
+
+
+# test ze hook dolicza do ogranicznika tylko nowe bajty, osobno dla kazdego pliku
+def test_hook_charges_bandwidth():
+    from app.core.download import _hook
+
+    channel = MagicMock()
+    hook = _hook(None, None, bandwidth=channel)
+    hook({"status": "downloading", "downloaded_bytes": 100, "tmpfilename": "v.part"})
+    hook({"status": "downloading", "downloaded_bytes": 250, "tmpfilename": "v.part"})
+    hook({"status": "downloading", "downloaded_bytes": 250, "tmpfilename": "v.part"})
+    hook({"status": "downloading", "downloaded_bytes": 40, "tmpfilename": "a.part"})
+    hook({"status": "finished", "downloaded_bytes": 250, "filename": "v"})
+
+    assert [c.args[0] for c in channel.throttle.call_args_list] == [100, 150, 40]
+
+
+# test mp3 przez pule konwersji: yt-dlp pobiera samo audio, konwersja osobno
+def test_download_audio_mp3_postprocess_stage(tmp_path):
+    from app.core.download import PHASE_POSTPROCESSING, download_audio_mp3
+    from app.core.postprocess import PostprocessPool
+
+    src = tmp_path / "Film.webm"
+
+    def fake_download(url, opts, profile=None, cancel=None):
+        src.write_bytes(b"audio")
+        for hook in opts["progress_hooks"]:
+            hook({"status": "finished", "filename": str(src), "total_bytes": 5})
+
+    def fake_transcode(ffmpeg, s, d, args, cancel_cb):
+        calls.append((ffmpeg, s, d, args))
+        return d
+
+    calls = []
+    events = []
+    downloaded = []
+    mock_yt = MagicMock()
+    mock_yt.ffmpeg_path = "/ffmpeg"
+    mock_yt.download.side_effect = fake_download
+    pool = PostprocessPool(workers=1)
+    with patch("app.core.download.transcode", fake_transcode):
+        download_audio_mp3(
+            mock_yt,
+            "https://youtu.be/TEST",
+            str(tmp_path),
+            progress_cb=events.append,
+            postprocess=pool,
+            downloaded_cb=lambda: downloaded.append(True),
+        )
+    pool.shutdown()
+
+    opts = mock_yt.download.call_args[0][1]
+    assert "postprocessors" not in opts
+    assert calls[0][:3] == ("/ffmpeg", str(src), str(tmp_path / "Film.mp3"))
+    assert "libmp3lame" in calls[0][3]
+    assert downloaded == [True]
+    assert events[-1].phase == PHASE_POSTPROCESSING
+
+
+# test wyboru trybu audio: kopia gdy kodek pasuje do kontenera
+def test_plan_audio_copy_and_transcode():
+    from app.core.download import AUDIO_COPY, AUDIO_TRANSCODE, plan_audio
+
+    assert plan_audio("m4a", "mp4a.40.2") == (
+        AUDIO_COPY,
+        ["-vn", "-c:a", "copy", "-f", "mp4"],
+    )
+    assert plan_audio("opus", "opus")[0] == AUDIO_COPY
+    assert plan_audio("ogg", "vorbis")[0] == AUDIO_COPY
+    mode, args = plan_audio("m4a", "opus")
+    assert mode == AUDIO_TRANSCODE
+    assert args[args.index("-c:a") + 1] == "aac"
+    assert plan_audio("opus", None)[0] == AUDIO_TRANSCODE
+
+
+# test typu pliku dla format_id z listy jakosci
+def test_kind_for_format():
+    from app.core.download import kind_for_format
+
+    assert kind_for_format(None) == "mp4"
+    assert kind_for_format("137+bestaudio") == "mp4"
+    assert kind_for_format("bestaudio") == "mp3"
+    assert kind_for_format("bestaudio:m4a") == "m4a"
+    assert kind_for_format("bestaudio:ogg") == "ogg"
+    assert kind_for_format("bestaudio:flac") == "mp3"
+
+
+def _audio_yt(src, acodec):
+    def fake_download(url, opts, profile=None, cancel=None):
+        src.write_bytes(b"audio")
+        for hook in opts["progress_hooks"]:
+            hook(
+                {
+                    "status": "finished",
+                    "filename": str(src),
+                    "total_bytes": 5,
+                    "info_dict": {"acodec": acodec},
+                }
+            )
+
+    mock_yt = MagicMock()
+    mock_yt.ffmpeg_path = "/ffmpeg"
+    mock_yt.download.side_effect = fake_download
+    return mock_yt
+
+
+# test kopii strumienia: bez puli konwersji, od razu w watku pobierania
+def test_download_audio_copy_skips_pool(tmp_path):
+    from app.core.download import AUDIO_COPY, download_audio
+
+    calls = []
+    pool = MagicMock()
+    downloaded = []
+    mock_yt = _audio_yt(tmp_path / "Film.m4a", "mp4a.40.2")
+    with patch("app.core.download.transcode", lambda *a: calls.append(a[:4]) or a[2]):
+        mode = download_audio(
+            mock_yt,
+            "https://youtu.be/TEST",
+            str(tmp_path),
+            "m4a",
+            postprocess=pool,
+            downloaded_cb=lambda: downloaded.append(True),
+        )
+
+    assert mode == AUDIO_COPY
+    opts = mock_yt.download.call_args[0][1]
+    assert opts["format"].startswith("bestaudio[acodec^=mp4a]")
+    assert "postprocessors" not in opts
+    pool.submit.assert_not_called()
+    assert downloaded == []
+    assert calls == [
+        (
+            "/ffmpeg",
+            str(tmp_path / "Film.m4a"),
+            str(tmp_path / "Film.m4a"),
+            ["-vn", "-c:a", "copy", "-f", "mp4"],
+        )
+    ]
+
+
+# test: yt-dlp nie zglosil pliku - jawny tryb skipped zamiast kopii
+def test_download_audio_nothing_downloaded(tmp_path):
+    from app.core.download import AUDIO_SKIPPED, download_audio
+
+    mock_yt = MagicMock()
+    mock_yt.ffmpeg_path = "/ffmpeg"
+    with patch("app.core.download.transcode") as transcode:
+        mode = download_audio(mock_yt, "https://youtu.be/TEST", str(tmp_path), "m4a")
+
+    assert mode == AUDIO_SKIPPED
+    transcode.assert_not_called()
+
+
+# test: mp3 bez pobranego pliku zwraca skipped i nie trafia do puli konwersji
+def test_download_audio_mp3_nothing_downloaded(tmp_path):
+    from app.core.download import AUDIO_SKIPPED, download_audio_mp3
+
+    mock_yt = MagicMock()
+    mock_yt.ffmpeg_path = "/ffmpeg"
+    pool = MagicMock()
+    mode = download_audio_mp3(
+        mock_yt, "https://youtu.be/TEST", str(tmp_path), postprocess=pool
+    )
+
+    assert mode == AUDIO_SKIPPED
+    pool.submit.assert_not_called()
+
+
+# test planu audio z mozliwosciami ffmpeg: bez libopus wbudowany koder opus
+def test_plan_audio_missing_encoder():
+    from app.core.download import AUDIO_TRANSCODE, plan_audio
+    from app.core.ffmpeg_caps import FFmpegCaps
+    from app.utils.errors import DependencyMissingError
+
+    def caps(*names):
+        return FFmpegCaps("/ffmpeg", "7.0", frozenset(names), frozenset(), True)
+
+    assert plan_audio("opus", "mp4a.40.2", caps("opus", "aac")) == (
+        AUDIO_TRANSCODE,
+        [
+            "-vn",
+            "-c:a",
+            "opus",
+            "-strict",
+            "experimental",
+            "-b:a",
+            "160k",
+            "-f",
+            "opus",
+        ],
+    )
+    args = plan_audio("ogg", "mp4a.40.2", caps("libvorbis", "opus"))[1]
+    assert args[args.index("-c:a") + 1] == "libvorbis"
+    with pytest.raises(DependencyMissingError):
+        plan_audio("opus", "mp4a.40.2", caps("aac"))
+
+
+# test mp3 w puli z ffmpeg bez libmp3lame: koder zastepczy z tej binarki
+def test_download_audio_mp3_uses_available_encoder(tmp_path):
+    from app.core.download import download_audio_mp3
+    from app.core.ffmpeg_caps import FFmpegCaps
+
+    calls = []
+    caps = FFmpegCaps("/ffmpeg", "7.0", frozenset({"libshine"}), frozenset(), True)
+    pool = MagicMock()
+    pool.submit.side_effect = lambda fn, *a, **kw: calls.append(a[3]) or MagicMock()
+    with patch("app.core.download.try_ffmpeg_caps", return_value=caps), patch(
+        "app.core.download.wait_result"
+    ):
+        download_audio_mp3(
+            _audio_yt(tmp_path / "Film.webm", "opus"),
+            "https://youtu.be/TEST",
+            str(tmp_path),
+            postprocess=pool,
+        )
+
+    assert calls[0][calls[0].index("-c:a") + 1] == "libshine"
+
+
+# test kodowania gdy kodek zrodla nie pasuje: idzie przez pule konwersji
+def test_download_audio_transcode_uses_pool(tmp_path):
+    from app.core.download import AUDIO_TRANSCODE, download_audio
+    from app.core.postprocess import PostprocessPool
+
+    calls = []
+    downloaded = []
+    mock_yt = _audio_yt(tmp_path / "Film.webm", "opus")
+    pool = PostprocessPool(workers=1)
+    with patch("app.core.download.transcode", lambda *a: calls.append(a[:4]) or a[2]):
+        mode = download_audio(
+            mock_yt,
+            "https://youtu.be/TEST",
+            str(tmp_path),
+            "m4a",
+            postprocess=pool,
+            downloaded_cb=lambda: downloaded.append(True),
+        )
+    pool.shutdown()
+
+    assert mode == AUDIO_TRANSCODE
+    assert downloaded == [True]
+    ((_, src, dst, args),) = calls
+    assert dst == str(tmp_path / "Film.m4a")
+    assert "aac" in args
+
+
+# test prawdziwej kopii strumienia ffmpeg: opus z webm do .opus bez dekodowania
+def test_download_audio_copy_real_ffmpeg(tmp_path):
+    import subprocess
+
+    imageio_ffmpeg = pytest.importorskip("imageio_ffmpeg")
+    from app.core.download import AUDIO_COPY, download_audio
+
+    ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+    src = tmp_path / "Film.webm"
+
+    def fake_download(url, opts, profile=None, cancel=None):
+        subprocess.run(
+            [ffmpeg, "-loglevel", "error", "-f", "lavfi", "-i", "sine=d=1"]
+            + ["-c:a", "libopus", str(src)],
+            check=True,
+        )
+        for hook in opts["progress_hooks"]:
+            hook(
+                {
+                    "status": "finished",
+                    "filename": str(src),
+                    "info_dict": {"acodec": "opus"},
+                }
+            )
+
+    mock_yt = MagicMock()
+    mock_yt.ffmpeg_path = ffmpeg
+    mock_yt.download.side_effect = fake_download
+    mode = download_audio(mock_yt, "https://youtu.be/TEST", str(tmp_path), "opus")
+
+    assert mode == AUDIO_COPY
+    out = tmp_path / "Film.opus"
+    assert out.stat().st_size > 0
+    assert not src.exists()
@@ -0,0 +1,62 @@
+from app.core.download_archive import (
+    DEFAULT_EXTRACTOR,
+    DownloadArchive,
+    shared_archive,
+    warm_download_archive,
+)
+
+
+def _archive(tmp_path):
+    return DownloadArchive(tmp_path / "archive.sqlite3")
+
+
+# test ze klucz obejmuje typ pliku (mp3 nie oznacza pobranego mp4)
+def test_archive_key_includes_kind(tmp_path):
+    a = _archive(tmp_path)
+    a.add("youtube", "abc", "mp3")
+
+    assert a.contains("youtube", "abc", "mp3")
+    assert not a.contains("youtube", "abc", "mp4")
+    assert not a.contains("vimeo", "abc", "mp3")
+
+
+# test sprawdzania wielu kluczy naraz, przed i po wczytaniu do pamieci
+def test_archive_done_keys_sql_and_memory(tmp_path):
+    a = _archive(tmp_path)
+    for i in range(1200):  # wiecej niz jedna porcja parametrow zapytania
+        a.add("youtube", f"v{i}", "mp4")
+    keys = [("youtube", f"v{i}", "mp4") for i in range(1195, 1205)]
+    expected = set(keys[:5])
+
+    assert not a.is_loaded()
+    assert a.done_keys(keys) == expected
+    a.load()
+    assert a.is_loaded()
+    assert a.done_keys(keys) == expected
+    assert len(a) == 1200
+
+
+# test ze dopisane po wczytaniu klucze sa od razu widoczne w pamieci
+def test_archive_add_after_load(tmp_path):
+    a = _archive(tmp_path)
+    a.load()
+    a.add("youtube", "new", "mp4")
+    assert a.contains("youtube", "new", "mp4")
+
+
+# test trwalosci archiwum miedzy uruchomieniami
+def test_archive_persists(tmp_path):
+    a = _archive(tmp_path)
+    a.add("youtube", "abc", "mp4")
+    a.close()
+
+    assert _archive(tmp_path).contains("youtube", "abc", "mp4")
+
+
+# test wczytywania wspoldzielonego archiwum w tle
+def test_warm_download_archive(isolated_cache_dir):
+    shared_archive().add(DEFAULT_EXTRACTOR, "abc", "mp4")
+    warm_download_archive().join(timeout=5)
+
+    assert shared_archive().is_loaded()
+    assert shared_archive().path == isolated_cache_dir / "archive.sqlite3"
@@ -0,0 +1,168 @@
+import json
+import subprocess
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.ffmpeg_caps import (
+    FFmpegCaps,
+    FFmpegCapsCache,
+    encoder_args,
+    ffmpeg_caps,
+    pick_encoder,
+    try_ffmpeg_caps,
+)
+from app.utils.errors import DependencyMissingError
+
+VERSION_OUT = """ffmpeg version 7.0.2-static https://johnvansickle.com/ffmpeg/
+built with gcc 8 (Debian 8.3.0-6)
+configuration: --enable-gpl --enable-version3 --enable-libmp3lame
+libavutil      59.  8.100 / 59.  8.100
+"""
+
+ENCODERS_OUT = """Encoders:
+ V..... = Video
+ A..... = Audio
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC
+ A....D aac                  AAC (Advanced Audio Coding)
+ A....D libmp3lame           libmp3lame MP3 (MPEG audio layer 3)
+"""
+
+MUXERS_OUT = """ File formats:
+ D. = Demuxing supported
+ .E = Muxing supported
+ ---
+  E ipod            iPod H.264 MP4 (MPEG-4 Part 14)
+  E mp4             MP4 (MPEG-4 Part 14)
+  E matroska,webm   Matroska / WebM
+"""
+
+
+def _fake_run(cmd, **kwargs):
+    out = {"-version": VERSION_OUT, "-encoders": ENCODERS_OUT, "-muxers": MUXERS_OUT}
+    return MagicMock(stdout=out[cmd[-1]])
+
+
+@pytest.fixture
+def fake_run(mocker):
+    return mocker.patch("app.core.ffmpeg_caps.subprocess.run", side_effect=_fake_run)
+
+
+# test parsowania wersji, enkoderow i muxerow
+def test_probe_parses_output(fake_run, mock_ffmpeg_path):
+    caps = ffmpeg_caps(mock_ffmpeg_path)
+
+    assert caps.version == "7.0.2-static"
+    assert caps.has_encoder("libmp3lame")
+    assert caps.has_encoder("aac")
+    assert not caps.has_encoder("libopus")
+    assert caps.has_muxer("mp4") and caps.has_muxer("webm")
+    assert "E" not in caps.muxers
+    assert caps.threads is True
+
+
+# test wykrycia buildu bez watkow
+def test_probe_detects_disabled_threads(mocker, mock_ffmpeg_path):
+    def run(cmd, **kwargs):
+        if cmd[-1] == "-version":
+            return MagicMock(stdout="configuration: --disable-pthreads\n")
+        return _fake_run(cmd, **kwargs)
+
+    mocker.patch("app.core.ffmpeg_caps.subprocess.run", side_effect=run)
+
+    assert ffmpeg_caps(mock_ffmpeg_path).threads is False
+
+
+# test ze sondowanie odbywa sie raz na proces
+def test_caps_memoized_in_process(fake_run, mock_ffmpeg_path):
+    first = ffmpeg_caps(mock_ffmpeg_path)
+    second = ffmpeg_caps(mock_ffmpeg_path)
+
+    assert first is second
+    assert fake_run.call_count == 3
+
+
+# test ze wynik z dysku jest uzywany przez nowy proces (nowa instancja cache)
+def test_caps_persisted_on_disk(fake_run, mock_ffmpeg_path, tmp_path):
+    path = tmp_path / "caps.json"
+    FFmpegCapsCache(path).get(mock_ffmpeg_path)
+    fake_run.reset_mock()
+
+    caps = FFmpegCapsCache(path).get(mock_ffmpeg_path)
+
+    assert caps.has_encoder("libmp3lame")
+    fake_run.assert_not_called()
+    assert len(json.loads(path.read_text(encoding="utf-8"))) == 1
+
+
+# test ze zmiana binarki (mtime/rozmiar) wymusza ponowne sondowanie
+def test_caps_reprobe_after_binary_change(fake_run, mock_ffmpeg_path, tmp_path):
+    path = tmp_path / "caps.json"
+    FFmpegCapsCache(path).get(mock_ffmpeg_path)
+    with open(mock_ffmpeg_path, "wb") as fh:
+        fh.write(b"new build")
+    fake_run.reset_mock()
+
+    FFmpegCapsCache(path).get(mock_ffmpeg_path)
+
+    assert fake_run.call_count == 3
+
+
+# test odpornosci na uszkodzony plik cache
+def test_caps_corrupt_cache_file(fake_run, mock_ffmpeg_path, tmp_path):
+    path = tmp_path / "caps.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    caps = FFmpegCapsCache(path).get(mock_ffmpeg_path)
+
+    assert caps.version == "7.0.2-static"
+
+
+# test ze timeout sondowania jest propagowany
+def test_caps_probe_timeout(mocker, mock_ffmpeg_path):
+    mocker.patch(
+        "app.core.ffmpeg_caps.subprocess.run",
+        side_effect=subprocess.TimeoutExpired("ffmpeg", 15),
+    )
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        ffmpeg_caps(mock_ffmpeg_path)
+
+
+def _caps(*encoders):
+    return FFmpegCaps("/ffmpeg", "7.0", frozenset(encoders), frozenset(), True)
+
+
+# test wyboru kodera: pierwszy dostepny, bez caps pierwszy z listy
+def test_pick_encoder_fallback():
+    assert pick_encoder(("libopus", "opus"), _caps("libopus", "opus")) == "libopus"
+    assert pick_encoder(("libopus", "opus"), _caps("opus")) == "opus"
+    assert pick_encoder(("libopus", "opus"), None) == "libopus"
+    with pytest.raises(DependencyMissingError):
+        pick_encoder(("libmp3lame",), _caps("aac"))
+
+
+# test ze wbudowany (eksperymentalny) koder dostaje -strict
+def test_encoder_args_experimental():
+    assert encoder_args("a", ("libopus", "opus"), _caps("libopus")) == [
+        "-c:a",
+        "libopus",
+    ]
+    assert encoder_args("a", ("libopus", "opus"), _caps("opus")) == [
+        "-c:a",
+        "opus",
+        "-strict",
+        "experimental",
+    ]
+
+
+# test ze brak binarki lub nieczytelny wynik sondowania daje None
+def test_try_ffmpeg_caps(fake_run, mock_ffmpeg_path, tmp_path):
+    assert try_ffmpeg_caps(str(tmp_path / "brak")) is None
+    assert try_ffmpeg_caps(mock_ffmpeg_path).has_encoder("aac")
+
+    fake_run.side_effect = lambda cmd, **kw: MagicMock(stdout="")
+    other = tmp_path / "ffmpeg2"
+    other.write_bytes(b"x")
+    assert try_ffmpeg_caps(str(other)) is None
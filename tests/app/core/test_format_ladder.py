@@ -0,0 +1,126 @@
+from app.core.format_ladder import Ladder, Rung, build_ladder, muxed_label
+
+
+def _fmt(fid, ext="mp4", height=None, fps=None, vcodec="avc1", acodec="mp4a", **kw):
+    f = {"format_id": fid, "ext": ext, "vcodec": vcodec, "acodec": acodec}
+    if height is not None:
+        f["height"] = height
+    if fps is not None:
+        f["fps"] = fps
+    f.update(kw)
+    return f
+
+
+# test klasyfikacji przykladowych formatow z fixture
+def test_build_ladder_classifies_sample(sample_video_info):
+    ladder = build_ladder(sample_video_info["formats"])
+
+    assert [r.format_id for r in ladder.muxed] == ["22", "18"]
+    assert [r.format_id for r in ladder.video_only] == ["137"]
+    assert [r.format_id for r in ladder.audio_only] == ["140"]
+
+
+# test listy opcji - video-only z audio na poczatku, potem muxed
+def test_ladder_options_order(sample_video_info):
+    options = build_ladder(sample_video_info["formats"]).options()
+
+    assert options == [
+        ("137+bestaudio", "1080p + audio"),
+        ("22", "720p @ 30fps"),
+        ("18", "360p @ 30fps"),
+    ]
+
+
+# test ze bez audio nie ma kombinacji video-only
+def test_ladder_video_only_without_audio():
+    ladder = build_ladder([_fmt("137", height=1080, acodec="none")])
+
+    assert ladder.video_only
+    assert ladder.options() == []
+
+
+# test wyboru najwyzszego fps dla danej wysokosci
+def test_ladder_prefers_higher_fps():
+    ladder = build_ladder(
+        [
+            _fmt("a", height=1080, fps=30, acodec="none"),
+            _fmt("b", height=1080, fps=60, acodec="none"),
+            _fmt("c", height=1080, fps=30, acodec="none"),
+        ]
+    )
+
+    assert [r.format_id for r in ladder.video_only] == ["b"]
+
+
+# test preferencji kodeka i kontenera przy tym samym fps
+def test_ladder_codec_and_container_preferences():
+    formats = [
+        _fmt(
+            "vp9",
+            ext="webm",
+            height=1080,
+            fps=30,
+            vcodec="vp09.00.40.08",
+            acodec="none",
+        ),
+        _fmt(
+            "h264", ext="mp4", height=1080, fps=30, vcodec="avc1.640028", acodec="none"
+        ),
+        _fmt(
+            "av1", ext="mp4", height=1080, fps=30, vcodec="av01.0.08M.08", acodec="none"
+        ),
+    ]
+
+    assert build_ladder(formats).video_only[0].format_id == "h264"
+    # inna kolejnosc preferencji wybiera inny kodek
+    custom = build_ladder(formats, video_prefs=("av01", "vp09"))
+    assert custom.video_only[0].format_id == "av1"
+
+
+# test ze muxed tylko w akceptowanym kontenerze i z wysokoscia
+def test_ladder_muxed_container_filter():
+    formats = [
+        _fmt("43", ext="webm", height=360, vcodec="vp8", acodec="vorbis"),
+        _fmt("nh", ext="mp4"),
+        _fmt("18", ext="mp4", height=360),
+    ]
+
+    ladder = build_ladder(formats)
+    assert [r.format_id for r in ladder.muxed] == ["18"]
+    assert [r.format_id for r in build_ladder(formats, muxed_exts=("webm",)).muxed] == [
+        "43"
+    ]
+
+
+# test kolejnosci audio wedlug kodeka i bitrate
+def test_ladder_audio_ranking():
+    ladder = build_ladder(
+        [
+            _fmt("251", ext="webm", vcodec="none", acodec="opus", abr=160),
+            _fmt("139", ext="m4a", vcodec="none", acodec="mp4a.40.5", abr=48),
+            _fmt("140", ext="m4a", vcodec="none", acodec="mp4a.40.2", abr=128),
+        ]
+    )
+
+    assert [r.format_id for r in ladder.audio_only] == ["140", "139", "251"]
+
+
+# test pomijania formatow bez obrazu i dzwieku (np. storyboardy)
+def test_ladder_skips_storyboards():
+    ladder = build_ladder([_fmt("sb0", ext="mhtml", vcodec="none", acodec="none")])
+
+    assert ladder == Ladder((), (), ())
+
+
+# test wyszukiwania szczebla po format_id
+def test_ladder_find(sample_video_info):
+    ladder = build_ladder(sample_video_info["formats"])
+
+    assert ladder.find("137") == Rung(1080, 30, "137", "avc1", "none", "mp4")
+    assert ladder.find("nope") is None
+
+
+# test etykiety muxed bez fps
+def test_muxed_label():
+    assert muxed_label(720, 60) == "720p @ 60fps"
+    assert muxed_label(720, 0) == "720p"
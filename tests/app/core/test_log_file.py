@@ -0,0 +1,49 @@
+from app.core.log_file import LOG_FILE_ENV, LogFileSink, log_sink_from_env
+
+
+# test zapisu linii do pliku (zapis w watku listenera, close czeka na koniec)
+def test_log_file_sink_writes_lines(tmp_path):
+    path = tmp_path / "logs" / "app.log"
+    sink = LogFileSink(path)
+    sink.write(["[10:00:00] a", "[10:00:01] b"])
+    sink.close()
+
+    assert path.read_text(encoding="utf-8").splitlines() == [
+        "[10:00:00] a",
+        "[10:00:01] b",
+    ]
+    # po zamknieciu zapis jest ignorowany
+    sink.write(["c"])
+    sink.close()
+
+
+# test rotacji po przekroczeniu rozmiaru pliku
+def test_log_file_sink_rotates(tmp_path):
+    path = tmp_path / "app.log"
+    sink = LogFileSink(path, max_bytes=200, backups=2)
+    sink.write([f"linia {i:03d} " + "x" * 40 for i in range(30)])
+    sink.close()
+
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert files == ["app.log", "app.log.1", "app.log.2"]
+    assert path.stat().st_size <= 200
+
+
+# test wlaczania pliku logow zmienna srodowiskowa
+def test_log_sink_from_env(tmp_path, monkeypatch):
+    monkeypatch.delenv(LOG_FILE_ENV, raising=False)
+    assert log_sink_from_env() is None
+
+    monkeypatch.setenv(LOG_FILE_ENV, "0")
+    assert log_sink_from_env() is None
+
+    monkeypatch.setenv(LOG_FILE_ENV, str(tmp_path / "x.log"))
+    sink = log_sink_from_env()
+    assert sink.path == tmp_path / "x.log"
+    sink.close()
+
+    monkeypatch.setenv(LOG_FILE_ENV, "1")
+    monkeypatch.setenv("JUSTDOWNIT_CACHE_DIR", str(tmp_path / "cache"))
+    sink = log_sink_from_env()
+    assert sink.path == tmp_path / "cache" / "logs" / "justdownit.log"
+    sink.close()
@@ -0,0 +1,175 @@
+import json
+import sqlite3
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.meta_cache import (
+    MetadataCache,
+    cached_extract,
+    project_info,
+    shared_cache,
+)
+
+
+# sztuczny zegar do testow ttl
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    c = MetadataCache(tmp_path / "meta.sqlite3", ttl=60.0, clock=clock)
+    yield c
+    c.close()
+
+
+# test projekcji - zostaja tylko uzywane pola
+def test_project_info_keeps_used_fields(sample_video_info):
+    info = dict(sample_video_info)
+    info["thumbnails"] = [
+        {"url": "http://small.jpg", "width": 120, "height": 90},
+        {"url": "http://big.jpg", "width": 1280, "height": 720},
+        {"url": "http://nosize.jpg"},
+    ]
+    info["formats"][0]["url"] = "https://googlevideo.example/very/long"
+    info["formats"][0]["http_headers"] = {"User-Agent": "x"}
+
+    meta = project_info(info)
+
+    assert meta["id"] == "dQw4w9WgXcQ"
+    assert meta["duration"] == 212
+    assert meta["thumbnail"] == "http://big.jpg"
+    assert len(meta["formats"]) == 4
+    assert "url" not in meta["formats"][0]
+    assert "http_headers" not in meta["formats"][0]
+    assert meta["formats"][0]["format_id"] == "18"
+    # audio bez wysokosci nie dostaje pustych kluczy
+    assert "height" not in meta["formats"][3]
+
+
+# test projekcji pustego info
+def test_project_info_empty():
+    meta = project_info({})
+
+    assert meta["thumbnail"] == ""
+    assert meta["duration"] == 0
+    assert meta["formats"] == []
+
+
+# test zapisu i odczytu
+def test_cache_put_get_roundtrip(cache):
+    cache.put("abc", {"duration": 10, "formats": [{"format_id": "18"}]})
+
+    assert cache.get("abc") == {"duration": 10, "formats": [{"format_id": "18"}]}
+    assert cache.get("missing") is None
+    assert len(cache) == 1
+
+
+# test wygasania wpisow po ttl
+def test_cache_ttl_expiry(cache, clock):
+    cache.put("abc", {"duration": 10})
+    clock.now += 59
+    assert cache.get("abc") is not None
+
+    clock.now += 2
+    assert cache.get("abc") is None
+    # wygasly wpis jest usuwany z bazy
+    assert len(cache) == 0
+
+
+# test odczytu wielu wpisow jednym zapytaniem
+def test_cache_get_many(cache):
+    for i in range(1200):
+        cache.put(f"v{i}", {"n": i})
+
+    got = cache.get_many([f"v{i}" for i in range(0, 1200, 2)] + ["nope", ""])
+
+    assert len(got) == 600
+    assert got["v10"] == {"n": 10}
+    assert "nope" not in got
+
+
+# test eviction wedlug rozmiaru - najdawniej uzywane wypadaja pierwsze
+def test_cache_size_eviction(tmp_path, clock):
+    payload = {"blob": "x" * 100}
+    size = len(json.dumps(payload, separators=(",", ":")))
+    c = MetadataCache(tmp_path / "m.sqlite3", max_bytes=size * 3, clock=clock)
+
+    for vid in ("a", "b", "c"):
+        c.put(vid, payload)
+        clock.now += 1
+    # odczyt "a" odswieza czas uzycia, wiec wypasc powinno "b"
+    c.get("a")
+    clock.now += 1
+    c.put("d", payload)
+
+    assert c.total_bytes() <= size * 3
+    assert c.get("b") is None
+    assert c.get("a") is not None
+    assert c.get("d") is not None
+    c.close()
+
+
+# test trwalosci - dane przetrwaja ponowne otwarcie bazy w trybie WAL
+def test_cache_persists_and_uses_wal(tmp_path):
+    path = tmp_path / "meta.sqlite3"
+    c = MetadataCache(path)
+    c.put("abc", {"duration": 5})
+    c.close()
+
+    conn = sqlite3.connect(str(path))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+    c2 = MetadataCache(path)
+    assert c2.get("abc") == {"duration": 5}
+    c2.close()
+
+
+# test uniewaznienia wpisu
+def test_cache_invalidate(cache):
+    cache.put("abc", {"duration": 5})
+    cache.invalidate("abc")
+
+    assert cache.get("abc") is None
+
+
+# test ze cached_extract nie odpytuje yt-dlp przy trafieniu
+def test_cached_extract_hit_skips_extract(cache, sample_video_info):
+    yt = MagicMock()
+    yt.extract.return_value = sample_video_info
+
+    first = cached_extract(yt, "https://youtube.com/watch?v=dQw4w9WgXcQ", "dQw", cache)
+    second = cached_extract(yt, "https://youtube.com/watch?v=dQw4w9WgXcQ", "dQw", cache)
+
+    assert yt.extract.call_count == 1
+    assert first == second
+    assert second["duration"] == 212
+
+
+# test ze bez id w url klucz pochodzi z info
+def test_cached_extract_uses_info_id(cache, sample_video_info):
+    yt = MagicMock()
+    yt.extract.return_value = sample_video_info
+
+    cached_extract(yt, "https://example.com/v", None, cache)
+
+    assert cache.get("dQw4w9WgXcQ") is not None
+
+
+# test ze wspolny cache trafia do katalogu z JUSTDOWNIT_CACHE_DIR
+def test_shared_cache_location(isolated_cache_dir):
+    c = shared_cache()
+
+    assert c is shared_cache()
+    assert c.path.parent == isolated_cache_dir
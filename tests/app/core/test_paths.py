@@ -4,7 +4,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from app.core.paths import ensure_output_dir, get_ffmpeg_path, outtmpl_for
+from app.core.paths import cache_dir, ensure_output_dir, get_ffmpeg_path, outtmpl_for
 from app.utils.errors import DependencyMissingError
 
 
@@ -31,6 +31,18 @@ def test_get_ffmpeg_path_from_imageio(monkeypatch):
         mock_imageio.get_ffmpeg_exe.assert_called_once()
 
 
+# test ze sciezka z imageio_ffmpeg jest wyznaczana raz na proces
+def test_get_ffmpeg_path_memoized(monkeypatch):
+    monkeypatch.delenv("FFMPEG_PATH", raising=False)
+
+    with patch.dict("sys.modules", {"imageio_ffmpeg": MagicMock()}) as mock_modules:
+        mock_imageio = mock_modules["imageio_ffmpeg"]
+        mock_imageio.get_ffmpeg_exe.return_value = "/path/to/ffmpeg"
+        assert get_ffmpeg_path() == "/path/to/ffmpeg"
+        assert get_ffmpeg_path() == "/path/to/ffmpeg"
+        mock_imageio.get_ffmpeg_exe.assert_called_once()
+
+
 # test bledu gdy brak imageio_ffmpeg
 def test_get_ffmpeg_path_missing_dependency(monkeypatch):
     monkeypatch.delenv("FFMPEG_PATH", raising=False)
@@ -132,3 +144,23 @@ def test_outtmpl_for_path_object(tmp_path):
     result = outtmpl_for(tmp_path)
     assert isinstance(result, str)
     assert str(tmp_path) in result
+
+
+# test katalogu cache ze zmiennej srodowiskowej
+def test_cache_dir_from_env(tmp_path, monkeypatch):
+    target = tmp_path / "my_cache"
+    monkeypatch.setenv("JUSTDOWNIT_CACHE_DIR", str(target))
+
+    result = cache_dir()
+
+    assert result == target.resolve()
+    assert result.is_dir()
+
+
+# test domyslnego katalogu cache (XDG na linux/mac)
+def test_cache_dir_default_xdg(tmp_path, monkeypatch):
+    monkeypatch.delenv("JUSTDOWNIT_CACHE_DIR", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr("app.core.paths.os.name", "posix")
+
+    assert cache_dir() == (tmp_path / "justdownit").resolve()
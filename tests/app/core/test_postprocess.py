@@ -0,0 +1,124 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from app.core.postprocess import PostprocessPool, mp3_args, transcode, wait_result
+from app.utils.errors import CancelledError
+
+
+@pytest.fixture
+def ffmpeg():
+    imageio_ffmpeg = pytest.importorskip("imageio_ffmpeg")
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+# krotki plik audio wygenerowany przez ffmpeg (sinus 1 s)
+@pytest.fixture
+def wav(ffmpeg, tmp_path):
+    path = tmp_path / "in.wav"
+    subprocess.run(
+        [ffmpeg, "-loglevel", "error", "-f", "lavfi", "-i", "sine=d=1", str(path)],
+        check=True,
+    )
+    return str(path)
+
+
+# test konwersji do mp3: wynik pod docelowa nazwa, zrodlo usuniete
+def test_transcode_mp3(ffmpeg, wav, tmp_path):
+    dst = str(tmp_path / "out.mp3")
+    assert transcode(ffmpeg, wav, dst, mp3_args()) == dst
+    assert os.path.getsize(dst) > 0
+    assert not os.path.exists(wav)
+    assert not os.path.exists(dst + ".part")
+
+
+# test bledu ffmpeg: wyjatek z trescia stderr, zrodlo zostaje, brak resztek
+def test_transcode_error(ffmpeg, tmp_path):
+    src = tmp_path / "zly.webm"
+    src.write_bytes(b"to nie jest audio")
+    dst = str(tmp_path / "out.mp3")
+    with pytest.raises(RuntimeError, match="FFmpeg"):
+        transcode(ffmpeg, str(src), dst, mp3_args())
+    assert src.exists()
+    assert not os.path.exists(dst)
+    assert not os.path.exists(dst + ".part")
+
+
+# test ze anulowanie zabija trwajacy proces konwersji
+@pytest.mark.skipif(sys.platform == "win32", reason="skrypt powloki")
+def test_transcode_cancel(tmp_path):
+    fake = tmp_path / "ffmpeg"
+    fake.write_text("#!/bin/sh\nsleep 10\n")
+    fake.chmod(0o755)
+    start = time.monotonic()
+    with pytest.raises(CancelledError):
+        transcode(
+            str(fake),
+            "in",
+            str(tmp_path / "out.mp3"),
+            [],
+            cancel_cb=lambda: time.monotonic() - start > 0.2,
+        )
+    assert time.monotonic() - start < 2.0
+
+
+# test limitu etapu: przy pelnej puli submit czeka, miejsce zwalnia koniec zadania
+def test_pool_backpressure():
+    pool = PostprocessPool(workers=1, max_pending=2)
+    gate = threading.Event()
+    futures = [pool.submit(gate.wait) for _ in range(2)]
+    assert pool.pending() == 2
+
+    stop = threading.Event()
+    with pytest.raises(CancelledError):
+        threading.Timer(0.2, stop.set).start()
+        pool.submit(gate.wait, cancel_cb=stop.is_set)
+
+    gate.set()
+    for f in futures:
+        f.result(timeout=2)
+    third = pool.submit(lambda: "ok")
+    assert wait_result(third) == "ok"
+    pool.shutdown()
+    assert pool.pending() == 0
+
+
+# test ze anulowanie zdejmuje z kolejki zadanie, ktore jeszcze nie ruszylo
+def test_wait_result_cancels_queued():
+    pool = PostprocessPool(workers=1, max_pending=2)
+    gate = threading.Event()
+    pool.submit(gate.wait)
+    queued = pool.submit(lambda: "nie")
+    with pytest.raises(CancelledError):
+        wait_result(queued, cancel_cb=lambda: True)
+    assert queued.cancelled()
+    gate.set()
+    pool.shutdown()
+
+
+# test zamykania bez czekania: trwajacy ffmpeg zabity, czekajace zadanie
+# zdjete z kolejki (wait_result zglasza anulowanie)
+@pytest.mark.skipif(sys.platform == "win32", reason="skrypt powloki")
+def test_pool_shutdown_kills_ffmpeg(tmp_path):
+    fake = tmp_path / "ffmpeg"
+    fake.write_text("#!/bin/sh\nexec sleep 30\n")
+    fake.chmod(0o755)
+    pool = PostprocessPool(workers=1, max_pending=2)
+    running = pool.submit(transcode, str(fake), "in", str(tmp_path / "a.mp3"), [])
+    queued = pool.submit(lambda: "nie")
+    deadline = time.monotonic() + 5
+    while not pool._processes and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    start = time.monotonic()
+    pool.shutdown(wait=False)
+    with pytest.raises(CancelledError):
+        wait_result(queued)
+    with pytest.raises(RuntimeError):
+        running.result(timeout=5)
+    assert time.monotonic() - start < 2.0
+    assert not (tmp_path / "a.mp3.part").exists()
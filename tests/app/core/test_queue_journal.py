@@ -0,0 +1,60 @@
+from app.core.queue_journal import QueueJournal, shared_journal
+
+
+def _items(n):
+    return [(f"https://youtu.be/v{i}", "22", "mp4") for i in range(n)]
+
+
+# test zapisu pozycji i odczytu tych do wznowienia
+def test_journal_add_and_unfinished(tmp_path):
+    j = QueueJournal(tmp_path / "q.sqlite3")
+    ids = j.add("/out", _items(3))
+
+    assert len(ids) == 3
+    jobs = j.unfinished()
+    assert [job.id for job in jobs] == ids
+    assert jobs[0].url == "https://youtu.be/v0"
+    assert jobs[0].format_id == "22" and jobs[0].kind == "mp4"
+    assert jobs[0].folder == "/out" and jobs[0].state == "queued"
+
+
+# test ze ukonczone pozycje nie wracaja, a przerwane w trakcie tak
+def test_journal_skips_finished(tmp_path):
+    j = QueueJournal(tmp_path / "q.sqlite3")
+    a, b, c, d = j.add("/out", _items(4))
+    j.set_state(a, "done")
+    j.set_state(b, "running")
+    j.set_state(c, "failed", "HTTP 403")
+
+    assert [job.id for job in j.unfinished()] == [b, d]
+
+
+# test ze dziennik przezywa ponowne otwarcie (restart aplikacji)
+def test_journal_persists_across_reopen(tmp_path):
+    path = tmp_path / "q.sqlite3"
+    j = QueueJournal(path)
+    (job_id,) = j.add("/out", _items(1))
+    j.set_state(job_id, "running")
+    j.set_part(job_id, "/out/film.f137.mp4.part")
+    j.close()
+
+    job = QueueJournal(path).get(job_id)
+    assert job.state == "running"
+    assert job.part_path == "/out/film.f137.mp4.part"
+
+
+# test usuwania wpisow
+def test_journal_remove(tmp_path):
+    j = QueueJournal(tmp_path / "q.sqlite3")
+    ids = j.add("/out", _items(2))
+    j.remove(ids[:1])
+
+    assert [job.id for job in j.unfinished()] == ids[1:]
+    assert j.get(ids[0]) is None
+
+
+# test wspoldzielonego dziennika w katalogu cache
+def test_shared_journal(isolated_cache_dir):
+    j = shared_journal()
+    assert j is shared_journal()
+    assert j.path == isolated_cache_dir / "queue.sqlite3"
@@ -0,0 +1,75 @@
+import os
+
+from app.core.thumb_cache import ThumbDiskCache, shared_thumb_cache
+
+
+# test zapisu i odczytu bajtow miniatury
+def test_thumb_cache_roundtrip(tmp_path):
+    cache = ThumbDiskCache(tmp_path / "thumbs")
+    cache.put("dQw4w9WgXcQ", b"jpeg-bytes")
+
+    assert cache.get("dQw4w9WgXcQ") == b"jpeg-bytes"
+    assert cache.get("missing") is None
+    assert cache.total_bytes() == 10
+
+
+# test ze nowa instancja widzi wpisy z dysku
+def test_thumb_cache_persists(tmp_path):
+    ThumbDiskCache(tmp_path).put("abc", b"1234")
+
+    cache = ThumbDiskCache(tmp_path)
+    assert cache.get("abc") == b"1234"
+    assert len(cache) == 1
+
+
+# test usuwania najdawniej uzytych po przekroczeniu budzetu
+def test_thumb_cache_evicts_lru(tmp_path):
+    cache = ThumbDiskCache(tmp_path, max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    cache.get("a")  # "b" staje sie najdawniej uzyty
+    cache.put("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.total_bytes() == 8
+    assert not (tmp_path / "b.img").exists()
+
+
+# test nadpisania wpisu - rozmiar liczony raz
+def test_thumb_cache_overwrite(tmp_path):
+    cache = ThumbDiskCache(tmp_path)
+    cache.put("a", b"xx")
+    cache.put("a", b"yyyy")
+
+    assert cache.get("a") == b"yyyy"
+    assert cache.total_bytes() == 4
+
+
+# test odrzucania niebezpiecznych id i za duzych plikow
+def test_thumb_cache_rejects_bad_input(tmp_path):
+    cache = ThumbDiskCache(tmp_path / "t", max_bytes=4)
+    cache.put("../evil", b"x")
+    cache.put("big", b"12345")
+
+    assert cache.get("../evil") is None
+    assert len(cache) == 0
+    assert not (tmp_path / "evil.img").exists()
+
+
+# test ze plik usuniety z zewnatrz nie psuje cache
+def test_thumb_cache_missing_file(tmp_path):
+    cache = ThumbDiskCache(tmp_path)
+    cache.put("a", b"data")
+    os.remove(tmp_path / "a.img")
+
+    assert cache.get("a") is None
+    assert cache.total_bytes() == 0
+
+
+# test wspolnego cache w katalogu aplikacji
+def test_shared_thumb_cache(isolated_cache_dir):
+    cache = shared_thumb_cache()
+
+    assert cache is shared_thumb_cache()
+    assert cache.path == isolated_cache_dir / "thumbs"
@@ -9,7 +9,7 @@ from app.core.thumbnails import get_thumbnail_url
 def test_get_thumbnail_url_maxres():
     url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
 
-    with patch("app.core.thumbnails.requests.head") as mock_head:
+    with patch("requests.head") as mock_head:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_head.return_value = mock_response
@@ -24,7 +24,7 @@ def test_get_thumbnail_url_maxres():
 def test_get_thumbnail_url_fallback():
     url = "https://www.youtube.com/watch?v=ABC123"
 
-    with patch("app.core.thumbnails.requests.head") as mock_head:
+    with patch("requests.head") as mock_head:
         mock_response = MagicMock()
         mock_response.status_code = 404  # maxres nie istnieje
         mock_head.return_value = mock_response
@@ -38,7 +38,7 @@ def test_get_thumbnail_url_fallback():
 def test_get_thumbnail_url_exception_fallback():
     url = "https://www.youtube.com/watch?v=XYZ789"
 
-    with patch("app.core.thumbnails.requests.head") as mock_head:
+    with patch("requests.head") as mock_head:
         mock_head.side_effect = Exception("Network error")
 
         result = get_thumbnail_url(url)
@@ -68,7 +68,7 @@ def test_get_thumbnail_url_with_log():
     def log_callback(msg):
         log_messages.append(msg)
 
-    with patch("app.core.thumbnails.requests.head") as mock_head:
+    with patch("requests.head") as mock_head:
         mock_head.side_effect = Exception("Timeout")
         get_thumbnail_url(url, log=log_callback)
 
@@ -81,7 +81,7 @@ def test_get_thumbnail_url_with_log():
 def test_get_thumbnail_url_custom_timeout():
     url = "https://www.youtube.com/watch?v=ABC"
 
-    with patch("app.core.thumbnails.requests.head") as mock_head:
+    with patch("requests.head") as mock_head:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_head.return_value = mock_response
@@ -104,7 +104,7 @@ def test_get_thumbnail_url_custom_timeout():
     ],
 )
 def test_get_thumbnail_url_various_formats(url, expected_id):
-    with patch("app.core.thumbnails.requests.head") as mock_head:
+    with patch("requests.head") as mock_head:
         mock_response = MagicMock()
         mock_response.status_code = 404  # uzyj fallback
         mock_head.return_value = mock_response
@@ -117,8 +117,72 @@ def test_get_thumbnail_url_various_formats(url, expected_id):
 def test_get_thumbnail_url_no_log():
     url = "https://www.youtube.com/watch?v=TEST"
 
-    with patch("app.core.thumbnails.requests.head") as mock_head:
+    with patch("requests.head") as mock_head:
         mock_head.side_effect = Exception("Error")
         # nie powinno crashnac gdy log=None
         result = get_thumbnail_url(url, log=None)
         assert result is not None
+
+
+# test ze wynik sprawdzania maxres jest zapamietany (takze negatywny)
+@pytest.mark.parametrize("status,suffix", [(200, "maxresdefault"), (404, "hqdefault")])
+def test_get_thumbnail_url_probe_cached(status, suffix):
+    url = "https://www.youtube.com/watch?v=CACHED1"
+
+    with patch("requests.head") as mock_head:
+        mock_head.return_value = MagicMock(status_code=status)
+
+        first = get_thumbnail_url(url)
+        second = get_thumbnail_url(url)
+
+        assert first == second
+        assert f"/{suffix}.jpg" in second
+        mock_head.assert_called_once()
+
+
+# test ze blad sieci nie jest zapamietywany
+def test_get_thumbnail_url_error_not_cached():
+    url = "https://www.youtube.com/watch?v=RETRY1"
+
+    with patch("requests.head") as mock_head:
+        mock_head.side_effect = [Exception("Timeout"), MagicMock(status_code=200)]
+
+        assert "hqdefault" in get_thumbnail_url(url)
+        assert "maxresdefault" in get_thumbnail_url(url)
+        assert mock_head.call_count == 2
+
+
+# test ze url z info dict nie wymaga zapytania HEAD
+def test_get_thumbnail_url_from_info():
+    info = {
+        "thumbnails": [
+            {"url": "https://i.ytimg.com/vi/A/default.jpg", "width": 120, "height": 90},
+            {
+                "url": "https://i.ytimg.com/vi/A/sddefault.jpg",
+                "width": 640,
+                "height": 480,
+            },
+        ]
+    }
+
+    with patch("requests.head") as mock_head:
+        result = get_thumbnail_url("https://youtu.be/A", info=info)
+
+        assert result == "https://i.ytimg.com/vi/A/sddefault.jpg"
+        mock_head.assert_not_called()
+
+
+# test ze film z cache metadanych nie wymaga zapytania HEAD
+def test_get_thumbnail_url_from_meta_cache(sample_video_info):
+    from app.core.meta_cache import project_info, shared_cache
+
+    sample_video_info["thumbnails"] = [
+        {"url": "https://i.ytimg.com/vi/dQw4w9WgXcQ/hq720.jpg", "width": 1280}
+    ]
+    shared_cache().put("dQw4w9WgXcQ", project_info(sample_video_info))
+
+    with patch("requests.head") as mock_head:
+        result = get_thumbnail_url("https://youtu.be/dQw4w9WgXcQ")
+
+        assert result == "https://i.ytimg.com/vi/dQw4w9WgXcQ/hq720.jpg"
+        mock_head.assert_not_called()
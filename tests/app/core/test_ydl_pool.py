@@ -0,0 +1,222 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.ydl_pool import YDLPool, fingerprint, shared_pool
+
+
+# fabryka zwracajaca nowe mocki YoutubeDL i zapamietujaca utworzone instancje
+def _factory():
+    created = []
+
+    def make(opts):
+        ydl = MagicMock(name=f"ydl{len(created)}")
+        ydl.__enter__.return_value = ydl
+        ydl.params = dict(opts)
+        created.append(ydl)
+        return ydl
+
+    return make, created
+
+
+# sztuczny zegar do testow eviction
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# test ze odcisk ignoruje hooki i kolejnosc kluczy
+def test_fingerprint_ignores_hooks_and_order():
+    a = fingerprint({"quiet": True, "format": "22", "progress_hooks": [lambda d: 1]})
+    b = fingerprint({"format": "22", "quiet": True, "progress_hooks": [lambda d: 2]})
+    c = fingerprint({"format": "18", "quiet": True})
+
+    assert a == b
+    assert a != c
+
+
+# test ponownego uzycia cieplej instancji dla tych samych opcji
+def test_pool_reuses_instance_for_same_options():
+    make, created = _factory()
+    pool = YDLPool()
+
+    with pool.lease(make, {"quiet": True}) as first:
+        pass
+    with pool.lease(make, {"quiet": True}) as second:
+        pass
+
+    assert first is second
+    assert len(created) == 1
+    first.__enter__.assert_called_once()
+    first.__exit__.assert_not_called()
+
+
+# test ze rozne opcje daja rozne instancje
+def test_pool_separates_by_fingerprint():
+    make, created = _factory()
+    pool = YDLPool()
+
+    with pool.lease(make, {"format": "22"}):
+        pass
+    with pool.lease(make, {"format": "18"}):
+        pass
+
+    assert len(created) == 2
+    assert len(pool) == 2
+
+
+# test podmiany hookow bez przebudowy instancji: instancja dostaje hooki raz
+# przez publiczne api, a kolejne wywolania tylko podmieniaja ich cel
+def test_pool_swaps_hooks_per_call():
+    make, created = _factory()
+    pool = YDLPool()
+    hook_a, hook_b = MagicMock(), MagicMock()
+
+    with pool.lease(make, {"quiet": True, "progress_hooks": [hook_a]}) as ydl:
+        relay = ydl.add_progress_hook.call_args[0][0]
+        relay({"status": "downloading"})
+    hook_a.assert_called_once_with({"status": "downloading"})
+    assert "progress_hooks" not in created[0].params
+
+    # po zwroceniu do puli hooki sa odpiete
+    relay({"status": "downloading"})
+    hook_a.assert_called_once()
+
+    with pool.lease(make, {"quiet": True, "progress_hooks": [hook_b]}) as ydl2:
+        assert ydl2 is ydl
+        relay({"status": "finished"})
+    hook_b.assert_called_once_with({"status": "finished"})
+
+    assert len(created) == 1
+    ydl.add_progress_hook.assert_called_once()
+
+
+# test podmiany hookow postprocesorow (tez tych dodanych po utworzeniu)
+def test_pool_swaps_postprocessor_hooks():
+    make, created = _factory()
+    pool = YDLPool()
+    pp_hook = MagicMock()
+
+    with pool.lease(make, {"quiet": True}):
+        pass
+    with pool.lease(make, {"quiet": True, "postprocessor_hooks": [pp_hook]}) as ydl:
+        relay = ydl.add_postprocessor_hook.call_args[0][0]
+        relay({"status": "started"})
+
+    pp_hook.assert_called_once_with({"status": "started"})
+    ydl.add_postprocessor_hook.assert_called_once()
+
+
+# test ze opcje spoza json sa odrzucane zamiast psuc odcisk przez repr()
+def test_fingerprint_rejects_objects():
+    with pytest.raises(TypeError, match="logger"):
+        fingerprint({"quiet": True, "logger": object()})
+    # hooki per wywolanie moga byc dowolnymi funkcjami
+    assert fingerprint({"progress_hooks": [object()]}) == fingerprint({})
+
+
+# test ze instancja po wyjatku nie wraca do puli
+def test_pool_discards_instance_on_error():
+    make, created = _factory()
+    pool = YDLPool()
+
+    with pytest.raises(RuntimeError):
+        with pool.lease(make, {"quiet": True}):
+            raise RuntimeError("boom")
+
+    assert len(pool) == 0
+    created[0].__exit__.assert_called_once()
+
+    with pool.lease(make, {"quiet": True}):
+        pass
+    assert len(created) == 2
+
+
+# test limitu rozmiaru - najstarsza bezczynna instancja jest zamykana
+def test_pool_max_size_evicts_oldest():
+    make, created = _factory()
+    pool = YDLPool(max_size=2)
+
+    for fmt in ("a", "b", "c"):
+        with pool.lease(make, {"format": fmt}):
+            pass
+
+    assert len(pool) == 2
+    created[0].__exit__.assert_called_once()
+    created[2].__exit__.assert_not_called()
+
+
+# test zamykania instancji bezczynnych dluzej niz idle_timeout
+def test_pool_idle_eviction():
+    make, created = _factory()
+    clock = _Clock()
+    pool = YDLPool(idle_timeout=10.0, clock=clock)
+
+    with pool.lease(make, {"quiet": True}):
+        pass
+    clock.now = 11.0
+    with pool.lease(make, {"quiet": True}):
+        pass
+
+    assert len(created) == 2
+    created[0].__exit__.assert_called_once()
+
+
+# test ze rozne fabryki nie dziela instancji
+def test_pool_separates_by_factory():
+    make_a, created_a = _factory()
+    make_b, created_b = _factory()
+    pool = YDLPool()
+
+    with pool.lease(make_a, {"quiet": True}):
+        pass
+    with pool.lease(make_b, {"quiet": True}):
+        pass
+
+    assert len(created_a) == 1
+    assert len(created_b) == 1
+
+
+# test wydawania instancji na wylacznosc przy wspolbieznym uzyciu
+def test_pool_exclusive_lease_across_threads():
+    make, created = _factory()
+    pool = YDLPool()
+    barrier = threading.Barrier(4)
+    seen = []
+
+    def work():
+        with pool.lease(make, {"quiet": True}) as ydl:
+            seen.append(ydl)
+            barrier.wait(timeout=5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # cztery rownoczesne wypozyczenia musza dostac cztery rozne instancje
+    assert len({id(y) for y in seen}) == 4
+    assert len(created) == 4
+
+
+# test czyszczenia puli
+def test_pool_clear_closes_idle():
+    make, created = _factory()
+    pool = YDLPool()
+
+    with pool.lease(make, {"quiet": True}):
+        pass
+    pool.clear()
+
+    assert len(pool) == 0
+    created[0].__exit__.assert_called_once()
+
+
+# test ze pula wspolna jest singletonem
+def test_shared_pool_singleton():
+    assert shared_pool() is shared_pool()
@@ -60,7 +60,8 @@ def test_ytclient_base_opts_default():
         assert opts["no-mtime"] is True
         assert opts["quiet"] is True
         assert opts["no_warnings"] is True
-        assert opts["ratelimit"] == 25_000_000
+        # limit predkosci daje wspolny ogranicznik (app.core.bandwidth)
+        assert "ratelimit" not in opts
         assert opts["retries"] == 3
         assert opts["no_check_certificate"] is True
 
@@ -118,6 +119,62 @@ def test_ytclient_download_calls_ytdlp():
         mock_ydl.download.assert_called_once_with(["https://youtube.com/watch?v=TEST"])
 
 
+# test pobierania dwufazowego: prepare dostaje info po wyborze formatow,
+# a jego opcje trafiaja do instancji, ktora pobiera z tego samego info
+def test_ytclient_download_prepare_uses_selected_info():
+    with patch.dict("sys.modules", {"yt_dlp": MagicMock()}) as mock_modules:
+        mock_ytdlp = mock_modules["yt_dlp"]
+        from app.core.ydl_pool import YDLPool
+        from app.core.ytclient import YTClient
+
+        info = {"id": "TEST", "requested_formats": []}
+        mock_ydl = MagicMock()
+        mock_ydl.extract_info.return_value = info
+        mock_ytdlp.YoutubeDL.return_value.__enter__.return_value = mock_ydl
+        seen = []
+
+        def prepare(selected):
+            seen.append(selected)
+            return {"merge_output_format": "mkv"}
+
+        client = YTClient(ffmpeg_path="/ffmpeg", pool=YDLPool())
+        client.download("https://youtube.com/watch?v=TEST", {}, prepare=prepare)
+
+        assert seen == [info]
+        mock_ydl.extract_info.assert_called_once_with(
+            "https://youtube.com/watch?v=TEST", download=False
+        )
+        mock_ydl.process_ie_result.assert_called_once_with(info, download=True)
+        mock_ydl.download.assert_not_called()
+        first, second = [c[0][0] for c in mock_ytdlp.YoutubeDL.call_args_list]
+        assert "merge_output_format" not in first
+        assert second["merge_output_format"] == "mkv"
+
+
+# test: prepare bez zmiany opcji - pobieranie na instancji z ekstrakcji
+def test_ytclient_download_prepare_reuses_instance():
+    with patch.dict("sys.modules", {"yt_dlp": MagicMock()}) as mock_modules:
+        mock_ytdlp = mock_modules["yt_dlp"]
+        from app.core.ydl_pool import YDLPool
+        from app.core.ytclient import YTClient
+
+        mock_ydl = MagicMock()
+        mock_ydl.extract_info.return_value = {"id": "TEST"}
+        mock_ytdlp.YoutubeDL.return_value.__enter__.return_value = mock_ydl
+
+        client = YTClient(ffmpeg_path="/ffmpeg", pool=YDLPool())
+        client.download(
+            "https://youtube.com/watch?v=TEST",
+            {"merge_output_format": "mkv"},
+            prepare=lambda info: {"merge_output_format": "mkv"},
+        )
+
+        assert mock_ytdlp.YoutubeDL.call_count == 1
+        mock_ydl.process_ie_result.assert_called_once_with(
+            {"id": "TEST"}, download=True
+        )
+
+
 # test wywolania extract
 def test_ytclient_extract_returns_info():
     with patch.dict("sys.modules", {"yt_dlp": MagicMock()}) as mock_modules:
@@ -184,3 +241,83 @@ def test_ytclient_errors_property():
 
         errors = client.errors
         assert errors == mock_ytdlp.utils
+
+
+# test ze kolejne wywolania uzywaja tej samej cieplej instancji z puli
+def test_ytclient_reuses_pooled_instance():
+    with patch.dict("sys.modules", {"yt_dlp": MagicMock()}) as mock_modules:
+        mock_ytdlp = mock_modules["yt_dlp"]
+        from app.core.ydl_pool import YDLPool
+        from app.core.ytclient import YTClient
+
+        mock_ydl = MagicMock()
+        mock_ydl.extract_info.return_value = {}
+        mock_ytdlp.YoutubeDL.return_value.__enter__.return_value = mock_ydl
+
+        client = YTClient(ffmpeg_path="/ffmpeg", pool=YDLPool())
+        client.extract("https://youtube.com/watch?v=A")
+        client.extract("https://youtube.com/watch?v=B")
+
+        assert mock_ytdlp.YoutubeDL.call_count == 1
+        assert mock_ydl.extract_info.call_count == 2
+
+
+# test ze bez sciezki ffmpeg opcja ffmpeg_location nie jest ustawiana
+def test_ytclient_base_opts_without_ffmpeg():
+    with patch.dict("sys.modules", {"yt_dlp": MagicMock()}):
+        from app.core.ytclient import YTClient
+
+        client = YTClient()
+        assert "ffmpeg_location" not in client._base_opts()
+
+
+# test ze profil klienta trafia do opcji pobierania, a nie do ekstrakcji
+def test_ytclient_download_uses_profile():
+    with patch.dict("sys.modules", {"yt_dlp": MagicMock()}) as mock_modules:
+        mock_ytdlp = mock_modules["yt_dlp"]
+        from app.core.ydl_pool import YDLPool
+        from app.core.ytclient import PROFILES, YTClient
+
+        client = YTClient(pool=YDLPool(), profile=PROFILES["max"])
+        client.download("https://youtube.com/watch?v=TEST", {"format": "best"})
+        opts = mock_ytdlp.YoutubeDL.call_args[0][0]
+        assert opts["concurrent_fragment_downloads"] == 8
+        assert opts["http_chunk_size"] == 10 * 1024 * 1024
+        assert opts["buffersize"] == 1024 * 1024
+
+        client.extract("https://youtube.com/watch?v=TEST")
+        assert "concurrent_fragment_downloads" not in (
+            mock_ytdlp.YoutubeDL.call_args[0][0]
+        )
+
+
+# test ze profil zadania nadpisuje profil klienta, a jawne opcje nadpisuja profil
+def test_ytclient_download_profile_override():
+    with patch.dict("sys.modules", {"yt_dlp": MagicMock()}) as mock_modules:
+        mock_ytdlp = mock_modules["yt_dlp"]
+        from app.core.ydl_pool import YDLPool
+        from app.core.ytclient import PROFILES, YTClient
+
+        client = YTClient(pool=YDLPool(), profile=PROFILES["max"])
+        client.download(
+            "https://youtube.com/watch?v=TEST",
+            {"buffersize": 4096},
+            profile=PROFILES["standard"],
+        )
+        opts = mock_ytdlp.YoutubeDL.call_args[0][0]
+        assert opts["concurrent_fragment_downloads"] == 1
+        assert opts["http_chunk_size"] is None
+        assert opts["buffersize"] == 4096
+
+
+# test wyboru profilu po nazwie i ze zmiennej srodowiskowej
+def test_get_profile(monkeypatch):
+    from app.core.ytclient import DEFAULT_PROFILE, PROFILE_ENV, get_profile
+
+    monkeypatch.delenv(PROFILE_ENV, raising=False)
+    assert get_profile().name == DEFAULT_PROFILE
+    assert get_profile("max").concurrent_fragments == 8
+    assert get_profile("nieznany").name == DEFAULT_PROFILE
+
+    monkeypatch.setenv(PROFILE_ENV, "standard")
+    assert get_profile().name == "standard"
@@ -0,0 +1,272 @@
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app import cli
+from app.utils.errors import CancelledError
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _events(out: io.StringIO):
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+@pytest.fixture
+def fake_env():
+    yt = MagicMock()
+    with patch("app.cli.get_ffmpeg_path", return_value="/ffmpeg"), patch(
+        "app.cli.YTClient", return_value=yt
+    ), patch("app.cli.download_video_mp4", return_value="remux") as mp4, patch(
+        "app.cli.download_audio_mp3", return_value="transcode"
+    ) as mp3:
+        yield yt, mp4, mp3
+
+
+# test ze modul cli (i wszystko co importuje) nie laduje PyQt6
+def test_cli_does_not_import_qt():
+    code = (
+        "import sys, app.cli; "
+        "print(any(m.split('.')[0] == 'PyQt6' for m in sys.modules))"
+    )
+    res = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    assert res.returncode == 0, res.stderr
+    assert res.stdout.strip() == "False"
+
+
+# test czytania url z argumentow, pliku i stdin (komentarze i puste linie pomijane)
+def test_read_urls(tmp_path):
+    f = tmp_path / "urls.txt"
+    f.write_text("# lista\nhttps://youtu.be/a\n\nhttps://youtu.be/b\n", "utf-8")
+    stdin = io.StringIO("https://youtu.be/c\n")
+
+    urls = cli.read_urls(["https://youtu.be/x"], [str(f), "-"], stdin)
+    assert urls == [
+        "https://youtu.be/x",
+        "https://youtu.be/a",
+        "https://youtu.be/b",
+        "https://youtu.be/c",
+    ]
+
+
+# test pobierania z rozwinieciem playlisty i zdarzeniami json na wyjsciu
+def test_cli_downloads_and_expands_playlist(fake_env, tmp_path):
+    yt, mp4, _ = fake_env
+    yt.iter_entries.return_value = iter([{"id": "p1"}, {"id": "p2"}, {"title": "x"}])
+    out = io.StringIO()
+
+    code = cli.main(
+        [
+            "https://youtu.be/dQw4w9WgXcQ",
+            "https://www.youtube.com/playlist?list=PL1",
+            "-o",
+            str(tmp_path),
+            "-j",
+            "2",
+            "--no-archive",
+        ],
+        stdin=io.StringIO(),
+        stdout=out,
+    )
+
+    assert code == 0
+    assert mp4.call_count == 3
+    events = _events(out)
+    assert {"playlist", "start", "done", "summary"} <= {e["event"] for e in events}
+    assert events[-1]["done"] == 3 and events[-1]["failed"] == 0
+
+
+# test ze url czytane sa ze stdin gdy nie podano argumentow
+def test_cli_reads_stdin(fake_env, tmp_path):
+    _, _, mp3 = fake_env
+    out = io.StringIO()
+    code = cli.main(
+        ["-t", "mp3", "-o", str(tmp_path), "--no-archive"],
+        stdin=io.StringIO("https://youtu.be/a\nhttps://youtu.be/b\n"),
+        stdout=out,
+    )
+    assert code == 0
+    assert mp3.call_count == 2
+
+
+# test kodu wyjscia i zdarzenia failed przy bledzie pobierania
+def test_cli_reports_failures(fake_env, tmp_path):
+    _, mp4, _ = fake_env
+    mp4.side_effect = [RuntimeError("HTTP 403"), CancelledError("anulowano")]
+    out = io.StringIO()
+    code = cli.main(
+        ["https://youtu.be/a", "https://youtu.be/b", "-j", "1", "--no-archive"],
+        stdin=io.StringIO(),
+        stdout=out,
+    )
+
+    assert code == 1
+    kinds = [e["event"] for e in _events(out)]
+    assert "failed" in kinds and "cancelled" in kinds
+
+
+# test tokenow zadan: kazda pozycja dostaje wlasny token, anulowanie partii
+# dochodzi do wszystkich
+def test_run_jobs_child_tokens(fake_env, tmp_path):
+    from app.core.cancel import CancelToken
+
+    yt, mp4, _ = fake_env
+    batch = CancelToken()
+    tokens = []
+
+    def fake_download(yt, url, output, fmt, progress_cb, cancel_cb, **kw):
+        tokens.append(cancel_cb)
+        return "remux"
+
+    mp4.side_effect = fake_download
+    jobs = [("https://youtu.be/a", "a"), ("https://youtu.be/b", "b")]
+    cli.run_jobs(
+        jobs,
+        output=str(tmp_path),
+        kind="mp4",
+        format_id=None,
+        concurrency=2,
+        yt=yt,
+        report=cli.JsonReporter(io.StringIO()),
+        cancel=batch,
+    )
+
+    assert len(tokens) == 2 and tokens[0] is not tokens[1]
+    assert all(isinstance(t, CancelToken) and t is not batch for t in tokens)
+    batch.cancel()
+    assert all(t.is_set() for t in tokens)
+
+
+# test ze postep trafia na wyjscie jako zdarzenia progress
+def test_cli_progress_events(fake_env, tmp_path):
+    from app.core.download import ProgressEvent
+
+    _, mp4, _ = fake_env
+
+    def fake_download(yt, url, output, fmt, progress_cb, cancel_cb, **kw):
+        progress_cb(ProgressEvent("downloading", 50, 100, speed=10.0, eta=5))
+        return "remux"
+
+    mp4.side_effect = fake_download
+    out = io.StringIO()
+    cli.main(["https://youtu.be/a", "--no-archive"], stdin=io.StringIO(), stdout=out)
+
+    progress = [e for e in _events(out) if e["event"] == "progress"]
+    assert progress[0]["percent"] == 50.0 and progress[0]["eta"] == 5
+
+
+# test audio bez pobranego pliku: tryb skipped w zdarzeniu i brak wpisu w archiwum
+def test_cli_audio_skipped_not_archived(fake_env, tmp_path):
+    from app.core.download_archive import shared_archive
+
+    out = io.StringIO()
+    with patch("app.cli.download_audio", return_value="skipped"):
+        code = cli.main(
+            ["https://youtu.be/dQw4w9WgXcQ", "-t", "m4a", "-o", str(tmp_path)],
+            stdin=io.StringIO(),
+            stdout=out,
+        )
+
+    assert code == 0
+    done = [e for e in _events(out) if e["event"] == "done"]
+    assert done[0]["mode"] == "skipped"
+    assert not shared_archive().contains("youtube", "dQw4w9WgXcQ", "m4a")
+
+
+# test mp3 bez pobranego pliku: tak samo jak audio, bez wpisu w archiwum
+def test_cli_mp3_skipped_not_archived(fake_env, tmp_path):
+    from app.core.download_archive import shared_archive
+
+    out = io.StringIO()
+    with patch("app.cli.download_audio_mp3", return_value="skipped"):
+        code = cli.main(
+            ["https://youtu.be/dQw4w9WgXcQ", "-t", "mp3", "-o", str(tmp_path)],
+            stdin=io.StringIO(),
+            stdout=out,
+        )
+
+    assert code == 0
+    done = [e for e in _events(out) if e["event"] == "done"]
+    assert done[0]["mode"] == "skipped"
+    assert not shared_archive().contains("youtube", "dQw4w9WgXcQ", "mp3")
+
+
+# test bledu zapisu w archiwum: zdarzenie error dla pozycji, partia idzie dalej
+def test_cli_archive_error_does_not_stop_batch(fake_env, tmp_path):
+    import sqlite3
+
+    archive = MagicMock()
+    archive.done_keys.return_value = set()
+    archive.add.side_effect = sqlite3.OperationalError("database is locked")
+    out = io.StringIO()
+    with patch("app.cli.shared_archive", return_value=archive):
+        code = cli.main(
+            ["https://youtu.be/dQw4w9WgXcQ", "https://youtu.be/jNQXAC9IVRw"],
+            stdin=io.StringIO(),
+            stdout=out,
+        )
+
+    events = _events(out)
+    errors = [e for e in events if e["event"] == "error"]
+    assert code == 0
+    assert sorted(e["index"] for e in errors) == [0, 1]
+    assert "database is locked" in errors[0]["error"]
+    assert events[-1]["event"] == "summary" and events[-1]["done"] == 2
+
+
+# test ze pozycje z archiwum sa pomijane, a pobrane dopisywane
+def test_cli_uses_archive(fake_env, tmp_path):
+    from app.core.download_archive import shared_archive
+
+    _, mp4, _ = fake_env
+    shared_archive().add("youtube", "dQw4w9WgXcQ", "mp4")
+    out = io.StringIO()
+    code = cli.main(
+        ["https://youtu.be/dQw4w9WgXcQ", "https://youtu.be/jNQXAC9IVRw"],
+        stdin=io.StringIO(),
+        stdout=out,
+    )
+
+    assert code == 0
+    assert mp4.call_count == 1
+    assert shared_archive().contains("youtube", "jNQXAC9IVRw", "mp4")
+    assert _events(out)[-1]["skipped"] == 1
+
+
+# test braku url: komunikat uzycia i kod 2
+def test_cli_no_urls(capsys):
+    tty = MagicMock()
+    tty.isatty.return_value = True
+    assert cli.main([], stdin=tty, stdout=io.StringIO()) == 2
+
+
+# test niedostepnego archiwum: zdarzenie error i kod 2 zamiast wyjatku
+def test_cli_archive_error(fake_env):
+    out = io.StringIO()
+    with patch("app.cli.shared_archive", side_effect=OSError("brak dostępu")):
+        code = cli.main(["https://youtu.be/a"], stdin=io.StringIO(), stdout=out)
+
+    assert code == 2
+    (event,) = _events(out)
+    assert (event["event"], event["error"]) == ("error", "brak dostępu")
+    fake_env[1].assert_not_called()
+
+
+# test ze --profile wybiera profil pobierania klienta
+def test_cli_profile(fake_env):
+    from app.core.ytclient import PROFILES
+
+    with patch("app.cli.YTClient") as client:
+        cli.main(
+            ["https://youtu.be/a", "--profile", "max", "--no-archive"],
+            stdin=io.StringIO(),
+            stdout=io.StringIO(),
+        )
+    assert client.call_args.kwargs["profile"] == PROFILES["max"]
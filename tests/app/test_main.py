@@ -80,3 +80,44 @@ def test_app_package_structure():
 
     app_path = os.path.dirname(app.__file__)
     assert os.path.exists(app_path)
+
+
+# test zamykania okna: pobierania zatrzymane, pula konwersji zamknieta
+def test_main_window_close_stops_downloads(qtbot):
+    from app.main import MainWindow
+
+    with patch("app.main.QTimer.singleShot"):
+        window = MainWindow()
+    qtbot.addWidget(window)
+    widget = window.downloader_widget
+    with patch.object(widget, "stop_downloads") as stop, patch(
+        "app.main.shutdown_shared_pool"
+    ) as pool, patch.object(widget.thumbs, "shutdown") as thumbs:
+        window.close()
+
+    stop.assert_called_once_with()
+    pool.assert_called_once_with()
+    thumbs.assert_called_once_with()
+
+
+# test spoznionej miniatury: wynik workera dla poprzedniego url nie trafia do
+# cache pod id biezacego filmu
+def test_stale_info_thumbnail_dropped(qtbot):
+    from app.main import MainWindow
+
+    with patch("app.main.QTimer.singleShot"):
+        window = MainWindow()
+    qtbot.addWidget(window)
+    widget = window.downloader_widget
+    widget.current_url = "https://youtube.com/watch?v=BBBBBBBBBBB"
+    with patch.object(widget.thumbs, "is_pending", return_value=True), patch.object(
+        widget.thumbs, "request"
+    ) as request:
+        widget._on_info_thumbnail(
+            "https://youtube.com/watch?v=AAAAAAAAAAA", "http://img/a.jpg"
+        )
+        request.assert_not_called()
+        widget._on_info_thumbnail(widget.current_url, "http://img/b.jpg")
+    request.assert_called_once()
+    assert request.call_args.args[1] == "http://img/b.jpg"
+    assert request.call_args.args[3] == "BBBBBBBBBBB"
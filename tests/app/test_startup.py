@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from app.core.warmup import HEAVY_MODULES, warm_imports
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# budzet czasu od startu procesu do pokazania okna (sekundy)
+STARTUP_BUDGET_S = float(os.getenv("JUSTDOWNIT_STARTUP_BUDGET", "5.0"))
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["QT_QPA_PLATFORM"] = "offscreen"
+    return env
+
+
+# test ze import glownego modulu nie wciaga ciezkich zaleznosci
+def test_main_import_skips_heavy_modules():
+    code = (
+        "import json, sys, app.main; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env=_env(),
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+    assert out.returncode == 0, out.stderr
+    assert json.loads(out.stdout.strip().splitlines()[-1]) == []
+
+
+# test budzetu startu: od uruchomienia procesu do pokazania okna
+def test_startup_budget():
+    env = _env()
+    env["JUSTDOWNIT_STARTUP_PROBE"] = "1"
+
+    started = time.time()
+    out = subprocess.run(
+        [sys.executable, "-m", "app.main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+    assert out.returncode == 0, out.stderr
+    report = json.loads(out.stdout.strip().splitlines()[-1])
+    elapsed = report["shown_at"] - started
+    print(f"start do pokazania okna: {elapsed * 1000:.0f} ms")
+
+    assert report["heavy_loaded"] == []
+    assert elapsed < STARTUP_BUDGET_S
+
+
+# test rozgrzewania importow w tle
+def test_warm_imports_loads_modules_in_background():
+    t = warm_imports(("json", "nie_istniejacy_modul_xyz"))
+    t.join(timeout=10)
+
+    assert not t.is_alive()
+    assert t.daemon
+    assert "json" in sys.modules
@@ -0,0 +1,62 @@
+from app.core.log_file import LogFileSink
+from app.ui.log_view import LogModel, LogView
+
+
+# test ze linie trafiaja do modelu dopiero przy flush, jedna partia
+def test_log_model_batches_lines(qtbot):
+    model = LogModel(max_lines=100)
+    inserted = []
+    model.rowsInserted.connect(lambda _, a, b: inserted.append((a, b)))
+    for i in range(10):
+        model.append(f"l{i}")
+
+    assert model.rowCount() == 0
+    model.flush()
+    assert inserted == [(0, 9)]
+    assert model.lines() == [f"l{i}" for i in range(10)]
+
+
+# test ze timer sam wypycha zalegle linie
+def test_log_model_timer_flush(qtbot):
+    model = LogModel(flush_ms=10)
+    model.append("a")
+    qtbot.waitUntil(lambda: model.rowCount() == 1, timeout=1000)
+
+
+# test limitu linii: najstarsze wypadaja, licznik porzuconych rosnie
+def test_log_model_line_cap(qtbot):
+    model = LogModel(max_lines=5)
+    for i in range(4):
+        model.append(str(i))
+    model.flush()
+    for i in range(4, 12):
+        model.append(str(i))
+    model.flush()
+
+    assert model.lines() == ["7", "8", "9", "10", "11"]
+    assert model.dropped == 7
+
+
+# test ze plik logow dostaje wszystkie linie, takze te usuniete z widoku
+def test_log_model_writes_sink(qtbot, tmp_path):
+    path = tmp_path / "app.log"
+    model = LogModel(max_lines=2, sink=LogFileSink(path))
+    for i in range(5):
+        model.append(str(i))
+    model.close()
+
+    assert model.lines() == ["3", "4"]
+    assert path.read_text(encoding="utf-8").splitlines() == ["0", "1", "2", "3", "4"]
+
+
+# test czyszczenia widoku logow
+def test_log_view_clear(qtbot):
+    view = LogView(max_lines=10)
+    qtbot.addWidget(view)
+    view.append("a")
+    view.log_model.flush()
+    view.append("b")
+    view.clear()
+    view.log_model.flush()
+
+    assert view.log_model.rowCount() == 0
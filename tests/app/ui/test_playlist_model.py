@@ -0,0 +1,262 @@
+from PyQt6.QtCore import QBuffer, QIODevice, QRect, Qt
+from PyQt6.QtGui import QImage, QPainter
+from PyQt6.QtWidgets import QStyleOptionViewItem
+
+from app.core.queue_journal import FAILED, RUNNING
+from app.ui.playlist_model import (
+    COL_CHECK,
+    COL_DURATION,
+    COL_QUALITY,
+    COL_STATE,
+    COL_THUMB,
+    COL_TITLE,
+    PlaylistModel,
+    QualityOptionsRole,
+    ThumbnailRole,
+    fmt_duration,
+)
+
+_FORMATS = [("137", "1080p (mp4)"), ("22", "720p (mp4)")]
+
+
+def _entries(n):
+    return [
+        {"id": f"vid{i}", "url": f"https://youtu.be/vid{i}", "title": f"Film {i}"}
+        for i in range(n)
+    ]
+
+
+def _model(n=3):
+    m = PlaylistModel()
+    m.reset(_entries(n))
+    return m
+
+
+# test formatowania czasu trwania
+def test_fmt_duration():
+    assert fmt_duration(None) == "—"
+    assert fmt_duration(65) == "1:05"
+    assert fmt_duration(3661) == "1:01:01"
+    assert fmt_duration("x") == "—"
+
+
+# test ze reset wypelnia model i domyslnie zaznacza wszystkie wiersze
+def test_reset_fills_rows(qtbot):
+    m = _model(3)
+    assert m.rowCount() == 3
+    assert m.columnCount() == 7
+    assert m.data(m.index(1, COL_TITLE)) == "Film 1"
+    assert m.data(m.index(0, COL_CHECK), Qt.ItemDataRole.CheckStateRole) == (
+        Qt.CheckState.Checked
+    )
+    assert [url for _, url, _ in m.checked_items()] == [e["url"] for e in _entries(3)]
+
+
+# test ze zaznaczanie wszystkich emituje jeden dataChanged na cala kolumne
+def test_set_all_checked_single_signal(qtbot):
+    m = _model(50)
+    seen = []
+    m.dataChanged.connect(lambda a, b, roles: seen.append((a.row(), b.row())))
+    m.set_all_checked(False)
+    assert seen == [(0, 49)]
+    assert m.checked_items() == []
+
+
+# test przelaczania checkboxa pojedynczego wiersza przez setData
+def test_set_data_toggles_check(qtbot):
+    m = _model(2)
+    assert m.setData(
+        m.index(0, COL_CHECK),
+        Qt.CheckState.Unchecked.value,
+        Qt.ItemDataRole.CheckStateRole,
+    )
+    assert [row for row, _, _ in m.checked_items()] == [1]
+
+
+# test ze aktualizacja metadanych zachowuje wybor jakosci jesli nadal dostepny
+def test_update_meta_keeps_quality(qtbot):
+    m = _model(1)
+    m.update_meta(0, 125, _FORMATS)
+    m.setData(m.index(0, COL_QUALITY), "22")
+    assert m.data(m.index(0, COL_QUALITY)) == "720p (mp4)"
+    assert m.data(m.index(0, COL_DURATION)) == "2:05"
+
+    m.update_meta(0, 125, _FORMATS[:1])
+    assert m.data(m.index(0, COL_QUALITY), Qt.ItemDataRole.EditRole) is None
+
+
+# test globalnej jakosci: po format_id, po etykiecie i powrot do auto
+def test_apply_quality(qtbot):
+    m = _model(2)
+    m.update_meta(0, 10, _FORMATS)
+    m.update_meta(1, 10, [("298", "720p (mp4)")])
+    seen = []
+    m.dataChanged.connect(lambda *a: seen.append(a))
+
+    m.apply_quality("bestaudio", "Tylko audio (MP3)")
+    assert [fid for _, _, fid in m.checked_items()] == ["bestaudio", "bestaudio"]
+
+    m.apply_quality(None, "720p (mp4)")
+    assert [fid for _, _, fid in m.checked_items()] == ["22", "298"]
+
+    m.apply_quality(None)
+    assert [fid for _, _, fid in m.checked_items()] == [None, None]
+    assert len(seen) == 3
+
+
+# test bledu metadanych i stanu pobierania z podpowiedzia
+def test_failed_and_state(qtbot):
+    m = _model(1)
+    m.mark_failed(0, "niedostepny")
+    assert m.data(m.index(0, COL_DURATION)) == "Błąd"
+    assert m.data(m.index(0, COL_DURATION), Qt.ItemDataRole.ToolTipRole) == (
+        "niedostepny"
+    )
+
+    m.set_state(0, RUNNING, pct=42.4)
+    assert m.data(m.index(0, COL_STATE)) == "Pobieranie 42%"
+    m.set_state(0, FAILED, "timeout")
+    assert m.data(m.index(0, COL_STATE)) == "Błąd"
+    assert m.data(m.index(0, COL_STATE), Qt.ItemDataRole.ToolTipRole) == "timeout"
+
+
+# test ze wiersz trzyma tylko url miniatury (bez obrazu)
+def test_set_thumbnail_url(qtbot):
+    m = _model(1)
+    assert m.data(m.index(0, COL_THUMB)) == "—"
+    assert m.data(m.index(0, COL_THUMB), ThumbnailRole) is None
+    m.set_thumbnail_url(0, "http://img/0.jpg")
+    assert m.data(m.index(0, COL_THUMB)) is None
+    assert m.data(m.index(0, COL_THUMB), ThumbnailRole) == ("vid0", "http://img/0.jpg")
+    assert not hasattr(m.row(0), "thumb")
+
+
+def _png() -> bytes:
+    img = QImage(320, 180, QImage.Format.Format_RGB32)
+    img.fill(0)
+    buf = QBuffer()
+    buf.open(QIODevice.OpenModeFlag.WriteOnly)
+    img.save(buf, "PNG")
+    return bytes(buf.data())
+
+
+# test leniwych miniatur: zlecane dopiero przy rysowaniu wiersza, obraz
+# rysowany z lru serwisu; blad pobierania usuwa url, wiec nie ma ponowien
+def test_thumbnails_requested_on_paint(qtbot, tmp_path):
+    from app.core.thumb_cache import ThumbDiskCache
+    from app.ui.ui_playlist import PlaylistView
+    from app.workers.thumbnail_service import ROW_SIZE, ThumbnailService
+
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        if "bad" in url:
+            raise OSError("404")
+        return _png()
+
+    thumbs = ThumbnailService(fetch=fetch, disk=ThumbDiskCache(str(tmp_path)))
+    view = PlaylistView(thumbs)
+    qtbot.addWidget(view)
+    view.reset_and_fill(_entries(3))
+    view.update_row(0, thumb_url="http://img/0.jpg", duration=1, formats=[])
+    view.update_row(1, thumb_url="http://img/bad.jpg", duration=1, formats=[])
+    view.update_row(2, thumb_url="http://img/2.jpg", duration=1, formats=[])
+    assert thumbs.pending() == 0
+
+    delegate = view.table.itemDelegateForColumn(COL_THUMB)
+    canvas = QImage(200, 100, QImage.Format.Format_RGB32)
+
+    def paint(row):
+        option = QStyleOptionViewItem()
+        option.rect = QRect(0, 0, 200, 100)
+        painter = QPainter(canvas)
+        delegate.paint(painter, option, view.model.index(row, COL_THUMB))
+        painter.end()
+
+    with qtbot.waitSignals([thumbs.ready, thumbs.failed], timeout=5000):
+        paint(0)
+        paint(1)
+    assert sorted(fetched) == ["http://img/0.jpg", "http://img/bad.jpg"]
+    assert thumbs.cached("vid0", ROW_SIZE) is not None
+    assert view.model.row(1).thumb_url is None
+
+    paint(0)
+    paint(1)
+    assert thumbs.pending() == 0
+    assert len(fetched) == 2
+    thumbs.shutdown()
+
+
+# test widoku: api PlaylistView dziala na modelu
+def test_playlist_view_uses_model(qtbot):
+    from app.ui.ui_playlist import PlaylistView
+
+    view = PlaylistView()
+    qtbot.addWidget(view)
+    view.reset_and_fill(_entries(3))
+    view.update_row(0, thumb_url=None, duration=60, formats=_FORMATS)
+    assert view.global_quality.findText("1080p (mp4)") >= 0
+
+    view.unselect_all()
+    assert view.selected_items() == []
+    view.select_all()
+    view.global_quality.setCurrentIndex(view.global_quality.findText("1080p (mp4)"))
+    assert view.selected_items()[0] == (0, "https://youtu.be/vid0", "137")
+    # wiersze bez tego formatu zostaja na auto
+    assert view.selected_items()[1][2] is None
+
+
+# test doklejania kolejnych porcji listy pod istniejace wiersze
+def test_append_rows(qtbot):
+    from app.ui.ui_playlist import PlaylistView
+
+    view = PlaylistView()
+    qtbot.addWidget(view)
+    entries = _entries(5)
+    view.reset_and_fill(entries[:2])
+    inserted = []
+    view.model.rowsInserted.connect(lambda _, a, b: inserted.append((a, b)))
+    view.append_rows(entries[2:])
+
+    assert inserted == [(2, 4)]
+    assert view.model.rowCount() == 5
+    assert view.entries == entries
+    assert view.model.data(view.model.index(4, COL_TITLE)) == "Film 4"
+
+
+# test oznaczania wierszy pobranych wczesniej: odznaczone, stan gotowe
+def test_mark_done(qtbot):
+    m = _model(5)
+    seen = []
+    m.dataChanged.connect(lambda a, b, roles: seen.append((a.row(), b.row())))
+    m.mark_done([1, 3], "Pobrane wcześniej")
+
+    assert seen == [(1, 3)]
+    assert [row for row, _, _ in m.checked_items()] == [0, 2, 4]
+    assert m.data(m.index(3, COL_STATE)) == "Gotowe"
+    assert m.data(m.index(3, COL_STATE), Qt.ItemDataRole.ToolTipRole) == (
+        "Pobrane wcześniej"
+    )
+
+
+# test opcji audio bez przekodowania: dostepne w kazdym wierszu od poczatku
+def test_audio_passthrough_options(qtbot):
+    m = _model(1)
+    options = m.data(m.index(0, COL_QUALITY), QualityOptionsRole)
+    assert "bestaudio:opus" in [fid for fid, _ in options]
+
+    m.apply_quality("bestaudio:m4a")
+    assert [fid for _, _, fid in m.checked_items()] == ["bestaudio:m4a"]
+
+
+# test ze model widoku nie zalezy od warstwy workerow (stany sa w app.core)
+def test_playlist_model_does_not_import_workers():
+    import subprocess
+    import sys
+
+    code = (
+        "import sys, app.ui.playlist_model; "
+        "sys.exit(any(m.startswith('app.workers') for m in sys.modules))"
+    )
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
@@ -0,0 +1,370 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from app.core.queue_journal import (
+    CANCELLED,
+    DONE,
+    FAILED,
+    POSTPROCESSING,
+    QUEUED,
+    RUNNING,
+)
+from app.workers.download_scheduler import DownloadScheduler, default_concurrency
+
+
+# udawany DownloadWorker - konczy sie dopiero gdy test wywola finish()
+class FakeWorker(QObject):
+    log_signal = pyqtSignal(str)
+    progress_signal = pyqtSignal(float)
+    finished_signal = pyqtSignal(bool, str)
+    partial_file = pyqtSignal(str)
+    downloaded = pyqtSignal()
+    skipped = pyqtSignal()
+    finished = pyqtSignal()
+
+    def __init__(self, url, folder, download_type, format_id):
+        super().__init__()
+        self.url = url
+        self.started = False
+        self.cancelled = False
+        self.weight = 1.0
+
+    def start(self):
+        self.started = True
+
+    def cancel(self, remove_partial=False):
+        self.cancelled = True
+        self.remove_partial = remove_partial
+
+    def set_weight(self, weight):
+        self.weight = weight
+
+    def isFinished(self):
+        return True
+
+    def wait(self, msecs=0):
+        self.waited = msecs
+        return True
+
+    def finish(self, ok=True, err=""):
+        self.finished_signal.emit(ok, err)
+
+
+class FakeFactory:
+    def __init__(self):
+        self.workers = {}
+
+    def __call__(self, url, folder, download_type, format_id):
+        w = FakeWorker(url, folder, download_type, format_id)
+        self.workers[url] = w
+        return w
+
+
+def _items(n):
+    return [(f"u{i}", "best", "mp4") for i in range(n)]
+
+
+def _scheduler(concurrency=2):
+    factory = FakeFactory()
+    sched = DownloadScheduler("/out", concurrency=concurrency, worker_factory=factory)
+    finished = []
+    sched.all_finished.connect(lambda d, f, c: finished.append((d, f, c)))
+    return sched, factory, finished
+
+
+# test ze startuje maksymalnie N pobran naraz i dobiera kolejne po zakonczeniu
+def test_scheduler_respects_concurrency():
+    sched, factory, finished = _scheduler(concurrency=2)
+    sched.start(_items(5))
+
+    assert sorted(factory.workers) == ["u0", "u1"]
+    assert [sched.state(i) for i in range(5)] == [RUNNING] * 2 + [QUEUED] * 3
+
+    factory.workers["u1"].finish()
+    assert sched.state(1) == DONE
+    assert sched.state(2) == RUNNING
+    assert not finished
+
+
+# test ze blad jednej pozycji nie zatrzymuje kolejki
+def test_scheduler_failure_does_not_stall():
+    sched, factory, finished = _scheduler(concurrency=1)
+    states = []
+    sched.item_state.connect(lambda i, s, e: states.append((i, s, e)))
+    sched.start(_items(3))
+
+    factory.workers["u0"].finish(False, "HTTP 403")
+    factory.workers["u1"].finish()
+    factory.workers["u2"].finish()
+
+    assert (0, FAILED, "HTTP 403") in states
+    assert finished == [(2, 1, 0)]
+
+
+# test ze blad tworzenia workera oznacza pozycje jako bledna i idzie dalej
+def test_scheduler_factory_error():
+    calls = []
+
+    def factory(**kw):
+        calls.append(kw["url"])
+        if kw["url"] == "u0":
+            raise RuntimeError("brak ffmpeg")
+        return FakeWorker(**kw)
+
+    sched = DownloadScheduler("/out", concurrency=1, worker_factory=factory)
+    sched.start(_items(2))
+
+    assert sched.state(0) == FAILED
+    assert sched.state(1) == RUNNING
+
+
+# test anulowania wszystkich pozycji
+def test_scheduler_cancel_all():
+    sched, factory, finished = _scheduler(concurrency=2)
+    sched.start(_items(4))
+
+    sched.cancel_all()
+    assert factory.workers["u0"].cancelled and factory.workers["u1"].cancelled
+    assert sched.state(2) == CANCELLED and sched.state(3) == CANCELLED
+    assert not finished  # trwajace pobrania jeszcze sie nie zakonczyly
+
+    factory.workers["u0"].finish(False, "Pobieranie anulowane")
+    factory.workers["u1"].finish()  # zdazylo sie skonczyc przed anulowaniem
+    assert sorted(factory.workers) == ["u0", "u1"]
+    assert finished == [(1, 0, 3)]
+
+
+# test anulowania pojedynczej pozycji
+def test_scheduler_cancel_single():
+    sched, factory, finished = _scheduler(concurrency=1)
+    sched.start(_items(3))
+
+    sched.cancel(2)
+    sched.cancel(0)
+    factory.workers["u0"].finish(False, "Pobieranie anulowane")
+
+    assert sched.state(0) == CANCELLED
+    assert sched.state(1) == RUNNING
+    assert "u2" not in factory.workers
+
+
+# test ze anulowanie przekazuje workerom prosbe o usuniecie plikow czesciowych
+def test_scheduler_cancel_remove_partial():
+    sched, factory, _ = _scheduler(concurrency=2)
+    sched.start(_items(3))
+
+    sched.cancel(0)
+    sched.cancel_all(remove_partial=True)
+
+    assert factory.workers["u0"].remove_partial is True
+    assert factory.workers["u1"].remove_partial is True
+
+
+# test postepu calej kolejki
+def test_scheduler_overall_progress():
+    sched, factory, _ = _scheduler(concurrency=2)
+    overall = []
+    sched.overall_progress.connect(overall.append)
+    sched.start(_items(2))
+
+    factory.workers["u0"].progress_signal.emit(50.0)
+    factory.workers["u1"].finish()
+
+    assert overall == [25.0, 75.0]
+
+
+# test zwiekszenia limitu w trakcie dzialania
+def test_scheduler_set_concurrency():
+    sched, factory, _ = _scheduler(concurrency=1)
+    sched.start(_items(3))
+
+    sched.set_concurrency(3)
+
+    assert sorted(factory.workers) == ["u0", "u1", "u2"]
+
+
+# test domyslnej liczby rownoleglych pobran ze zmiennej srodowiskowej
+def test_default_concurrency_env(monkeypatch):
+    monkeypatch.setenv("JUSTDOWNIT_CONCURRENCY", "5")
+    assert default_concurrency() == 5
+    monkeypatch.setenv("JUSTDOWNIT_CONCURRENCY", "99")
+    assert default_concurrency() == 8
+    monkeypatch.setenv("JUSTDOWNIT_CONCURRENCY", "abc")
+    assert default_concurrency() == 3
+
+
+# test ze dziennik kolejki sledzi stany i pliki .part, a po koncu jest czyszczony
+def test_scheduler_journal(tmp_path):
+    from app.core.queue_journal import QueueJournal
+
+    journal = QueueJournal(tmp_path / "q.sqlite3")
+    factory = FakeFactory()
+    sched = DownloadScheduler(
+        "/out", concurrency=1, worker_factory=factory, journal=journal
+    )
+    sched.start(_items(2))
+
+    jobs = journal.unfinished()
+    assert [(j.url, j.state) for j in jobs] == [("u0", RUNNING), ("u1", QUEUED)]
+    factory.workers["u0"].partial_file.emit("/out/u0.mp4.part")
+    assert journal.get(jobs[0].id).part_path == "/out/u0.mp4.part"
+
+    factory.workers["u0"].finish()
+    assert [j.url for j in journal.unfinished()] == ["u1"]
+
+    factory.workers["u1"].finish()
+    assert journal.unfinished() == []
+    assert journal.get(jobs[0].id) is None
+
+
+# test wznowienia: istniejace wpisy dziennika sa uzywane zamiast nowych
+def test_scheduler_resumes_journal_jobs(tmp_path):
+    from app.core.queue_journal import QueueJournal
+
+    journal = QueueJournal(tmp_path / "q.sqlite3")
+    ids = journal.add("/out", _items(3))
+    journal.set_state(ids[0], DONE)
+    journal.set_state(ids[1], RUNNING)  # przerwane awaria aplikacji
+    jobs = journal.unfinished()
+
+    factory = FakeFactory()
+    sched = DownloadScheduler(
+        "/out", concurrency=2, worker_factory=factory, journal=journal
+    )
+    sched.start([(j.url, j.format_id, j.kind) for j in jobs], [j.id for j in jobs])
+
+    assert sorted(factory.workers) == ["u1", "u2"]
+    assert len(journal.unfinished()) == 2  # nie dopisano nowych pozycji
+    factory.workers["u2"].finish(False, "HTTP 403")
+    assert [j.id for j in journal.unfinished()] == [ids[1]]
+
+
+# test ze ukonczone pozycje trafiaja do archiwum pobran (z typem pliku)
+def test_scheduler_records_archive(tmp_path):
+    from app.core.download_archive import DownloadArchive
+
+    archive = DownloadArchive(tmp_path / "a.sqlite3")
+    factory = FakeFactory()
+    sched = DownloadScheduler(
+        "/out", concurrency=2, worker_factory=factory, archive=archive
+    )
+    sched.start(
+        [
+            ("https://youtu.be/dQw4w9WgXcQ", "bestaudio", "mp3"),
+            ("https://youtu.be/jNQXAC9IVRw", "22", "mp4"),
+        ]
+    )
+    factory.workers["https://youtu.be/dQw4w9WgXcQ"].finish()
+    factory.workers["https://youtu.be/jNQXAC9IVRw"].finish(False, "HTTP 403")
+
+    assert archive.contains("youtube", "dQw4w9WgXcQ", "mp3")
+    assert not archive.contains("youtube", "jNQXAC9IVRw", "mp4")
+
+
+# test ze pozycja bez pobranego pliku jest gotowa, ale nie trafia do archiwum
+def test_scheduler_skipped_not_archived(tmp_path):
+    from app.core.download_archive import DownloadArchive
+
+    archive = DownloadArchive(tmp_path / "a.sqlite3")
+    factory = FakeFactory()
+    sched = DownloadScheduler(
+        "/out", concurrency=2, worker_factory=factory, archive=archive
+    )
+    sched.start([("https://youtu.be/dQw4w9WgXcQ", None, "mp3")])
+    worker = factory.workers["https://youtu.be/dQw4w9WgXcQ"]
+    worker.skipped.emit()
+    worker.finish()
+
+    assert sched.state(0) == DONE
+    assert not archive.contains("youtube", "dQw4w9WgXcQ", "mp3")
+
+
+# test ze profil kolejki trafia do kazdego workera
+def test_scheduler_passes_profile():
+    calls = []
+
+    def factory(**kwargs):
+        calls.append(kwargs.get("profile"))
+        return FakeWorker(
+            kwargs["url"], kwargs["folder"], kwargs["download_type"], None
+        )
+
+    sched = DownloadScheduler(
+        "/out", concurrency=2, worker_factory=factory, profile="max"
+    )
+    sched.start(_items(2))
+    assert calls == ["max", "max"]
+
+
+# test ze wybrana pozycja dostaje wiekszy udzial w limicie przepustowosci
+def test_scheduler_prioritize():
+    from app.core.bandwidth import PRIORITY_WEIGHT
+
+    sched, factory, _ = _scheduler(concurrency=2)
+    sched.start(_items(3))
+    sched.prioritize(1)
+    assert factory.workers["u1"].weight == PRIORITY_WEIGHT
+    assert factory.workers["u0"].weight == 1.0
+
+    sched.prioritize(0)
+    assert factory.workers["u0"].weight == PRIORITY_WEIGHT
+    assert factory.workers["u1"].weight == 1.0
+
+    # priorytet dla pozycji oczekujacej dziala od jej startu
+    sched.prioritize(2)
+    factory.workers["u0"].finish()
+    assert factory.workers["u2"].weight == PRIORITY_WEIGHT
+
+
+# test ze pozycja w konwersji zwalnia miejsce w etapie sieci
+def test_scheduler_postprocessing_frees_slot():
+    sched, factory, finished = _scheduler(concurrency=1)
+    sched.start(_items(2))
+    assert sorted(factory.workers) == ["u0"]
+
+    factory.workers["u0"].downloaded.emit()
+    assert sched.state(0) == POSTPROCESSING
+    assert sched.state(1) == RUNNING
+    assert sched.is_active()
+
+    # postep konwersji nie cofa paska pozycji
+    factory.workers["u0"].progress_signal.emit(0.0)
+    factory.workers["u1"].finish()
+    factory.workers["u0"].finish()
+    assert sched.state(0) == DONE
+    assert finished == [(2, 0, 0)]
+
+
+# test anulowania pozycji w trakcie konwersji
+def test_scheduler_cancel_postprocessing():
+    sched, factory, _ = _scheduler(concurrency=1)
+    sched.start(_items(1))
+    factory.workers["u0"].downloaded.emit()
+    sched.cancel(0)
+    assert factory.workers["u0"].cancelled
+    factory.workers["u0"].finish(False, "Pobieranie anulowane")
+    assert sched.state(0) == CANCELLED
+
+
+# test zamkniecia aplikacji: trwajace pozycje przerwane bez usuwania plikow,
+# oczekujace nie startuja, a dziennik zostaje do wznowienia
+def test_scheduler_shutdown_keeps_journal(tmp_path):
+    from app.core.queue_journal import QueueJournal
+
+    journal = QueueJournal(tmp_path / "q.sqlite3")
+    factory = FakeFactory()
+    sched = DownloadScheduler(
+        "/out", concurrency=1, worker_factory=factory, journal=journal
+    )
+    sched.start(_items(2))
+    worker = factory.workers["u0"]
+
+    sched.shutdown(timeout_ms=100)
+    assert worker.cancelled and not worker.remove_partial
+    assert worker.waited <= 100
+    worker.finish(False, "Pobieranie anulowane")
+
+    assert sorted(factory.workers) == ["u0"]
+    assert [(j.url, j.state) for j in journal.unfinished()] == [
+        ("u0", RUNNING),
+        ("u1", QUEUED),
+    ]
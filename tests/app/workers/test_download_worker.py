@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 from PyQt6.QtCore import QCoreApplication
 
+from app.core.download import ProgressEvent
 from app.utils.errors import CancelledError
 
 
@@ -33,7 +34,7 @@ def test_download_worker_init():
         assert worker.folder == "/output"
         assert worker.download_type == "mp4"
         assert worker.format_id == "137+bestaudio"
-        assert worker._cancelled is False
+        assert worker._is_cancelled() is False
 
 
 # test anulowania
@@ -50,9 +51,9 @@ def test_download_worker_cancel():
             format_id=None,
         )
 
-        assert worker._cancelled is False
+        assert worker._is_cancelled() is False
         worker.cancel()
-        assert worker._cancelled is True
+        assert worker._is_cancelled() is True
 
 
 # test callbacku postepu
@@ -75,7 +76,7 @@ def test_download_worker_on_progress():
         worker.progress_signal.connect(lambda v: progress_emitted.append(v))
         worker.log_signal.connect(lambda m: log_emitted.append(m))
 
-        worker._on_progress(50.5, 5_000_000, 10_000_000)
+        worker._on_progress(ProgressEvent("downloading", 5_050_000, 10_000_000))
 
         assert len(progress_emitted) == 1
         assert progress_emitted[0] == pytest.approx(50.5)
@@ -102,10 +103,10 @@ def test_download_worker_on_progress_no_total():
         log_emitted = []
         worker.log_signal.connect(lambda m: log_emitted.append(m))
 
-        worker._on_progress(25.0, 0, 0)
+        worker._on_progress(ProgressEvent("downloading", 2_500_000, 0))
 
         assert len(log_emitted) == 1
-        assert "25.0%" in log_emitted[0]
+        assert "2.5 MB" in log_emitted[0]
 
 
 # test sprawdzania anulowania
@@ -127,6 +128,30 @@ def test_download_worker_is_cancelled():
         assert worker._is_cancelled() is True
 
 
+# test ze worker przekazuje downloadom token anulowania (wymuszone przerwanie)
+def test_download_worker_passes_cancel_token():
+    with patch.dict("sys.modules", {"yt_dlp": MagicMock()}), patch(
+        "app.core.paths.get_ffmpeg_path", return_value="/mock/ffmpeg"
+    ):
+        from app.core.cancel import CancelToken
+        from app.workers.download_worker import DownloadWorker
+
+        with patch("app.workers.download_worker.download_video_mp4") as mock_download:
+            worker = DownloadWorker(
+                url="https://youtube.com/watch?v=TEST",
+                folder="/output",
+                download_type="mp4",
+                format_id="best",
+            )
+            worker.run()
+            token = mock_download.call_args.kwargs["cancel_cb"]
+            assert isinstance(token, CancelToken)
+
+            worker.cancel(remove_partial=True)
+            assert token() is True
+            assert token._remove_partial is True
+
+
 # test sukcesu pobierania mp3
 def test_download_worker_mp3_success():
     with patch.dict("sys.modules", {"yt_dlp": MagicMock()}), patch(
@@ -154,6 +179,57 @@ def test_download_worker_mp3_success():
             mock_download.assert_called_once()
 
 
+# test mp3 bez pobranego pliku: sygnal skipped przed zakonczeniem
+def test_download_worker_mp3_skipped():
+    with patch.dict("sys.modules", {"yt_dlp": MagicMock()}), patch(
+        "app.core.paths.get_ffmpeg_path", return_value="/mock/ffmpeg"
+    ):
+        from app.core.download import AUDIO_SKIPPED
+        from app.workers.download_worker import DownloadWorker
+
+        with patch(
+            "app.workers.download_worker.download_audio_mp3",
+            return_value=AUDIO_SKIPPED,
+        ):
+            worker = DownloadWorker(
+                url="https://youtube.com/watch?v=TEST",
+                folder="/output",
+                download_type="mp3",
+                format_id=None,
+            )
+            calls = []
+            worker.skipped.connect(lambda: calls.append("skipped"))
+            worker.finished_signal.connect(lambda s, e: calls.append(s))
+            worker.run()
+
+            assert calls == ["skipped", True]
+
+
+# test pobierania audio do kontenera: kopia strumienia zapisana w logu
+def test_download_worker_audio_container_copy():
+    with patch.dict("sys.modules", {"yt_dlp": MagicMock()}), patch(
+        "app.core.paths.get_ffmpeg_path", return_value="/mock/ffmpeg"
+    ):
+        from app.core.download import AUDIO_COPY
+        from app.workers.download_worker import DownloadWorker
+
+        with patch(
+            "app.workers.download_worker.download_audio", return_value=AUDIO_COPY
+        ) as mock_download:
+            worker = DownloadWorker(
+                url="https://youtube.com/watch?v=TEST",
+                folder="/output",
+                download_type="opus",
+                format_id="bestaudio:opus",
+            )
+            logs = []
+            worker.log_signal.connect(logs.append)
+            worker.run()
+
+            assert mock_download.call_args.kwargs["container"] == "opus"
+            assert any("bez kodowania" in line for line in logs)
+
+
 # test sukcesu pobierania mp4
 def test_download_worker_mp4_success():
     with patch.dict("sys.modules", {"yt_dlp": MagicMock()}), patch(
@@ -258,3 +334,145 @@ def test_download_worker_cancel_signal():
 
         worker.cancel()
         assert len(cancel_emitted) == 1
+
+
+# test ze worker loguje sciezke mp4 ustalona po wyborze formatow
+@pytest.mark.parametrize(
+    "mode, expected",
+    [
+        ("remux", "bez kodowania"),
+        ("transcode", "przekodowanie"),
+        ("auto", "nieznane kodeki"),
+    ],
+)
+def test_download_worker_mp4_logs_mode(mode, expected):
+    with patch.dict("sys.modules", {"yt_dlp": MagicMock()}), patch(
+        "app.core.paths.get_ffmpeg_path", return_value="/mock/ffmpeg"
+    ):
+        from app.workers.download_worker import DownloadWorker
+
+        with patch("app.workers.download_worker.download_video_mp4", return_value=mode):
+            worker = DownloadWorker(
+                url="https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+                folder="/output",
+                download_type="mp4",
+                format_id="137+bestaudio",
+            )
+            log_emitted = []
+            worker.log_signal.connect(lambda m: log_emitted.append(m))
+
+            worker.run()
+
+            assert any(expected in m for m in log_emitted)
+
+
+# test ze log dostaje tylko kamienie milowe, a pasek kazde zdarzenie
+def test_download_worker_logs_only_milestones():
+    with patch.dict("sys.modules", {"yt_dlp": MagicMock()}), patch(
+        "app.core.paths.get_ffmpeg_path", return_value="/mock/ffmpeg"
+    ):
+        from app.workers.download_worker import DownloadWorker
+
+        worker = DownloadWorker(
+            url="https://youtube.com/watch?v=TEST",
+            folder="/output",
+            download_type="mp4",
+            format_id="22",
+        )
+        progress_emitted = []
+        log_emitted = []
+        worker.progress_signal.connect(progress_emitted.append)
+        worker.log_signal.connect(log_emitted.append)
+
+        for done in range(0, 1001, 10):
+            worker._on_progress(ProgressEvent("downloading", done, 1000))
+        worker._on_progress(ProgressEvent("finished", 1000, 1000))
+        worker._on_progress(
+            ProgressEvent("postprocessing", 0, 0, postprocessor="Merger")
+        )
+
+        assert len(progress_emitted) == 103
+        # start, 25/50/75/100%, koniec pliku, postprocessing
+        assert len(log_emitted) == 7
+        assert log_emitted[-1] == "Przetwarzanie: Merger…"
+
+
+# test ze kazdy nowy plik .part jest zglaszany raz (dla dziennika kolejki)
+def test_download_worker_reports_partial_files():
+    with patch.dict("sys.modules", {"yt_dlp": MagicMock()}), patch(
+        "app.core.paths.get_ffmpeg_path", return_value="/mock/ffmpeg"
+    ):
+        from app.workers.download_worker import DownloadWorker
+
+        worker = DownloadWorker(
+            url="https://youtube.com/watch?v=TEST",
+            folder="/output",
+            download_type="mp4",
+            format_id="137+140",
+        )
+        parts = []
+        worker.partial_file.connect(parts.append)
+
+        for done in (0, 500, 1000):
+            worker._on_progress(
+                ProgressEvent("downloading", done, 1000, filename="a.f137.mp4.part")
+            )
+        worker._on_progress(ProgressEvent("finished", 1000, 1000, filename="a.mp4"))
+        worker._on_progress(
+            ProgressEvent("downloading", 10, 100, filename="a.f140.m4a.part")
+        )
+
+        assert parts == ["a.f137.mp4.part", "a.f140.m4a.part"]
+
+
+# test ze wybrany profil pobierania trafia do download_video_mp4
+def test_download_worker_profile():
+    with patch.dict("sys.modules", {"yt_dlp": MagicMock()}), patch(
+        "app.core.paths.get_ffmpeg_path", return_value="/mock/ffmpeg"
+    ):
+        from app.core.ytclient import PROFILES
+        from app.workers.download_worker import DownloadWorker
+
+        with patch("app.workers.download_worker.download_video_mp4") as mock_download:
+            worker = DownloadWorker(
+                url="https://youtube.com/watch?v=TEST",
+                folder="/output",
+                download_type="mp4",
+                format_id="22",
+                profile="standard",
+            )
+            worker.run()
+
+            assert mock_download.call_args.kwargs["profile"] == PROFILES["standard"]
+
+
+# test ze pobieranie idzie przez kanal wspolnego ogranicznika z waga workera
+def test_download_worker_bandwidth_channel():
+    with patch.dict("sys.modules", {"yt_dlp": MagicMock()}), patch(
+        "app.core.paths.get_ffmpeg_path", return_value="/mock/ffmpeg"
+    ):
+        from app.core.bandwidth import shared_limiter
+        from app.workers.download_worker import DownloadWorker
+
+        seen = []
+
+        def fake_download(**kwargs):
+            ch = kwargs["bandwidth"]
+            seen.append((ch.weight, shared_limiter().channel_count()))
+            worker.set_weight(2.0)
+            seen.append(ch.weight)
+
+        with patch(
+            "app.workers.download_worker.download_audio_mp3", side_effect=fake_download
+        ):
+            worker = DownloadWorker(
+                url="https://youtube.com/watch?v=TEST",
+                folder="/output",
+                download_type="mp3",
+                format_id=None,
+                weight=3.0,
+            )
+            worker.run()
+
+        assert seen == [(3.0, 1), 2.0]
+        assert shared_limiter().channel_count() == 0
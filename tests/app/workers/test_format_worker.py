@@ -25,7 +25,7 @@ def test_format_worker_init():
 def test_format_worker_parses_muxed():
     from app.workers.format_worker import FormatFetchWorker
 
-    with patch("app.workers.format_worker.yt_dlp.YoutubeDL") as mock_ydl:
+    with patch("yt_dlp.YoutubeDL") as mock_ydl:
         mock_info = {
             "formats": [
                 {
@@ -70,7 +70,7 @@ def test_format_worker_parses_muxed():
 def test_format_worker_parses_video_only():
     from app.workers.format_worker import FormatFetchWorker
 
-    with patch("app.workers.format_worker.yt_dlp.YoutubeDL") as mock_ydl:
+    with patch("yt_dlp.YoutubeDL") as mock_ydl:
         mock_info = {
             "formats": [
                 {
@@ -109,7 +109,7 @@ def test_format_worker_parses_video_only():
 def test_format_worker_combines_video_audio():
     from app.workers.format_worker import FormatFetchWorker
 
-    with patch("app.workers.format_worker.yt_dlp.YoutubeDL") as mock_ydl:
+    with patch("yt_dlp.YoutubeDL") as mock_ydl:
         mock_info = {
             "formats": [
                 {
@@ -156,7 +156,7 @@ def test_format_worker_combines_video_audio():
 def test_format_worker_sorts_by_quality():
     from app.workers.format_worker import FormatFetchWorker
 
-    with patch("app.workers.format_worker.yt_dlp.YoutubeDL") as mock_ydl:
+    with patch("yt_dlp.YoutubeDL") as mock_ydl:
         mock_info = {
             "formats": [
                 {
@@ -204,7 +204,7 @@ def test_format_worker_sorts_by_quality():
 def test_format_worker_selects_highest_fps():
     from app.workers.format_worker import FormatFetchWorker
 
-    with patch("app.workers.format_worker.yt_dlp.YoutubeDL") as mock_ydl:
+    with patch("yt_dlp.YoutubeDL") as mock_ydl:
         mock_info = {
             "formats": [
                 {
@@ -253,7 +253,7 @@ def test_format_worker_selects_highest_fps():
 def test_format_worker_no_formats_error():
     from app.workers.format_worker import FormatFetchWorker
 
-    with patch("app.workers.format_worker.yt_dlp.YoutubeDL") as mock_ydl:
+    with patch("yt_dlp.YoutubeDL") as mock_ydl:
         mock_info = {"formats": []}
         mock_ydl.return_value.__enter__.return_value.extract_info.return_value = (
             mock_info
@@ -273,7 +273,7 @@ def test_format_worker_no_formats_error():
 def test_format_worker_exception_handling():
     from app.workers.format_worker import FormatFetchWorker
 
-    with patch("app.workers.format_worker.yt_dlp.YoutubeDL") as mock_ydl:
+    with patch("yt_dlp.YoutubeDL") as mock_ydl:
         mock_ydl.return_value.__enter__.return_value.extract_info.side_effect = (
             Exception("Network error")
         )
@@ -292,7 +292,7 @@ def test_format_worker_exception_handling():
 def test_format_worker_ignores_no_height():
     from app.workers.format_worker import FormatFetchWorker
 
-    with patch("app.workers.format_worker.yt_dlp.YoutubeDL") as mock_ydl:
+    with patch("yt_dlp.YoutubeDL") as mock_ydl:
         mock_info = {
             "formats": [
                 {
@@ -331,7 +331,7 @@ def test_format_worker_ignores_no_height():
 def test_format_worker_fps_in_labels():
     from app.workers.format_worker import FormatFetchWorker
 
-    with patch("app.workers.format_worker.yt_dlp.YoutubeDL") as mock_ydl:
+    with patch("yt_dlp.YoutubeDL") as mock_ydl:
         mock_info = {
             "formats": [
                 {
@@ -357,3 +357,26 @@ def test_format_worker_fps_in_labels():
         formats = formats_emitted[0]
         # sprawdz ze label zawiera fps
         assert any("60fps" in f[1] for f in formats)
+
+
+# test przekazania url miniatury z metadanych
+def test_format_worker_emits_thumbnail(sample_video_info):
+    from app.workers.format_worker import FormatFetchWorker
+
+    sample_video_info["thumbnails"] = [
+        {"url": "http://img/small.jpg", "width": 120, "height": 90},
+        {"url": "http://img/big.jpg", "width": 1280, "height": 720},
+    ]
+    with patch("yt_dlp.YoutubeDL") as mock_ydl:
+        mock_ydl.return_value.__enter__.return_value.extract_info.return_value = (
+            sample_video_info
+        )
+
+        worker = FormatFetchWorker(url="https://youtube.com/watch?v=dQw4w9WgXcQ")
+        thumbs = []
+        worker.thumbnail_ready.connect(lambda *args: thumbs.append(args))
+        worker.run()
+
+        assert thumbs == [
+            ("https://youtube.com/watch?v=dQw4w9WgXcQ", "http://img/big.jpg")
+        ]
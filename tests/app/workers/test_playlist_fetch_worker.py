@@ -164,8 +164,96 @@ def test_playlist_fetch_worker_ytdlp_options():
         worker = PlaylistFetchWorker("https://youtube.com/playlist?list=TEST")
         worker.run()
 
+        # entries czytane leniwie, bez przetwarzania calej listy przez yt-dlp
+        assert mock_ydl.extract_info.call_args.kwargs["process"] is False
+
         # sprawdz ze YoutubeDL zostal wywolany z poprawnymi opcjami
         call_args = mock_ytdlp.call_args[0][0]
         assert call_args["quiet"] is True
         assert call_args["skip_download"] is True
         assert call_args["extract_flat"] is True
+
+
+# test ze elementy przychodza porcjami zanim lista jest kompletna
+def test_playlist_fetch_worker_emits_chunks():
+    from app.workers.playlist_fetch_worker import PlaylistFetchWorker
+
+    mock_ydl = MagicMock()
+    mock_ydl.extract_info.return_value = {
+        "entries": ({"id": f"v{i}", "title": str(i)} for i in range(5))
+    }
+
+    with patch("yt_dlp.YoutubeDL") as mock_ytdlp:
+        mock_ytdlp.return_value.__enter__.return_value = mock_ydl
+
+        worker = PlaylistFetchWorker(
+            "https://youtube.com/playlist?list=TEST", chunk_size=2, chunk_interval=60
+        )
+        chunks, results = [], []
+        worker.chunk.connect(lambda c: chunks.append([e["id"] for e in c]))
+        worker.result.connect(lambda r: results.append(r))
+        worker.run()
+
+        assert chunks == [["v0", "v1"], ["v2", "v3"], ["v4"]]
+        assert [e["id"] for e in results[0]] == ["v0", "v1", "v2", "v3", "v4"]
+
+
+# test ze link do filmu z lista jest rozwijany do strony playlisty
+def test_playlist_fetch_worker_follows_url_result():
+    from app.workers.playlist_fetch_worker import PlaylistFetchWorker
+
+    mock_ydl = MagicMock()
+    mock_ydl.extract_info.side_effect = [
+        {
+            "_type": "url",
+            "url": "https://www.youtube.com/playlist?list=TEST",
+            "ie_key": "YoutubeTab",
+        },
+        {"entries": [{"id": "video1", "title": "A"}]},
+    ]
+
+    with patch("yt_dlp.YoutubeDL") as mock_ytdlp:
+        mock_ytdlp.return_value.__enter__.return_value = mock_ydl
+
+        worker = PlaylistFetchWorker("https://youtube.com/watch?v=video1&list=TEST")
+        results = []
+        worker.result.connect(lambda r: results.append(r))
+        worker.run()
+
+        assert [e["id"] for e in results[0]] == ["video1"]
+        second = mock_ydl.extract_info.call_args_list[1]
+        assert second.args[0] == "https://www.youtube.com/playlist?list=TEST"
+        assert second.kwargs["ie_key"] == "YoutubeTab"
+
+
+# test ze zebrane elementy docieraja do ui, gdy pobieranie kolejnej strony trwa
+def test_playlist_fetch_worker_flushes_during_slow_page(qtbot):
+    import threading
+
+    from app.workers.playlist_fetch_worker import PlaylistFetchWorker
+
+    next_page = threading.Event()
+
+    def entries():
+        yield {"id": "v0", "title": "0"}
+        next_page.wait(5)  # kolejna strona jeszcze sie pobiera
+        yield {"id": "v1", "title": "1"}
+
+    mock_ydl = MagicMock()
+    mock_ydl.extract_info.return_value = {"entries": entries()}
+
+    with patch("yt_dlp.YoutubeDL") as mock_ytdlp:
+        mock_ytdlp.return_value.__enter__.return_value = mock_ydl
+
+        worker = PlaylistFetchWorker(
+            "https://youtube.com/playlist?list=TEST", chunk_interval=0.05
+        )
+        chunks = []
+        worker.chunk.connect(lambda c: chunks.append([e["id"] for e in c]))
+        with qtbot.waitSignal(worker.result, timeout=5000):
+            worker.start()
+            qtbot.waitUntil(lambda: chunks == [["v0"]], timeout=2000)
+            next_page.set()
+        worker.wait()
+
+    assert chunks == [["v0"], ["v1"]]
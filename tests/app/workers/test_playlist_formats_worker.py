@@ -138,6 +138,7 @@ def test_playlist_formats_worker_formats_muxed():
         assert "22" in format_ids
         assert "18" in format_ids
         assert "bestaudio" in format_ids
+        assert "bestaudio:m4a" in format_ids
 
 
 # test budowania listy formatow - video-only + audio
@@ -268,10 +269,9 @@ def test_playlist_formats_worker_multiple_entries():
         worker.row_ready.connect(lambda r, t, d, o: rows.append((r, t, d, o)))
         worker.run()
 
+        # wiersze moga przychodzic w kolejnosci ukonczenia
         assert len(rows) == 3
-        assert rows[0][0] == 0
-        assert rows[1][0] == 1
-        assert rows[2][0] == 2
+        assert sorted(r[0] for r in rows) == [0, 1, 2]
 
 
 # test obslugi braku miniaturek
@@ -340,3 +340,183 @@ def test_playlist_formats_worker_no_duration():
 
         _, _, duration, _ = rows[0]
         assert duration == 0
+
+
+# test ze wpisy znane z cache metadanych nie sa ponownie wyciagane
+def test_playlist_formats_worker_uses_metadata_cache():
+    from app.workers.playlist_formats_worker import PlaylistFormatsWorker
+
+    mock_ydl = MagicMock()
+    mock_ydl.extract_info.return_value = {
+        "duration": 42,
+        "thumbnails": [{"url": "http://t.jpg", "width": 1, "height": 1}],
+        "formats": [
+            {
+                "format_id": "18",
+                "ext": "mp4",
+                "vcodec": "avc1",
+                "acodec": "mp4a",
+                "height": 360,
+            }
+        ],
+    }
+
+    with patch("yt_dlp.YoutubeDL") as mock_ytdlp:
+        mock_ytdlp.return_value.__enter__.return_value = mock_ydl
+
+        entries = [
+            {"id": "AAA", "url": "https://youtube.com/watch?v=AAA"},
+            {"id": "BBB", "url": "https://youtube.com/watch?v=BBB"},
+        ]
+        first, second = [], []
+        worker = PlaylistFormatsWorker(entries)
+        worker.row_ready.connect(lambda *a: first.append(a))
+        worker.run()
+
+        worker = PlaylistFormatsWorker(entries)
+        worker.row_ready.connect(lambda *a: second.append(a))
+        worker.run()
+
+        # drugie otwarcie playlisty nie odpytuje yt-dlp
+        assert mock_ydl.extract_info.call_count == 2
+        assert sorted(first) == sorted(second)
+        assert all(r[2] == 42 for r in second)
+
+
+# fabryka mockow yt-dlp ktorych extract_info zalezy od url
+def _ydl_by_url(handler):
+    def make(opts):
+        ydl = MagicMock()
+        ydl.__enter__.return_value = ydl
+        ydl.extract_info.side_effect = lambda url, download=False: handler(url)
+        return ydl
+
+    return make
+
+
+def _info(duration):
+    return {
+        "duration": duration,
+        "thumbnails": [],
+        "formats": [
+            {
+                "format_id": "18",
+                "ext": "mp4",
+                "vcodec": "avc1",
+                "acodec": "mp4a",
+                "height": 360,
+            }
+        ],
+    }
+
+
+# test ze blad jednego filmu nie zatrzymuje pozostalych wierszy
+def test_playlist_formats_worker_isolates_failures():
+    from app.workers.playlist_formats_worker import PlaylistFormatsWorker
+
+    def handler(url):
+        if url.endswith("=2"):
+            raise Exception("Video unavailable")
+        return _info(int(url[-1]) * 10)
+
+    with patch("yt_dlp.YoutubeDL", side_effect=_ydl_by_url(handler)):
+        entries = [{"url": f"https://youtube.com/watch?v={i}"} for i in range(1, 5)]
+        worker = PlaylistFormatsWorker(entries, concurrency=2, retries=0)
+
+        rows, failed, summary = [], [], []
+        worker.row_ready.connect(lambda r, t, d, o: rows.append((r, d)))
+        worker.row_failed.connect(lambda r, m: failed.append((r, m)))
+        worker.summary.connect(lambda ok, bad: summary.append((ok, bad)))
+        worker.run()
+
+        assert sorted(rows) == [(0, 10), (2, 30), (3, 40)]
+        assert failed == [(1, "Video unavailable")]
+        assert summary == [(3, 1)]
+
+
+# test ponowienia nieudanej pozycji w kolejnej rundzie
+def test_playlist_formats_worker_retries_failed_rows():
+    from app.workers.playlist_formats_worker import PlaylistFormatsWorker
+
+    attempts = []
+
+    def handler(url):
+        attempts.append(url)
+        if len(attempts) == 1:
+            raise Exception("Temporary failure")
+        return _info(7)
+
+    with patch("yt_dlp.YoutubeDL", side_effect=_ydl_by_url(handler)):
+        worker = PlaylistFormatsWorker(
+            [{"url": "https://youtube.com/watch?v=R"}], retries=1
+        )
+
+        rows, failed, summary = [], [], []
+        worker.row_ready.connect(lambda r, t, d, o: rows.append((r, d)))
+        worker.row_failed.connect(lambda r, m: failed.append(r))
+        worker.summary.connect(lambda ok, bad: summary.append((ok, bad)))
+        worker.run()
+
+        assert len(attempts) == 2
+        assert rows == [(0, 7)]
+        assert failed == []
+        assert summary == [(1, 0)]
+
+
+# test ze ekstrakcje ida rownolegle w ograniczonej puli
+def test_playlist_formats_worker_runs_concurrently():
+    import threading
+    import time
+
+    from app.workers.playlist_formats_worker import PlaylistFormatsWorker
+
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def handler(url):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return _info(1)
+
+    with patch("yt_dlp.YoutubeDL", side_effect=_ydl_by_url(handler)):
+        entries = [{"url": f"https://youtube.com/watch?v={i}"} for i in range(12)]
+        worker = PlaylistFormatsWorker(entries, concurrency=3)
+
+        rows = []
+        worker.row_ready.connect(lambda r, t, d, o: rows.append(r))
+        worker.run()
+
+        assert sorted(rows) == list(range(12))
+        assert 1 < peak[0] <= 3
+
+
+# test trybu streaming: wiersze z kolejnych porcji sa wczytywane przed koncem listy
+def test_playlist_formats_worker_streaming_input():
+    from app.workers.playlist_formats_worker import PlaylistFormatsWorker
+
+    with patch(
+        "yt_dlp.YoutubeDL", side_effect=_ydl_by_url(lambda url: _info(int(url[-1])))
+    ):
+        first = [{"url": "https://youtube.com/watch?v=1"}]
+        worker = PlaylistFormatsWorker(first, streaming=True)
+        rows, summary = [], []
+        worker.row_ready.connect(lambda r, t, d, o: rows.append((r, d)))
+        worker.summary.connect(lambda ok, bad: summary.append((ok, bad)))
+
+        worker.add_entries(
+            [
+                {"url": "https://youtube.com/watch?v=2"},
+                {"url": "https://youtube.com/watch?v=3"},
+            ]
+        )
+        worker.close_input()
+        worker.run()
+
+        assert sorted(rows) == [(0, 1), (1, 2), (2, 3)]
+        assert summary == [(3, 0)]
+        assert len(worker.entries) == 3
@@ -0,0 +1,189 @@
+import threading
+
+from PyQt6.QtCore import QBuffer, QIODevice
+from PyQt6.QtGui import QColor, QImage
+
+from app.workers.thumbnail_service import ROW_SIZE, ThumbnailService, decode_scaled
+
+
+def _png(w=640, h=360) -> bytes:
+    img = QImage(w, h, QImage.Format.Format_RGB32)
+    img.fill(QColor("red"))
+    buf = QBuffer()
+    buf.open(QIODevice.OpenModeFlag.WriteOnly)
+    img.save(buf, "PNG")
+    return bytes(buf.data())
+
+
+# test dekodowania i skalowania z zachowaniem proporcji
+def test_decode_scaled(qapp):
+    img = decode_scaled(_png(640, 480), (120, 68))
+
+    assert img.height() == 68
+    assert img.width() in (90, 91)  # 4:3 miesci sie w 120x68 na wysokosc
+    assert decode_scaled(b"not an image", (120, 68)) is None
+
+
+# test dostarczenia gotowego obrazu sygnalem ready
+def test_service_delivers_image(qtbot):
+    threads = []
+
+    def fetch(url):
+        threads.append(threading.current_thread().name)
+        return _png()
+
+    svc = ThumbnailService(fetch=fetch)
+    with qtbot.waitSignal(svc.ready, timeout=5000) as blocker:
+        svc.request("row:0", "http://img/0.jpg", ROW_SIZE)
+
+    key, img = blocker.args
+    assert key == "row:0"
+    assert img.width() == 120
+    assert threads[0].startswith("thumbnails")  # poza watkiem gui
+    assert svc.pending() == 0
+    svc.shutdown()
+
+
+# test bledu pobierania zglaszanego sygnalem failed
+def test_service_reports_failure(qtbot):
+    def fetch(url):
+        raise OSError("timeout")
+
+    svc = ThumbnailService(fetch=fetch)
+    with qtbot.waitSignal(svc.failed, timeout=5000) as blocker:
+        svc.request("single", "http://img/x.jpg", ROW_SIZE)
+
+    assert blocker.args == ["single", "timeout"]
+    svc.shutdown()
+
+
+# test ze anulowane zadanie nie dostarcza wyniku, nawet gdy fetch juz trwa
+def test_service_cancel_in_flight(qtbot):
+    started = threading.Event()
+    release = threading.Event()
+
+    def fetch(url):
+        started.set()
+        release.wait(5)
+        return _png()
+
+    svc = ThumbnailService(fetch=fetch)
+    ready = []
+    svc.ready.connect(lambda k, i: ready.append(k))
+    svc.request("row:1", "http://img/1.jpg", ROW_SIZE)
+    assert started.wait(5)
+
+    svc.cancel("row:1")
+    release.set()
+    qtbot.wait(200)
+
+    assert ready == []
+    assert svc.pending() == 0
+    svc.shutdown()
+
+
+# test ze nowe zadanie dla tego samego klucza zastepuje poprzednie
+def test_service_newer_request_wins(qtbot):
+    release = threading.Event()
+
+    def fetch(url):
+        if url.endswith("old.jpg"):
+            release.wait(5)
+            return _png(100, 100)
+        return _png(640, 360)
+
+    svc = ThumbnailService(fetch=fetch)
+    results = []
+    svc.ready.connect(lambda k, i: results.append((k, i.width(), i.height())))
+
+    svc.request("single", "http://img/old.jpg", (320, 180))
+    with qtbot.waitSignal(svc.ready, timeout=5000):
+        svc.request("single", "http://img/new.jpg", (320, 180))
+    release.set()
+    qtbot.wait(200)
+
+    assert results == [("single", 320, 180)]
+    svc.shutdown()
+
+
+# test wyznaczania url miniatury dla linku do filmu w tle
+def test_service_request_for_video(qtbot, mocker):
+    resolve = mocker.patch(
+        "app.workers.thumbnail_service.get_thumbnail_url",
+        return_value="http://img/hq.jpg",
+    )
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        return _png()
+
+    svc = ThumbnailService(fetch=fetch)
+    with qtbot.waitSignal(svc.ready, timeout=5000):
+        svc.request_for_video("single", "https://youtu.be/dQw4w9WgXcQ")
+
+    resolve.assert_called_once_with("https://youtu.be/dQw4w9WgXcQ")
+    assert fetched == ["http://img/hq.jpg"]
+    svc.shutdown()
+
+
+# test lru w pamieci - budzet w bajtach i kolejnosc usuwania
+def test_image_lru_budget(qapp):
+    from app.workers.thumbnail_service import ImageLRU
+
+    img = QImage(10, 10, QImage.Format.Format_RGB32)  # 400 bajtow
+    lru = ImageLRU(max_bytes=800)
+    lru.put(("a", 10, 10), img)
+    lru.put(("b", 10, 10), img)
+    lru.get(("a", 10, 10))
+    lru.put(("c", 10, 10), img)
+
+    assert lru.get(("b", 10, 10)) is None
+    assert lru.get(("a", 10, 10)) is not None
+    assert lru.total_bytes() == 800
+
+
+# test ze drugie zadanie dla tego samego filmu i rozmiaru nie pobiera nic
+def test_service_memory_cache_hit(qtbot, tmp_path):
+    from app.core.thumb_cache import ThumbDiskCache
+
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        return _png()
+
+    svc = ThumbnailService(fetch=fetch, disk=ThumbDiskCache(tmp_path))
+    with qtbot.waitSignal(svc.ready, timeout=5000):
+        svc.request("row:0", "http://img/a.jpg", ROW_SIZE, video_id="vid1")
+
+    ready = []
+    svc.ready.connect(lambda k, i: ready.append((k, i.width())))
+    svc.request("row:7", "http://img/a.jpg", ROW_SIZE, video_id="vid1")
+
+    assert ready == [("row:7", 120)]  # trafienie od razu, bez watku
+    assert fetched == ["http://img/a.jpg"]
+    svc.shutdown()
+
+
+# test ze inny rozmiar tego samego filmu korzysta z bajtow z dysku
+def test_service_disk_cache_other_size(qtbot, tmp_path):
+    from app.core.thumb_cache import ThumbDiskCache
+
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        return _png()
+
+    disk = ThumbDiskCache(tmp_path)
+    svc = ThumbnailService(fetch=fetch, disk=disk)
+    with qtbot.waitSignal(svc.ready, timeout=5000):
+        svc.request("row:0", "http://img/a.jpg", ROW_SIZE, video_id="vid1")
+    with qtbot.waitSignal(svc.ready, timeout=5000) as blocker:
+        svc.request("single", "http://img/a.jpg", (320, 180), video_id="vid1")
+
+    assert blocker.args[1].width() == 320
+    assert fetched == ["http://img/a.jpg"]
+    assert disk.get("vid1") is not None
+    svc.shutdown()
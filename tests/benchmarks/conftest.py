@@ -0,0 +1,190 @@
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import pytest
+
+# katalog z zapisanymi przebiegami (wzgledem katalogu projektu)
+BENCH_DIR = ".benchmarks"
+# minimalny czas jednej serii przy samodzielnym doborze liczby wywolan
+_MIN_ROUND_S = 0.05
+_RESULTS = pytest.StashKey[Dict[str, dict]]()
+_BASELINE = pytest.StashKey[Optional[Dict[str, dict]]]()
+
+
+# pomiary pod coverage/debuggerem nie sa miarodajne - nie sa zapisywane ani
+# porownywane (benchmarki warto uruchamiac z --no-cov)
+def _traced() -> bool:
+    return sys.gettrace() is not None
+
+
+def _bench_path(config: pytest.Config, name: str) -> Path:
+    path = Path(name)
+    if path.suffix == ".json" or path.exists():
+        return path
+    return Path(config.rootpath) / BENCH_DIR / f"{name}.json"
+
+
+def _baseline(config: pytest.Config) -> Optional[Dict[str, dict]]:
+    if _BASELINE not in config.stash:
+        name = config.getoption("--bench-compare")
+        data = None
+        if name:
+            path = _bench_path(config, name)
+            if not path.exists():
+                raise pytest.UsageError(f"brak zapisanego przebiegu: {path}")
+            data = json.loads(path.read_text(encoding="utf-8"))["results"]
+        config.stash[_BASELINE] = data
+    return config.stash[_BASELINE]
+
+
+# mierzy fn w stylu pytest-benchmark: number wywolan na serie (domyslnie
+# dobierane tak, by seria trwala >= 50 ms), repeat serii, wynikiem jest
+# najlepszy czas jednego wywolania; z --bench-compare spowolnienie ponad
+# --bench-threshold procent wzgledem bazy konczy test bledem
+@pytest.fixture
+def bench(request) -> Callable[..., float]:
+    config = request.config
+    results = config.stash.setdefault(_RESULTS, {})
+
+    def run(
+        fn: Callable[[], object],
+        *,
+        name: str = "",
+        number: Optional[int] = None,
+        repeat: int = 5,
+    ) -> float:
+        timer = timeit.Timer(fn)
+        if number is None:
+            number = 1
+            while timer.timeit(number) < _MIN_ROUND_S and number < 1_000_000:
+                number *= 10 if number < 1000 else 2
+        rounds = [t / number for t in timer.repeat(repeat, number)]
+        key = request.node.name + (f"::{name}" if name else "")
+        best = min(rounds)
+        results[key] = {
+            "min": best,
+            "median": statistics.median(rounds),
+            "number": number,
+            "repeat": repeat,
+            "traced": _traced(),
+        }
+        base = (_baseline(config) or {}).get(key)
+        if base and not _traced():
+            limit = base["min"] * (1 + config.getoption("--bench-threshold") / 100)
+            if best > limit:
+                pytest.fail(
+                    f"{key}: {best * 1e6:.2f} us/wywolanie, baza "
+                    f"{base['min'] * 1e6:.2f} us (+{(best / base['min'] - 1):.0%})"
+                )
+        return best
+
+    return run
+
+
+# zapisuje wyniki przebiegu (--bench-save) razem z opisem srodowiska
+def pytest_sessionfinish(session) -> None:
+    config = session.config
+    name = config.getoption("--bench-save")
+    results = config.stash.get(_RESULTS, {})
+    if not name or not results or any(r["traced"] for r in results.values()):
+        return
+    path = _bench_path(config, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "saved": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": {
+            k: {f: v for f, v in r.items() if f != "traced"}
+            for k, r in sorted(results.items())
+        },
+    }
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+# tabela wynikow na koncu przebiegu (z roznica wzgledem bazy, jesli podana)
+def pytest_terminal_summary(terminalreporter, config) -> None:
+    results = config.stash.get(_RESULTS, {})
+    if not results:
+        return
+    tr = terminalreporter
+    tr.section("benchmarki (us na wywolanie)")
+    if any(r["traced"] for r in results.values()):
+        tr.write_line("pomiar pod coverage/debuggerem: bez zapisu i porownania")
+    base = _baseline(config) or {}
+    for key, r in sorted(results.items()):
+        line = f"{key:<60} {r['min'] * 1e6:>12.2f} (mediana {r['median'] * 1e6:.2f})"
+        if key in base:
+            line += f"  {r['min'] / base[key]['min'] - 1:+.0%}"
+        tr.write_line(line)
+
+
+_VCODECS = ["avc1.640028", "vp09.00.40.08", "av01.0.08M.08", "avc1.4d401f"]
+_ACODECS = ["mp4a.40.2", "opus", "mp4a.40.5"]
+_HEIGHTS = [144, 240, 360, 480, 720, 1080, 1440, 2160, 4320]
+
+
+# fabryka syntetycznych info dictow z duza liczba formatow (deterministyczna)
+@pytest.fixture
+def synthetic_info():
+    def make(n_formats: int = 150, seed: int = 0) -> dict:
+        rnd = random.Random(seed)
+        formats = []
+        for i in range(n_formats):
+            kind = rnd.random()
+            if kind < 0.6:
+                # video-only w roznych kodekach i kontenerach
+                vcodec = rnd.choice(_VCODECS)
+                formats.append(
+                    {
+                        "format_id": f"v{i}",
+                        "ext": "mp4" if vcodec.startswith(("avc1", "av01")) else "webm",
+                        "vcodec": vcodec,
+                        "acodec": "none",
+                        "height": rnd.choice(_HEIGHTS),
+                        "fps": rnd.choice([24, 25, 30, 48, 60]),
+                    }
+                )
+            elif kind < 0.8:
+                formats.append(
+                    {
+                        "format_id": f"a{i}",
+                        "ext": rnd.choice(["m4a", "webm"]),
+                        "vcodec": "none",
+                        "acodec": rnd.choice(_ACODECS),
+                        "abr": rnd.choice([48, 64, 128, 160]),
+                    }
+                )
+            elif kind < 0.95:
+                formats.append(
+                    {
+                        "format_id": f"m{i}",
+                        "ext": rnd.choice(["mp4", "webm", "3gp"]),
+                        "vcodec": rnd.choice(_VCODECS),
+                        "acodec": rnd.choice(_ACODECS),
+                        "height": rnd.choice(_HEIGHTS),
+                        "fps": rnd.choice([25, 30]),
+                    }
+                )
+            else:
+                # storyboardy bez obrazu i dzwieku
+                formats.append(
+                    {
+                        "format_id": f"sb{i}",
+                        "ext": "mhtml",
+                        "vcodec": "none",
+                        "acodec": "none",
+                    }
+                )
+        return {"id": f"SYN{seed}", "duration": 600, "formats": formats}
+
+    return make
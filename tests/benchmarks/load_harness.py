@@ -0,0 +1,249 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from app.core.download import (
+    PHASE_DOWNLOADING,
+    PHASE_FINISHED,
+    ProgressCb,
+    ProgressEvent,
+    download_audio_mp3,
+    download_video_mp4,
+)
+from app.core.postprocess import PostprocessPool
+from app.core.ydl_pool import YDLPool
+from app.core.ytclient import PROFILES, DownloadProfile, YTClient
+
+from .media_server import MediaServer, NetConfig, replicate, synthetic_media
+
+# harness obciazenia end-to-end bez sieci: zadania ida przez YTClient i funkcje
+# z app.core.download (ekstraktor generic yt-dlp) do lokalnego MediaServer,
+# raport: przepustowosc, czas do pierwszego bajtu i cpu na zadanie dla kilku
+# poziomow rownoleglosci
+#
+#   python -m tests.benchmarks.load_harness --jobs 8 --concurrency 1 2 4 \
+#       --latency 0.05 --rate 2M --error-rate 0.05
+
+# rodzaje zadan: mp4 (plik ciagly), hls (fragmenty + remux), mp3 (konwersja)
+KINDS = ("mp4", "hls", "mp3")
+
+
+# wynik jednego zadania
+class JobResult(NamedTuple):
+    ok: bool
+    seconds: float  # od startu zadania do zakonczenia (z konwersja)
+    ttfb: Optional[float]  # od startu do pierwszego pobranego bajtu mediow
+    nbytes: int  # bajty mediow pobrane przez yt-dlp
+    error: str = ""
+
+
+# wynik serii zadan jednego rodzaju przy danej rownoleglosci
+class LoadReport(NamedTuple):
+    kind: str
+    concurrency: int
+    wall: float
+    cpu: float  # cpu procesu i zakonczonych procesow potomnych (ffmpeg)
+    jobs: List[JobResult]
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for j in self.jobs if not j.ok)
+
+    # laczna przepustowosc serii w MB/s
+    @property
+    def throughput(self) -> float:
+        return sum(j.nbytes for j in self.jobs) / 1e6 / self.wall if self.wall else 0.0
+
+    @property
+    def ttfb_median(self) -> Optional[float]:
+        values = [j.ttfb for j in self.jobs if j.ttfb is not None]
+        return statistics.median(values) if values else None
+
+    @property
+    def cpu_per_job(self) -> float:
+        return self.cpu / len(self.jobs) if self.jobs else 0.0
+
+
+def _cpu_now() -> float:
+    t = os.times()
+    return time.process_time() + t.children_user + t.children_system
+
+
+# sledzi pierwszy bajt i bajty pobrane (najwieksza wartosc na plik)
+class _JobProgress:
+    def __init__(self, start: float):
+        self.start = start
+        self.ttfb: Optional[float] = None
+        self.sizes: Dict[str, int] = {}
+
+    def __call__(self, ev: ProgressEvent) -> None:
+        if ev.phase not in (PHASE_DOWNLOADING, PHASE_FINISHED):
+            return
+        if ev.phase == PHASE_DOWNLOADING and ev.downloaded and self.ttfb is None:
+            self.ttfb = time.perf_counter() - self.start
+        size = ev.total if ev.phase == PHASE_FINISHED and ev.total else ev.downloaded
+        # w trakcie pobierania zglaszany jest plik .part, na koniec docelowy
+        name = ev.filename[:-5] if ev.filename.endswith(".part") else ev.filename
+        self.sizes[name] = max(self.sizes.get(name, 0), size)
+
+
+def _job(
+    kind: str, yt: YTClient, pool: PostprocessPool
+) -> Callable[[str, str, ProgressCb], object]:
+    if kind == "mp3":
+        return lambda url, out, cb: download_audio_mp3(
+            yt, url, out, progress_cb=cb, postprocess=pool
+        )
+    return lambda url, out, cb: download_video_mp4(yt, url, out, "best", cb)
+
+
+# uruchamia zadania kind dla urls z podana rownoleglascia; kazde zadanie pisze
+# do wlasnego katalogu w out_dir
+def run_load(
+    kind: str,
+    urls: Sequence[str],
+    concurrency: int,
+    out_dir: Path,
+    ffmpeg: str,
+    profile: Optional[DownloadProfile] = None,
+) -> LoadReport:
+    yt = YTClient(ffmpeg_path=ffmpeg, pool=YDLPool(), profile=profile)
+    pool = PostprocessPool(workers=concurrency)
+    run = _job(kind, yt, pool)
+
+    def one(i: int, url: str) -> JobResult:
+        progress = _JobProgress(time.perf_counter())
+        try:
+            run(url, str(out_dir / f"{kind}-{concurrency}-{i}"), progress)
+            ok, error = True, ""
+        except Exception as e:  # noqa: BLE001 - blad zadania trafia do raportu
+            ok, error = False, f"{type(e).__name__}: {e}"
+        return JobResult(
+            ok,
+            time.perf_counter() - progress.start,
+            progress.ttfb,
+            sum(progress.sizes.values()),
+            error,
+        )
+
+    cpu0 = _cpu_now()
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as ex:
+            jobs = list(ex.map(one, range(len(urls)), urls))
+    finally:
+        pool.shutdown()
+    wall = time.perf_counter() - start
+    return LoadReport(kind, concurrency, wall, _cpu_now() - cpu0, jobs)
+
+
+# serwer z syntetycznymi mediami (po kopii na zadanie), w kontekscie
+class LoadBench:
+    def __init__(
+        self,
+        ffmpeg: str,
+        work_dir: Path,
+        jobs: int,
+        config: NetConfig,
+        seconds: int = 4,
+    ):
+        self.ffmpeg = ffmpeg
+        self.work_dir = work_dir
+        self.media = synthetic_media(ffmpeg, work_dir / "media", seconds=seconds)
+        files, self._paths = replicate(self.media, jobs)
+        self.server = MediaServer(files, config)
+
+    def urls(self, kind: str) -> List[str]:
+        key = "hls" if kind == "hls" else "progressive"
+        return [self.server.url(p) for p in self._paths[key]]
+
+    def run(
+        self, kind: str, concurrency: int, profile: Optional[DownloadProfile] = None
+    ) -> LoadReport:
+        return run_load(
+            kind,
+            self.urls(kind),
+            concurrency,
+            self.work_dir / "out",
+            self.ffmpeg,
+            profile,
+        )
+
+    def __enter__(self) -> "LoadBench":
+        self.server.__enter__()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.__exit__(*exc)
+
+
+def format_report(reports: Sequence[LoadReport]) -> str:
+    lines = [
+        f"{'rodzaj':<6} {'rown.':>5} {'zadania':>8} {'bledy':>5} {'czas s':>7} "
+        f"{'MB/s':>7} {'ttfb ms':>8} {'cpu/zad s':>9}"
+    ]
+    for r in reports:
+        ttfb = r.ttfb_median
+        lines.append(
+            f"{r.kind:<6} {r.concurrency:>5} {len(r.jobs):>8} {r.failed:>5} "
+            f"{r.wall:>7.2f} {r.throughput:>7.2f} "
+            f"{(f'{ttfb * 1e3:.0f}' if ttfb is not None else '-'):>8} "
+            f"{r.cpu_per_job:>9.3f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import imageio_ffmpeg
+
+    from app.core.bandwidth import parse_rate
+
+    p = argparse.ArgumentParser(description="Harness obciazenia end-to-end (offline)")
+    p.add_argument("--kind", nargs="+", choices=KINDS, default=list(KINDS))
+    p.add_argument("--concurrency", nargs="+", type=int, default=[1, 2, 4])
+    p.add_argument("--jobs", type=int, default=8)
+    p.add_argument("--latency", type=float, default=0.05, help="sekundy na zapytanie")
+    p.add_argument("--rate", default="0", help="limit na polaczenie, np. 2M")
+    p.add_argument("--link-rate", default="0", help="limit wspolny, np. 8M")
+    p.add_argument("--error-rate", type=float, default=0.0)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--profile", choices=sorted(PROFILES), default="standard")
+    args = p.parse_args(argv)
+
+    config = NetConfig(
+        latency=args.latency,
+        rate=parse_rate(args.rate),
+        link_rate=parse_rate(args.link_rate),
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    reports = []
+    with tempfile.TemporaryDirectory(prefix="justdownit-load-") as tmp:
+        ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+        with LoadBench(ffmpeg, Path(tmp), args.jobs, config) as bench:
+            for kind in args.kind:
+                for n in args.concurrency:
+                    reports.append(bench.run(kind, n, PROFILES[args.profile]))
+                    print(format_report(reports[-1:]).splitlines()[-1], flush=True)
+            served = bench.server
+    print()
+    print(format_report(reports))
+    print(
+        f"\nserwer: {served.requests} zapytan, {served.failures} wstrzyknietych "
+        f"bledow, {served.bytes_sent / 1e6:.1f} MB"
+    )
+    for r in reports:
+        for j in r.jobs:
+            if not j.ok:
+                print(f"{r.kind}/{r.concurrency}: {j.error}", file=sys.stderr)
+    return 1 if any(r.failed for r in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
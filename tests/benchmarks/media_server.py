@@ -0,0 +1,246 @@
+import random
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from app.core.bandwidth import BandwidthLimiter
+
+# lokalny serwer mediow dla benchmarkow i harnessu obciazenia: pliki ciagle
+# (z obsluga range) i playlisty hls z segmentami, z opoznieniem, limitem
+# przepustowosci i wstrzykiwanymi bledami
+
+# porcja zapisu odpowiedzi (co tyle bajtow dziala limit przepustowosci)
+_WRITE_CHUNK = 16 * 1024
+# segmenty hls: przy bledzie moga dostac tez 503 (pobieranie fragmentow ponawia)
+_SEGMENT_SUFFIXES = (".ts", ".m4s")
+
+
+# warunki sieci symulowane przez serwer
+class NetConfig(NamedTuple):
+    latency: float = 0.0  # sekundy przed kazda odpowiedzia (rtt + ttfb serwera)
+    rate: int = 0  # bajty/s na jedno polaczenie (0 = bez limitu)
+    link_rate: int = 0  # bajty/s wspolne dla wszystkich polaczen (0 = bez limitu)
+    error_rate: float = 0.0  # udzial odpowiedzi mediow, ktore koncza sie bledem
+    seed: int = 0
+
+
+# plik serwowany pod sciezka: typ mime i zawartosc
+class MediaFile(NamedTuple):
+    content_type: str
+    body: bytes
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MediaServer"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        srv = self.server
+        path = self.path.split("?", 1)[0]
+        media = srv.files.get(path)
+        if srv.config.latency:
+            time.sleep(srv.config.latency)
+        if media is None:
+            self._send_plain(404, b"not found")
+            return
+        failure = srv.pick_failure(path)
+        if failure == "status":
+            self._send_plain(503, b"busy")
+            return
+        self._send_media(media, drop=failure == "drop")
+
+    def _send_plain(self, code: int, body: bytes):
+        self.send_response(code)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # odpowiedz z obsluga range; drop zrywa polaczenie w polowie tresci
+    def _send_media(self, media: MediaFile, drop: bool):
+        size = len(media.body)
+        start, end = 0, size - 1
+        rng = self.headers.get("Range")
+        if rng and rng.startswith("bytes="):
+            first, _, last = rng[6:].partition("-")
+            start = int(first or 0)
+            end = min(int(last), end) if last else end
+        if rng:
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Type", media.content_type)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if drop:
+            end = start + (end - start) // 2
+        self._write_limited(memoryview(media.body)[start : end + 1])
+        if drop:
+            self.close_connection = True
+            self.wfile.flush()
+            self.connection.shutdown(2)
+
+    def _write_limited(self, body: memoryview):
+        srv = self.server
+        own = BandwidthLimiter(srv.config.rate).channel() if srv.config.rate else None
+        shared = srv.link.channel() if srv.link is not None else None
+        try:
+            for i in range(0, len(body), _WRITE_CHUNK):
+                chunk = body[i : i + _WRITE_CHUNK]
+                for ch in (own, shared):
+                    if ch is not None:
+                        ch.throttle(len(chunk))
+                self.wfile.write(chunk)
+                srv.count_bytes(len(chunk))
+        finally:
+            if shared is not None:
+                shared.close()
+
+
+# serwer http na losowym porcie; files: sciezka -> MediaFile
+# zerwane przez klienta polaczenia (np. ekstraktor generic czyta tylko
+# naglowki) nie sa bledem serwera
+class MediaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, files: Dict[str, MediaFile], config: NetConfig = NetConfig()):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.files = files
+        self.config = config
+        self.link = BandwidthLimiter(config.link_rate) if config.link_rate else None
+        self._rnd = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.bytes_sent = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    # losuje blad dla odpowiedzi z mediami; playlisty sa zawsze poprawne,
+    # pliki ciagle tylko sie urywaja (ekstraktor generic ich nie powtarza,
+    # a pobieranie dokancza range), segmenty moga tez dostac 503
+    def pick_failure(self, path: str) -> Optional[str]:
+        with self._lock:
+            self.requests += 1
+            if path.endswith(".m3u8") or self._rnd.random() >= self.config.error_rate:
+                return None
+            self.failures += 1
+            if path.endswith(_SEGMENT_SUFFIXES) and self._rnd.random() < 0.5:
+                return "status"
+            return "drop"
+
+    def count_bytes(self, n: int) -> None:
+        with self._lock:
+            self.bytes_sent += n
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def __enter__(self) -> "MediaServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+# generuje prawdziwe media ffmpeg-iem: plik mp4 (h264 + aac) i ta sama tresc
+# jako playlista hls z segmentami fmp4 (jak wspolczesne serwisy, yt-dlp skleja
+# je bez remuxu); zwraca pliki do MediaServer
+def synthetic_media(
+    ffmpeg: str, work_dir: Path, seconds: int = 4, video_kbps: int = 2000
+) -> Dict[str, MediaFile]:
+    work_dir.mkdir(parents=True, exist_ok=True)
+    src = work_dir / "clip.mp4"
+    base = [ffmpeg, "-hide_banner", "-loglevel", "error", "-y"]
+    subprocess.run(
+        [
+            *base,
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=size=640x360:rate=25:duration={seconds}",
+            "-f",
+            "lavfi",
+            "-i",
+            f"sine=frequency=440:duration={seconds}",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-g",
+            "25",  # klatka kluczowa co sekunde, zeby hls mial segmenty 1 s
+            "-b:v",
+            f"{video_kbps}k",
+            "-c:a",
+            "aac",
+            "-b:a",
+            "128k",
+            "-shortest",
+            str(src),
+        ],
+        check=True,
+    )
+    hls = work_dir / "hls"
+    hls.mkdir(exist_ok=True)
+    subprocess.run(
+        [
+            *base,
+            "-i",
+            str(src),
+            "-c",
+            "copy",
+            "-f",
+            "hls",
+            "-hls_time",
+            "1",
+            "-hls_list_size",
+            "0",
+            "-hls_segment_type",
+            "fmp4",
+            "-hls_segment_filename",
+            str(hls / "seg%03d.m4s"),
+            str(hls / "index.m3u8"),
+        ],
+        check=True,
+    )
+    files = {"/clip.mp4": MediaFile("video/mp4", src.read_bytes())}
+    for f in sorted(hls.iterdir()):
+        ctype = "application/vnd.apple.mpegurl" if f.suffix == ".m3u8" else "video/mp4"
+        files[f"/hls/{f.name}"] = MediaFile(ctype, f.read_bytes())
+    return files
+
+
+# kopie sciezki pod roznymi nazwami (kazde zadanie zapisuje inny plik):
+# /clip.mp4 -> /clip-0.mp4, /clip-1.mp4, ...; hls -> /hls-0/index.m3u8, ...
+def replicate(
+    files: Dict[str, MediaFile], count: int
+) -> Tuple[Dict[str, MediaFile], Dict[str, list]]:
+    out = dict(files)
+    paths: Dict[str, list] = {"progressive": [], "hls": []}
+    for i in range(count):
+        out[f"/clip-{i}.mp4"] = files["/clip.mp4"]
+        paths["progressive"].append(f"/clip-{i}.mp4")
+        for path, media in files.items():
+            if path.startswith("/hls/"):
+                out[path.replace("/hls/", f"/hls-{i}/")] = media
+        paths["hls"].append(f"/hls-{i}/index.m3u8")
+    return out, paths
@@ -0,0 +1,22 @@
+import sys
+
+import pytest
+
+from app.core.format_ladder import build_ladder
+
+# budzet czasu na klasyfikacje 100 formatow (wywolywana raz na wiersz playlisty)
+_BUDGET_PER_100_S = 0.0005
+
+
+# mikro-benchmark klasyfikacji formatow dla roznych rozmiarow info dict
+@pytest.mark.slow
+@pytest.mark.parametrize("n_formats", [100, 250, 500])
+def test_bench_build_ladder(bench, synthetic_info, n_formats):
+    formats = synthetic_info(n_formats)["formats"]
+
+    per_call = bench(lambda: build_ladder(formats).options(), number=200)
+    print(f"build_ladder({n_formats} formatow): {per_call * 1e6:.1f} us/wywolanie")
+
+    # pod coverage/debuggerem czasy nie sa miarodajne
+    if sys.gettrace() is None:
+        assert per_call < _BUDGET_PER_100_S * n_formats / 100
@@ -0,0 +1,85 @@
+import sys
+import time
+
+import pytest
+
+from app.core.ydl_pool import YDLPool
+from app.core.ytclient import PROFILES, DownloadProfile, YTClient
+
+from .media_server import MediaFile, MediaServer, NetConfig
+
+# media serwowane lokalnie z opoznieniem na kazde zapytanie (symulacja rtt)
+_LATENCY_S = 0.05
+_FRAGMENTS = 16
+_FRAGMENT_SIZE = 64 * 1024
+_FILE_SIZE = 4 * 1024 * 1024
+
+
+# bajty bez znaczenia (fixup wylaczony): playlista hls z fragmentami ts i plik
+# ciagly z obsluga range
+@pytest.fixture
+def media_server():
+    playlist = (
+        "#EXTM3U\n#EXT-X-VERSION:3\n#EXT-X-TARGETDURATION:2\n"
+        "#EXT-X-MEDIA-SEQUENCE:0\n"
+        + "".join(f"#EXTINF:2.0,\nseg{i}.ts\n" for i in range(_FRAGMENTS))
+        + "#EXT-X-ENDLIST\n"
+    )
+    files = {
+        "/media.m3u8": MediaFile("application/vnd.apple.mpegurl", playlist.encode()),
+        "/video.mp4": MediaFile("video/mp4", b"\0" * _FILE_SIZE),
+    }
+    for i in range(_FRAGMENTS):
+        files[f"/seg{i}.ts"] = MediaFile("video/mp2t", b"\x47" * _FRAGMENT_SIZE)
+    with MediaServer(files, NetConfig(latency=_LATENCY_S)) as srv:
+        yield srv.base_url
+
+
+# czas pobrania url z danym profilem (swiezy katalog i pula, bez cache yt-dlp)
+def _timed_download(url, profile, out_dir):
+    yt = YTClient(pool=YDLPool(), profile=profile)
+    opts = {
+        "outtmpl": str(out_dir / "%(id)s.%(ext)s"),
+        "fixup": "never",
+        "hls_prefer_native": True,
+        "cachedir": False,
+    }
+    start = time.perf_counter()
+    yt.download(url, opts)
+    return time.perf_counter() - start
+
+
+# benchmark profili: fragmenty hls naraz oraz porcje http i bufor dla pliku
+# ciaglego; kazde zapytanie do serwera kosztuje _LATENCY_S
+@pytest.mark.slow
+def test_bench_fragment_profiles(media_server, tmp_path):
+    hls_mb = _FRAGMENTS * _FRAGMENT_SIZE / 1e6
+    times = {}
+    for name in ("standard", "fast", "max"):
+        out = tmp_path / f"hls-{name}"
+        times[name] = _timed_download(f"{media_server}/media.m3u8", PROFILES[name], out)
+        assert (out / "media.mp4").stat().st_size == _FRAGMENTS * _FRAGMENT_SIZE
+        print(
+            f"hls {name}: {times[name] * 1e3:.0f} ms "
+            f"({hls_mb / times[name]:.1f} MB/s)"
+        )
+
+    file_mb = _FILE_SIZE / 1e6
+    variants = [
+        DownloadProfile("bez porcji", 1, None, 1024),
+        DownloadProfile("porcje 1 MiB", 1, 1024 * 1024, 1024),
+        DownloadProfile("porcje 10 MiB", 1, 10 * 1024 * 1024, 1024),
+        DownloadProfile("bufor 64 KiB", 1, None, 64 * 1024),
+        DownloadProfile("bufor 1 MiB", 1, None, 1024 * 1024),
+    ]
+    for i, profile in enumerate(variants):
+        out = tmp_path / f"file-{i}"
+        took = _timed_download(f"{media_server}/video.mp4", profile, out)
+        assert (out / "video.mp4").stat().st_size == _FILE_SIZE
+        print(f"plik {profile.name}: {took * 1e3:.0f} ms ({file_mb / took:.1f} MB/s)")
+
+    # pod coverage/debuggerem czasy nie sa miarodajne
+    if sys.gettrace() is None:
+        # 16 fragmentow po jednym rtt: 4 naraz musza byc wyraznie szybsze
+        assert times["fast"] < times["standard"] * 0.7
+        assert times["max"] < times["standard"] * 0.7
@@ -0,0 +1,43 @@
+import sys
+
+import pytest
+
+from app.core.bandwidth import BandwidthLimiter
+from app.core.download import ProgressThrottle, _hook
+
+# budzet na jedno wywolanie hooka (yt-dlp wola go po kazdym bloku danych)
+_BUDGET_PER_CALL_S = 30e-6
+_BLOCK = 64 * 1024
+
+
+# mikro-benchmark narzutu _hook na blok danych: sam postep oraz postep
+# z kanalem ogranicznika (limit 0 = bez drzemek, liczy sie tylko ksiegowanie)
+@pytest.mark.slow
+@pytest.mark.parametrize("with_bandwidth", [False, True], ids=["plain", "bandwidth"])
+def test_bench_hook_per_call(bench, with_bandwidth):
+    events = []
+    channel = BandwidthLimiter(0).channel() if with_bandwidth else None
+    hook = _hook(events.append, lambda: False, ProgressThrottle(), channel)
+    d = {
+        "status": "downloading",
+        "downloaded_bytes": 0,
+        "total_bytes": 10**12,
+        "tmpfilename": "film.f137.mp4.part",
+        "filename": "film.f137.mp4",
+        "speed": 5_000_000.0,
+        "eta": 120,
+    }
+
+    def call():
+        d["downloaded_bytes"] += _BLOCK
+        hook(d)
+
+    per_call = bench(call)
+    print(
+        f"_hook ({'z kanalem' if channel else 'bez kanalu'}): {per_call * 1e6:.2f} us"
+    )
+
+    # throttle przepuszcza najwyzej kilka zdarzen na sekunde
+    assert len(events) < 50
+    if sys.gettrace() is None:
+        assert per_call < _BUDGET_PER_CALL_S
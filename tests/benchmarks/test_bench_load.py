@@ -0,0 +1,85 @@
+import sys
+import urllib.error
+import urllib.request
+from http.client import IncompleteRead
+
+import pytest
+
+from .load_harness import KINDS, LoadBench, format_report
+from .media_server import MediaFile, MediaServer, NetConfig
+
+# warunki sieci dla testu end-to-end: rtt, limit na polaczenie i troche bledow
+_NET = NetConfig(latency=0.05, rate=4_000_000, error_rate=0.05, seed=1)
+_JOBS = 3
+
+
+@pytest.fixture(scope="module")
+def load_bench(tmp_path_factory):
+    imageio_ffmpeg = pytest.importorskip("imageio_ffmpeg")
+    work = tmp_path_factory.mktemp("load")
+    with LoadBench(
+        imageio_ffmpeg.get_ffmpeg_exe(), work, _JOBS, _NET, seconds=2
+    ) as bench:
+        yield bench
+
+
+def _get(url, headers=None):
+    req = urllib.request.Request(url, headers=headers or {})
+    with urllib.request.urlopen(req, timeout=5) as resp:
+        return resp.status, resp.read()
+
+
+# test serwera: range, playlisty bez bledow, zerwanie i 503 dla mediow
+def test_media_server_ranges_and_errors():
+    files = {
+        "/a.mp4": MediaFile("video/mp4", bytes(range(256)) * 64),
+        "/hls/index.m3u8": MediaFile("application/vnd.apple.mpegurl", b"#EXTM3U\n"),
+        "/hls/seg000.m4s": MediaFile("video/mp4", b"\0" * 1000),
+    }
+    with MediaServer(files) as srv:
+        status, body = _get(srv.url("/a.mp4"), {"Range": "bytes=10-19"})
+        assert status == 206 and body == bytes(range(10, 20))
+        with pytest.raises(urllib.error.HTTPError):
+            _get(srv.url("/missing"))
+
+    with MediaServer(files, NetConfig(error_rate=1.0, seed=3)) as srv:
+        assert _get(srv.url("/hls/index.m3u8")) == (200, b"#EXTM3U\n")
+        with pytest.raises(IncompleteRead):
+            _get(srv.url("/a.mp4"))
+        statuses = set()
+        for _ in range(8):
+            try:
+                statuses.add(_get(srv.url("/hls/seg000.m4s"))[0])
+            except urllib.error.HTTPError as e:
+                statuses.add(e.code)
+            except IncompleteRead:
+                statuses.add("drop")
+        assert statuses == {503, "drop"}
+        assert srv.failures == 9
+
+
+# test end-to-end: zadania mp4/hls/mp3 przez ekstraktor generic przy 1 i 3
+# rownoleglych pobraniach; raport z przepustowoscia, ttfb i cpu na zadanie
+@pytest.mark.slow
+@pytest.mark.parametrize("kind", KINDS)
+def test_bench_load(load_bench, kind):
+    reports = [load_bench.run(kind, n) for n in (1, _JOBS)]
+    print("\n" + format_report(reports))
+
+    clip = len(load_bench.media["/clip.mp4"].body)
+    for report in reports:
+        assert report.failed == 0, [j.error for j in report.jobs]
+        for job in report.jobs:
+            # ekstrakcja i pierwsze zapytanie o media to co najmniej dwa rtt
+            assert job.ttfb is not None and job.ttfb >= 2 * _NET.latency
+            if kind != "hls":
+                assert job.nbytes == clip
+            assert job.nbytes > 0
+        outs = sorted(load_bench.work_dir.glob(f"out/{kind}-{report.concurrency}-*/*"))
+        assert len(outs) == _JOBS
+        assert all(p.suffix == (".mp3" if kind == "mp3" else ".mp4") for p in outs)
+
+    # pod coverage/debuggerem czasy nie sa miarodajne
+    if sys.gettrace() is None:
+        # limit jest na polaczenie, wiec rownolegle zadania sumuja przepustowosc
+        assert reports[1].throughput > reports[0].throughput * 1.5
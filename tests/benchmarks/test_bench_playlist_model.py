@@ -0,0 +1,90 @@
+import sys
+
+import pytest
+
+from app.ui.playlist_model import PlaylistModel
+
+# budzety czasu dla playlisty z 10 000 pozycji (1k dostaje 1/10)
+_FILL_BUDGET_S = 0.25
+_UPDATE_BUDGET_S = 0.5
+_TOGGLE_BUDGET_S = 0.05
+
+_FORMATS = [
+    ("137+bestaudio", "1080p + audio"),
+    ("136+bestaudio", "720p + audio"),
+    ("135+bestaudio", "480p + audio"),
+    ("22", "720p (mp4)"),
+    ("18", "360p (mp4)"),
+]
+
+
+def _entries(n):
+    return [
+        {"id": f"vid{i:07d}", "url": f"https://youtu.be/vid{i:07d}", "title": f"F{i}"}
+        for i in range(n)
+    ]
+
+
+# mikro-benchmark wypelnienia widoku playlisty i metadanych kazdego wiersza
+# (update_row przychodzi raz na wiersz z workera formatow)
+@pytest.mark.slow
+@pytest.mark.parametrize("rows", [1_000, 10_000])
+def test_bench_playlist_fill_and_update(bench, qtbot, rows):
+    from app.ui.ui_playlist import PlaylistView
+
+    entries = _entries(rows)
+    view = PlaylistView()
+    qtbot.addWidget(view)
+    view.show()
+
+    def update_all():
+        for r in range(rows):
+            view.update_row(r, thumb_url=None, duration=r, formats=_FORMATS)
+
+    fill = bench(lambda: view.reset_and_fill(entries), name="fill", number=1, repeat=3)
+    update = bench(update_all, name="update_row", number=1, repeat=3)
+    print(
+        f"playlista {rows}: wypelnienie {fill * 1e3:.1f} ms, "
+        f"update_row wszystkich {update * 1e3:.1f} ms"
+    )
+    assert view.model.rowCount() == rows
+    assert view.model.row(rows - 1).duration == rows - 1
+
+    # pod coverage/debuggerem czasy nie sa miarodajne
+    if sys.gettrace() is None:
+        assert fill < _FILL_BUDGET_S * rows / 10_000
+        assert update < _UPDATE_BUDGET_S * rows / 10_000
+
+
+# mikro-benchmark operacji zbiorczych na 10k wierszy
+@pytest.mark.slow
+def test_bench_playlist_model_10k(bench, qtbot):
+    from app.ui.ui_playlist import PlaylistView
+
+    entries = _entries(10_000)
+    view = PlaylistView()
+    qtbot.addWidget(view)
+    view.show()
+    model: PlaylistModel = view.model
+    view.reset_and_fill(entries)
+
+    toggle = bench(
+        lambda: (view.unselect_all(), view.select_all()),
+        name="toggle",
+        number=1,
+        repeat=5,
+    )
+    quality = bench(
+        lambda: model.apply_quality("bestaudio"), name="quality", number=1, repeat=5
+    )
+    print(
+        f"playlista 10k: zaznacz/odznacz {toggle * 1e3:.1f} ms, "
+        f"jakosc {quality * 1e3:.1f} ms"
+    )
+    assert model.rowCount() == 10_000
+    assert len(model.checked_items()) == 10_000
+
+    # pod coverage/debuggerem czasy nie sa miarodajne
+    if sys.gettrace() is None:
+        assert toggle < _TOGGLE_BUDGET_S
+        assert quality < _TOGGLE_BUDGET_S
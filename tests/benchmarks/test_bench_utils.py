@@ -0,0 +1,96 @@
+import random
+import sys
+
+import pytest
+
+from app.ui.playlist_model import fmt_duration
+from app.utils.filename import safe_filename
+from app.utils.url import extract_video_id
+
+_CORPUS = 10_000
+# budzety na jeden element korpusu
+_URL_BUDGET_S = 20e-6
+_NAME_BUDGET_S = 60e-6
+_DURATION_BUDGET_S = 10e-6
+
+_ALPHABET = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_"
+_WORDS = [
+    "Official",
+    "Video",
+    "Teledysk",
+    "Zażółć",
+    "gęślą",
+    "jaźń",
+    "4K",
+    "HDR",
+    "Live",
+    "[Remastered]",
+    "feat.",
+    "Ü",
+    "東京",
+    "🎵",
+]
+_ILLEGAL = '<>:"/\\|?*\t'
+
+
+# deterministyczny korpus linkow: wszystkie obslugiwane postacie + obce adresy
+def _urls(n):
+    rnd = random.Random(1)
+    forms = [
+        "https://www.youtube.com/watch?v={id}",
+        "https://www.youtube.com/watch?v={id}&list=PL{id}&index=3",
+        "https://youtu.be/{id}?t=42",
+        "https://www.youtube.com/embed/{id}",
+        "https://www.youtube.com/v/{id}?version=3",
+        "https://www.youtube.com/playlist?list=PL{id}",
+        "https://example.com/watch/{id}",
+    ]
+    out = []
+    for _ in range(n):
+        vid = "".join(rnd.choice(_ALPHABET) for _ in range(11))
+        out.append(rnd.choice(forms).format(id=vid))
+    return out
+
+
+# deterministyczny korpus tytulow: unicode, niedozwolone znaki, dlugie nazwy
+def _titles(n):
+    rnd = random.Random(2)
+    out = []
+    for _ in range(n):
+        words = [rnd.choice(_WORDS) for _ in range(rnd.randint(2, 40))]
+        for _ in range(rnd.randint(0, 4)):
+            words.insert(rnd.randrange(len(words) + 1), rnd.choice(_ILLEGAL))
+        out.append("  ".join(words))
+    return out
+
+
+# mikro-benchmark extract_video_id na 10k linkow
+@pytest.mark.slow
+def test_bench_extract_video_id(bench):
+    urls = _urls(_CORPUS)
+    per_corpus = bench(lambda: [extract_video_id(u) for u in urls], number=1, repeat=3)
+    print(f"extract_video_id: {per_corpus / _CORPUS * 1e6:.2f} us/link")
+    assert sum(1 for u in urls if extract_video_id(u)) > _CORPUS // 2
+    if sys.gettrace() is None:
+        assert per_corpus / _CORPUS < _URL_BUDGET_S
+
+
+# mikro-benchmark safe_filename na 10k tytulow
+@pytest.mark.slow
+def test_bench_safe_filename(bench):
+    titles = _titles(_CORPUS)
+    per_corpus = bench(lambda: [safe_filename(t) for t in titles], number=1, repeat=3)
+    print(f"safe_filename: {per_corpus / _CORPUS * 1e6:.2f} us/tytul")
+    assert all(len(safe_filename(t)) <= 180 for t in titles)
+    if sys.gettrace() is None:
+        assert per_corpus / _CORPUS < _NAME_BUDGET_S
+
+
+# mikro-benchmark fmt_duration (kolumna czasu, wolane przy kazdym malowaniu)
+@pytest.mark.slow
+def test_bench_fmt_duration(bench):
+    values = [None, "?", *range(0, 200_000, 200_000 // _CORPUS)][:_CORPUS]
+    per_corpus = bench(lambda: [fmt_duration(v) for v in values], number=1, repeat=3)
+    print(f"fmt_duration: {per_corpus / _CORPUS * 1e6:.2f} us/wartosc")
+    if sys.gettrace() is None:
+        assert per_corpus / _CORPUS < _DURATION_BUDGET_S
@@ -12,6 +12,60 @@ if root_path not in sys.path:
     sys.path.insert(0, root_path)
 
 
+# opcje mikro-benchmarkow (fixture bench w tests/benchmarks/conftest.py);
+# musza byc tutaj, bo pytest czyta opcje tylko z poczatkowych conftest
+def pytest_addoption(parser) -> None:
+    group = parser.getgroup("bench", "mikro-benchmarki")
+    group.addoption(
+        "--bench-save",
+        metavar="NAZWA",
+        default=None,
+        help="zapisz wyniki benchmarkow do .benchmarks/NAZWA.json",
+    )
+    group.addoption(
+        "--bench-compare",
+        metavar="NAZWA",
+        default=None,
+        help="porownaj z zapisanym przebiegiem (nazwa z .benchmarks lub sciezka)",
+    )
+    group.addoption(
+        "--bench-threshold",
+        metavar="PROCENT",
+        type=float,
+        default=25.0,
+        help="dopuszczalne spowolnienie wzgledem przebiegu bazowego (domyslnie 25)",
+    )
+
+
+# izoluje cache aplikacji od katalogu domowego i miedzy testami
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path: Path, monkeypatch) -> Path:
+    cache = tmp_path / "cache"
+    monkeypatch.setenv("JUSTDOWNIT_CACHE_DIR", str(cache))
+    monkeypatch.setattr("app.core.meta_cache._shared_cache", None)
+    monkeypatch.setattr("app.core.thumb_cache._shared_thumb_cache", None)
+    monkeypatch.setattr("app.core.queue_journal._shared_journal", None)
+    monkeypatch.setattr("app.core.download_archive._shared_archive", None)
+    monkeypatch.setattr("app.core.bandwidth._shared_limiter", None)
+    monkeypatch.setattr("app.core.postprocess._shared_pool", None)
+    from app.core.thumbnails import reset_probe_cache
+
+    reset_probe_cache()
+    return cache
+
+
+# czysci zapamietana sciezke ffmpeg i wyniki sondowania miedzy testami
+@pytest.fixture(autouse=True)
+def reset_ffmpeg_caches(monkeypatch) -> Generator[None, None, None]:
+    from app.core.ffmpeg_caps import FFmpegCapsCache
+    from app.core.paths import reset_ffmpeg_path_cache
+
+    reset_ffmpeg_path_cache()
+    monkeypatch.setattr("app.core.ffmpeg_caps._shared", FFmpegCapsCache())
+    yield
+    reset_ffmpeg_path_cache()
+
+
 # fixture dla tymczasowego katalogu
 @pytest.fixture
 def temp_dir() -> Generator[Path, None, None]: